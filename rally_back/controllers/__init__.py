@@ -3,14 +3,17 @@ This file contains all the controllers
 """
 from . import action_logs_controller
 from . import authent_controller
+from . import banned_term_controller
 from . import banned_users_controller
 from . import comment_controller
 from . import event_controller
 from . import like_controller
+from . import moderation_scan_controller
 from . import payment_controller
 from . import profile_controller
 from . import reason_controller
 from . import registration_controller
+from . import revenue_controller
 from . import signaled_comment_controller
 from . import signaled_event_controller
 from . import signaled_user_controller
@@ -5,8 +5,9 @@ from typing import Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
 from schemas.response_schemas.action_log_schema_response import ActionLogSchemaResponse, ActionLogListResponse
-from services import action_log_service, role_service, user_service
+from services import action_log_service
 from enums.action import ActionEnum
+from enums.count_mode import CountModeEnum
 from enums.log_level import LogLevelEnum
 from schemas.response_schemas.user_schema_response import UserResponse
 from schemas.response_schemas.role_schema_response import RoleSchemaResponse
@@ -18,7 +19,8 @@ def get_action_logs(
     user_id: Optional[int],
     log_type: Optional[LogLevelEnum],
     offset: int,
-    limit: int
+    limit: int,
+    count_mode: CountModeEnum = CountModeEnum.EXACT
 ) -> ActionLogListResponse:
     """
     Retrieve all action logs based on optional filtering parameters.
@@ -31,6 +33,7 @@ def get_action_logs(
         log_type (Optional[LogLevelEnum]): Filter by log level.
         offset (int): Number of items to skip for pagination.
         limit (int): Maximum number of items to return.
+        count_mode (CountModeEnum): Whether the total is exact, estimated from the planner statistics or omitted.
 
     Returns:
         ActionLogListResponse: List of action logs matching the filters.
@@ -49,11 +52,12 @@ def get_action_logs(
     all_logs = []
 
     for log in action_logs:
-        user = user_service.get_user(db, log.user_id)
+        # the users and their roles are loaded with the logs
+        user = log.user
 
         if user:
 
-            role = role_service.get_role_by_id(db, user.role_id)
+            role = user.role
 
             role_schema = RoleSchemaResponse(
                 id=role.id,
@@ -81,12 +85,22 @@ def get_action_logs(
                 date=log.date
             )
         )
-    total = action_log_service.get_action_logs_count(
-        db,
-        date,
-        action_type,
-        user_id,
-        log_type
-    )
+    total = None
+    if count_mode == CountModeEnum.EXACT:
+        total = action_log_service.get_action_logs_count(
+            db,
+            date,
+            action_type,
+            user_id,
+            log_type
+        )
+    elif count_mode == CountModeEnum.ESTIMATED:
+        total = action_log_service.get_action_logs_estimated_count(
+            db,
+            date,
+            action_type,
+            user_id,
+            log_type
+        )
 
     return ActionLogListResponse(count=len(all_logs), data=all_logs, total=total)
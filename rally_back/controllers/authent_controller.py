@@ -5,8 +5,10 @@ from datetime import datetime
 from fastapi import Depends, Cookie, Request, status, Header
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from models.user_model import User
-from database.db import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.principal import Principal
+from core.security import hash_password_async, password_pool
+from database.db import get_async_db, get_db
 from schemas.request_schemas.register_schema import RegisterSchema
 from services import action_log_service, authent_service, role_service, user_service
 from schemas.response_schemas.user_schema_response import UserResponse
@@ -54,7 +56,16 @@ async def register_user(
             detail="Password must be at least 8 characters long, include an uppercase letter and a number"
         )
 
-    new_user = authent_service.register_user(db, user.email, user.password, user.phone_number, user.first_name, user.last_name, user.photo)
+    hashed_password = await hash_password_async(user.password)
+    new_user = authent_service.register_user(
+        db,
+        user.email,
+        hashed_password,
+        user.phone_number,
+        user.first_name,
+        user.last_name,
+        user.photo
+    )
     role = role_service.get_role_by_id(db, new_user.role_id)
     action_log_service.create_action_log(
         db,
@@ -100,7 +111,16 @@ async def register_admin(
     if not authent_service.is_password_strong(user.password):
         raise WeakPasswordError(status_code=400, detail="Password must be at least 8 characters long, include an uppercase letter and a number")
 
-    new_user = authent_service.register_admin(db, user.email, user.password, user.phone_number, user.first_name, user.last_name, user.photo)
+    hashed_password = await hash_password_async(user.password)
+    new_user = authent_service.register_admin(
+        db,
+        user.email,
+        hashed_password,
+        user.phone_number,
+        user.first_name,
+        user.last_name,
+        user.photo
+    )
     role = role_service.get_role_by_id(db, new_user.role_id)
     action_log_service.create_action_log(
         db,
@@ -146,7 +166,16 @@ async def register_super_admin(
     if not authent_service.is_password_strong(user.password):
         raise WeakPasswordError(status_code=400, detail="Password must be at least 8 characters long, include an uppercase letter and a number")
 
-    new_user = authent_service.register_super_admin(db, user.email, user.password, user.phone_number, user.first_name, user.last_name, user.photo)
+    hashed_password = await hash_password_async(user.password)
+    new_user = authent_service.register_super_admin(
+        db,
+        user.email,
+        hashed_password,
+        user.phone_number,
+        user.first_name,
+        user.last_name,
+        user.photo
+    )
     role = role_service.get_role_by_id(db, new_user.role_id)
     action_log_service.create_action_log(
         db,
@@ -202,7 +231,9 @@ def verify_jwt(
         UserNotFoundError: If no user is found associated with the provided access token.
     """
     print(authorization, access_token)
-    user = authent_service.get_connected_user(db, authorization, access_token)
+    principal = authent_service.get_connected_user(db, authorization, access_token)
+    # the phone number is not part of the principal
+    user = user_service.get_user(db, principal.id)
     print("USER ", user)
     if not user:
         print("pas trouve")
@@ -229,7 +260,7 @@ def get_connected_user(
     access_token: str = Cookie(None),
     authorization: str = Header(None),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     """
     Retrieves the currently connected user based on the provided access token.
 
@@ -238,7 +269,7 @@ def get_connected_user(
         db (Session): The database session dependency used for user retrieval.
 
     Returns:
-        User: The user object corresponding to the provided access token.
+        Principal: The principal (id, email, role, verified and banned state) of the user the access token was issued to.
 
     Raises:
         UserNotFoundError: If no user is found associated with the provided access token.
@@ -249,11 +280,38 @@ def get_connected_user(
         raise UserNotFoundError(status_code=404, detail="L'utilisateur n'a pas été trouvé")
     return user
 
+async def get_connected_user_async(
+    access_token: str = Cookie(None),
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    Retrieves the currently connected user on the asyncio database session.
+
+    Routes using `get_async_db` depend on this one instead of `get_connected_user`, so that the user and
+    the route share the same asyncio session (and connection) for the whole request.
+
+    Args:
+        access_token (str, optional): The access token passed via a cookie to identify the user. Defaults to None.
+        authorization (str, optional): The bearer token passed via the Authorization header. Defaults to None.
+        db (AsyncSession): The asyncio database session dependency used for user retrieval.
+
+    Returns:
+        Principal: The principal (id, email, role, verified and banned state) of the user the access token was issued to.
+
+    Raises:
+        UserNotFoundError: If no user is found associated with the provided access token.
+    """
+    user = await authent_service.get_connected_user_async(db, authorization, access_token)
+    if not user:
+        raise UserNotFoundError(status_code=404, detail="L'utilisateur n'a pas été trouvé")
+    return user
+
 def get_current_user(
     access_token: str = Cookie(None),
     authorization: str = Header(None),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     """
     Fetches the current user based on the provided access token.
 
@@ -262,7 +320,7 @@ def get_current_user(
         db (Session): The database session dependency used for fetching the user from the database.
 
     Returns:
-        User: The user object associated with the provided access token.
+        Principal: The principal of the user the access token was issued to.
 
     Raises:
         UserNotFoundError: If no user is found with the given access token.
@@ -277,7 +335,7 @@ def get_current_admin(
     access_token: str = Cookie(None),
     authorization: str = Header(None),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     """
     Fetches the current admin user based on the provided access token.
 
@@ -286,7 +344,7 @@ def get_current_admin(
         db (Session): The database session dependency used for fetching the admin user from the database.
 
     Returns:
-        User: The admin user object associated with the provided access token.
+        Principal: The principal of the admin the access token was issued to.
 
     Raises:
         UserNotFoundError: If no admin user is found with the given access token.
@@ -300,7 +358,7 @@ def get_current_admin_or_super_admin(
     access_token: str = Cookie(None),
     authorization: str = Header(None),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     """
     Fetches the current admin or super admin user based on the provided access token.
 
@@ -309,7 +367,7 @@ def get_current_admin_or_super_admin(
         db (Session): The database session dependency used for fetching the user from the database.
 
     Returns:
-        User: The admin or super admin user object associated with the provided access token.
+        Principal: The principal of the admin or super admin the access token was issued to.
 
     Raises:
         UserNotFoundError: If no admin or super admin user is found with the given access token.
@@ -323,7 +381,7 @@ def get_current_super_admin(
     access_token: str = Cookie(None),
     authorization: str = Header(None),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     """
     Fetches the current super admin user based on the provided access token.
 
@@ -332,7 +390,7 @@ def get_current_super_admin(
         db (Session): The database session dependency used for fetching the user from the database.
 
     Returns:
-        User: The super admin user object associated with the provided access token.
+        Principal: The principal of the super admin the access token was issued to.
 
     Raises:
         UserNotFoundError: If no super admin user is found with the given access token.
@@ -473,7 +531,7 @@ def generate_link_reset_password(db: Session, user_email: str)->None:
         )
     return authent_service.send_mail_for_password_reset(db, user)
 
-def reset_password(db: Session, reset_password_schema: ResetPasswordSchema)->bool:
+async def reset_password(db: Session, reset_password_schema: ResetPasswordSchema)->bool:
     """
     Resets the user's password using the provided reset token and new password.
 
@@ -490,8 +548,23 @@ def reset_password(db: Session, reset_password_schema: ResetPasswordSchema)->boo
     if not authent_service.is_password_strong(reset_password_schema.new_password):
         raise WeakPasswordError(status_code=400, detail="Password must be at least 8 characters long, include an uppercase letter and a number")
 
-    return authent_service.reset_pwd(db,
+    return await authent_service.reset_pwd(db,
                                      reset_password_schema.token,
                                      reset_password_schema.new_password,
                                      reset_password_schema.confirm_password
                                     )
+
+
+def get_password_hashing_metrics() -> dict[str, float]:
+    """
+    Retrieves the metrics of the password hashing pool.
+
+    The bcrypt work of the logins and registrations runs on a bounded thread pool, off the event loop.
+    A growing number of waiting operations means the pool is saturated (burst of logins, cost factor too
+    high for the CPUs): the operations beyond `PASSWORD_HASH_MAX_PENDING` are refused with a 503.
+
+    Returns:
+        dict[str, float]: The workers, the waiting and running operations, and the counters since the start
+            (submitted, completed, rejected, highest queue depth, cumulated wait and run seconds).
+    """
+    return password_pool.stats()
@@ -0,0 +1,69 @@
+"""
+This file contains the controller related to the banned terms of the moderation
+"""
+from datetime import datetime
+from sqlalchemy.orm import Session
+from schemas.request_schemas.banned_term_schema import BannedTermSchema
+from schemas.response_schemas.banned_term_schema_response import BannedTermSchemaResponse
+from services import action_log_service, bad_words_service
+from enums.log_level import LogLevelEnum
+from enums.action import ActionEnum
+from models.user_model import User
+
+
+def create_banned_term(db: Session, banned_term: BannedTermSchema, current_user: User) -> BannedTermSchemaResponse:
+    """
+    Adds a banned term to the moderation, on top of the banned words file.
+
+    The term is normalized like the contents (accents, case, leetspeak), a "word" term only matches whole
+    words or phrases while a "substring" term matches inside other words too. The contents containing a term
+    of severity `MODERATION_BLOCK_SEVERITY` or above are refused. The matcher of this worker is rebuilt at
+    once, the other workers pick the term up at their next reload check.
+
+    Args:
+        db (Session): The database session used to interact with the database.
+        banned_term (BannedTermSchema): The term, its kind and its severity.
+        current_user (User): The super-admin performing the action.
+
+    Returns:
+        BannedTermSchemaResponse: The created banned term.
+
+    Logs the action of creating the banned term for auditing purposes.
+    """
+    created_term = bad_words_service.create_banned_term(db, banned_term.term, banned_term.kind, banned_term.severity)
+
+    action_log_service.create_action_log(
+        db,
+        current_user.id,
+        LogLevelEnum.INFO,
+        ActionEnum.BANNED_TERM_CREATED,
+        f"User {current_user.id} added banned term {created_term.id} at {datetime.now()} by {current_user.email}"
+    )
+
+    return BannedTermSchemaResponse.model_validate(created_term)
+
+
+def reload_banned_terms(db: Session, current_user: User) -> dict[str, int]:
+    """
+    Reloads the banned terms from the banned words file and the database, without restarting the API.
+
+    Args:
+        db (Session): The database session used to interact with the database.
+        current_user (User): The super-admin performing the action.
+
+    Returns:
+        dict[str, int]: The number of rules compiled in the matcher.
+
+    Logs the action of reloading the banned terms for auditing purposes.
+    """
+    rules = bad_words_service.load_banned_words(db)
+
+    action_log_service.create_action_log(
+        db,
+        current_user.id,
+        LogLevelEnum.INFO,
+        ActionEnum.BANNED_TERMS_RELOADED,
+        f"User {current_user.id} reloaded {rules} banned terms at {datetime.now()} by {current_user.email}"
+    )
+
+    return {"rules": rules}
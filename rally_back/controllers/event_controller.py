@@ -4,16 +4,22 @@ This file contains the controller related to events
 from typing import Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import JSONResponse
 from models.user_model import User
+from core import cache
 from schemas.response_schemas.profile_schema_response import ProfileRestrictedSchemaResponse
 from services import (
     action_log_service,
     address_service,
+    cache_service,
+    counter_service,
+    event_card_service,
     event_picture_service,
     event_service,
     moderation_service,
     profile_service,
+    search_service,
     user_service
 )
 from schemas.request_schemas.event_schema import EventSchema
@@ -25,9 +31,76 @@ from schemas.response_schemas.event_picture_schema_response import EventPictureS
 from models.event_picture_model import EventPicture
 from enums.log_level import LogLevelEnum
 from enums.action import ActionEnum
+from enums.count_mode import CountModeEnum
 from errors import NoStripeAccountError, EventNotFound, ProfileNotFound
 
 
+def add_pending_likes(
+    events: list[EventSchemaResponse],
+    event_likes: dict[int, int],
+    profile_likes: dict[int, int]
+) -> list[EventSchemaResponse]:
+    """
+    Adds buffered likes to the event responses.
+
+    Args:
+        events (list[EventSchemaResponse]): The event responses built from the persisted counters.
+        event_likes (dict[int, int]): The likes not yet flushed, by event ID.
+        profile_likes (dict[int, int]): The likes received not yet flushed, by profile ID.
+
+    Returns:
+        list[EventSchemaResponse]: The event responses with up to date like counters.
+    """
+    if not event_likes and not profile_likes:
+        return events
+
+    return [
+        event.model_copy(update={
+            "nb_likes": (event.nb_likes or 0) + event_likes.get(event.id, 0),
+            "profile": event.profile.model_copy(update={
+                "nb_like": (event.profile.nb_like or 0) + profile_likes.get(event.profile.id, 0)
+            })
+        }) if event.id in event_likes or event.profile.id in profile_likes else event
+        for event in events
+    ]
+
+
+def with_pending_likes(events: list[EventSchemaResponse]) -> list[EventSchemaResponse]:
+    """
+    Adds the likes not yet flushed to the database (buffered counters) to the event responses.
+
+    The responses are cached with the persisted counters only, the pending likes are added on every read.
+
+    Args:
+        events (list[EventSchemaResponse]): The event responses built from the persisted counters.
+
+    Returns:
+        list[EventSchemaResponse]: The event responses with up to date like counters.
+    """
+    return add_pending_likes(
+        events,
+        counter_service.get_pending_event_likes([event.id for event in events]),
+        counter_service.get_pending_profile_likes(list({event.profile.id for event in events}))
+    )
+
+
+async def with_pending_likes_async(events: list[EventSchemaResponse]) -> list[EventSchemaResponse]:
+    """
+    Asyncio counterpart of `with_pending_likes`, the buffer is read without blocking the event loop.
+
+    Args:
+        events (list[EventSchemaResponse]): The event responses built from the persisted counters.
+
+    Returns:
+        list[EventSchemaResponse]: The event responses with up to date like counters.
+    """
+    return add_pending_likes(
+        events,
+        await counter_service.get_pending_event_likes_async([event.id for event in events]),
+        await counter_service.get_pending_profile_likes_async(list({event.profile.id for event in events}))
+    )
+
+
 def create_event(db: Session, event: EventSchema, current_user: User) -> EventSchemaResponse:
     """
     Creates a new event, associates it with the current user, and handles address and pictures.
@@ -75,6 +148,8 @@ def create_event(db: Session, event: EventSchema, current_user: User) -> EventSc
     if current_user.is_planner is False:
         user_service.toggle_is_planner(db, current_user.id)
 
+    search_service.index_event(db, new_event.id)
+
     event_pictures = []
     for picture in event.pictures:
         pic = event_picture_service.create_event_picture(
@@ -88,6 +163,7 @@ def create_event(db: Session, event: EventSchema, current_user: User) -> EventSc
                 photo=pic.photo
             )
         )
+    event_card_service.refresh_event_card(db, new_event.id)
 
     profile =  ProfileRestrictedSchemaResponse(
         id=profile.id,
@@ -144,18 +220,29 @@ def create_event(db: Session, event: EventSchema, current_user: User) -> EventSc
     )
 
 
-def get_event_by_id(db: Session, event_id: int) -> EventSchemaResponse:
+def event_cache_tags(event: EventSchemaResponse) -> list[str]:
     """
-    Retrieves an event by its ID, along with related information including the profile of the user who created it,
-    event types, event pictures, and the event address.
+    Returns the cache tags of an event response.
+
+    Args:
+        event (EventSchemaResponse): The cached event response.
+
+    Returns:
+        list[str]: The tags invalidated when the event or the profile of its creator changes.
+    """
+    return [cache_service.event_tag(event.id), cache_service.profile_tag(event.profile.id)]
+
+
+def build_event_response(db: Session, event_id: int) -> EventSchemaResponse:
+    """
+    Builds the response of an event from the database, with the persisted like counters.
 
     Args:
         db (Session): The database session used to interact with the database.
-        id (int): The ID of the event to retrieve.
+        event_id (int): The ID of the event to retrieve.
 
     Returns:
-        EventSchemaResponse: The detailed event information, including the profile of the creator,
-                              event types, event pictures, and event address.
+        EventSchemaResponse: The event, with the profile of its creator, its types, pictures and address.
 
     Raises:
         EventNotFound: If no event is found with the provided ID.
@@ -230,6 +317,202 @@ def get_event_by_id(db: Session, event_id: int) -> EventSchemaResponse:
     )
 
 
+def get_event_by_id(db: Session, event_id: int) -> EventSchemaResponse:
+    """
+    Retrieves an event by its ID, along with related information including the profile of the user who created it,
+    event types, event pictures, and the event address.
+
+    Args:
+        db (Session): The database session used to interact with the database.
+        id (int): The ID of the event to retrieve.
+
+    Returns:
+        EventSchemaResponse: The detailed event information, including the profile of the creator,
+                              event types, event pictures, and event address.
+
+    Raises:
+        EventNotFound: If no event is found with the provided ID.
+        ProfileNotFound: If no profile is found for the user who created the event.
+    """
+    cache_key = cache_service.event_key(event_id)
+    event_response = cache.get_model(cache_key, EventSchemaResponse)
+    if event_response is None:
+        event_response = build_event_response(db, event_id)
+        cache.set_model(cache_key, event_response, cache_service.EVENT_TTL, event_cache_tags(event_response))
+    return with_pending_likes([event_response])[0]
+
+
+async def get_event_by_id_async(db: AsyncSession, event_id: int) -> EventSchemaResponse:
+    """
+    Asyncio counterpart of `get_event_by_id`: the cache and the buffered likes are awaited on the event loop,
+    only the database queries run in `run_sync`.
+
+    Args:
+        db (AsyncSession): The asyncio database session used to interact with the database.
+        event_id (int): The ID of the event to retrieve.
+
+    Returns:
+        EventSchemaResponse: The detailed event information.
+
+    Raises:
+        EventNotFound: If no event is found with the provided ID.
+        ProfileNotFound: If no profile is found for the user who created the event.
+    """
+    cache_key = cache_service.event_key(event_id)
+    event_response = await cache.get_model_async(cache_key, EventSchemaResponse)
+    if event_response is None:
+        event_response = await db.run_sync(build_event_response, event_id)
+        await cache.set_model_async(
+            cache_key,
+            event_response,
+            cache_service.EVENT_TTL,
+            event_cache_tags(event_response)
+        )
+    return (await with_pending_likes_async([event_response]))[0]
+
+
+def event_list_cache_key(
+    date_avant: Optional[datetime],
+    date_apres: Optional[datetime],
+    type_ids: Optional[list[int]],
+    profile_id: Optional[int],
+    country: Optional[str],
+    city: Optional[str],
+    popularity: Optional[bool],
+    recent: Optional[bool],
+    nb_places: Optional[int],
+    search: Optional[str],
+    offset: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    keyset: bool = False,
+    count_mode: CountModeEnum = CountModeEnum.EXACT
+) -> str:
+    """
+    Builds the cache key of a page of events, from the filters and the pagination of `get_events`.
+
+    Returns:
+        str: The cache key.
+    """
+    return cache.make_key(
+        "events:list",
+        date_avant=date_avant,
+        date_apres=date_apres,
+        type_ids=type_ids,
+        profile_id=profile_id,
+        country=country,
+        city=city,
+        popularity=popularity,
+        recent=recent,
+        nb_places=nb_places,
+        search=search,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+        keyset=keyset,
+        count_mode=count_mode
+    )
+
+
+def build_event_list_response(
+    db: Session,
+    date_avant: Optional[datetime],
+    date_apres: Optional[datetime],
+    type_ids: Optional[list[int]],
+    profile_id: Optional[int],
+    country: Optional[str],
+    city: Optional[str],
+    popularity: Optional[bool],
+    recent: Optional[bool],
+    nb_places: Optional[int],
+    search: Optional[str],
+    offset: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    keyset: bool = False,
+    count_mode: CountModeEnum = CountModeEnum.EXACT
+) -> EventListSchemaResponse:
+    """
+    Builds a page of events from the database, with the persisted like counters. The arguments are the ones
+    of `get_events`.
+
+    Returns:
+        EventListSchemaResponse: The events of the page, the total count and the cursor of the next page.
+
+    Raises:
+        ProfileNotFound: If the profile associated with an event cannot be found.
+        InvalidCursorError: If the cursor is invalid or does not match the requested ordering.
+    """
+    next_cursor = None
+    if keyset or cursor:
+        events, next_cursor = event_service.get_events_keyset(
+            db,
+            date_avant,
+            date_apres,
+            type_ids,
+            profile_id,
+            country,
+            city,
+            popularity,
+            recent,
+            search,
+            cursor,
+            limit
+        )
+    else:
+        events = event_service.get_events_filters(
+            db,
+            date_avant,
+            date_apres,
+            type_ids,
+            profile_id,
+            country,
+            city,
+            popularity,
+            recent,
+            nb_places,
+            search,
+            offset,
+            limit
+        )
+
+    all_events = [
+        EventSchemaResponse.model_validate(card)
+        for card in event_card_service.get_event_cards(db, [event.id for event in events])
+    ]
+
+    total_events = None
+    if count_mode == CountModeEnum.EXACT:
+        total_events = event_service.get_count_total_events(
+            db,
+            date_avant,
+            date_apres,
+            type_ids,
+            profile_id,
+            country,
+            city,
+            search
+        )
+    elif count_mode == CountModeEnum.ESTIMATED:
+        total_events = event_service.get_estimated_count_total_events(
+            db,
+            date_avant,
+            date_apres,
+            type_ids,
+            profile_id,
+            country,
+            city,
+            search
+        )
+
+    return EventListSchemaResponse(
+        count=len(all_events),
+        total=total_events,
+        data=all_events,
+        next_cursor=next_cursor
+    )
+
+
 def get_events(
     db: Session,
     date_avant: Optional[datetime],
@@ -243,13 +526,21 @@ def get_events(
     nb_places: Optional[int],
     search: Optional[str],
     offset: int,
-    limit: int
+    limit: int,
+    cursor: Optional[str] = None,
+    keyset: bool = False,
+    count_mode: CountModeEnum = CountModeEnum.EXACT
 ) -> EventListSchemaResponse:
     """
     Retrieves a list of events based on various filters, including date range, type, location, and search query.
     The events are returned with detailed information, such as the profile of the user who created the event,
     event types, event pictures, and event address.
 
+    Two pagination modes are available. The offset mode (default) skips `offset` rows. The keyset mode
+    (`keyset=True` or a `cursor` is given) seeks after the cursor returned by the previous page, so that deep
+    pages cost the same as the first one; it supports the popularity, recent and default orderings, the
+    `type_ids` filter is applied without its "all types matched first" ranking and `nb_places` is ignored.
+
     Args:
         db (Session): The database session used to interact with the database.
         date_avant (Optional[datetime]): The end date for the event search.
@@ -264,16 +555,19 @@ def get_events(
         search (Optional[str]): The search keyword to filter events by title or description.
         offset (int): The starting index for pagination.
         limit (int): The maximum number of events to retrieve.
+        cursor (Optional[str]): The `next_cursor` returned by the previous page (keyset mode).
+        keyset (bool): Whether to use the keyset mode for the first page.
+        count_mode (CountModeEnum): Whether the total is exact, estimated from the planner statistics or omitted.
 
     Returns:
         EventListSchemaResponse: A response containing the list of events matching the filter criteria,
-                                 along with the total count of events.
+                                 along with the total count of events and the cursor of the next page.
 
     Raises:
         ProfileNotFound: If the profile associated with an event cannot be found.
+        InvalidCursorError: If the cursor is invalid or does not match the requested ordering.
     """
-    events = event_service.get_events_filters(
-        db,
+    cache_key = event_list_cache_key(
         date_avant,
         date_apres,
         type_ids,
@@ -285,91 +579,109 @@ def get_events(
         nb_places,
         search,
         offset,
-        limit
+        limit,
+        cursor,
+        keyset,
+        count_mode
     )
+    events_response = cache.get_model(cache_key, EventListSchemaResponse)
+    if events_response is None:
+        events_response = build_event_list_response(
+            db,
+            date_avant,
+            date_apres,
+            type_ids,
+            profile_id,
+            country,
+            city,
+            popularity,
+            recent,
+            nb_places,
+            search,
+            offset,
+            limit,
+            cursor,
+            keyset,
+            count_mode
+        )
+        cache.set_model(cache_key, events_response, cache_service.EVENT_LIST_TTL, [cache_service.EVENT_LIST_TAG])
+    return events_response.model_copy(update={"data": with_pending_likes(events_response.data)})
 
-    all_events = []
-
-    for event in events:
-        profile = profile_service.get_profile(db, event.profile_id)
-
-        if not profile:
-            raise ProfileNotFound(status_code=404, detail="Le profil n'a pas été trouvé")
-
-        user = user_service.get_user(db, profile.user_id)
-
-        profile_schema =  ProfileRestrictedSchemaResponse(
-            id=profile.id,
-            first_name=profile.first_name,
-            last_name=profile.last_name,
-            photo=profile.photo,
-            nb_like=profile.nb_like,
-            email=user.email,
-            created_at=profile.created_at,
-            )
-
-        all_types = []
 
-        for type_ in event.types:
-            all_types.append(
-                TypeSchemaResponse(
-                    id=type_.id,
-                    type=type_.type
-                )
-            )
+async def get_events_async(
+    db: AsyncSession,
+    date_avant: Optional[datetime],
+    date_apres: Optional[datetime],
+    type_ids: Optional[list[int]],
+    profile_id: Optional[int],
+    country: Optional[str],
+    city: Optional[str],
+    popularity: Optional[bool],
+    recent: Optional[bool],
+    nb_places: Optional[int],
+    search: Optional[str],
+    offset: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    keyset: bool = False,
+    count_mode: CountModeEnum = CountModeEnum.EXACT
+) -> EventListSchemaResponse:
+    """
+    Asyncio counterpart of `get_events`: the cache and the buffered likes are awaited on the event loop,
+    only the database queries run in `run_sync`. The arguments are the ones of `get_events`.
 
-        event_pictures = []
-        for picture in event.pictures:
-            event_pictures.append(
-                EventPictureSchemaResponse(
-                    id=picture.id,
-                    photo=picture.photo
-                )
-            )
+    Returns:
+        EventListSchemaResponse: A response containing the list of events matching the filter criteria,
+                                 along with the total count of events and the cursor of the next page.
 
-        event_address = AddressSchemaResponse(
-            id=event.address.id,
-            city=event.address.city,
-            zipcode=event.address.zipcode,
-            number=event.address.number,
-            street=event.address.street,
-            country=event.address.country
-        )
-        all_events.append(
-            EventSchemaResponse(
-                id=event.id,
-                title=event.title,
-                description=event.description,
-                nb_places=event.nb_places,
-                price=event.price,
-                profile=profile_schema,
-                nb_likes=event.nb_likes,
-                nb_comments=event.nb_comments,
-                date=event.date,
-                cloture_billets=event.cloture_billets,
-                address=event_address,
-                created_at=event.created_at,
-                updated_at=event.updated_at,
-                types=all_types,
-                pictures=event_pictures
-            )
-        )
-    total_events = event_service.get_count_total_events(
-        db,
+    Raises:
+        ProfileNotFound: If the profile associated with an event cannot be found.
+        InvalidCursorError: If the cursor is invalid or does not match the requested ordering.
+    """
+    cache_key = event_list_cache_key(
         date_avant,
         date_apres,
         type_ids,
         profile_id,
         country,
         city,
-        search
-    )
-
-    return EventListSchemaResponse(
-        count=len(all_events),
-        total=total_events,
-        data=all_events
+        popularity,
+        recent,
+        nb_places,
+        search,
+        offset,
+        limit,
+        cursor,
+        keyset,
+        count_mode
     )
+    events_response = await cache.get_model_async(cache_key, EventListSchemaResponse)
+    if events_response is None:
+        events_response = await db.run_sync(
+            build_event_list_response,
+            date_avant,
+            date_apres,
+            type_ids,
+            profile_id,
+            country,
+            city,
+            popularity,
+            recent,
+            nb_places,
+            search,
+            offset,
+            limit,
+            cursor,
+            keyset,
+            count_mode
+        )
+        await cache.set_model_async(
+            cache_key,
+            events_response,
+            cache_service.EVENT_LIST_TTL,
+            [cache_service.EVENT_LIST_TAG]
+        )
+    return events_response.model_copy(update={"data": await with_pending_likes_async(events_response.data)})
 
 
 def update_event(db: Session, event_id: int, event: EventSchema) -> EventSchemaResponse:
@@ -415,6 +727,8 @@ def update_event(db: Session, event_id: int, event: EventSchema) -> EventSchemaR
     profile = profile_service.get_profile(db, event_.profile_id)
     user = user_service.get_user(db, profile.user_id)
     update_event_pictures(db, event_.pictures, event.pictures, event_.id)
+    search_service.index_event(db, event_.id)
+    event_card_service.refresh_event_card(db, event_.id)
 
     profile =  ProfileRestrictedSchemaResponse(
         id=profile.id,
@@ -502,14 +816,17 @@ def delete_event(db: Session, event_id: int, current_user: User) -> dict[str, st
     # ⚠️ user.id == profile.id by design
     user = user_service.get_user(db, event.profile_id)
 
-    moderation_service.delete_event(db, event_id, current_user.id)
+    # the event row is deleted in bulk, its attributes can not be reloaded afterwards
+    event_created_at = event.created_at
+
+    summary = moderation_service.delete_event(db, event_id, current_user.id)
 
     action_log_service.create_action_log(
         db,
         user.id,
         LogLevelEnum.INFO,
         ActionEnum.EVENT_DELETED,
-        f"Event {event.id} deleted at {event.created_at} by {user.email}"
+        f"Event {event_id} deleted at {event_created_at} by {user.email} ({summary})"
     )
     return JSONResponse(content={"msg": "event supprimé"})
 
@@ -545,6 +862,47 @@ def update_event_pictures(
     event_picture_service.add_picture_to_event(db, list(pics_to_add), event_id)
 
 
+def build_events_by_profile_response(
+    db: Session,
+    profile_id: int,
+    offset: int,
+    limit: int
+) -> EventListSchemaResponse:
+    """
+    Builds a page of the events of a profile from the database, with the persisted like counters.
+
+    Args:
+        db (Session): The database session used to interact with the database.
+        profile_id (int): The ID of the profile the events belong to.
+        offset (int): The number of events to skip.
+        limit (int): The number of events of the page.
+
+    Returns:
+        EventListSchemaResponse: The events of the page and the total number of events of the profile.
+    """
+    events = event_service.get_events_by_profile(
+        db,
+        profile_id,
+        offset,
+        limit
+    )
+
+    all_events = [
+        EventSchemaResponse.model_validate(card)
+        for card in event_card_service.get_event_cards(db, [event.id for event in events])
+    ]
+
+    total_events = event_service.get_count_total_events(
+        db=db,
+        profile_id=profile_id,
+    )
+    return EventListSchemaResponse(
+        total=total_events,
+        count=len(all_events),
+        data=all_events
+    )
+
+
 def get_events_by_profile(
     db: Session,
     profile_id: int,
@@ -566,82 +924,50 @@ def get_events_by_profile(
     Returns:
         EventListSchemaResponse: Un objet contenant la liste des événements récupérés et le nombre total d'événements.
     """
-    events = event_service.get_events_by_profile(
-        db,
-        profile_id,
-        offset,
-        limit
-    )
+    events_response = build_events_by_profile_response(db, profile_id, offset, limit)
+    return events_response.model_copy(update={"data": with_pending_likes(events_response.data)})
+
 
-    all_events = []
+async def get_events_by_profile_async(
+    db: AsyncSession,
+    profile_id: int,
+    offset: int,
+    limit: int
+) -> EventListSchemaResponse:
+    """
+    Asyncio counterpart of `get_events_by_profile`, the buffered likes are awaited on the event loop.
 
-    for event in events:
-        profile = profile_service.get_profile(db, event.profile_id)
-        user = user_service.get_user(db, profile.user_id)
+    Args:
+        db (AsyncSession): The asyncio database session used to interact with the database.
+        profile_id (int): The ID of the profile the events belong to.
+        offset (int): The number of events to skip.
+        limit (int): The number of events of the page.
 
-        profile =  ProfileRestrictedSchemaResponse(
-            id=profile.id,
-            first_name=profile.first_name,
-            last_name=profile.last_name,
-            photo=profile.photo,
-            nb_like=profile.nb_like,
-            email=user.email,
-            created_at=profile.created_at,
-            )
+    Returns:
+        EventListSchemaResponse: The events of the page and the total number of events of the profile.
+    """
+    events_response = await db.run_sync(build_events_by_profile_response, profile_id, offset, limit)
+    return events_response.model_copy(update={"data": await with_pending_likes_async(events_response.data)})
 
-        all_types = []
 
-        for type_ in event.types:
-            all_types.append(
-                TypeSchemaResponse(
-                    id=type_.id,
-                    type=type_.type
-                )
-            )
+def reindex_search(db: Session, current_user: User) -> dict[str, int]:
+    """
+    Rebuilds the search documents of every event (backfill after a deployment or a bulk import).
 
-        event_pictures = []
-        for picture in event.pictures:
-            event_pictures.append(
-                EventPictureSchemaResponse(
-                    id=picture.id,
-                    photo=picture.photo
-                )
-            )
+    Args:
+        db (Session): The database session used to interact with the database.
+        current_user (User): The super admin triggering the reindexation.
 
-        event_address = AddressSchemaResponse(
-            id=event.address.id,
-            city=event.address.city,
-            zipcode=event.address.zipcode,
-            number=event.address.number,
-            street=event.address.street,
-            country=event.address.country
-        )
-        all_events.append(
-            EventSchemaResponse(
-                id=event.id,
-                title=event.title,
-                description=event.description,
-                nb_places=event.nb_places,
-                price=event.price,
-                profile=profile,
-                nb_likes=event.nb_likes,
-                nb_comments=event.nb_comments,
-                date=event.date,
-                cloture_billets=event.cloture_billets,
-                address=event_address,
-                created_at=event.created_at,
-                updated_at=event.updated_at,
-                types=all_types,
-                pictures=event_pictures
-            )
-        )
+    Returns:
+        dict[str, int]: The number of indexed events.
+    """
+    indexed = search_service.reindex_all_events(db)
 
-    total_events = event_service.get_count_total_events(
-        db=db,
-        profile_id=profile_id,
-    )
-    return EventListSchemaResponse(
-        total=total_events,
-        count=len(all_events),
-        data=all_events
+    action_log_service.create_action_log(
+        db,
+        current_user.id,
+        LogLevelEnum.INFO,
+        ActionEnum.SEARCH_REINDEXED,
+        f"{indexed} events reindexed by {current_user.email}"
     )
+    return {"indexed": indexed}
@@ -2,14 +2,19 @@
 This file contains the controller related to likes
 """
 from sqlalchemy.orm import Session
+from models.user_model import User
 from schemas.response_schemas.profile_schema_response import ProfileRestrictedSchemaResponse
 from services import (
+    action_log_service,
+    counter_service,
     event_service,
     like_service,
     profile_service,
     user_service
 )
 from schemas.response_schemas.like_schema_response import LikeSchemaresponseSchemas,  LikeListSchemaresponseSchemas, IsLikedResponseSchema
+from enums.log_level import LogLevelEnum
+from enums.action import ActionEnum
 
 
 def unlike_event(db: Session, profile_id: int, event_id: int) -> dict[str, str]:
@@ -141,3 +146,29 @@ def is_event_liked_by_current(db: Session, event_id: int, current_user_id: int)
         return IsLikedResponseSchema(is_liked=False)
 
     return IsLikedResponseSchema(is_liked=True)
+
+
+def reconcile_counters(db: Session, current_user: User) -> dict[str, int]:
+    """
+    Recomputes the likes, comments and seats counters from the likes, comments and registrations tables.
+
+    The counters are kept up to date by the database on every like, comment and registration, this job
+    repairs the drift left by rows deleted outside the application or by older versions.
+
+    Args:
+        db (Session): The database session used to perform the operation.
+        current_user (User): The super admin triggering the reconciliation.
+
+    Returns:
+        dict[str, int]: The number of fixed counters by kind.
+    """
+    summary = counter_service.reconcile_counters(db)
+
+    action_log_service.create_action_log(
+        db,
+        current_user.id,
+        LogLevelEnum.INFO,
+        ActionEnum.COUNTERS_RECONCILED,
+        f"counters reconciled by {current_user.email}: {summary}"
+    )
+    return summary
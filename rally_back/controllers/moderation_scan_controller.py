@@ -0,0 +1,92 @@
+"""
+This file contains the controller related to the retroactive moderation scans
+"""
+from datetime import datetime
+from sqlalchemy.orm import Session
+from schemas.response_schemas.moderation_scan_schema_response import ModerationScanSchemaResponse
+from services import action_log_service, moderation_scan_service
+from enums.log_level import LogLevelEnum
+from enums.action import ActionEnum
+from models.user_model import User
+
+
+def create_moderation_scan(db: Session, current_user: User) -> ModerationScanSchemaResponse:
+    """
+    Queues a retroactive moderation scan of the existing comments and events.
+
+    The contents already published are never checked again when the banned terms change. The scan runs in
+    the background: the comments then the event titles and descriptions are read by batches of increasing
+    id, each batch in a short transaction, and checked with the current banned terms. The contents refused
+    by the moderation are signaled (pending) with the system reason, in the name of the super-admin who
+    triggered the scan, so that they show up in the usual moderation lists.
+
+    Args:
+        db (Session): The database session used to interact with the database.
+        current_user (User): The super-admin triggering the scan.
+
+    Returns:
+        ModerationScanSchemaResponse: The queued scan, its progress is followed with its id.
+
+    Logs the action of triggering the scan for auditing purposes.
+    """
+    moderation_scan = moderation_scan_service.create_moderation_scan(db, current_user.id)
+
+    action_log_service.create_action_log(
+        db,
+        current_user.id,
+        LogLevelEnum.INFO,
+        ActionEnum.MODERATION_SCAN_STARTED,
+        f"User {current_user.id} started moderation scan {moderation_scan.id} at {datetime.now()} by {current_user.email}"
+    )
+
+    return ModerationScanSchemaResponse.model_validate(moderation_scan)
+
+
+def get_moderation_scan(db: Session, moderation_scan_id: int) -> ModerationScanSchemaResponse:
+    """
+    Retrieves the progress of a moderation scan.
+
+    Args:
+        db (Session): The database session used to interact with the database.
+        moderation_scan_id (int): The ID of the scan.
+
+    Returns:
+        ModerationScanSchemaResponse: The status of the scan, its checkpoint (last comment and event checked)
+            and the number of contents checked and signaled.
+
+    Raises:
+        ModerationScanNotFoundError: If the scan does not exist.
+    """
+    return ModerationScanSchemaResponse.model_validate(moderation_scan_service.get_moderation_scan(db, moderation_scan_id))
+
+
+def resume_moderation_scan(db: Session, moderation_scan_id: int, current_user: User) -> ModerationScanSchemaResponse:
+    """
+    Queues again a failed moderation scan, it resumes from its checkpoint: the contents already checked are
+    not read again and no content is signaled twice.
+
+    Args:
+        db (Session): The database session used to interact with the database.
+        moderation_scan_id (int): The ID of the scan.
+        current_user (User): The super-admin resuming the scan.
+
+    Returns:
+        ModerationScanSchemaResponse: The queued scan.
+
+    Raises:
+        ModerationScanNotFoundError: If the scan does not exist.
+        ModerationScanNotResumableError: If the scan did not fail.
+
+    Logs the action of resuming the scan for auditing purposes.
+    """
+    moderation_scan = moderation_scan_service.resume_moderation_scan(db, moderation_scan_id)
+
+    action_log_service.create_action_log(
+        db,
+        current_user.id,
+        LogLevelEnum.INFO,
+        ActionEnum.MODERATION_SCAN_STARTED,
+        f"User {current_user.id} resumed moderation scan {moderation_scan.id} at {datetime.now()} by {current_user.email}"
+    )
+
+    return ModerationScanSchemaResponse.model_validate(moderation_scan)
@@ -1,15 +1,26 @@
 """
 This file contains the controller related to payments
 """
-import os
 from datetime import datetime
 from typing import Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-import stripe
-from services import event_service, payment_service, profile_service, registration_service, user_service
+from fastapi.responses import FileResponse, StreamingResponse
+from services import (
+    action_log_service,
+    event_service,
+    invoice_service,
+    payment_service,
+    profile_service,
+    registration_service,
+    user_service,
+    webhook_service
+)
 from models.user_model import User
+from enums.export_format import ExportFormatEnum
 from enums.payment_status import PaymentStatusEnum
+from enums.log_level import LogLevelEnum
+from enums.action import ActionEnum
 from schemas.response_schemas.payment_schema_response import (
     PaymentSchemaResponse,
     PaymentListSchemaResponse,
@@ -17,8 +28,6 @@ from schemas.response_schemas.payment_schema_response import (
     PaymentRestrictedListSchemaResponse
 )
 
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
-
 def create_check_out_session(db: Session, event_id: int, current_user: User)->dict[str, str]:
     """
     Creates a checkout session for a user to pay for event registration.
@@ -116,22 +125,24 @@ def get_onboarding_url(db: Session, current_user: User)->dict[str, str]:
     # user_service.update_stripe_account(db, current_user.id, account["id"])
     return {"onboarding_url": onboarding_url}
 
-def handle_webhooks(event: dict, db: Session):
+def receive_webhook(db: Session, event: dict) -> dict[str, str]:
     """
-    Handles incoming Stripe webhook events and processes them.
+    Stores an incoming Stripe webhook event in the inbox and acknowledges it.
 
-    This function receives a webhook event from Stripe, processes it using the
-    `payment_service.handle_stripe_webhook_event` method, and updates the database
-    accordingly based on the event type.
+    The event is not processed during the request: it is written to the `webhook_events` table, keyed by
+    its Stripe event id, and processed by the webhook workers in order, with retries. A redelivery of an
+    event already received is acknowledged without being stored again.
 
     Args:
-        event (dict): The webhook event data sent by Stripe.
         db (Session): The database session to interact with the database.
+        event (dict): The verified webhook event sent by Stripe.
 
     Returns:
-        The result of processing the webhook event through the `payment_service.handle_stripe_webhook_event` method.
+        dict[str, str]: "queued" for a new event, "duplicate" for a redelivery.
     """
-    return payment_service.handle_stripe_webhook_event(event, db)
+    if webhook_service.receive_stripe_event(db, event):
+        return {"status": "queued"}
+    return {"status": "duplicate"}
 
 def get_payments(
     db: Session,
@@ -247,6 +258,91 @@ def get_payments(
     return PaymentListSchemaResponse(count=len(all_payments), data=all_payments, total=total)
 
 
+def export_payments(
+    db: Session,
+    current_user: User,
+    event_title: Optional[str],
+    buyer_email: Optional[str],
+    organizer_email: Optional[str],
+    amount_min: Optional[float],
+    amount_max: Optional[float],
+    fee_min: Optional[float],
+    fee_max: Optional[float],
+    brut_amount_min: Optional[float],
+    brut_amount_max: Optional[float],
+    stripe_session_id: Optional[str],
+    stripe_payment_intent_id: Optional[str],
+    status: Optional[PaymentStatusEnum],
+    date_apres: Optional[datetime],
+    date_avant: Optional[datetime],
+    export_format: ExportFormatEnum
+) -> StreamingResponse:
+    """
+    Exports all the payments matching the filters of `get_payments`, as a CSV or NDJSON download.
+
+    The payments are not paginated: they are read by batches with a server-side cursor and sent in chunks as
+    they are read, so the memory used does not grow with the export and the download starts at once, a month
+    of payments is exported in one call. The export uses its own database session, kept open until the last
+    chunk is sent.
+
+    Args:
+        db (Session): The database session of the request, used to log the export.
+        current_user (User): The super-admin exporting the payments.
+        event_title (Optional[str]): Filter payments by event title.
+        buyer_email (Optional[str]): Filter payments by buyer's email.
+        organizer_email (Optional[str]): Filter payments by organizer's email.
+        amount_min (Optional[float]): Filter payments by minimum amount.
+        amount_max (Optional[float]): Filter payments by maximum amount.
+        fee_min (Optional[float]): Filter payments by minimum fee.
+        fee_max (Optional[float]): Filter payments by maximum fee.
+        brut_amount_min (Optional[float]): Filter payments by minimum brut amount.
+        brut_amount_max (Optional[float]): Filter payments by maximum brut amount.
+        stripe_session_id (Optional[str]): Filter payments by Stripe session ID.
+        stripe_payment_intent_id (Optional[str]): Filter payments by Stripe payment intent ID.
+        status (Optional[PaymentStatusEnum]): Filter payments by payment status.
+        date_apres (Optional[datetime]): Filter payments after this date.
+        date_avant (Optional[datetime]): Filter payments before this date.
+        export_format (ExportFormatEnum): CSV (with a header line) or NDJSON (one JSON object per line).
+
+    Returns:
+        StreamingResponse: The streamed export, sent as an attachment.
+
+    Logs the action of exporting the payments for auditing purposes.
+    """
+    action_log_service.create_action_log(
+        db,
+        current_user.id,
+        LogLevelEnum.INFO,
+        ActionEnum.PAYMENTS_EXPORTED,
+        f"User {current_user.id} exported payments as {export_format.value} at {datetime.now()} by {current_user.email}"
+    )
+
+    chunks = payment_service.stream_payments_export(
+        event_title,
+        buyer_email,
+        organizer_email,
+        amount_min,
+        amount_max,
+        fee_min,
+        fee_max,
+        brut_amount_min,
+        brut_amount_max,
+        stripe_session_id,
+        stripe_payment_intent_id,
+        status,
+        date_apres,
+        date_avant,
+        export_format=export_format
+    )
+    media_type = "text/csv" if export_format == ExportFormatEnum.CSV else "application/x-ndjson"
+    filename = f"payments-{datetime.now():%Y%m%d-%H%M%S}.{export_format.value}"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 def get_payments_for_user(
     db: Session,
     current_user: User,
@@ -319,3 +415,61 @@ def get_payments_for_user(
         )
 
     return PaymentRestrictedListSchemaResponse(count=len(all_payments), data=all_payments)
+
+
+def download_invoice(db: Session, payment_id: int, current_user: User) -> FileResponse:
+    """
+    Downloads the document of a payment: the invoice for the buyer (and the super-admins), the receipt for
+    the organizer.
+
+    The documents are rendered once and stored by payment id, the next downloads (and the emails already
+    sent) serve the stored file. A document is rendered again when the payment changes, e.g. its status.
+
+    Args:
+        db (Session): The database session to interact with the database.
+        payment_id (int): The ID of the payment.
+        current_user (User): The user downloading the document.
+
+    Returns:
+        FileResponse: The HTML document of the payment.
+
+    Raises:
+        PaymentNotFound: If the payment does not exist.
+        InvoiceAccessForbiddenError: If the user is neither the buyer nor the organizer of the payment.
+    """
+    path = invoice_service.get_invoice_for_user(db, payment_id, current_user)
+    return FileResponse(path, media_type="text/html", filename=f"facture-{payment_id}.html")
+
+
+def resend_event_invoices(db: Session, event_id: int, current_user: User) -> dict[str, int]:
+    """
+    Sends again the invoices and receipts of the successful payments of an event.
+
+    The documents of the whole event are rendered in one batch, split between the rendering processes when
+    the event has many payments, then stored and queued for emailing.
+
+    Args:
+        db (Session): The database session to interact with the database.
+        event_id (int): The ID of the event.
+        current_user (User): The super-admin sending the invoices again.
+
+    Returns:
+        dict[str, int]: The number of payments whose invoice and receipt were sent again.
+
+    Raises:
+        EventNotFound: If the event does not exist.
+
+    Logs the action of sending the invoices again for auditing purposes.
+    """
+    event_service.get_event_by_id(db, event_id)
+    resent = invoice_service.resend_event_invoices(db, event_id)
+
+    action_log_service.create_action_log(
+        db,
+        current_user.id,
+        LogLevelEnum.INFO,
+        ActionEnum.INVOICES_RESENT,
+        f"User {current_user.id} resent {resent} invoices of event {event_id} at {datetime.now()} by {current_user.email}"
+    )
+
+    return {"resent": resent}
@@ -3,6 +3,7 @@ This file contains the controller related to profiles
 """
 from typing import Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
 from schemas.response_schemas.user_schema_response import UserResponse
@@ -16,6 +17,7 @@ from schemas.response_schemas.profile_schema_response import (
 from schemas.request_schemas.profile_schema import ProfileSchema, ModifyProfileSchema
 from services import (
     action_log_service,
+    counter_service,
     moderation_service,
     profile_service,
     role_service,
@@ -26,21 +28,16 @@ from enums.log_level import LogLevelEnum
 from enums.action import ActionEnum
 
 
-def get_profile(db: Session, profile_id: int) -> ProfileSchemaResponse:
+def build_profile_response(db: Session, profile_id: int) -> ProfileSchemaResponse:
     """
-    Retrieves a profile by its ID, along with the associated user and role details.
-
-    This function fetches a user's profile by ID, then retrieves the associated user and their role
-    information. It returns a profile response containing the profile details, user information,
-    and role associated with the user.
+    Builds the response of a profile from the database, with the persisted like counter.
 
     Args:
         db (Session): The database session to interact with the database.
-        id (int): The ID of the profile to retrieve.
+        profile_id (int): The ID of the profile to retrieve.
 
     Returns:
-        ProfileSchemaResponse: A response containing the profile details along with the associated user
-                               and role information.
+        ProfileSchemaResponse: The profile with its user and role.
 
     Raises:
         HTTPException: If the profile is not found, a 404 HTTPException is raised with the message
@@ -74,6 +71,61 @@ def get_profile(db: Session, profile_id: int) -> ProfileSchemaResponse:
             )
     raise HTTPException(status_code=404, detail="Profile not found")
 
+def with_pending_profile_likes(profile: ProfileSchemaResponse, pending_likes: dict[int, int]) -> ProfileSchemaResponse:
+    """
+    Adds the likes received not yet flushed to the database (buffered counters) to a profile response.
+
+    Args:
+        profile (ProfileSchemaResponse): The profile response built from the persisted counter.
+        pending_likes (dict[int, int]): The buffered likes by profile ID.
+
+    Returns:
+        ProfileSchemaResponse: The profile response with an up to date like counter.
+    """
+    if not pending_likes.get(profile.id):
+        return profile
+    return profile.model_copy(update={"nb_like": (profile.nb_like or 0) + pending_likes[profile.id]})
+
+def get_profile(db: Session, profile_id: int) -> ProfileSchemaResponse:
+    """
+    Retrieves a profile by its ID, along with the associated user and role details.
+
+    This function fetches a user's profile by ID, then retrieves the associated user and their role
+    information. It returns a profile response containing the profile details, user information,
+    and role associated with the user.
+
+    Args:
+        db (Session): The database session to interact with the database.
+        id (int): The ID of the profile to retrieve.
+
+    Returns:
+        ProfileSchemaResponse: A response containing the profile details along with the associated user
+                               and role information.
+
+    Raises:
+        HTTPException: If the profile is not found, a 404 HTTPException is raised with the message
+                        "Profile not found".
+    """
+    profile = build_profile_response(db, profile_id)
+    return with_pending_profile_likes(profile, counter_service.get_pending_profile_likes([profile.id]))
+
+async def get_profile_async(db: AsyncSession, profile_id: int) -> ProfileSchemaResponse:
+    """
+    Asyncio counterpart of `get_profile`, the buffered likes are awaited on the event loop.
+
+    Args:
+        db (AsyncSession): The asyncio database session to interact with the database.
+        profile_id (int): The ID of the profile to retrieve.
+
+    Returns:
+        ProfileSchemaResponse: The profile with its user and role.
+
+    Raises:
+        HTTPException: If the profile is not found.
+    """
+    profile = await db.run_sync(build_profile_response, profile_id)
+    return with_pending_profile_likes(profile, await counter_service.get_pending_profile_likes_async([profile.id]))
+
 def update_profile(db: Session, profile_schema: ModifyProfileSchema, profile_id: int) -> ProfileSchemaResponse:
     """
     Updates a user's profile and associated user details.
@@ -5,7 +5,8 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from schemas.request_schemas.reason_schema import ReasonSchema
 from schemas.response_schemas.reason_schema_response import ReasonSchemaResponse, ReasonListSchemaResponse
-from services import action_log_service, reason_service
+from core import cache
+from services import action_log_service, cache_service, reason_service
 from enums.log_level import LogLevelEnum
 from enums.action import ActionEnum
 from models.user_model import User
@@ -54,6 +55,10 @@ def get_reasons(db: Session) -> ReasonListSchemaResponse:
 
     This function fetches the reasons with the given pagination parameters and returns them.
     """
+    cached_reasons = cache.get_model(cache_service.REASONS_TAG, ReasonListSchemaResponse)
+    if cached_reasons is not None:
+        return cached_reasons
+
     reasons = reason_service.get_reasons(db)
     all_reasons = []
     for reason in reasons:
@@ -63,10 +68,17 @@ def get_reasons(db: Session) -> ReasonListSchemaResponse:
                 reason=reason.reason
             )
         )
-    return ReasonListSchemaResponse(
+    reasons_response = ReasonListSchemaResponse(
         count=len(all_reasons),
         data=all_reasons
     )
+    cache.set_model(
+        cache_service.REASONS_TAG,
+        reasons_response,
+        cache_service.REFERENCE_TTL,
+        [cache_service.REASONS_TAG]
+    )
+    return reasons_response
 
 def get_reason_by_id(db: Session, reason_id: int) -> ReasonSchemaResponse:
     """
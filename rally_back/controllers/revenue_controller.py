@@ -0,0 +1,100 @@
+"""
+This file contains the controller related to the daily revenues of the organizers and events
+"""
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from schemas.response_schemas.revenue_schema_response import RevenueListSchemaResponse, RevenueSchemaResponse
+from services import action_log_service, revenue_service
+from enums.log_level import LogLevelEnum
+from enums.action import ActionEnum
+from enums.payment_status import PaymentStatusEnum
+from models.user_model import User
+
+
+def _to_list_response(revenues: list) -> RevenueListSchemaResponse:
+    data = [RevenueSchemaResponse.model_validate(revenue) for revenue in revenues]
+    return RevenueListSchemaResponse(count=len(data), data=data)
+
+
+def get_organizer_revenues(
+    db: Session,
+    organizer_id: Optional[int],
+    date_apres: Optional[date],
+    date_avant: Optional[date],
+    status: Optional[PaymentStatusEnum]
+) -> RevenueListSchemaResponse:
+    """
+    Retrieves the daily revenues of an organizer, or of every organizer, between two days.
+
+    The revenues are read from the daily rollups kept up to date on every payment status change: one row per
+    organizer, day and payment status with the number of payments and the sums of their gross (brut_amount),
+    fee and net (amount) amounts. A date range costs one indexed scan of the rollups instead of a walk over
+    the payments.
+
+    Args:
+        db (Session): The database session used to interact with the database.
+        organizer_id (Optional[int]): The ID of the organizer, all the organizers when None.
+        date_apres (Optional[date]): The first day of the range, included.
+        date_avant (Optional[date]): The last day of the range, included.
+        status (Optional[PaymentStatusEnum]): Only the payments with this status (e.g. success for the revenue).
+
+    Returns:
+        RevenueListSchemaResponse: The daily revenues, by day.
+    """
+    return _to_list_response(revenue_service.get_organizer_revenues(db, organizer_id, date_apres, date_avant, status))
+
+
+def get_event_revenues(
+    db: Session,
+    event_id: Optional[int],
+    organizer_id: Optional[int],
+    date_apres: Optional[date],
+    date_avant: Optional[date],
+    status: Optional[PaymentStatusEnum]
+) -> RevenueListSchemaResponse:
+    """
+    Retrieves the daily revenues of an event, or of the events of an organizer, between two days.
+
+    Args:
+        db (Session): The database session used to interact with the database.
+        event_id (Optional[int]): The ID of the event, all the events when None.
+        organizer_id (Optional[int]): Only the events of this organizer, all the organizers when None.
+        date_apres (Optional[date]): The first day of the range, included.
+        date_avant (Optional[date]): The last day of the range, included.
+        status (Optional[PaymentStatusEnum]): Only the payments with this status.
+
+    Returns:
+        RevenueListSchemaResponse: The daily revenues, by day and event.
+    """
+    return _to_list_response(
+        revenue_service.get_event_revenues(db, event_id, organizer_id, date_apres, date_avant, status)
+    )
+
+
+def rebuild_revenues(db: Session, current_user: User) -> dict[str, int]:
+    """
+    Recomputes the daily revenues of the organizers and events from the payments table.
+
+    The rollups are maintained on every payment creation and status change, this job fills them for the
+    payments made before they existed and repairs the drift left by payments changed outside the application.
+
+    Args:
+        db (Session): The database session used to perform the operation.
+        current_user (User): The super admin triggering the rebuild.
+
+    Returns:
+        dict[str, int]: The number of rollup rows written by table.
+
+    Logs the action of rebuilding the revenues for auditing purposes.
+    """
+    summary = revenue_service.rebuild_revenues(db)
+
+    action_log_service.create_action_log(
+        db,
+        current_user.id,
+        LogLevelEnum.INFO,
+        ActionEnum.REVENUES_REBUILT,
+        f"User {current_user.id} rebuilt the revenues at {datetime.now()} by {current_user.email}: {summary}"
+    )
+    return summary
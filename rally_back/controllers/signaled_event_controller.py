@@ -16,6 +16,7 @@ from schemas.response_schemas.address_schema_response import AddressSchemaRespon
 from schemas.response_schemas.event_schema_response import EventSchemaResponse
 from services import (
     action_log_service,
+    event_card_service,
     event_picture_service,
     event_service,
     moderation_service,
@@ -69,6 +70,11 @@ def get_signaled_events(db: Session) -> SignaledEventListSchemaResponse:
     """
     signaled_events = signaled_event_service.get_signaled_events(db)
 
+    event_ids = [signaled_comment.event_id for signaled_comment in signaled_events]
+    event_cards = {
+        card["id"]: card for card in event_card_service.get_event_cards(db, event_ids)
+    }
+
     all_signaled_events = []
 
     for signaled_comment in signaled_events:
@@ -80,78 +86,7 @@ def get_signaled_events(db: Session) -> SignaledEventListSchemaResponse:
             reason=reason.reason
         )
 
-
-        event = event_service.get_event_by_id(db, signaled_comment.event_id)
-        profile_event = profile_service.get_profile(db, event.profile_id)
-        user = user_service.get_user(db, profile_event.user_id)
-        role = role_service.get_role_by_id(db, user.role_id)
-        role = RoleSchemaResponse(
-            id=role.id,
-            role=role.role
-        )
-        user = UserResponse(
-            id=user.id,
-            email=user.email,
-            phone_number=user.phone_number,
-            is_planner=user.is_planner,
-            role=role,
-            account_id=user.account_id
-        )
-        profile =  ProfileRestrictedSchemaResponse(
-            id=profile_event.id,
-            first_name=profile_event.first_name,
-            last_name=profile_event.last_name,
-            photo=profile_event.photo,
-            nb_like=profile_event.nb_like,
-            email=user.email,
-            created_at=profile_event.created_at,
-            )
-
-        all_types = []
-
-        for type_ in type_service.get_event_types(db, event.id):
-            all_types.append(
-                TypeSchemaResponse(
-                    id=type_.id,
-                    type=type_.type
-                )
-            )
-
-        event_pictures = []
-        for picture in event_picture_service.get_pictures_from_event(db, event.id):
-            event_pictures.append(
-                EventPictureSchemaResponse(
-                    id=picture.id,
-                    photo=picture.photo
-                )
-            )
-
-        event_address = AddressSchemaResponse(
-            id=event.address.id,
-            city=event.address.city,
-            zipcode=event.address.zipcode,
-            number=event.address.number,
-            street=event.address.street,
-            country=event.address.country
-        )
-
-        event_schema =  EventSchemaResponse(
-            id=event.id,
-            title=event.title,
-            description=event.description,
-            nb_places=event.nb_places,
-            price=event.price,
-            profile=profile,
-            nb_likes=event.nb_likes,
-            nb_comments=event.nb_comments,
-            date=event.date,
-            cloture_billets=event.cloture_billets,
-            address=event_address,
-            created_at=event.created_at,
-            updated_at=event.updated_at,
-            types=all_types,
-            pictures=event_pictures
-        )
+        event_schema = EventSchemaResponse.model_validate(event_cards[signaled_comment.event_id])
 
         all_signaled_events.append(
             SignaledEventSchemaResponse(
@@ -214,6 +149,11 @@ def get_signaled_events_filters(
         limit
     )
 
+    event_ids = [signaled_comment.event_id for signaled_comment in signaled_events]
+    event_cards = {
+        card["id"]: card for card in event_card_service.get_event_cards(db, event_ids)
+    }
+
     all_signaled_events = []
 
     for signaled_comment in signaled_events:
@@ -225,80 +165,7 @@ def get_signaled_events_filters(
             reason=reason.reason
         )
 
-
-        #### SEARCH FOR PROFILE THAT POSTED EVENT ######
-
-        event = event_service.get_event_by_id(db, signaled_comment.event_id)
-        profile_event = profile_service.get_profile(db, event.profile_id)
-        user = user_service.get_user(db, profile_event.user_id)
-        role = role_service.get_role_by_id(db, user.role_id)
-        role = RoleSchemaResponse(
-            id=role.id,
-            role=role.role
-        )
-        user = UserResponse(
-            id=user.id,
-            email=user.email,
-            phone_number=user.phone_number,
-            is_planner=user.is_planner,
-            role=role,
-            account_id=user.account_id
-        )
-        profile =  ProfileRestrictedSchemaResponse(
-            id=profile_event.id,
-            first_name=profile_event.first_name,
-            last_name=profile_event.last_name,
-            photo=profile_event.photo,
-            nb_like=profile_event.nb_like,
-            email=user.email,
-            created_at=profile_event.created_at
-        )
-
-        all_types = []
-
-        for type_ in type_service.get_event_types(db, event.id):
-            all_types.append(
-                TypeSchemaResponse(
-                    id=type_.id,
-                    type=type_.type
-                )
-            )
-
-        event_pictures = []
-        for picture in event_picture_service.get_pictures_from_event(db, event.id):
-            event_pictures.append(
-                EventPictureSchemaResponse(
-                    id=picture.id,
-                    photo=picture.photo
-                )
-            )
-
-        event_address = AddressSchemaResponse(
-            id=event.address.id,
-            city=event.address.city,
-            zipcode=event.address.zipcode,
-            number=event.address.number,
-            street=event.address.street,
-            country=event.address.country
-        )
-
-        event_schema =  EventSchemaResponse(
-            id=event.id,
-            title=event.title,
-            description=event.description,
-            nb_places=event.nb_places,
-            price=event.price,
-            profile=profile,
-            nb_likes=event.nb_likes,
-            nb_comments=event.nb_comments,
-            date=event.date,
-            cloture_billets=event.cloture_billets,
-            address=event_address,
-            created_at=event.created_at,
-            updated_at=event.updated_at,
-            types=all_types,
-            pictures=event_pictures
-        )
+        event_schema = EventSchemaResponse.model_validate(event_cards[signaled_comment.event_id])
 
         all_signaled_events.append(
             SignaledEventSchemaResponse(
@@ -3,7 +3,8 @@ This file contains the controller related to types
 """
 from datetime import datetime
 from sqlalchemy.orm import Session
-from services import action_log_service, type_service
+from core import cache
+from services import action_log_service, cache_service, type_service
 from schemas.request_schemas.type_schema import TypeSchema
 from schemas.response_schemas.type_schema_response import TypeSchemaResponse, TypeListSchemaResponse
 from enums.log_level import LogLevelEnum
@@ -77,6 +78,10 @@ def get_types(db: Session) -> TypeListSchemaResponse:
         TypeListSchemaResponse: A response object containing the count of event types
         and a list of event types with their IDs and names.
     """
+    cached_types = cache.get_model(cache_service.TYPES_TAG, TypeListSchemaResponse)
+    if cached_types is not None:
+        return cached_types
+
     types = type_service.get_types(db)
 
     all_types = []
@@ -89,10 +94,17 @@ def get_types(db: Session) -> TypeListSchemaResponse:
             )
         )
 
-    return TypeListSchemaResponse(
+    types_response = TypeListSchemaResponse(
         count=len(all_types),
         data=all_types
     )
+    cache.set_model(
+        cache_service.TYPES_TAG,
+        types_response,
+        cache_service.REFERENCE_TTL,
+        [cache_service.TYPES_TAG]
+    )
+    return types_response
 
 
 def delete_type(db: Session, type_id: int, current_user: User) -> dict[str, str]:
@@ -71,7 +71,7 @@ def update_user(db: Session, user: UserSchema, user_id: int) -> UserResponse:
         account_id=user.account_id
     )
 
-def delete_user(db: Session, user_id: int) -> dict[str, str]:
+def delete_user(db: Session, user_id: int, current_user_id: int) -> dict[str, str]:
     """
     Deletes a user from the database.
 
@@ -81,11 +81,12 @@ def delete_user(db: Session, user_id: int) -> dict[str, str]:
     Args:
         db (Session): The database session used to interact with the database.
         id (int): The ID of the user to delete.
+        current_user_id (int): The ID of the admin deleting the user.
 
     Returns:
         dict[str, str]: A dictionary with a message indicating that the user has been reported.
     """
-    moderation_service.delete_user(db, user_id)
+    moderation_service.delete_user(db, user_id, current_user_id)
     return {"msg": "le user a  été signalé"}
 
 def search_users(db: Session, search: Optional[str], offset: int, limit: int) -> UserListResponse:
@@ -1,4 +1,14 @@
 """
 This file contains the security file
 """
+from . import background
+from . import cache
+from . import counter_buffer
+from . import date_range
+from . import log_writer
+from . import pagination
+from . import principal
 from . import security
+from . import stripe_client
+from . import templates
+from . import throttle
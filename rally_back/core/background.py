@@ -0,0 +1,59 @@
+"""
+This file contains the background loops: daemon threads running a job at a fixed interval, started and
+stopped with the application (or by a standalone worker process)
+"""
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundLoop:
+    """Runs `job` every `interval` seconds in a daemon thread until stopped."""
+
+    def __init__(self, name: str, job: Callable[[], None], interval: float):
+        self.name = name
+        self.job = job
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """
+        Tells whether the loop thread is started.
+
+        Returns:
+            bool: True if the loop is running.
+        """
+        return self._thread is not None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.job()
+            except Exception:  # pylint: disable=broad-exception-caught
+                # the loop must survive a failed run, the job is retried on the next tick
+                logger.exception("%s failed", self.name)
+
+    def start(self) -> None:
+        """Starts the loop thread, does nothing if it is already started."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the loop thread and waits for the current run to end."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def run_forever(self) -> None:
+        """Runs the loop in the current thread (standalone worker process) until `stop` is called."""
+        self._stop.clear()
+        self._run()
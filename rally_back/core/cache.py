@@ -0,0 +1,469 @@
+"""
+This file contains the response cache: an in-process LRU tier in front of an optional Redis tier
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, TypeVar
+
+from pydantic import BaseModel
+import redis
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# memory: in-process LRU only, redis: in-process LRU in front of redis, none: no cache.
+# The memory backend is single process: an invalidation is not seen by the other workers, which keep
+# serving their entries until they expire. Redis is the default as soon as REDIS_URL is set.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "redis" if os.getenv("REDIS_URL") else "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_PREFIX = os.getenv("CACHE_PREFIX", "rally:cache:")
+CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", "60"))
+CACHE_LOCAL_MAXSIZE = int(os.getenv("CACHE_LOCAL_MAXSIZE", "1024"))
+# in front of redis, entries invalidated by another worker stay visible locally at most this long
+CACHE_LOCAL_TTL = int(os.getenv("CACHE_LOCAL_TTL", "5"))
+# lifetime of the redis tag sets, entries never outlive it
+CACHE_TAG_TTL = 86400
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class MemoryBackend:
+    """Thread safe LRU cache with per entry expiration and tags."""
+
+    def __init__(self, maxsize: int, max_ttl: Optional[int] = None):
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self._entries: OrderedDict[str, tuple[float, str, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Fetches an entry unless it expired.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[str]: The cached value or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: str, ttl: int, tags: Iterable[str] = ()) -> None:
+        """
+        Stores an entry, the least recently used ones are evicted beyond `maxsize`.
+
+        Args:
+            key (str): The cache key.
+            value (str): The serialized value.
+            ttl (int): The time to live in seconds, capped by `max_ttl`.
+            tags (Iterable[str]): The tags the entry is invalidated with.
+        """
+        if self.max_ttl is not None:
+            ttl = min(ttl, self.max_ttl)
+        tags = tuple(tags)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def delete(self, keys: Iterable[str]) -> None:
+        """
+        Removes entries.
+
+        Args:
+            keys (Iterable[str]): The cache keys.
+        """
+        with self._lock:
+            for key in keys:
+                self._discard(key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        """
+        Removes every entry stored with one of the tags.
+
+        Args:
+            tags (Iterable[str]): The tags to invalidate.
+        """
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._discard(key)
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+
+class RedisBackend:
+    """
+    Redis cache, tags are stored as redis sets of keys. Redis errors are logged and ignored.
+
+    The asyncio routes read and write it with the `_async` methods, so that a slow redis does not
+    block the event loop.
+    """
+
+    def __init__(self, url: str, prefix: str):
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.async_client = aioredis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.prefix = prefix
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Fetches a value from redis.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[str]: The cached value or None on a miss or a redis error.
+        """
+        try:
+            value = self.client.get(self.prefix + key)
+        except redis.RedisError as error:
+            logger.warning("cache get failed: %s", error)
+            return None
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str, ttl: int, tags: Iterable[str] = ()) -> None:
+        """
+        Stores a value and adds its key to the redis set of each tag.
+
+        Args:
+            key (str): The cache key.
+            value (str): The serialized value.
+            ttl (int): The time to live in seconds.
+            tags (Iterable[str]): The tags the entry is invalidated with.
+        """
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(self.prefix + key, value, ex=min(ttl, CACHE_TAG_TTL))
+            for tag in tags:
+                pipe.sadd(self._tag_key(tag), self.prefix + key)
+                pipe.expire(self._tag_key(tag), CACHE_TAG_TTL)
+            pipe.execute()
+        except redis.RedisError as error:
+            logger.warning("cache set failed: %s", error)
+
+    async def get_async(self, key: str) -> Optional[str]:
+        """
+        Fetches a value from redis without blocking the event loop.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[str]: The cached value or None on a miss or a redis error.
+        """
+        try:
+            value = await self.async_client.get(self.prefix + key)
+        except redis.RedisError as error:
+            logger.warning("cache get failed: %s", error)
+            return None
+        return value.decode() if value is not None else None
+
+    async def set_async(self, key: str, value: str, ttl: int, tags: Iterable[str] = ()) -> None:
+        """
+        Stores a value and its tags in redis without blocking the event loop.
+
+        Args:
+            key (str): The cache key.
+            value (str): The serialized value.
+            ttl (int): The time to live in seconds.
+            tags (Iterable[str]): The tags the entry is invalidated with.
+        """
+        try:
+            pipe = self.async_client.pipeline()
+            pipe.set(self.prefix + key, value, ex=min(ttl, CACHE_TAG_TTL))
+            for tag in tags:
+                pipe.sadd(self._tag_key(tag), self.prefix + key)
+                pipe.expire(self._tag_key(tag), CACHE_TAG_TTL)
+            await pipe.execute()
+        except redis.RedisError as error:
+            logger.warning("cache set failed: %s", error)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        """
+        Removes entries from redis.
+
+        Args:
+            keys (Iterable[str]): The cache keys.
+        """
+        keys = [self.prefix + key for key in keys]
+        if not keys:
+            return
+        try:
+            self.client.delete(*keys)
+        except redis.RedisError as error:
+            logger.warning("cache delete failed: %s", error)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        """
+        Removes the entries listed in the redis set of each tag, and the sets.
+
+        Args:
+            tags (Iterable[str]): The tags to invalidate.
+        """
+        try:
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                keys = self.client.smembers(tag_key)
+                self.client.delete(tag_key, *keys)
+        except redis.RedisError as error:
+            logger.warning("cache invalidation failed: %s", error)
+
+    def clear(self) -> None:
+        """Removes every key of the cache prefix from redis."""
+        try:
+            for key in self.client.scan_iter(match=self.prefix + "*"):
+                self.client.delete(key)
+        except redis.RedisError as error:
+            logger.warning("cache clear failed: %s", error)
+
+
+_local: Optional[MemoryBackend] = None
+_remote: Optional[RedisBackend] = None
+
+
+def configure(backend: str = CACHE_BACKEND) -> None:
+    """
+    (Re)configures the cache tiers.
+
+    Args:
+        backend (str): "memory" (in-process LRU only), "redis" (in-process LRU in front of redis)
+            or "none" (cache disabled).
+    """
+    global _local, _remote  # pylint: disable=global-statement
+    _local, _remote = None, None
+    if backend == "memory":
+        _local = MemoryBackend(CACHE_LOCAL_MAXSIZE)
+    elif backend == "redis":
+        _local = MemoryBackend(CACHE_LOCAL_MAXSIZE, max_ttl=CACHE_LOCAL_TTL)
+        _remote = RedisBackend(REDIS_URL, CACHE_PREFIX)
+
+
+def make_key(namespace: str, **params) -> str:
+    """
+    Builds a cache key from a namespace and the parameters the cached value depends on.
+
+    Args:
+        namespace (str): The namespace of the key, e.g. "events:list".
+        **params: The parameters, serialized in a stable order.
+
+    Returns:
+        str: The cache key.
+    """
+    if not params:
+        return namespace
+    serialized = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+    return f"{namespace}:{hashlib.sha1(serialized.encode()).hexdigest()}"
+
+
+def get(key: str) -> Optional[str]:
+    """
+    Fetches a cached value, from the in-process tier first then from redis.
+
+    Args:
+        key (str): The cache key.
+
+    Returns:
+        Optional[str]: The cached value or None on a miss.
+    """
+    if _local is None:
+        return None
+    value = _local.get(key)
+    if value is None and _remote is not None:
+        value = _remote.get(key)
+        if value is not None:
+            _local.set(key, value, CACHE_LOCAL_TTL)
+    return value
+
+
+def put(key: str, value: str, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+    """
+    Stores a value in every tier.
+
+    Args:
+        key (str): The cache key.
+        value (str): The serialized value.
+        ttl (Optional[int]): The time to live in seconds, defaults to `CACHE_DEFAULT_TTL`.
+        tags (Iterable[str]): The tags the entry is invalidated with.
+    """
+    if _local is None:
+        return
+    tags = list(tags)
+    ttl = ttl or CACHE_DEFAULT_TTL
+    _local.set(key, value, ttl, tags)
+    if _remote is not None:
+        _remote.set(key, value, ttl, tags)
+
+
+async def get_async(key: str) -> Optional[str]:
+    """
+    Asyncio counterpart of `get`, the redis tier is awaited instead of blocking the event loop.
+
+    Args:
+        key (str): The cache key.
+
+    Returns:
+        Optional[str]: The cached value or None on a miss.
+    """
+    if _local is None:
+        return None
+    value = _local.get(key)
+    if value is None and _remote is not None:
+        value = await _remote.get_async(key)
+        if value is not None:
+            _local.set(key, value, CACHE_LOCAL_TTL)
+    return value
+
+
+async def put_async(key: str, value: str, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+    """
+    Asyncio counterpart of `put`.
+
+    Args:
+        key (str): The cache key.
+        value (str): The serialized value.
+        ttl (Optional[int]): The time to live in seconds, defaults to `CACHE_DEFAULT_TTL`.
+        tags (Iterable[str]): The tags the entry is invalidated with.
+    """
+    if _local is None:
+        return
+    tags = list(tags)
+    ttl = ttl or CACHE_DEFAULT_TTL
+    _local.set(key, value, ttl, tags)
+    if _remote is not None:
+        await _remote.set_async(key, value, ttl, tags)
+
+
+def delete(*keys: str) -> None:
+    """
+    Removes entries from every tier.
+
+    Args:
+        *keys (str): The cache keys.
+    """
+    if _local is None:
+        return
+    _local.delete(keys)
+    if _remote is not None:
+        _remote.delete(keys)
+
+
+def invalidate_tags(*tags: str) -> None:
+    """
+    Removes every entry stored with one of the given tags from every tier.
+
+    Args:
+        *tags (str): The tags to invalidate.
+    """
+    if _local is None:
+        return
+    _local.invalidate_tags(tags)
+    if _remote is not None:
+        _remote.invalidate_tags(tags)
+
+
+def clear() -> None:
+    """Removes every entry from every tier."""
+    if _local is None:
+        return
+    _local.clear()
+    if _remote is not None:
+        _remote.clear()
+
+
+def get_model(key: str, model: type[ModelT]) -> Optional[ModelT]:
+    """
+    Fetches a cached response model.
+
+    Args:
+        key (str): The cache key.
+        model (type[ModelT]): The pydantic model the value was serialized from.
+
+    Returns:
+        Optional[ModelT]: The response model or None on a miss.
+    """
+    value = get(key)
+    if value is None:
+        return None
+    return model.model_validate_json(value)
+
+
+def set_model(key: str, response: BaseModel, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+    """
+    Stores a response model serialized as JSON.
+
+    Args:
+        key (str): The cache key.
+        response (BaseModel): The response model to cache.
+        ttl (Optional[int]): The time to live in seconds.
+        tags (Iterable[str]): The tags the entry is invalidated with.
+    """
+    put(key, response.model_dump_json(), ttl, tags)
+
+
+async def get_model_async(key: str, model: type[ModelT]) -> Optional[ModelT]:
+    """
+    Asyncio counterpart of `get_model`.
+
+    Args:
+        key (str): The cache key.
+        model (type[ModelT]): The pydantic model the value was serialized from.
+
+    Returns:
+        Optional[ModelT]: The response model or None on a miss.
+    """
+    value = await get_async(key)
+    if value is None:
+        return None
+    return model.model_validate_json(value)
+
+
+async def set_model_async(key: str, response: BaseModel, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+    """
+    Asyncio counterpart of `set_model`.
+
+    Args:
+        key (str): The cache key.
+        response (BaseModel): The response model to cache.
+        ttl (Optional[int]): The time to live in seconds.
+        tags (Iterable[str]): The tags the entry is invalidated with.
+    """
+    await put_async(key, response.model_dump_json(), ttl, tags)
+
+
+configure()
@@ -0,0 +1,413 @@
+"""
+This file contains the write-behind buffer of the likes counters: like and unlike deltas are collected
+in memory (or in Redis, shared by every worker) and flushed to the database in batches
+"""
+import logging
+import os
+import threading
+from typing import Iterable, Optional, Union
+
+import redis
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# none: counters are updated by every like (default), memory: per process buffer, redis: shared buffer
+COUNTER_BUFFER = os.getenv("COUNTER_BUFFER", "none")
+COUNTER_FLUSH_INTERVAL_MS = int(os.getenv("COUNTER_FLUSH_INTERVAL_MS", "500"))
+COUNTER_PREFIX = os.getenv("COUNTER_PREFIX", "rally:counters:")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+EVENT_LIKES = "event_likes"
+PROFILE_LIKES = "profile_likes"
+KINDS = (EVENT_LIKES, PROFILE_LIKES)
+
+Deltas = dict[str, dict[int, int]]
+
+
+class MemoryBuffer:
+    """
+    Per process buffer. The drained deltas stay visible (in flight) until the flush is acknowledged,
+    a retried batch keeps its id.
+    """
+
+    def __init__(self):
+        self._pending: Deltas = {kind: {} for kind in KINDS}
+        self._in_flight: Deltas = {kind: {} for kind in KINDS}
+        self._lock = threading.Lock()
+        self.batch_id: Optional[str] = None
+
+    def add(self, kind: str, key: int, delta: int) -> bool:
+        """
+        Adds a delta to a buffered counter.
+
+        Args:
+            kind (str): The counter kind, `EVENT_LIKES` or `PROFILE_LIKES`.
+            key (int): The id of the event or profile.
+            delta (int): The delta to add.
+
+        Returns:
+            bool: Always True, the per process buffer cannot fail.
+        """
+        with self._lock:
+            counters = self._pending[kind]
+            counters[key] = counters.get(key, 0) + delta
+        return True
+
+    def pending(self, kind: str, keys: Iterable[int]) -> dict[int, int]:
+        """
+        Returns the buffered and in flight deltas.
+
+        Args:
+            kind (str): The counter kind, `EVENT_LIKES` or `PROFILE_LIKES`.
+            keys (Iterable[int]): The ids of the events or profiles.
+
+        Returns:
+            dict[int, int]: The non zero deltas by id.
+        """
+        with self._lock:
+            pending, in_flight = self._pending[kind], self._in_flight[kind]
+            deltas = {key: pending.get(key, 0) + in_flight.get(key, 0) for key in keys}
+        return {key: delta for key, delta in deltas.items() if delta}
+
+    async def pending_async(self, kind: str, keys: Iterable[int]) -> dict[int, int]:
+        """
+        Asyncio counterpart of `pending`, the per process buffer never waits on I/O.
+
+        Args:
+            kind (str): The counter kind.
+            keys (Iterable[int]): The ids of the events or profiles.
+
+        Returns:
+            dict[int, int]: The non zero deltas by id.
+        """
+        return self.pending(kind, keys)
+
+    def drain(self) -> Deltas:
+        """
+        Moves the buffered deltas in flight, or returns the batch of a failed flush again.
+
+        Returns:
+            Deltas: The in flight deltas by kind and id.
+        """
+        with self._lock:
+            if any(self._in_flight.values()):
+                # the previous flush failed and was not restored, it is retried first
+                return {kind: dict(counters) for kind, counters in self._in_flight.items()}
+            self._in_flight = {
+                kind: {key: delta for key, delta in counters.items() if delta}
+                for kind, counters in self._pending.items()
+            }
+            self._pending = {kind: {} for kind in KINDS}
+            self.batch_id = new_batch_id()
+            return {kind: dict(counters) for kind, counters in self._in_flight.items()}
+
+    def acknowledge(self) -> None:
+        """Forgets the in flight deltas once they are persisted."""
+        with self._lock:
+            self._in_flight = {kind: {} for kind in KINDS}
+            self.batch_id = None
+
+    def restore(self) -> None:
+        """Gives the in flight deltas back to the buffer after a failed flush."""
+        with self._lock:
+            for kind, counters in self._in_flight.items():
+                pending = self._pending[kind]
+                for key, delta in counters.items():
+                    pending[key] = pending.get(key, 0) + delta
+            self._in_flight = {kind: {} for kind in KINDS}
+            self.batch_id = None
+
+
+class RedisBuffer:
+    """
+    Buffer shared by every worker, one redis hash per kind. A flush renames the hashes to in flight
+    hashes under a lock, so only one worker applies a given delta. The id of the in flight batch is
+    kept next to them until the batch is acknowledged.
+    """
+
+    LOCK_TTL_MS = 30000
+
+    def __init__(self, url: str, prefix: str):
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.async_client = aioredis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.prefix = prefix
+        self._lock_key = f"{prefix}lock"
+        self._lock_token: Optional[str] = None
+        self._batch_key = f"{prefix}in_flight:batch_id"
+        self.batch_id: Optional[str] = None
+
+    def _key(self, kind: str) -> str:
+        return f"{self.prefix}{kind}"
+
+    def _in_flight_key(self, kind: str) -> str:
+        return f"{self.prefix}in_flight:{kind}"
+
+    def add(self, kind: str, key: int, delta: int) -> bool:
+        """
+        Adds a delta to a buffered counter hash.
+
+        Args:
+            kind (str): The counter kind, `EVENT_LIKES` or `PROFILE_LIKES`.
+            key (int): The id of the event or profile.
+            delta (int): The delta to add.
+
+        Returns:
+            bool: False on a redis error, the delta must then be written directly.
+        """
+        try:
+            self.client.hincrby(self._key(kind), str(key), delta)
+        except redis.RedisError as error:
+            logger.warning("counter buffer add failed: %s", error)
+            return False
+        return True
+
+    def pending(self, kind: str, keys: Iterable[int]) -> dict[int, int]:
+        """
+        Returns the buffered and in flight deltas.
+
+        Args:
+            kind (str): The counter kind, `EVENT_LIKES` or `PROFILE_LIKES`.
+            keys (Iterable[int]): The ids of the events or profiles.
+
+        Returns:
+            dict[int, int]: The non zero deltas by id, empty on a redis error.
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        fields = [str(key) for key in keys]
+        try:
+            pipe = self.client.pipeline()
+            pipe.hmget(self._key(kind), fields)
+            pipe.hmget(self._in_flight_key(kind), fields)
+            pending, in_flight = pipe.execute()
+        except redis.RedisError as error:
+            logger.warning("counter buffer read failed: %s", error)
+            return {}
+        deltas = {
+            key: int(pending[index] or 0) + int(in_flight[index] or 0)
+            for index, key in enumerate(keys)
+        }
+        return {key: delta for key, delta in deltas.items() if delta}
+
+    async def pending_async(self, kind: str, keys: Iterable[int]) -> dict[int, int]:
+        """
+        Asyncio counterpart of `pending`, the hashes are read without blocking the event loop.
+
+        Args:
+            kind (str): The counter kind.
+            keys (Iterable[int]): The ids of the events or profiles.
+
+        Returns:
+            dict[int, int]: The non zero deltas by id, empty on a redis error.
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        fields = [str(key) for key in keys]
+        try:
+            pipe = self.async_client.pipeline()
+            pipe.hmget(self._key(kind), fields)
+            pipe.hmget(self._in_flight_key(kind), fields)
+            pending, in_flight = await pipe.execute()
+        except redis.RedisError as error:
+            logger.warning("counter buffer read failed: %s", error)
+            return {}
+        deltas = {
+            key: int(pending[index] or 0) + int(in_flight[index] or 0)
+            for index, key in enumerate(keys)
+        }
+        return {key: delta for key, delta in deltas.items() if delta}
+
+    def drain(self) -> Deltas:
+        """
+        Takes the flush lock and moves the buffered hashes in flight, unless a failed flush left a batch to retry.
+
+        Returns:
+            Deltas: The in flight deltas by kind and id, empty when another worker is flushing.
+        """
+        token = os.urandom(8).hex()
+        try:
+            if not self.client.set(self._lock_key, token, nx=True, px=self.LOCK_TTL_MS):
+                # another worker is flushing
+                return {}
+            self._lock_token = token
+            batch_id = self.client.get(self._batch_key)
+            if batch_id is None:
+                # no batch left by a failed flush: the new deltas become the in flight batch
+                batch_id = new_batch_id().encode()
+                for kind in KINDS:
+                    if self.client.exists(self._key(kind)):
+                        self.client.renamenx(self._key(kind), self._in_flight_key(kind))
+                self.client.set(self._batch_key, batch_id)
+            self.batch_id = batch_id.decode()
+            deltas = {}
+            for kind in KINDS:
+                deltas[kind] = {
+                    int(key): int(delta)
+                    for key, delta in self.client.hgetall(self._in_flight_key(kind)).items()
+                    if int(delta)
+                }
+            return deltas
+        except redis.RedisError as error:
+            logger.warning("counter buffer drain failed: %s", error)
+            self._release()
+            return {}
+
+    def _release(self) -> None:
+        token, self._lock_token = self._lock_token, None
+        if token is None:
+            return
+        try:
+            if self.client.get(self._lock_key) == token.encode():
+                self.client.delete(self._lock_key)
+        except redis.RedisError as error:
+            logger.warning("counter buffer unlock failed: %s", error)
+
+    def acknowledge(self) -> None:
+        """Deletes the in flight hashes and their batch id, releases the flush lock."""
+        if self._lock_token is None:
+            # nothing was drained by this worker, the in flight batch belongs to another one
+            return
+        try:
+            self.client.delete(self._batch_key, *(self._in_flight_key(kind) for kind in KINDS))
+        except redis.RedisError as error:
+            logger.warning("counter buffer acknowledge failed: %s", error)
+        self.batch_id = None
+        self._release()
+
+    def restore(self) -> None:
+        """Releases the flush lock, the in flight batch is retried by the next drain."""
+        # the in flight hashes and their batch id are kept, the next drain retries them
+        self.batch_id = None
+        self._release()
+
+
+def new_batch_id() -> str:
+    """
+    Generates the id of a batch of drained deltas.
+
+    Returns:
+        str: A random id.
+    """
+    return os.urandom(16).hex()
+
+
+_buffer: Optional[Union[MemoryBuffer, RedisBuffer]] = None
+
+
+def configure(backend: str = COUNTER_BUFFER) -> None:
+    """
+    (Re)configures the counter buffer.
+
+    Args:
+        backend (str): "none" (counters updated on every like), "memory" (per process buffer)
+            or "redis" (buffer shared by every worker).
+    """
+    global _buffer  # pylint: disable=global-statement
+    _buffer = None
+    if backend == "memory":
+        _buffer = MemoryBuffer()
+    elif backend == "redis":
+        _buffer = RedisBuffer(REDIS_URL, COUNTER_PREFIX)
+
+
+def enabled() -> bool:
+    """
+    Tells whether the counters are buffered.
+
+    Returns:
+        bool: True if a buffer is configured.
+    """
+    return _buffer is not None
+
+
+def add(kind: str, key: int, delta: int) -> bool:
+    """
+    Adds a delta to a buffered counter.
+
+    Args:
+        kind (str): The counter kind, `EVENT_LIKES` or `PROFILE_LIKES`.
+        key (int): The id of the event or profile.
+        delta (int): The delta to add.
+
+    Returns:
+        bool: False if the delta could not be buffered and must be written directly.
+    """
+    if _buffer is None:
+        return False
+    return _buffer.add(kind, key, delta)
+
+
+def pending(kind: str, keys: Iterable[int]) -> dict[int, int]:
+    """
+    Returns the deltas not yet persisted (buffered or being flushed).
+
+    Args:
+        kind (str): The counter kind.
+        keys (Iterable[int]): The ids of the events or profiles.
+
+    Returns:
+        dict[int, int]: The non zero deltas by id.
+    """
+    if _buffer is None:
+        return {}
+    return _buffer.pending(kind, keys)
+
+
+async def pending_async(kind: str, keys: Iterable[int]) -> dict[int, int]:
+    """
+    Asyncio counterpart of `pending`, the shared buffer is read without blocking the event loop.
+
+    Args:
+        kind (str): The counter kind.
+        keys (Iterable[int]): The ids of the events or profiles.
+
+    Returns:
+        dict[int, int]: The non zero deltas by id.
+    """
+    if _buffer is None:
+        return {}
+    return await _buffer.pending_async(kind, keys)
+
+
+def drain() -> Deltas:
+    """
+    Takes the buffered deltas to flush them. They stay visible to `pending` until `acknowledge`
+    or `restore` is called, every drain must be followed by one of them, even when it is empty.
+
+    Returns:
+        Deltas: The deltas by kind and id.
+    """
+    if _buffer is None:
+        return {}
+    return _buffer.drain()
+
+
+def batch_id() -> Optional[str]:
+    """
+    Returns the id of the drained batch. A batch retried after a failed flush or a lost
+    acknowledgement keeps its id.
+
+    Returns:
+        Optional[str]: The id of the batch, None when nothing was drained.
+    """
+    if _buffer is None:
+        return None
+    return _buffer.batch_id
+
+
+def acknowledge() -> None:
+    """Forgets the drained deltas once they are persisted, releases the flush lock."""
+    if _buffer is not None:
+        _buffer.acknowledge()
+
+
+def restore() -> None:
+    """Gives the drained deltas back to the buffer after a failed flush."""
+    if _buffer is not None:
+        _buffer.restore()
+
+
+configure()
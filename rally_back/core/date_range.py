@@ -0,0 +1,70 @@
+"""
+This file contains the date range filters: the days are turned into half-open [start, end) timestamp
+ranges on the raw columns, so that the indexes on the timestamps (and the partitions) can be used
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Query
+
+
+def day_start(value: date) -> datetime:
+    """
+    Returns the first instant of the day of a date or datetime.
+
+    Args:
+        value (date): The date, the time of a datetime is ignored.
+
+    Returns:
+        datetime: Midnight of that day.
+    """
+    return datetime.combine(value, time.min)
+
+
+def next_day_start(value: date) -> datetime:
+    """
+    Returns the first instant of the day following a date or datetime, the exclusive end of its day.
+
+    Args:
+        value (date): The date, the time of a datetime is ignored.
+
+    Returns:
+        datetime: Midnight of the next day.
+    """
+    return day_start(value) + timedelta(days=1)
+
+
+def filter_days(query: Query, column, day_from: Optional[date], day_to: Optional[date]) -> Query:
+    """
+    Keeps the rows whose timestamp falls between two days, both included: `column >= day_from 00:00`
+    and `column < (day_to + 1) 00:00`. Either bound can be omitted.
+
+    Args:
+        query (Query): The query to filter.
+        column: The timestamp column.
+        day_from (Optional[date]): The first day, its time is ignored.
+        day_to (Optional[date]): The last day, its time is ignored.
+
+    Returns:
+        Query: The filtered query.
+    """
+    if day_from is not None:
+        query = query.filter(column >= day_start(day_from))
+    if day_to is not None:
+        query = query.filter(column < next_day_start(day_to))
+    return query
+
+
+def filter_day(query: Query, column, day: Optional[date]) -> Query:
+    """
+    Keeps the rows whose timestamp falls within a day.
+
+    Args:
+        query (Query): The query to filter.
+        column: The timestamp column.
+        day (Optional[date]): The day, its time is ignored. No filter when None.
+
+    Returns:
+        Query: The filtered query.
+    """
+    return filter_days(query, column, day, day)
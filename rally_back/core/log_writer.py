@@ -0,0 +1,185 @@
+"""
+This file contains the buffered log writer: the requests queue their records in memory and a background
+thread writes them in batches to pluggable sinks (database, rotating NDJSON file, stdout)
+"""
+import json
+import logging
+import queue
+import sys
+import threading
+from datetime import datetime
+from enum import Enum
+from logging.handlers import RotatingFileHandler
+from typing import Iterable, Optional, Protocol, TextIO
+
+from core.background import BackgroundLoop
+
+logger = logging.getLogger(__name__)
+
+
+class Sink(Protocol):
+    """Destination of the records, `write` receives a whole batch."""
+
+    def write(self, records: list[dict]) -> None:
+        """
+        Writes a batch of records.
+
+        Args:
+            records (list[dict]): The records of the batch.
+        """
+
+
+def _json_default(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def to_json(record: dict) -> str:
+    """
+    Serializes a record on one line (NDJSON), enums by value and dates in ISO format.
+
+    Args:
+        record (dict): The record to serialize.
+
+    Returns:
+        str: The JSON document, without line break.
+    """
+    return json.dumps(record, default=_json_default, ensure_ascii=False)
+
+
+class StdoutSink:
+    """Writes the records as NDJSON lines on the standard output (collected by the container logs)."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+
+    def write(self, records: list[dict]) -> None:
+        """
+        Writes a batch of records, one NDJSON line each.
+
+        Args:
+            records (list[dict]): The records of the batch.
+        """
+        stream = self.stream or sys.stdout
+        stream.write("".join(f"{to_json(record)}\n" for record in records))
+        stream.flush()
+
+
+class FileSink:
+    """Appends the records as NDJSON lines to a file, rotated once it reaches `max_bytes`."""
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        self.handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def write(self, records: list[dict]) -> None:
+        """
+        Appends a batch of records, one NDJSON line each.
+
+        Args:
+            records (list[dict]): The records of the batch.
+        """
+        for record in records:
+            self.handler.emit(logging.makeLogRecord({"msg": to_json(record)}))
+
+    def close(self) -> None:
+        """Closes the file."""
+        self.handler.close()
+
+
+class BufferedWriter:
+    """
+    Queue of records flushed in batches to its sinks by a background loop.
+
+    `submit` never blocks the request: when the queue is full the record is written at once by the caller
+    (back pressure instead of losing it). A sink failing does not stop the others, the records it could
+    not write are logged as NDJSON so that they can be replayed.
+    """
+
+    def __init__(self, name: str, sinks: Iterable[Sink], max_pending: int, batch_size: int, interval: float):
+        self.name = name
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._flush_lock = threading.Lock()
+        self._loop = BackgroundLoop(name, self.flush, interval)
+        self.stats = {"flushed": 0, "failed": 0, "overflowed": 0}
+
+    @property
+    def running(self) -> bool:
+        """
+        Tells whether the background loop is started.
+
+        Returns:
+            bool: True if the loop is running.
+        """
+        return self._loop.running
+
+    @property
+    def pending(self) -> int:
+        """
+        Returns the number of queued records.
+
+        Returns:
+            int: The approximate queue size.
+        """
+        return self._queue.qsize()
+
+    def submit(self, record: dict) -> None:
+        """
+        Queues a record, or writes it at once when the queue is full.
+
+        Args:
+            record (dict): The record to write.
+        """
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.stats["overflowed"] += 1
+            self.write([record])
+
+    def write(self, records: list[dict]) -> None:
+        """
+        Writes a batch to every sink, a failing sink does not stop the others.
+
+        Args:
+            records (list[dict]): The records of the batch.
+        """
+        for sink in self.sinks:
+            try:
+                sink.write(records)
+            except Exception:  # pylint: disable=broad-exception-caught
+                self.stats["failed"] += len(records)
+                logger.exception(
+                    "%s: %s failed to write %d records:\n%s",
+                    self.name, type(sink).__name__, len(records), "\n".join(to_json(record) for record in records)
+                )
+        self.stats["flushed"] += len(records)
+
+    def flush(self) -> int:
+        """Writes the queued records by batches of `batch_size`, returns the number of records written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = []
+                try:
+                    while len(batch) < self.batch_size:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                if not batch:
+                    return written
+                self.write(batch)
+                written += len(batch)
+
+    def start(self) -> None:
+        """Starts the background loop."""
+        self._loop.start()
+
+    def stop(self) -> None:
+        """Stops the loop and writes the records still queued."""
+        self._loop.stop()
+        self.flush()
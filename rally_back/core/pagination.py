@@ -0,0 +1,104 @@
+"""
+This file contains the keyset pagination related functions
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import status
+from errors import InvalidCursorError
+
+
+def encode_cursor(ordering: str, sort_key: Optional[Any], last_id: int) -> str:
+    """
+    Encodes the position of the last row of a page into an opaque cursor.
+
+    The cursor holds the ordering it was produced for, the value of the sort key of the last row
+    and its id (used as a tie breaker, so rows sharing the same sort key are never skipped).
+
+    Args:
+        ordering (str): The name of the ordering the page was produced with.
+        sort_key (Optional[Any]): The value of the sort key for the last row of the page.
+        last_id (int): The id of the last row of the page.
+
+    Returns:
+        str: An url-safe opaque cursor.
+    """
+    if isinstance(sort_key, datetime):
+        sort_key = sort_key.isoformat()
+    payload = json.dumps({"o": ordering, "k": sort_key, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_sort_key(ordering: str, sort_key: Optional[Any]) -> Optional[Any]:
+    """
+    Checks the sort key of a cursor against the type of the sort column of its ordering.
+
+    Args:
+        ordering (str): The name of the ordering the cursor was produced for.
+        sort_key (Optional[Any]): The sort key read from the cursor.
+
+    Returns:
+        Optional[Any]: The number of likes for "popularity", the creation date for "recent", None otherwise.
+
+    Raises:
+        ValueError: If the sort key does not match the ordering.
+    """
+    if ordering == "popularity":
+        # bool is a subclass of int, json true/false are not a number of likes
+        if not isinstance(sort_key, int) or isinstance(sort_key, bool):
+            raise ValueError("The sort key of a popularity cursor must be an integer")
+        return sort_key
+    if ordering == "recent":
+        if not isinstance(sort_key, str):
+            raise ValueError("The sort key of a recent cursor must be a date")
+        return datetime.fromisoformat(sort_key)
+    if sort_key is not None:
+        raise ValueError("The default ordering has no sort key")
+    return None
+
+
+def decode_cursor(cursor: str, ordering: str) -> tuple[Optional[Any], int]:
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor sent back by the client.
+        ordering (str): The ordering of the current request, it must match the one of the cursor.
+
+    Returns:
+        tuple[Optional[Any], int]: The sort key value (a datetime for the "recent" ordering) and the id
+        of the last row of the previous page.
+
+    Raises:
+        InvalidCursorError: If the cursor cannot be decoded, its sort key does not match the ordering or
+        it was produced for another ordering.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding).decode())
+        cursor_ordering = payload["o"]
+        sort_key = payload["k"]
+        last_id = int(payload["id"])
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        ) from e
+
+    if cursor_ordering != ordering:
+        raise InvalidCursorError(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The cursor does not match the requested ordering"
+        )
+
+    try:
+        sort_key = _decode_sort_key(ordering, sort_key)
+    except ValueError as e:
+        raise InvalidCursorError(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        ) from e
+    return sort_key, last_id
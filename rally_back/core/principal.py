@@ -0,0 +1,29 @@
+"""
+This file contains the principal: the identity and rights of the user behind a token, cached between requests
+"""
+from typing import Optional
+from pydantic import BaseModel
+
+
+class Principal(BaseModel):
+    """
+    Snapshot of the user an access token was issued to.
+
+    The authentication dependencies return it instead of the `User` row: it holds what the routes need
+    (id, email, role, verified, banned, planner and Stripe account) and is cached by token subject and
+    version, so that an authenticated request does not query the users table. It is read only: the routes
+    load the `User` row when they change it.
+    """
+    id: int
+    email: str
+    role_id: Optional[int] = None
+    role: Optional[str] = None
+    is_verified: bool = False
+    is_banned: bool = False
+    is_planner: bool = False
+    account_id: Optional[str] = None
+    token_version: int = 0
+
+    model_config = {
+        "frozen": True
+    }
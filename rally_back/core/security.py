@@ -1,40 +1,143 @@
 """
 This file contains the security related functions
 """
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from fastapi import status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from errors import PasswordHashingBusyError
 
+# cost factor of the new hashes, the hashes made with another cost are rehashed at the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL: the hashes run in parallel on this many threads, off the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# password operations waiting or running beyond which new ones are refused with a 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
 
-def hash_password(password: str)->str:
-    """
-    Hashes the provided password using a secure hashing algorithm.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+ResultT = TypeVar("ResultT")
+
+
+class PasswordHasherPool:
+    """Bounded thread pool running the bcrypt work, with queue depth metrics."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "max_pending": 0,
+            "wait_seconds": 0.0,
+            "run_seconds": 0.0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hasher")
+        return self._executor
+
+    def submit(self, function: Callable[..., ResultT], *args) -> Future:
+        """Queues a password operation, raises PasswordHashingBusyError when the queue is full."""
+        submitted_at = time.perf_counter()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise PasswordHashingBusyError(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many password operations, try again later"
+                )
+            self._pending += 1
+            self._stats["submitted"] += 1
+            self._stats["max_pending"] = max(self._stats["max_pending"], self._pending)
+            executor = self._get_executor()
+
+        def run() -> ResultT:
+            started_at = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._stats["wait_seconds"] += started_at - submitted_at
+            try:
+                return function(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._pending -= 1
+                    self._stats["completed"] += 1
+                    self._stats["run_seconds"] += time.perf_counter() - started_at
 
-    This function takes a plain text password and hashes it using a cryptographic hashing algorithm
-    defined by the `pwd_context` (such as bcrypt, argon2, etc.). The resulting hash can then be stored
-    securely in the database.
+        try:
+            return executor.submit(run)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    async def run_async(self, function: Callable[..., ResultT], *args) -> ResultT:
+        """Runs a password operation on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(function, *args))
+
+    def stats(self) -> dict:
+        """Returns the queue depth (waiting and running operations) and the counters since the start."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending_allowed": self.max_pending,
+                "pending": self._pending,
+                "running": self._running,
+                "waiting": self._pending - self._running,
+                **self._stats,
+            }
+
+    def shutdown(self) -> None:
+        """Stops the worker threads once the queued password operations are done."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_pool = PasswordHasherPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hashes the provided password on the password pool without blocking the event loop. There is no
+    synchronous variant: waiting for the pool from a request would block the event loop (or a threadpool
+    worker) for the whole bcrypt queue.
 
     Args:
         password (str): The plain text password that needs to be hashed.
 
     Returns:
-        str: The hashed password, which is a string that can be stored securely in a database.
+        str: The hashed password.
     """
-    return pwd_context.hash(password)
+    return await password_pool.run_async(pwd_context.hash, password)
 
 
-def verify_password(plain_password, hashed_password)->bool:
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
     """
-    Verifies if the provided plain password matches the hashed password.
-
-    This function takes a plain text password and a hashed password, and compares the two to
-    check if they match. The comparison is done securely using the `pwd_context.verify()` method.
+    Verifies a password on the password pool without blocking the event loop, and rehashes it when the
+    stored hash does not use the configured cost factor (`BCRYPT_ROUNDS`) anymore.
 
     Args:
         plain_password (str): The plain text password to be verified.
         hashed_password (str): The hashed password stored in the database.
 
     Returns:
-        bool: True if the plain password matches the hashed password, otherwise False.
+        tuple[bool, Optional[str]]: Whether the password matches, and the new hash to store if it must be
+            replaced (None otherwise).
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return await password_pool.run_async(pwd_context.verify_and_update, plain_password, hashed_password)
@@ -0,0 +1,21 @@
+"""
+This file contains the Stripe client: the stripe package takes most of the import time of the API, it is
+imported and configured on its first use (checkout, onboarding, webhook) instead of when the API starts
+"""
+import os
+from functools import lru_cache
+from types import ModuleType
+
+
+@lru_cache(maxsize=None)
+def get_stripe() -> ModuleType:
+    """
+    Imports the stripe package and sets its API key, once.
+
+    Returns:
+        ModuleType: The configured stripe module.
+    """
+    import stripe  # pylint: disable=import-outside-toplevel
+
+    stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+    return stripe
@@ -0,0 +1,118 @@
+"""
+This file contains the template rendering: one Jinja environment per process, created once, whose compiled
+templates are kept in memory and whose bytecode is cached on disk (shared by the workers and the restarts),
+and the batch rendering of many documents in a process pool
+"""
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from jinja2 import Environment
+
+TEMPLATES_DIR = os.getenv("TEMPLATES_DIR", str(Path(__file__).resolve().parent.parent / "templates"))
+# compiled templates stored on disk, empty to keep them in memory only
+TEMPLATES_BYTECODE_CACHE_DIR = os.getenv(
+    "TEMPLATES_BYTECODE_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "rally-jinja-cache")
+)
+# check the templates for changes on every use (development)
+TEMPLATES_AUTO_RELOAD = os.getenv("TEMPLATES_AUTO_RELOAD", "false").lower() == "true"
+# processes rendering the batches, 0 renders them in the calling thread
+TEMPLATES_POOL_WORKERS = int(os.getenv("TEMPLATES_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+# smaller batches are rendered in the calling thread, the pool does not pay off
+TEMPLATES_POOL_MIN_BATCH = int(os.getenv("TEMPLATES_POOL_MIN_BATCH", "50"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_environment() -> "Environment":
+    """
+    Creates the Jinja environment of the process, once. Jinja is imported here, by the first rendering (or the
+    warm-up) rather than when the API starts.
+
+    Returns:
+        Environment: The environment loading the templates of `TEMPLATES_DIR`.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    bytecode_cache = None
+    if TEMPLATES_BYTECODE_CACHE_DIR:
+        os.makedirs(TEMPLATES_BYTECODE_CACHE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(TEMPLATES_BYTECODE_CACHE_DIR)
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        bytecode_cache=bytecode_cache,
+        auto_reload=TEMPLATES_AUTO_RELOAD
+    )
+
+
+def render(template_name: str, **context) -> str:
+    """
+    Renders a template with the shared environment.
+
+    Args:
+        template_name (str): The file name of the template, e.g. "facture.html".
+        **context: The variables of the template.
+
+    Returns:
+        str: The rendered document.
+    """
+    return get_environment().get_template(template_name).render(**context)
+
+
+def _render_chunk(template_name: str, contexts: list[dict]) -> list[str]:
+    template = get_environment().get_template(template_name)
+    return [template.render(**context) for context in contexts]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool  # pylint: disable=global-statement
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the API process runs threads, forking it could copy a held lock into the workers
+            _pool = ProcessPoolExecutor(
+                max_workers=TEMPLATES_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def render_many(template_name: str, contexts: list[dict]) -> list[str]:
+    """
+    Renders a template for many contexts (bulk re-send of the invoices of an event, ...). The big batches are
+    split in chunks rendered in parallel by the process pool, each worker compiles the template once.
+
+    Args:
+        template_name (str): The file name of the template.
+        contexts (list[dict]): The variables of every document, made of picklable values (no ORM objects).
+
+    Returns:
+        list[str]: The rendered documents, in the order of the contexts.
+    """
+    if TEMPLATES_POOL_WORKERS <= 0 or len(contexts) < TEMPLATES_POOL_MIN_BATCH:
+        return _render_chunk(template_name, contexts)
+    chunk_size = -(-len(contexts) // TEMPLATES_POOL_WORKERS)
+    chunks = [contexts[index:index + chunk_size] for index in range(0, len(contexts), chunk_size)]
+    pool = _get_pool()
+    documents = []
+    for rendered in pool.map(_render_chunk, [template_name] * len(chunks), chunks):
+        documents.extend(rendered)
+    return documents
+
+
+def shutdown_pool() -> None:
+    """Stops the rendering processes, if they were started."""
+    global _pool  # pylint: disable=global-statement
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
@@ -0,0 +1,206 @@
+"""
+This file contains the multi-pattern text matcher of the moderation: every rule is compiled into one
+Aho-Corasick automaton, so a text is scanned once whatever the number of rules (linear in its length)
+"""
+import re
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, Iterator, NamedTuple
+
+# leetspeak substitutions, applied to the texts and to the rules alike
+LEET = {"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "@": "a", "$": "s"}
+
+# a word rule (a word or a phrase) only matches whole words, a substring rule matches anywhere
+WORD = "word"
+SUBSTRING = "substring"
+
+
+class Rule(NamedTuple):
+    """A banned term, how it matches and how serious it is."""
+    term: str
+    kind: str
+    severity: str
+
+
+class Match(NamedTuple):
+    """A rule found in a text, `start` and `end` are offsets in the original text."""
+    start: int
+    end: int
+    rule: Rule
+
+
+@lru_cache(maxsize=4096)
+def fold_char(char: str) -> str:
+    """
+    Normalizes a character: accents removed (NFKD), case folded, leetspeak substituted.
+
+    Args:
+        char (str): The character of the text.
+
+    Returns:
+        str: The normalized letters or digits (several for "œ" or "ß"), " " for a separator.
+    """
+    folded = []
+    for decomposed in unicodedata.normalize("NFKD", char):
+        if unicodedata.combining(decomposed):
+            continue
+        for lowered in decomposed.casefold():
+            lowered = LEET.get(lowered, lowered)
+            folded.append(lowered if lowered.isalnum() else " ")
+    return "".join(folded) or " "
+
+
+class _FoldTable(dict):
+    """str.translate table of fold_char, filled on demand with the characters met."""
+
+    MAX_SIZE = 65536
+
+    def __missing__(self, codepoint: int) -> str:
+        folded = fold_char(chr(codepoint))
+        if len(self) < self.MAX_SIZE:
+            self[codepoint] = folded
+        return folded
+
+
+_fold_table = _FoldTable()
+_separators = re.compile(" {2,}")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes a text like `normalize`, without the offsets: the scan of a clean text does not need them.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    return _separators.sub(" ", text.translate(_fold_table)).lstrip(" ")
+
+
+def normalize(text: str) -> tuple[str, list[int]]:
+    """
+    Normalizes a text for the matching, the separators (spaces, punctuation, ...) are collapsed into one space.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        tuple[str, list[int]]: The normalized text, and for each of its characters the offset of the
+            character of the original text it comes from.
+    """
+    chars: list[str] = []
+    offsets: list[int] = []
+    separator = True
+    for index, char in enumerate(text):
+        for folded in fold_char(char):
+            if folded == " ":
+                if separator:
+                    continue
+                separator = True
+            else:
+                separator = False
+            chars.append(folded)
+            offsets.append(index)
+    return "".join(chars), offsets
+
+
+class TextMatcher:
+    """Aho-Corasick automaton of a set of rules."""
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules: list[Rule] = []
+        self._lengths: list[int] = []
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._outputs: list[tuple[int, ...]] = [()]
+        for rule in rules:
+            pattern = normalize(rule.term)[0].strip()
+            if pattern:
+                self._add(pattern, rule)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _add(self, pattern: str, rule: Rule) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        self._outputs[state] += (len(self.rules),)
+        self.rules.append(rule)
+        self._lengths.append(len(pattern))
+
+    def _build(self) -> None:
+        # breadth first: the failure state of a state is computed before the ones of its children
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._outputs[child] += self._outputs[fail]
+        # the failure links are folded into the transitions (deterministic automaton): the scan makes one
+        # dictionary lookup per character, a character without transition goes back to the root
+        self._delta: list[dict[str, int]] = [dict(self._goto[0])] + [{} for _ in self._goto[1:]]
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+            queue.extend(self._goto[state].values())
+
+    def iter_matches(self, text: str) -> Iterator[Match]:
+        """
+        Scans a text once and yields the rules it contains, in the order they end.
+
+        Args:
+            text (str): The text to scan.
+
+        Yields:
+            Match: The rules found, with their span in the original text.
+        """
+        normalized = normalize_text(text)
+        # the offsets in the original text are only computed once a rule is found
+        offsets = None
+        delta, outputs = self._delta, self._outputs
+        state = 0
+        for end, char in enumerate(normalized, start=1):
+            state = delta[state].get(char, 0)
+            if not outputs[state]:
+                continue
+            for rule_index in outputs[state]:
+                start = end - self._lengths[rule_index]
+                rule = self.rules[rule_index]
+                if rule.kind == WORD and not (
+                    (start == 0 or normalized[start - 1] == " ")
+                    and (end == len(normalized) or normalized[end] == " ")
+                ):
+                    continue
+                if offsets is None:
+                    offsets = normalize(text)[1]
+                yield Match(offsets[start], offsets[end - 1] + 1, rule)
+
+    def find(self, text: str) -> list[Match]:
+        """
+        Finds every rule a text contains.
+
+        Args:
+            text (str): The text to scan.
+
+        Returns:
+            list[Match]: The matches, sorted by position in the text.
+        """
+        return sorted(self.iter_matches(text))
@@ -0,0 +1,443 @@
+"""
+This file contains the sliding-window throttle: the attempts of a key (client IP, account) during the last
+`window` seconds are counted in memory (per process) or in Redis (shared by every worker)
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Optional, Union
+
+import redis
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# memory: per process counters, redis: counters shared by every worker, none: throttling disabled
+THROTTLE_BACKEND = os.getenv("THROTTLE_BACKEND", "memory")
+THROTTLE_PREFIX = os.getenv("THROTTLE_PREFIX", "rally:throttle:")
+# keys tracked by the memory backend, the least recently used ones are dropped beyond
+THROTTLE_MAX_KEYS = int(os.getenv("THROTTLE_MAX_KEYS", "100000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# records an attempt unless the key reached its limit, in one step so that concurrent attempts cannot
+# all pass the check: returns {1} when recorded, {0, score of the attempt keeping the window full} otherwise
+ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[2])
+local count = redis.call('ZCARD', KEYS[1])
+local limit = tonumber(ARGV[3])
+if count >= limit then
+    local limiting = redis.call('ZRANGE', KEYS[1], count - limit, count - limit, 'WITHSCORES')
+    return {0, limiting[2]}
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[5])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {1}
+"""
+
+
+class MemoryBackend:
+    """Thread safe sliding-window log: the timestamps of the attempts of every key, in an LRU."""
+
+    def __init__(self, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._attempts: OrderedDict[str, deque[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _window(self, key: str, window: int, now: float) -> Optional[deque[float]]:
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            return None
+        while attempts and attempts[0] <= now - window:
+            attempts.popleft()
+        if not attempts:
+            del self._attempts[key]
+            return None
+        return attempts
+
+    def hit(self, key: str, window: int) -> int:
+        """
+        Records an attempt.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+            window (int): The length of the sliding window in seconds.
+
+        Returns:
+            int: The number of attempts in the window, this one included.
+        """
+        now = self.clock()
+        with self._lock:
+            return len(self._record(key, self._window(key, window, now), now))
+
+    def _record(self, key: str, attempts: Optional[deque[float]], now: float) -> deque[float]:
+        if attempts is None:
+            attempts = self._attempts[key] = deque()
+        attempts.append(now)
+        self._attempts.move_to_end(key)
+        while len(self._attempts) > self.max_keys:
+            self._attempts.popitem(last=False)
+        return attempts
+
+    def acquire(self, key: str, limit: int, window: int) -> tuple[Optional[str], float]:
+        """
+        Records an attempt unless the key reached its limit, the check and the record are atomic.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+            limit (int): The number of attempts allowed in the window.
+            window (int): The length of the sliding window in seconds.
+
+        Returns:
+            tuple[Optional[str], float]: The recorded attempt (to release it) and 0, or None and the seconds
+                to wait when the key is over its limit.
+        """
+        now = self.clock()
+        with self._lock:
+            attempts = self._window(key, window, now)
+            if attempts is not None and len(attempts) >= limit:
+                return None, attempts[len(attempts) - limit] + window - now
+            self._record(key, attempts, now)
+            return repr(now), 0.0
+
+    def release(self, key: str, attempt: Optional[str]) -> None:
+        """
+        Forgets one attempt recorded by `acquire`.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+            attempt (Optional[str]): The attempt returned by `acquire`, nothing is done when None.
+        """
+        if attempt is None:
+            return
+        with self._lock:
+            attempts = self._attempts.get(key)
+            if attempts is None:
+                return
+            try:
+                attempts.remove(float(attempt))
+            except ValueError:
+                return
+            if not attempts:
+                del self._attempts[key]
+
+    async def acquire_async(self, key: str, limit: int, window: int) -> tuple[Optional[str], float]:
+        """
+        Asyncio counterpart of `acquire`, the per process log never waits on I/O.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+            limit (int): The number of attempts allowed in the window.
+            window (int): The length of the sliding window in seconds.
+
+        Returns:
+            tuple[Optional[str], float]: The recorded attempt and 0, or None and the seconds to wait.
+        """
+        return self.acquire(key, limit, window)
+
+    async def release_async(self, key: str, attempt: Optional[str]) -> None:
+        """
+        Asyncio counterpart of `release`.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+            attempt (Optional[str]): The attempt returned by `acquire_async`.
+        """
+        self.release(key, attempt)
+
+    async def reset_async(self, key: str) -> None:
+        """
+        Asyncio counterpart of `reset`.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+        """
+        self.reset(key)
+
+    def retry_after(self, key: str, limit: int, window: int) -> float:
+        """
+        Tells how long the key stays over the limit.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+            limit (int): The number of attempts allowed in the window.
+            window (int): The length of the sliding window in seconds.
+
+        Returns:
+            float: The seconds to wait, 0 when an attempt is allowed now.
+        """
+        now = self.clock()
+        with self._lock:
+            attempts = self._window(key, window, now)
+            if attempts is None or len(attempts) < limit:
+                return 0.0
+            # the window slides under the limit when the oldest attempt that keeps it full expires
+            return attempts[len(attempts) - limit] + window - now
+
+    def reset(self, key: str) -> None:
+        """
+        Forgets the attempts of a key.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+        """
+        with self._lock:
+            self._attempts.pop(key, None)
+
+    def clear(self) -> None:
+        """Forgets every attempt."""
+        with self._lock:
+            self._attempts.clear()
+
+
+class RedisBackend:
+    """
+    Sliding-window log shared by every worker, one sorted set of attempt timestamps per key.
+    Redis errors are logged and the attempts are let through.
+
+    The login route uses the `_async` methods (redis.asyncio), they do not block the event loop.
+    """
+
+    def __init__(self, url: str, prefix: str):
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.async_client = aioredis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._acquire_script = self.async_client.register_script(ACQUIRE_SCRIPT)
+        self.prefix = prefix
+
+    def hit(self, key: str, window: int) -> int:
+        """
+        Records an attempt in the sorted set of the key.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+            window (int): The length of the sliding window in seconds.
+
+        Returns:
+            int: The number of attempts in the window, this one included, 0 on a redis error.
+        """
+        now = time.time()
+        try:
+            pipe = self.client.pipeline()
+            pipe.zremrangebyscore(self.prefix + key, "-inf", now - window)
+            pipe.zadd(self.prefix + key, {f"{now}:{os.urandom(4).hex()}": now})
+            pipe.zcard(self.prefix + key)
+            pipe.expire(self.prefix + key, window)
+            return int(pipe.execute()[2])
+        except redis.RedisError as error:
+            logger.warning("throttle hit failed: %s", error)
+            return 0
+
+    def retry_after(self, key: str, limit: int, window: int) -> float:
+        """
+        Tells how long the key stays over the limit.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+            limit (int): The number of attempts allowed in the window.
+            window (int): The length of the sliding window in seconds.
+
+        Returns:
+            float: The seconds to wait, 0 when an attempt is allowed now or on a redis error.
+        """
+        now = time.time()
+        try:
+            pipe = self.client.pipeline()
+            pipe.zremrangebyscore(self.prefix + key, "-inf", now - window)
+            pipe.zrevrange(self.prefix + key, limit - 1, limit - 1, withscores=True)
+            limiting = pipe.execute()[1]
+        except redis.RedisError as error:
+            logger.warning("throttle check failed: %s", error)
+            return 0.0
+        if not limiting:
+            return 0.0
+        return max(limiting[0][1] + window - now, 0.0)
+
+    def reset(self, key: str) -> None:
+        """
+        Forgets the attempts of a key.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+        """
+        try:
+            self.client.delete(self.prefix + key)
+        except redis.RedisError as error:
+            logger.warning("throttle reset failed: %s", error)
+
+    async def acquire_async(self, key: str, limit: int, window: int) -> tuple[Optional[str], float]:
+        """
+        Records an attempt unless the key reached its limit, in one script run by redis.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+            limit (int): The number of attempts allowed in the window.
+            window (int): The length of the sliding window in seconds.
+
+        Returns:
+            tuple[Optional[str], float]: The recorded attempt (to release it) and 0, or None and the seconds
+                to wait when the key is over its limit. None and 0 on a redis error.
+        """
+        now = time.time()
+        attempt = f"{now}:{os.urandom(4).hex()}"
+        try:
+            result = await self._acquire_script(
+                keys=[self.prefix + key],
+                args=[repr(now), repr(now - window), limit, window, attempt]
+            )
+        except redis.RedisError as error:
+            logger.warning("throttle acquire failed: %s", error)
+            return None, 0.0
+        if result[0]:
+            return attempt, 0.0
+        return None, max(float(result[1]) + window - now, 0.0)
+
+    async def release_async(self, key: str, attempt: Optional[str]) -> None:
+        """
+        Forgets one attempt recorded by `acquire_async`.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+            attempt (Optional[str]): The attempt returned by `acquire_async`, nothing is done when None.
+        """
+        if attempt is None:
+            return
+        try:
+            await self.async_client.zrem(self.prefix + key, attempt)
+        except redis.RedisError as error:
+            logger.warning("throttle release failed: %s", error)
+
+    async def reset_async(self, key: str) -> None:
+        """
+        Forgets the attempts of a key without blocking the event loop.
+
+        Args:
+            key (str): The throttled key (ip address, hashed email...).
+        """
+        try:
+            await self.async_client.delete(self.prefix + key)
+        except redis.RedisError as error:
+            logger.warning("throttle reset failed: %s", error)
+
+    def clear(self) -> None:
+        """Forgets the attempts of every key of the throttle prefix."""
+        try:
+            for key in self.client.scan_iter(match=self.prefix + "*"):
+                self.client.delete(key)
+        except redis.RedisError as error:
+            logger.warning("throttle clear failed: %s", error)
+
+
+_backend: Optional[Union[MemoryBackend, RedisBackend]] = None
+
+
+def configure(backend: str = THROTTLE_BACKEND) -> None:
+    """
+    (Re)configures the throttle backend.
+
+    Args:
+        backend (str): "memory" (per process counters), "redis" (counters shared by every worker)
+            or "none" (throttling disabled).
+    """
+    global _backend  # pylint: disable=global-statement
+    _backend = None
+    if backend == "memory":
+        _backend = MemoryBackend(THROTTLE_MAX_KEYS)
+    elif backend == "redis":
+        _backend = RedisBackend(REDIS_URL, THROTTLE_PREFIX)
+
+
+def hit(key: str, window: int) -> int:
+    """
+    Records an attempt of a key.
+
+    Args:
+        key (str): The throttled key, e.g. "login:ip:127.0.0.1".
+        window (int): The length of the sliding window in seconds.
+
+    Returns:
+        int: The number of attempts of the key during the window, this one included.
+    """
+    if _backend is None:
+        return 0
+    return _backend.hit(key, window)
+
+
+def retry_after(key: str, limit: int, window: int) -> float:
+    """
+    Checks whether a key reached its limit, without recording an attempt.
+
+    Args:
+        key (str): The throttled key.
+        limit (int): The number of attempts allowed during the window.
+        window (int): The length of the sliding window in seconds.
+
+    Returns:
+        float: The seconds before the key gets under its limit again, 0 if it is under it.
+    """
+    if _backend is None:
+        return 0.0
+    return _backend.retry_after(key, limit, window)
+
+
+def reset(key: str) -> None:
+    """
+    Forgets the attempts of a key.
+
+    Args:
+        key (str): The throttled key.
+    """
+    if _backend is not None:
+        _backend.reset(key)
+
+
+async def acquire_async(key: str, limit: int, window: int) -> tuple[Optional[str], float]:
+    """
+    Records an attempt of a key unless it reached its limit. The check and the record are one atomic step:
+    concurrent attempts cannot all pass the check before one of them is recorded.
+
+    Args:
+        key (str): The throttled key.
+        limit (int): The number of attempts allowed during the window.
+        window (int): The length of the sliding window in seconds.
+
+    Returns:
+        tuple[Optional[str], float]: The recorded attempt, to give to `release_async` if it must not count,
+            and 0. None and the seconds before the key gets under its limit again when it is over it.
+    """
+    if _backend is None:
+        return None, 0.0
+    return await _backend.acquire_async(key, limit, window)
+
+
+async def release_async(key: str, attempt: Optional[str]) -> None:
+    """
+    Forgets an attempt recorded by `acquire_async`, e.g. once the login succeeded.
+
+    Args:
+        key (str): The throttled key.
+        attempt (Optional[str]): The attempt returned by `acquire_async`.
+    """
+    if _backend is not None:
+        await _backend.release_async(key, attempt)
+
+
+async def reset_async(key: str) -> None:
+    """
+    Asyncio counterpart of `reset`.
+
+    Args:
+        key (str): The throttled key.
+    """
+    if _backend is not None:
+        await _backend.reset_async(key)
+
+
+def clear() -> None:
+    """Forgets the attempts of every key."""
+    if _backend is not None:
+        _backend.clear()
+
+
+configure()
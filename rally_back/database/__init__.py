@@ -1,2 +1,3 @@
 """This file contains the import database"""
 from . import db
+from . import migrations
@@ -0,0 +1,84 @@
+"""
+This file contains the database migrations entry point: the schema is versioned with Alembic (migrations/)
+instead of being created by `Base.metadata.create_all`
+"""
+import os
+from typing import TYPE_CHECKING
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from database.db import engine
+
+if TYPE_CHECKING:
+    from alembic.config import Config
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALEMBIC_INI = os.path.join(ROOT_DIR, "alembic.ini")
+# the schema of the databases created by create_all, before the migrations existed
+BASELINE_REVISION = "0001"
+# upgrade the database when the API starts, disable it when the migrations are run as a deployment step
+DB_MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() == "true"
+
+
+def get_alembic_config(connection=None) -> "Config":
+    """
+    Builds the Alembic configuration of the application, whatever the working directory. Alembic is imported
+    here, the API processes that do not migrate never load it.
+
+    Args:
+        connection: The connection the migrations run on, the application engine when None.
+
+    Returns:
+        Config: The Alembic configuration.
+    """
+    from alembic.config import Config  # pylint: disable=import-outside-toplevel
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(ROOT_DIR, "migrations"))
+    # the logging of the application is kept as is
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_database(bind: Engine = engine, revision: str = "head") -> None:
+    """
+    Upgrades the database to a revision.
+
+    A database created by `create_all` (tables but no `alembic_version`) is stamped at the baseline revision
+    first, the following revisions bring its missing tables, columns, constraints and indexes and backfill
+    the existing rows. On PostgreSQL the instances starting together wait on an advisory lock, only the first
+    one migrates.
+
+    Args:
+        bind (Engine): The engine of the database to upgrade.
+        revision (str): The target revision.
+    """
+    from alembic import command  # pylint: disable=import-outside-toplevel
+
+    with bind.connect() as connection:
+        is_postgresql = connection.dialect.name == "postgresql"
+        if is_postgresql:
+            connection.execute(text("SELECT pg_advisory_lock(hashtext('rally_migrations'))"))
+            connection.commit()
+        try:
+            config = get_alembic_config(connection)
+            tables = set(inspect(connection).get_table_names())
+            connection.commit()
+            if tables and "alembic_version" not in tables:
+                command.stamp(config, BASELINE_REVISION)
+            command.upgrade(config, revision)
+        finally:
+            if is_postgresql:
+                connection.execute(text("SELECT pg_advisory_unlock(hashtext('rally_migrations'))"))
+                connection.commit()
+
+
+def migrate_database() -> None:
+    """
+    Upgrades the database of the application to the last revision, unless disabled with DB_MIGRATE_ON_STARTUP.
+    """
+    if DB_MIGRATE_ON_STARTUP:
+        upgrade_database()
@@ -0,0 +1,13 @@
+"""
+This file contains the email worker process, it sends the queued emails: python email_worker.py
+"""
+import logging
+from services import email_service
+
+logging.basicConfig(level=logging.INFO)
+
+if __name__ == "__main__":
+    try:
+        email_service.email_worker.run_forever()
+    finally:
+        email_service.stop_email_worker()
@@ -1,5 +1,12 @@
 """This file contains the imports enums"""
 from . import action
+from . import count_mode
+from . import email_job_status
+from . import export_format
 from . import log_level
+from . import moderation_rule_kind
+from . import moderation_scan_status
+from . import moderation_severity
 from . import payment_status
 from . import role
+from . import webhook_event_status
@@ -27,3 +27,11 @@ class ActionEnum(str, Enum):
     REASON_CREATED = "reason_created"
     REASON_DELETED = "reason_deleted"
     EMAIL_UNBANNED = "email_unbanned"
+    SEARCH_REINDEXED = "search_reindexed"
+    COUNTERS_RECONCILED = "counters_reconciled"
+    BANNED_TERM_CREATED = "banned_term_created"
+    BANNED_TERMS_RELOADED = "banned_terms_reloaded"
+    MODERATION_SCAN_STARTED = "moderation_scan_started"
+    INVOICES_RESENT = "invoices_resent"
+    PAYMENTS_EXPORTED = "payments_exported"
+    REVENUES_REBUILT = "revenues_rebuilt"
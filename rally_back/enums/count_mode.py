@@ -0,0 +1,8 @@
+"""This file contains the enum for the total count modes"""
+from enum import Enum
+
+class CountModeEnum(str, Enum):
+    """used to choose how the total of a list response is computed"""
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
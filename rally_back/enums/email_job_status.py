@@ -0,0 +1,9 @@
+"""This file contains the enum email job status"""
+from enum import Enum
+
+class EmailJobStatusEnum(str, Enum):
+    """used for status in email jobs"""
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
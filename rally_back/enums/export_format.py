@@ -0,0 +1,7 @@
+"""This file contains the export format enum"""
+from enum import Enum
+
+class ExportFormatEnum(str, Enum):
+    """used to choose the format of a streamed export"""
+    CSV = "csv"
+    NDJSON = "ndjson"
@@ -0,0 +1,9 @@
+"""This file contains the enum for the kinds of banned terms"""
+from enum import Enum
+
+class ModerationRuleKindEnum(str, Enum):
+    """used to choose how a banned term matches"""
+    # whole words only, the term can be a phrase ("fils de pute")
+    WORD = "word"
+    # anywhere, inside other words too ("encul")
+    SUBSTRING = "substring"
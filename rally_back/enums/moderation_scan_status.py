@@ -0,0 +1,9 @@
+"""This file contains the enum moderation scan status"""
+from enum import Enum
+
+class ModerationScanStatusEnum(str, Enum):
+    """used for status of the retroactive moderation scans"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
@@ -0,0 +1,13 @@
+"""This file contains the enum for the severity of the banned terms"""
+from enum import Enum
+
+class ModerationSeverityEnum(str, Enum):
+    """used to grade the banned terms, the content is refused from MODERATION_BLOCK_SEVERITY"""
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
+    @property
+    def rank(self) -> int:
+        """used to compare the severities"""
+        return list(ModerationSeverityEnum).index(self)
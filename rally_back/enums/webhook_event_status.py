@@ -0,0 +1,9 @@
+"""This file contains the enum webhook event status"""
+from enum import Enum
+
+class WebhookEventStatusEnum(str, Enum):
+    """used for status in the webhook inbox"""
+    PENDING = "pending"
+    PROCESSING = "processing"
+    PROCESSED = "processed"
+    FAILED = "failed"
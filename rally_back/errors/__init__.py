@@ -147,3 +147,27 @@ class ErrorDuringEmailing(HTTPException):
 
 class InvalidContent(HTTPException):
     """the content contains invalid terms"""
+
+
+class InvalidCursorError(HTTPException):
+    """the pagination cursor is invalid"""
+
+
+class PasswordHashingBusyError(HTTPException):
+    """too many password operations are waiting"""
+
+
+class BannedTermAlreadyExistsError(HTTPException):
+    """the banned term already exists"""
+
+
+class ModerationScanNotFoundError(HTTPException):
+    """the moderation scan is not found"""
+
+
+class ModerationScanNotResumableError(HTTPException):
+    """the moderation scan is not failed, it cannot be resumed"""
+
+
+class InvoiceAccessForbiddenError(HTTPException):
+    """the user is neither the buyer nor the organizer of the payment"""
@@ -0,0 +1,72 @@
+"""
+This file contains the Alembic environment: the migrations run on the engine of the application
+(DATABASE_URL), or on the connection given by `database.migrations`
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+import models  # pylint: disable=unused-import
+from database.db import Base, engine
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# tables managed outside of the migrations: the monthly partitions of action_logs (action_log_repo)
+EXCLUDED_TABLE_PREFIXES = ("action_logs_y", "action_logs_default")
+# indexes created on one dialect only (`ddl_if`), written by hand in the migrations
+DIALECT_INDEXES = {"ix_action_logs_date", "ix_action_logs_date_brin", "ix_event_search_vector"}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Leaves the action logs partitions and the dialect specific indexes out of the autogenerated migrations."""
+    if type_ == "table" and name.startswith(EXCLUDED_TABLE_PREFIXES):
+        return False
+    if type_ == "index" and name in DIALECT_INDEXES:
+        return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    """Writes the SQL of the migrations instead of running them: alembic upgrade head --sql"""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        include_object=include_object,
+        render_as_batch=engine.dialect.name == "sqlite"
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Runs the migrations on the given connection, or on a connection of the application engine."""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_migrations(connection)
+        return
+    with engine.connect() as connection:
+        _run_migrations(connection)
+
+
+def _run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite cannot alter most constraints in place, the tables are copied instead
+        render_as_batch=connection.dialect.name == "sqlite"
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
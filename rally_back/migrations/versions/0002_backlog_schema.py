@@ -0,0 +1,281 @@
+"""backlog schema
+
+The tables and columns added to the models after the baseline: the search index, the event cards,
+the email and webhook queues, the banned terms, the moderation scans, the revenue rollups,
+`events.seats_taken` and `users.token_version`.
+
+The existing rows are brought in line before the constraints are added: the duplicated likes and
+registrations are removed (the oldest row is kept) and `seats_taken` is counted from the registrations.
+The foreign keys towards the events, the profiles, the users and the comments get their ON DELETE CASCADE.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 03:24:46.652369
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the foreign keys of the baseline have no name: PostgreSQL calls them <table>_<column>_fkey,
+# the same name is given to the SQLite ones when the table is reflected by the batch
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+# table, column, referred table
+CASCADE_FOREIGN_KEYS = [
+    ('comments', 'event_id', 'events'),
+    ('comments', 'profile_id', 'profiles'),
+    ('event_pictures', 'event_id', 'events'),
+    ('event_type', 'event_id', 'events'),
+    ('likes', 'event_id', 'events'),
+    ('likes', 'profile_id', 'profiles'),
+    ('profiles', 'user_id', 'users'),
+    ('registrations', 'event_id', 'events'),
+    ('registrations', 'profile_id', 'profiles'),
+    ('signaled_comments', 'comment_id', 'comments'),
+    ('signaled_comments', 'user_id', 'users'),
+    ('signaled_events', 'event_id', 'events'),
+    ('signaled_events', 'user_id', 'users'),
+    ('signaled_users', 'user_id', 'users'),
+    ('signaled_users', 'user_signaled_id', 'users'),
+]
+
+# name, table: one row per (profile, event) is kept
+UNIQUE_PROFILE_EVENT = [
+    ('uq_likes_profile_event', 'likes'),
+    ('uq_registrations_profile_event', 'registrations'),
+]
+
+BASELINE_ACTION_TYPES = [
+    'LOGIN', 'REGISTRATION', 'LOGOUT', 'EVENT_CREATED', 'EVENT_UPDATED', 'EVENT_DELETED',
+    'EVENT_REGISTERED', 'EVENT_UNREGISTERED', 'USER_BANNED', 'PAYMENT_FAILED', 'USER_SIGNALED',
+    'USER_UNSIGNALED', 'COMMENT_SIGNALED', 'COMMENT_BANNED', 'COMMENT_UNSIGNALED', 'EVENT_SIGNALED',
+    'EVENT_UNSIGNALED', 'EVENT_BANNED', 'PROFILE_UPDATED', 'TYPE_CREATED', 'TYPE_DELETED',
+    'REASON_CREATED', 'REASON_DELETED', 'EMAIL_UNBANNED',
+]
+
+# members of ActionEnum added after the baseline
+ACTION_TYPES = [
+    'SEARCH_REINDEXED', 'COUNTERS_RECONCILED', 'BANNED_TERM_CREATED', 'BANNED_TERMS_RELOADED',
+    'MODERATION_SCAN_STARTED', 'INVOICES_RESENT', 'PAYMENTS_EXPORTED', 'REVENUES_REBUILT',
+]
+
+
+def _replace_foreign_keys(ondelete: Union[str, None]) -> None:
+    tables = {}
+    for table, column, referred_table in CASCADE_FOREIGN_KEYS:
+        tables.setdefault(table, []).append((column, referred_table))
+    for table, foreign_keys in tables.items():
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for column, referred_table in foreign_keys:
+                name = f"{table}_{column}_fkey"
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred_table, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == "postgresql"
+
+    op.create_table('banned_terms',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('term', sa.String(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('severity', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('term')
+    )
+    op.create_index(op.f('ix_banned_terms_id'), 'banned_terms', ['id'], unique=False)
+
+    op.create_table('email_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('recipient', sa.String(), nullable=False),
+    sa.Column('subject', sa.String(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_email_jobs_id'), 'email_jobs', ['id'], unique=False)
+    op.create_index('ix_email_jobs_status_next_attempt_at', 'email_jobs', ['status', 'next_attempt_at'], unique=False)
+
+    op.create_table('event_daily_revenues',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('organizer_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('payments_count', sa.Integer(), nullable=False),
+    sa.Column('gross_amount', sa.Double(), nullable=False),
+    sa.Column('fee_amount', sa.Double(), nullable=False),
+    sa.Column('net_amount', sa.Double(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_id', 'day', 'status', name='uq_event_daily_revenues_event_day_status')
+    )
+    op.create_index('ix_event_daily_revenues_day', 'event_daily_revenues', ['day'], unique=False)
+    op.create_index(op.f('ix_event_daily_revenues_id'), 'event_daily_revenues', ['id'], unique=False)
+    op.create_index(op.f('ix_event_daily_revenues_organizer_id'), 'event_daily_revenues', ['organizer_id'], unique=False)
+
+    op.create_table('organizer_daily_revenues',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organizer_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('payments_count', sa.Integer(), nullable=False),
+    sa.Column('gross_amount', sa.Double(), nullable=False),
+    sa.Column('fee_amount', sa.Double(), nullable=False),
+    sa.Column('net_amount', sa.Double(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('organizer_id', 'day', 'status', name='uq_organizer_daily_revenues_organizer_day_status')
+    )
+    op.create_index('ix_organizer_daily_revenues_day', 'organizer_daily_revenues', ['day'], unique=False)
+    op.create_index(op.f('ix_organizer_daily_revenues_id'), 'organizer_daily_revenues', ['id'], unique=False)
+
+    op.create_table('webhook_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('stripe_event_id', sa.String(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('object_id', sa.String(), nullable=True),
+    sa.Column('stripe_created', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('stripe_event_id')
+    )
+    op.create_index(op.f('ix_webhook_events_id'), 'webhook_events', ['id'], unique=False)
+    op.create_index(op.f('ix_webhook_events_object_id'), 'webhook_events', ['object_id'], unique=False)
+    op.create_index('ix_webhook_events_status_next_attempt_at', 'webhook_events', ['status', 'next_attempt_at'], unique=False)
+
+    op.create_table('moderation_scans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('phase', sa.String(), nullable=False),
+    sa.Column('last_comment_id', sa.Integer(), nullable=False),
+    sa.Column('last_event_id', sa.Integer(), nullable=False),
+    sa.Column('comments_scanned', sa.Integer(), nullable=False),
+    sa.Column('comments_flagged', sa.Integer(), nullable=False),
+    sa.Column('events_scanned', sa.Integer(), nullable=False),
+    sa.Column('events_flagged', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_moderation_scans_id'), 'moderation_scans', ['id'], unique=False)
+    op.create_index(op.f('ix_moderation_scans_status'), 'moderation_scans', ['status'], unique=False)
+
+    op.create_table('event_cards',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_table('event_search',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('document', sa.Text(), nullable=False),
+    sa.Column('search_vector', sa.Text().with_variant(postgresql.TSVECTOR(), 'postgresql'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+
+    if is_postgresql:
+        with op.get_context().autocommit_block():
+            for action_type in ACTION_TYPES:
+                op.execute(f"ALTER TYPE actionenum ADD VALUE IF NOT EXISTS '{action_type}'")
+    else:
+        with op.batch_alter_table('action_logs', schema=None) as batch_op:
+            batch_op.alter_column('action_type',
+                   existing_type=sa.Enum(*BASELINE_ACTION_TYPES, name='actionenum'),
+                   type_=sa.Enum(*BASELINE_ACTION_TYPES, *ACTION_TYPES, name='actionenum'),
+                   existing_nullable=True)
+
+    _replace_foreign_keys('CASCADE')
+
+    for name, table in UNIQUE_PROFILE_EVENT:
+        op.execute(
+            f"DELETE FROM {table} WHERE id NOT IN "
+            f"(SELECT min(id) FROM {table} GROUP BY profile_id, event_id)"
+        )
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_unique_constraint(name, ['profile_id', 'event_id'])
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seats_taken', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE events SET seats_taken = "
+        "(SELECT count(*) FROM registrations WHERE registrations.event_id = events.id)"
+    )
+
+    # the tokens issued before have no version claim, they stay valid until the next bump
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    # the values of the enum type cannot be removed on PostgreSQL, they stay
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_column('seats_taken')
+
+    for name, table in reversed(UNIQUE_PROFILE_EVENT):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(name, type_='unique')
+
+    _replace_foreign_keys(None)
+
+    if op.get_bind().dialect.name != "postgresql":
+        with op.batch_alter_table('action_logs', schema=None) as batch_op:
+            batch_op.alter_column('action_type',
+                   existing_type=sa.Enum(*BASELINE_ACTION_TYPES, *ACTION_TYPES, name='actionenum'),
+                   type_=sa.Enum(*BASELINE_ACTION_TYPES, name='actionenum'),
+                   existing_nullable=True)
+
+    op.drop_table('event_search')
+    op.drop_table('event_cards')
+    op.drop_index(op.f('ix_moderation_scans_status'), table_name='moderation_scans')
+    op.drop_index(op.f('ix_moderation_scans_id'), table_name='moderation_scans')
+    op.drop_table('moderation_scans')
+    op.drop_index('ix_webhook_events_status_next_attempt_at', table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_object_id'), table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_id'), table_name='webhook_events')
+    op.drop_table('webhook_events')
+    op.drop_index(op.f('ix_organizer_daily_revenues_id'), table_name='organizer_daily_revenues')
+    op.drop_index('ix_organizer_daily_revenues_day', table_name='organizer_daily_revenues')
+    op.drop_table('organizer_daily_revenues')
+    op.drop_index(op.f('ix_event_daily_revenues_organizer_id'), table_name='event_daily_revenues')
+    op.drop_index(op.f('ix_event_daily_revenues_id'), table_name='event_daily_revenues')
+    op.drop_index('ix_event_daily_revenues_day', table_name='event_daily_revenues')
+    op.drop_table('event_daily_revenues')
+    op.drop_index('ix_email_jobs_status_next_attempt_at', table_name='email_jobs')
+    op.drop_index(op.f('ix_email_jobs_id'), table_name='email_jobs')
+    op.drop_table('email_jobs')
+    op.drop_index(op.f('ix_banned_terms_id'), table_name='banned_terms')
+    op.drop_table('banned_terms')
@@ -0,0 +1,88 @@
+"""hot lookup indexes
+
+One index per lookup of the repositories: the day ranges (core.date_range), the lists of an event or a
+profile in date order, the Stripe ids of the webhooks, the moderation queues by status.
+
+The databases created by `create_all` may already hold some of them (`index=True` columns added to the
+models before this revision), the indexes are created if they do not exist.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 03:31:12.408337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name, table, columns, options
+INDEXES = [
+    ('ix_addresses_country_city', 'addresses', ['country', 'city'], {}),
+    ('ix_banned_users_banned_email_lower', 'banned_users', [sa.text('lower(banned_email)')], {}),
+    ('ix_comments_event_id_created_at', 'comments', ['event_id', 'created_at'], {}),
+    ('ix_comments_profile_id_created_at', 'comments', ['profile_id', 'created_at'], {}),
+    ('ix_event_pictures_event_id', 'event_pictures', ['event_id'], {}),
+    ('ix_event_pictures_photo', 'event_pictures', ['photo'], {}),
+    ('ix_event_type_type_id', 'event_type', ['type_id'], {}),
+    ('ix_events_date', 'events', ['date'], {}),
+    ('ix_events_profile_id_date', 'events', ['profile_id', 'date'], {}),
+    ('ix_likes_event_id_created_at', 'likes', ['event_id', 'created_at'], {}),
+    ('ix_payments_buyer_id_created_at', 'payments', ['buyer_id', 'created_at'], {}),
+    ('ix_payments_created_at', 'payments', ['created_at'], {}),
+    ('ix_payments_event_id_status', 'payments', ['event_id', 'status'], {}),
+    ('ix_payments_organizer_id_created_at', 'payments', ['organizer_id', 'created_at'], {}),
+    (
+        'ix_payments_stripe_payment_intent_id', 'payments', ['stripe_payment_intent_id'],
+        {
+            'postgresql_where': sa.text('stripe_payment_intent_id IS NOT NULL'),
+            'sqlite_where': sa.text('stripe_payment_intent_id IS NOT NULL')
+        }
+    ),
+    ('ix_payments_stripe_session_id', 'payments', ['stripe_session_id'], {}),
+    ('ix_registrations_event_id_registered_at', 'registrations', ['event_id', 'registered_at'], {}),
+    ('ix_registrations_registered_at', 'registrations', ['registered_at'], {}),
+    ('ix_signaled_comments_comment_id', 'signaled_comments', ['comment_id'], {}),
+    ('ix_signaled_comments_created_at', 'signaled_comments', ['created_at'], {}),
+    ('ix_signaled_comments_status_created_at', 'signaled_comments', ['status', 'created_at'], {}),
+    ('ix_signaled_comments_user_id', 'signaled_comments', ['user_id'], {}),
+    ('ix_signaled_events_created_at', 'signaled_events', ['created_at'], {}),
+    ('ix_signaled_events_event_id', 'signaled_events', ['event_id'], {}),
+    ('ix_signaled_events_status_created_at', 'signaled_events', ['status', 'created_at'], {}),
+    ('ix_signaled_events_user_id', 'signaled_events', ['user_id'], {}),
+    ('ix_signaled_users_created_at', 'signaled_users', ['created_at'], {}),
+    ('ix_signaled_users_status_created_at', 'signaled_users', ['status', 'created_at'], {}),
+    ('ix_signaled_users_user_id', 'signaled_users', ['user_id'], {}),
+    ('ix_signaled_users_user_signaled_id', 'signaled_users', ['user_signaled_id'], {}),
+    ('ix_action_logs_user_id_date', 'action_logs', ['user_id', 'date'], {}),
+]
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == "postgresql"
+    for name, table, columns, options in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True, **options)
+    # the logs are written in date order: a BRIN index on PostgreSQL (a few pages), a B-tree elsewhere
+    if is_postgresql:
+        op.create_index(
+            'ix_action_logs_date_brin', 'action_logs', ['date'], unique=False, if_not_exists=True,
+            postgresql_using='brin'
+        )
+    else:
+        op.create_index('ix_action_logs_date', 'action_logs', ['date'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index('ix_action_logs_date_brin', table_name='action_logs', postgresql_using='brin')
+    else:
+        op.drop_index('ix_action_logs_date', table_name='action_logs')
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,72 @@
+"""search index backfill
+
+Builds the search document of every existing event, the search only reads `event_search` and the events
+created before it would not be found until a reindex. The events are read with plain SQL (the schema of
+this revision), the documents are written by the search repository so they match the ones of the API.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 03:52:40.117264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from repositories import event_search_repo
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+EVENTS = sa.text(
+    "SELECT events.id, events.title, events.description, addresses.city, addresses.country, "
+    "addresses.zipcode, profiles.first_name, profiles.last_name "
+    "FROM events "
+    "LEFT JOIN addresses ON addresses.id = events.address_id "
+    "LEFT JOIN profiles ON profiles.id = events.profile_id "
+    "WHERE events.id > :last_id ORDER BY events.id LIMIT :limit"
+)
+
+EVENT_TYPES = sa.text(
+    "SELECT event_type.event_id, types.type FROM event_type "
+    "JOIN types ON types.id = event_type.type_id "
+    "WHERE event_type.event_id BETWEEN :first_id AND :last_id"
+)
+
+
+def upgrade() -> None:
+    # the session joins the transaction of the migration, it is committed with the revision
+    with Session(bind=op.get_bind()) as session:
+        last_id = 0
+        while True:
+            events = session.execute(EVENTS, {"last_id": last_id, "limit": BATCH_SIZE}).all()
+            if not events:
+                return
+            types = {}
+            bounds = {"first_id": events[0].id, "last_id": events[-1].id}
+            for event_id, type_ in session.execute(EVENT_TYPES, bounds):
+                types.setdefault(event_id, []).append(type_)
+            for event in events:
+                event_search_repo.upsert_event_document(
+                    session,
+                    event.id,
+                    event.title,
+                    event.description,
+                    " ".join(part for part in (event.city, event.country, event.zipcode) if part),
+                    " ".join(part for part in (event.first_name, event.last_name) if part),
+                    " ".join(type_ for type_ in types.get(event.id, []) if type_)
+                )
+            last_id = events[-1].id
+
+
+def downgrade() -> None:
+    # the documents stay, the table itself is dropped by the downgrade of 0002
+    pass
@@ -0,0 +1,35 @@
+"""revenue rollups backfill
+
+Computes the daily revenues of the existing payments, the revenue routes only read the rollup tables and
+the payments made before them would be missing until a rebuild. The rollups are computed by the repository
+with INSERT ... SELECT ... GROUP BY, the same statements as the super-admin rebuild route.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 04:06:18.530942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy.orm import Session
+
+from repositories import revenue_rollup_repo
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the session joins the transaction of the migration, it is committed with the revision
+    with Session(bind=op.get_bind()) as session:
+        revenue_rollup_repo.rebuild_revenues(session)
+
+
+def downgrade() -> None:
+    # the rollups stay, the tables themselves are dropped by the downgrade of 0002
+    pass
@@ -0,0 +1,35 @@
+"""counter flushes
+
+The record of the batches of buffered likes applied to the counters, a batch replayed after a lost
+acknowledgement is not counted twice.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 04:31:54.276810
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('counter_flushes',
+    sa.Column('batch_id', sa.String(), nullable=False),
+    sa.Column('flushed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('batch_id')
+    )
+    op.create_index(op.f('ix_counter_flushes_flushed_at'), 'counter_flushes', ['flushed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_counter_flushes_flushed_at'), table_name='counter_flushes')
+    op.drop_table('counter_flushes')
@@ -2,19 +2,27 @@
 from . import action_logs_model
 from . import address_model
 from . import association_model
+from . import banned_term_model
 from . import banned_user_model
 from . import comment_model
+from . import counter_flush_model
+from . import email_job_model
+from . import event_card_model
 from . import event_model
 from . import event_picture_model
+from . import event_search_model
 from . import failed_login_model
 from . import like_model
+from . import moderation_scan_model
 from . import payment_model
 from . import profile_model
 from . import reason_model
 from . import registration_model
+from . import revenue_rollup_model
 from . import role_model
 from . import signaled_comments_model
 from . import signaled_events_model
 from . import signaled_users_model
 from . import type_model
 from . import user_model
+from . import webhook_event_model
@@ -1,11 +1,16 @@
 """This file contains the action log model for sqlalchemy"""
-from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime, Enum
+from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from database.db import Base
 from enums import action, log_level
 
 class ActionLog(Base):
-    """Action log model that will be translated as a table in db"""
+    """
+    Action log model that will be translated as a table in db.
+
+    On PostgreSQL the table is partitioned by month on `date` (see `action_log_repo.partition_action_logs`),
+    its primary key then is (id, date): the ids stay unique, they come from a single sequence.
+    """
     __tablename__ = "action_logs"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -15,4 +20,12 @@ class ActionLog(Base):
     description = Column(Text)
     date = Column(DateTime)
 
+    __table_args__ = (
+        # the logs are written in date order, a BRIN index of a few pages covers the date ranges
+        Index("ix_action_logs_date_brin", "date", postgresql_using="brin").ddl_if(dialect="postgresql"),
+        # other databases have no BRIN index, a B-tree serves the day ranges
+        Index("ix_action_logs_date", "date").ddl_if(callable_=lambda ddl, target, bind, **kw: kw["dialect"].name != "postgresql"),
+        Index("ix_action_logs_user_id_date", "user_id", "date"),
+    )
+
     user = relationship("User", foreign_keys=[user_id])
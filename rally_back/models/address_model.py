@@ -1,5 +1,5 @@
 """This file contains the address model for sqlalchemy"""
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from sqlalchemy.orm import relationship
 
 from database.db import Base
@@ -15,4 +15,8 @@ class Address(Base):
     street = Column(String)
     country = Column(String)
 
+    __table_args__ = (
+        Index("ix_addresses_country_city", "country", "city"),
+    )
+
     event = relationship("Event", back_populates="address", uselist=False, cascade="all, delete-orphan", single_parent=True)
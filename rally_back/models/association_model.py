@@ -1,10 +1,12 @@
 """This file contains the association models for sqlalchemy"""
-from sqlalchemy import Column, Integer, ForeignKey, Table
+from sqlalchemy import Column, Integer, ForeignKey, Index, Table
 from database.db import Base
 
 EventType = Table(
     "event_type",
     Base.metadata,
-    Column("event_id", Integer, ForeignKey("events.id"), primary_key=True),
+    Column("event_id", Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True),
     Column("type_id", Integer, ForeignKey("types.id"), primary_key=True),
+    # the primary key serves the types of an event, this index the events of a type
+    Index("ix_event_type_type_id", "type_id"),
 )
@@ -0,0 +1,21 @@
+"""This file contains the banned term model for sqlalchemy"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+from database.db import Base
+from enums.moderation_rule_kind import ModerationRuleKindEnum
+from enums.moderation_severity import ModerationSeverityEnum
+
+class BannedTerm(Base):
+    """
+    banned terms table in db, added by the super-admins on top of the banned words file.
+
+    The moderation matcher of every worker is rebuilt when the terms change (count or last update).
+    """
+    __tablename__ = "banned_terms"
+
+    id = Column(Integer, primary_key=True, index=True)
+    term = Column(String, nullable=False, unique=True)
+    kind = Column(String, nullable=False, default=ModerationRuleKindEnum.WORD.value)
+    severity = Column(String, nullable=False, default=ModerationSeverityEnum.HIGH.value)
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
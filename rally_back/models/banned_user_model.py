@@ -1,6 +1,6 @@
 """This file contains the banned users model for sqlalchemy"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index, func
 from database.db import Base
 
 class BannedUser(Base):
@@ -11,3 +11,8 @@ class BannedUser(Base):
     banned_email = Column(String, nullable=False, unique=True)
     banned_by_email = Column(String, nullable=True)
     banned_at = Column(DateTime, default=datetime.now())
+
+    __table_args__ = (
+        # the bans are looked up case insensitively (banned_user_repo.get_banned_user_by_email)
+        Index("ix_banned_users_banned_email_lower", func.lower(banned_email)),
+    )
@@ -1,6 +1,6 @@
 """This file contains the comment model for sqlalchemy"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Index
 from sqlalchemy.orm import relationship
 from database.db import Base
 
@@ -10,10 +10,15 @@ class Comment(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     content = Column(String)
-    profile_id = Column(Integer, ForeignKey("profiles.id"))
-    event_id = Column(Integer, ForeignKey("events.id"))
+    profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"))
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"))
     created_at = Column(DateTime, default=datetime.now())
 
 
+    __table_args__ = (
+        Index("ix_comments_event_id_created_at", "event_id", "created_at"),
+        Index("ix_comments_profile_id_created_at", "profile_id", "created_at"),
+    )
+
     profile = relationship("Profile", foreign_keys=[profile_id])
     event = relationship("Event", foreign_keys=[event_id])
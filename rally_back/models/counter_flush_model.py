@@ -0,0 +1,16 @@
+"""This file contains the counter flush model for sqlalchemy"""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from database.db import Base
+
+class CounterFlush(Base):
+    """
+    counter flushes table in db, one row per batch of buffered likes written to the counters.
+
+    The row is inserted in the transaction applying the batch: a batch replayed after a lost
+    acknowledgement finds its row and is not counted twice.
+    """
+    __tablename__ = "counter_flushes"
+
+    batch_id = Column(String, primary_key=True)
+    flushed_at = Column(DateTime, default=datetime.now, nullable=False, index=True)
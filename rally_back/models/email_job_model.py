@@ -0,0 +1,30 @@
+"""This file contains the email job model for sqlalchemy"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from database.db import Base
+from enums.email_job_status import EmailJobStatusEnum
+
+class EmailJob(Base):
+    """
+    email jobs table in db, the outbound email queue.
+
+    Requests only insert a pending job, the email workers claim them in batches, send them over
+    a reused SMTP session and retry the failures with an exponential backoff.
+    """
+    __tablename__ = "email_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default=EmailJobStatusEnum.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.now)
+    locked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_jobs_status_next_attempt_at", "status", "next_attempt_at"),
+    )
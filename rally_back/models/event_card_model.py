@@ -0,0 +1,18 @@
+"""This file contains the event card model for sqlalchemy"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON
+from database.db import Base
+
+class EventCard(Base):
+    """
+    event cards table in db, one row per event.
+
+    `payload` is the precomputed list representation of the event (event, organizer profile, types,
+    pictures and address), refreshed whenever one of them changes, so that the event lists are read
+    from a single table instead of being rebuilt from six.
+    """
+    __tablename__ = "event_cards"
+
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    payload = Column(JSON, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now)
@@ -1,6 +1,6 @@
 """This file contains the event model for sqlalchemy"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Double, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Double, Text, Index
 from sqlalchemy.orm import relationship
 from models.association_model import EventType
 from database.db import Base
@@ -13,18 +13,24 @@ class Event(Base):
     title = Column(String, index=True)
     description = Column(Text)
     nb_places = Column(Integer)
+    # registrations holding a seat, reserved and released with conditional updates (seat_repo)
+    seats_taken = Column(Integer, nullable=False, default=0, server_default="0")
     price = Column(Double)
     profile_id = Column(Integer, ForeignKey("profiles.id"))
     nb_likes = Column(Integer)
     nb_comments = Column(Integer)
-    date = Column(DateTime)
+    date = Column(DateTime, index=True)
     cloture_billets = Column(DateTime)
     address_id = Column(Integer, ForeignKey("addresses.id"))
     created_at = Column(DateTime, default=datetime.now())
     updated_at = Column(DateTime, default=datetime.now())
 
 
+    __table_args__ = (
+        Index("ix_events_profile_id_date", "profile_id", "date"),
+    )
+
     profile = relationship("Profile", foreign_keys=[profile_id])
     types = relationship("Type", secondary=EventType, back_populates="events")
     address = relationship("Address", back_populates="event", uselist=False, single_parent=True)
-    pictures = relationship("EventPicture", back_populates="event", cascade="all, delete-orphan")
+    pictures = relationship("EventPicture", back_populates="event", cascade="all, delete-orphan", passive_deletes=True)
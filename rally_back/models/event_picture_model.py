@@ -8,7 +8,7 @@ class EventPicture(Base):
     __tablename__ = "event_pictures"
 
     id = Column(Integer, primary_key=True, index=True)
-    event_id = Column(Integer, ForeignKey("events.id"))
-    photo = Column(String)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), index=True)
+    photo = Column(String, index=True)
 
     event = relationship("Event", back_populates="pictures")
@@ -0,0 +1,24 @@
+"""This file contains the event search document model for sqlalchemy"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from database.db import Base
+
+class EventSearch(Base):
+    """
+    event search documents table in db, one row per event.
+
+    `document` holds the normalized (lowercased, accent free) searchable text of the event: title,
+    description, city, country, zipcode, organizer name and type names. On PostgreSQL `search_vector`
+    holds the weighted tsvector of the same fields, backed by a GIN index.
+    """
+    __tablename__ = "event_search"
+
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    document = Column(Text, nullable=False, default="")
+    search_vector = Column(Text().with_variant(TSVECTOR(), "postgresql"), nullable=True)
+    updated_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index("ix_event_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
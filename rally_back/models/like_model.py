@@ -1,6 +1,6 @@
 """This file contains the llike model for sqlalchemy"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from database.db import Base
 
@@ -9,10 +9,14 @@ class Like(Base):
     __tablename__ = "likes"
 
     id = Column(Integer, primary_key=True, index=True)
-    profile_id = Column(Integer, ForeignKey("profiles.id"))
-    event_id = Column(Integer, ForeignKey("events.id"))
+    profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"))
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"))
     created_at = Column(DateTime, default=datetime.now())
 
+    __table_args__ = (
+        UniqueConstraint("profile_id", "event_id", name="uq_likes_profile_event"),
+        Index("ix_likes_event_id_created_at", "event_id", "created_at"),
+    )
 
     profile = relationship("Profile", foreign_keys=[profile_id])
     event = relationship("Event", foreign_keys=[event_id])
@@ -0,0 +1,32 @@
+"""This file contains the moderation scan model for sqlalchemy"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from database.db import Base
+from enums.moderation_scan_status import ModerationScanStatusEnum
+
+class ModerationScan(Base):
+    """
+    retroactive moderation scans table in db, one row per scan triggered by a super-admin.
+
+    A scan goes through the comments then the events by increasing id, one batch per transaction, and
+    stores after each batch the last id it checked: a scan interrupted (worker restart, failure) resumes
+    from this checkpoint. The contents containing banned terms are signaled in the name of the
+    super-admin who triggered the scan, with the system reason.
+    """
+    __tablename__ = "moderation_scans"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    status = Column(String, nullable=False, default=ModerationScanStatusEnum.PENDING.value, index=True)
+    # "comments" then "events"
+    phase = Column(String, nullable=False, default="comments")
+    last_comment_id = Column(Integer, nullable=False, default=0)
+    last_event_id = Column(Integer, nullable=False, default=0)
+    comments_scanned = Column(Integer, nullable=False, default=0)
+    comments_flagged = Column(Integer, nullable=False, default=0)
+    events_scanned = Column(Integer, nullable=False, default=0)
+    events_flagged = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    locked_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
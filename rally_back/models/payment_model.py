@@ -1,6 +1,6 @@
 """This file contains the payment model for sqlalchemy"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Double
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Double, Index, text
 from sqlalchemy.orm import relationship
 from database.db import Base
 from enums.payment_status import PaymentStatusEnum
@@ -19,10 +19,23 @@ class Payment(Base):
     amount = Column(Double)
     fee = Column(Double)
     brut_amount = Column(Double)
-    stripe_session_id = Column(String)
+    stripe_session_id = Column(String, index=True)
     stripe_payment_intent_id = Column(String, nullable=True)
     status = Column(String, default=PaymentStatusEnum.PENDING)
-    created_at = Column(DateTime, default=datetime.now())
+    created_at = Column(DateTime, default=datetime.now(), index=True)
+
+    __table_args__ = (
+        Index("ix_payments_buyer_id_created_at", "buyer_id", "created_at"),
+        Index("ix_payments_organizer_id_created_at", "organizer_id", "created_at"),
+        Index("ix_payments_event_id_status", "event_id", "status"),
+        # most payments never get an intent id (abandoned checkouts), only the others are indexed
+        Index(
+            "ix_payments_stripe_payment_intent_id",
+            "stripe_payment_intent_id",
+            postgresql_where=text("stripe_payment_intent_id IS NOT NULL"),
+            sqlite_where=text("stripe_payment_intent_id IS NOT NULL")
+        ),
+    )
 
     buyer = relationship("User", foreign_keys=[buyer_id])
     organizer = relationship("User", foreign_keys=[organizer_id])
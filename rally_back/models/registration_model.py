@@ -1,6 +1,6 @@
 """This file contains the registration model for sqlalchemy"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from database.db import Base
 from enums.payment_status import PaymentStatusEnum
@@ -10,11 +10,15 @@ class Registration(Base):
     __tablename__ = "registrations"
 
     id = Column(Integer, primary_key=True, index=True)
-    profile_id = Column(Integer, ForeignKey("profiles.id"))
-    event_id = Column(Integer, ForeignKey("events.id"))
-    registered_at = Column(DateTime, default=datetime.now())
+    profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"))
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"))
+    registered_at = Column(DateTime, default=datetime.now(), index=True)
     payment_status = Column(String, default=PaymentStatusEnum.PENDING)
 
+    __table_args__ = (
+        UniqueConstraint("profile_id", "event_id", name="uq_registrations_profile_event"),
+        Index("ix_registrations_event_id_registered_at", "event_id", "registered_at"),
+    )
 
     profile = relationship("Profile", foreign_keys=[profile_id])
     event = relationship("Event", foreign_keys=[event_id])
@@ -0,0 +1,53 @@
+"""This file contains the daily revenue rollup models for sqlalchemy"""
+from sqlalchemy import Column, Integer, String, Date, Double, UniqueConstraint, Index
+from database.db import Base
+
+
+class OrganizerDailyRevenue(Base):
+    """
+    daily revenue of an organizer in db, one row per organizer, day and payment status.
+
+    The rows are updated in the transaction of every payment status change: the payment is counted
+    (amounts and count) in the row of its new status and removed from the row of its old status, on the
+    day the payment was created. The ids are not foreign keys, the revenue history outlives the users.
+    """
+    __tablename__ = "organizer_daily_revenues"
+
+    id = Column(Integer, primary_key=True, index=True)
+    organizer_id = Column(Integer, nullable=False)
+    day = Column(Date, nullable=False)
+    status = Column(String, nullable=False)
+    payments_count = Column(Integer, nullable=False, default=0)
+    # brut_amount, fee and amount of the payments
+    gross_amount = Column(Double, nullable=False, default=0)
+    fee_amount = Column(Double, nullable=False, default=0)
+    net_amount = Column(Double, nullable=False, default=0)
+
+    __table_args__ = (
+        # the date range queries of an organizer read this index only
+        UniqueConstraint("organizer_id", "day", "status", name="uq_organizer_daily_revenues_organizer_day_status"),
+        Index("ix_organizer_daily_revenues_day", "day"),
+    )
+
+
+class EventDailyRevenue(Base):
+    """
+    daily revenue of an event in db, one row per event, day and payment status, maintained like
+    `OrganizerDailyRevenue`. The organizer of the event is kept to restrict the reads to them.
+    """
+    __tablename__ = "event_daily_revenues"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, nullable=False)
+    organizer_id = Column(Integer, nullable=False, index=True)
+    day = Column(Date, nullable=False)
+    status = Column(String, nullable=False)
+    payments_count = Column(Integer, nullable=False, default=0)
+    gross_amount = Column(Double, nullable=False, default=0)
+    fee_amount = Column(Double, nullable=False, default=0)
+    net_amount = Column(Double, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("event_id", "day", "status", name="uq_event_daily_revenues_event_day_status"),
+        Index("ix_event_daily_revenues_day", "day"),
+    )
@@ -1,6 +1,6 @@
 """This file contains the signaled comments model for sqlalchemy"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from database.db import Base
@@ -10,12 +10,16 @@ class SignaledComment(Base):
     __tablename__ = "signaled_comments"
 
     id = Column(Integer, primary_key=True, index=True)
-    comment_id = Column(Integer, ForeignKey("comments.id"))
+    comment_id = Column(Integer, ForeignKey("comments.id", ondelete="CASCADE"), index=True)
     reason_id = Column(Integer, ForeignKey("reasons.id"))
-    created_at = Column(DateTime, default=datetime.now)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, default=datetime.now, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
     status = Column(String, default="pending")
 
+    __table_args__ = (
+        Index("ix_signaled_comments_status_created_at", "status", "created_at"),
+    )
+
     comment_signaled = relationship("Comment", foreign_keys=[comment_id])
     user = relationship("User", foreign_keys=[user_id])
     reason = relationship("Reason", back_populates="signaled_comments")
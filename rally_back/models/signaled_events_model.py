@@ -1,6 +1,6 @@
 """This file contains the signaled events model for sqlalchemy"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database.db import Base
 
@@ -9,12 +9,16 @@ class SignaledEvent(Base):
     __tablename__ = "signaled_events"
 
     id = Column(Integer, primary_key=True, index=True)
-    event_id = Column(Integer, ForeignKey("events.id"))
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), index=True)
     reason_id = Column(Integer, ForeignKey("reasons.id"))
-    created_at = Column(DateTime, default=datetime.now)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, default=datetime.now, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
     status = Column(String, default="pending")
 
+    __table_args__ = (
+        Index("ix_signaled_events_status_created_at", "status", "created_at"),
+    )
+
     event = relationship("Event", foreign_keys=[event_id])
     user = relationship("User", foreign_keys=[user_id])
     reason = relationship("Reason", back_populates="signaled_events")
@@ -1,6 +1,6 @@
 """This file contains the signaled users model for sqlalchemy"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database.db import Base
 
@@ -9,12 +9,16 @@ class SignaledUser(Base):
     __tablename__ = "signaled_users"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_signaled_id = Column(Integer, ForeignKey("users.id"))
+    user_signaled_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
     reason_id = Column(Integer, ForeignKey("reasons.id"))
-    created_at = Column(DateTime, default=datetime.now)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, default=datetime.now, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
     status = Column(String, default="pending")
 
+    __table_args__ = (
+        Index("ix_signaled_users_status_created_at", "status", "created_at"),
+    )
+
     user_signaled = relationship("User", foreign_keys=[user_signaled_id])
     user = relationship("User", foreign_keys=[user_id])
     reason = relationship("Reason", back_populates="signaled_users")
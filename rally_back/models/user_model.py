@@ -19,6 +19,8 @@ class User(Base):
     is_verified = Column(Boolean, default=False)
     verification_token = Column(Integer, nullable=True, default=None)
     verification_token_sent_at = Column(DateTime, nullable=True, default=None)
+    # embedded in the access tokens, incremented to revoke them (role change)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     role = relationship("Role", back_populates="user", uselist=False)
     profile = relationship("Profile", back_populates="user", cascade="all, delete-orphan", uselist=False)
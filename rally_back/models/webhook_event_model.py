@@ -0,0 +1,35 @@
+"""This file contains the webhook event model for sqlalchemy"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from database.db import Base
+from enums.webhook_event_status import WebhookEventStatusEnum
+
+class WebhookEvent(Base):
+    """
+    webhook inbox table in db, one row per Stripe event.
+
+    The webhook endpoint only stores the verified payload and acknowledges it, the unique
+    `stripe_event_id` turns Stripe redeliveries into no-ops. The webhook workers process the
+    events in the order Stripe created them, the events of a same object (checkout session,
+    account) one after the other, and retry the failures with an exponential backoff.
+    """
+    __tablename__ = "webhook_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    stripe_event_id = Column(String, nullable=False, unique=True)
+    event_type = Column(String, nullable=False)
+    # id of the Stripe object the event is about, the events of an object are processed in order
+    object_id = Column(String, nullable=True, index=True)
+    stripe_created = Column(Integer, nullable=False, default=0)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default=WebhookEventStatusEnum.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.now)
+    locked_at = Column(DateTime, nullable=True)
+    received_at = Column(DateTime, default=datetime.now)
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_webhook_events_status_next_attempt_at", "status", "next_attempt_at"),
+    )
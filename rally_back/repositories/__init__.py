@@ -1,19 +1,29 @@
 """This file contains the repo imports"""
 from . import action_log_repo
 from . import address_repo
+from . import banned_term_repo
 from . import banned_user_repo
 from . import comment_repo
+from . import counter_repo
+from . import deletion_repo
+from . import email_job_repo
+from . import event_card_repo
 from . import event_picture_repo
 from . import event_repo
+from . import event_search_repo
 from . import failed_login_repo
 from . import like_repo
+from . import moderation_scan_repo
 from . import payment_repo
 from . import profile_repo
 from . import reason_repo
 from . import registration_repo
+from . import revenue_rollup_repo
 from . import role_repo
+from . import seat_repo
 from . import signaled_comment_repo
 from . import signaled_event_repo
 from . import signaled_user_repo
 from . import type_repo
 from . import user_repo
+from . import webhook_event_repo
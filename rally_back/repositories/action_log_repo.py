@@ -1,11 +1,14 @@
 """This file contains the action log repository"""
+import json
 from typing import Optional
-from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from datetime import date as Date, datetime, timedelta
+from sqlalchemy.orm import Query, Session, selectinload
+from sqlalchemy import insert, text
 from models.action_logs_model import ActionLog
+from models.user_model import User
 from enums.action import ActionEnum
 from enums.log_level import LogLevelEnum
+from core.date_range import filter_day
 
 
 def add_action_log(db: Session, action_log: ActionLog):
@@ -37,6 +40,53 @@ def refresh_action_log(db: Session, action_log: ActionLog):
     """
     db.refresh(action_log)
 
+def insert_action_logs(db: Session, records: list[dict]) -> None:
+    """
+    Insert many action logs in one statement (multi-row INSERT ... VALUES batches of the driver).
+    The caller commits.
+
+    Args:
+        db (Session): The database session used to interact with the database.
+        records (list[dict]): The columns of the action logs.
+    """
+    db.execute(insert(ActionLog), records)
+
+def filter_action_logs(
+    query: Query,
+    date: Optional[datetime],
+    action_type: Optional[ActionEnum],
+    user_id: Optional[int],
+    log_type: Optional[LogLevelEnum]
+) -> Query:
+    """
+    Apply the filters of the action logs list to a query.
+
+    The day is filtered as a half-open range on the raw column, so that the partitions of the other months
+    are pruned and the BRIN index on `date` is used.
+
+    Args:
+        query (Query): The query to filter.
+        date (Optional[datetime]): day filter
+        action_type (Optional[ActionEnum]): action type filter
+        user_id (Optional[int]): user id filter
+        log_type (Optional[LogLevelEnum]): log type filter
+
+    Returns:
+        The filtered query.
+    """
+    query = filter_day(query, ActionLog.date, date)
+
+    if action_type is not None:
+        query = query.filter(ActionLog.action_type == action_type)
+
+    if user_id is not None:
+        query = query.filter(ActionLog.user_id == user_id)
+
+    if log_type is not None:
+        query = query.filter(ActionLog.log_type == log_type)
+
+    return query
+
 def get_action_logs_with_filters(
     db: Session,
     date: Optional[datetime],
@@ -61,23 +111,42 @@ def get_action_logs_with_filters(
     Returns:
         A list of action logs from the database.
     """
-    query = db.query(ActionLog)
+    query = filter_action_logs(
+        db.query(ActionLog).options(selectinload(ActionLog.user).selectinload(User.role)),
+        date,
+        action_type,
+        user_id,
+        log_type
+    )
+    # the ids follow the writing order (the dates): the primary key index of every partition serves the
+    # latest logs first, without sorting the matching rows
+    return query.order_by(ActionLog.id.desc()).offset(offset).limit(limit).all()
 
-    if date is not None:
-        query = query.filter(func.date(ActionLog.date) == date.date())
-
-    if action_type is not None:
-        query = query.filter(ActionLog.action_type == action_type)
+def get_action_logs_with_filters_total_count(
+    db: Session,
+    date: Optional[datetime],
+    action_type: Optional[ActionEnum],
+    user_id: Optional[int],
+    log_type: Optional[LogLevelEnum],
+) -> int:
+    """
+    Returns the count of the action logs from the database according to filters.
 
-    if user_id is not None:
-        query = query.filter(ActionLog.user_id == user_id)
+    Args:
+        db (Session): The database session used to interact with the database.
+        date (Optional[datetime]): date filter
+        action_type (Optional[ActionEnum]): action type filter
+        user_id (Optional[int]): user id filter
+        log_type (Optional[LogLevelEnum]): log type filter
 
-    if log_type is not None:
-        query = query.filter(ActionLog.log_type == log_type)
+    Returns:
+        A list of action logs from the database.
+    """
+    query = filter_action_logs(db.query(ActionLog), date, action_type, user_id, log_type)
+    return query.count()
 
-    return query.order_by(ActionLog.date.desc()).offset(offset).limit(limit).all()
 
-def get_action_logs_with_filters_total_count(
+def get_action_logs_estimated_count(
     db: Session,
     date: Optional[datetime],
     action_type: Optional[ActionEnum],
@@ -85,7 +154,10 @@ def get_action_logs_with_filters_total_count(
     log_type: Optional[LogLevelEnum],
 ) -> int:
     """
-    Returns the count of the action logs from the database according to filters.
+    Returns an estimation of the number of action logs matching the filters, without counting them.
+
+    On PostgreSQL the estimation is the row estimate of `EXPLAIN` (the statistics of the partitions),
+    on other databases it falls back to the exact count.
 
     Args:
         db (Session): The database session used to interact with the database.
@@ -95,21 +167,100 @@ def get_action_logs_with_filters_total_count(
         log_type (Optional[LogLevelEnum]): log type filter
 
     Returns:
-        A list of action logs from the database.
+        The estimated number of action logs.
     """
-    query = db.query(ActionLog)
+    if db.get_bind().dialect.name != "postgresql":
+        return get_action_logs_with_filters_total_count(db, date, action_type, user_id, log_type)
 
-    if date is not None:
-        query = query.filter(func.date(ActionLog.date) == date.date())
+    query = filter_action_logs(db.query(ActionLog.id), date, action_type, user_id, log_type)
+    compiled = query.statement.compile(dialect=db.get_bind().dialect)
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
 
-    if action_type is not None:
-        query = query.filter(ActionLog.action_type == action_type)
+ACTION_LOGS_DEFAULT_PARTITION = "action_logs_default"
 
-    if user_id is not None:
-        query = query.filter(ActionLog.user_id == user_id)
+def partition_action_logs(db: Session) -> bool:
+    """
+    Turns the `action_logs` table into a table partitioned by month on `date` (PostgreSQL only).
 
-    if log_type is not None:
-        query = query.filter(ActionLog.log_type == log_type)
+    The existing table becomes the default partition as is (no copy), the new rows go to the monthly
+    partitions created by `create_action_logs_partition`. The primary key becomes (id, date), the ids
+    keep coming from the same sequence. Runs once, the concurrent workers wait on an advisory lock.
+    The caller commits.
 
-    return query.order_by(ActionLog.date.desc()).count()
+    Args:
+        db (Session): The database session used to interact with the database.
 
+    Returns:
+        Whether the table was converted by this call.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('action_logs_partitioning'))"))
+    partitioned = db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'action_logs'::regclass)"
+    )).scalar()
+    if partitioned:
+        return False
+    for statement in (
+        # the secondary indexes are created again on the partitioned table, the names must be free
+        "DROP INDEX IF EXISTS ix_action_logs_id",
+        "DROP INDEX IF EXISTS ix_action_logs_date_brin",
+        "DROP INDEX IF EXISTS ix_action_logs_user_id_date",
+        f"ALTER TABLE action_logs RENAME TO {ACTION_LOGS_DEFAULT_PARTITION}",
+        f"ALTER TABLE {ACTION_LOGS_DEFAULT_PARTITION} RENAME CONSTRAINT action_logs_pkey TO {ACTION_LOGS_DEFAULT_PARTITION}_pkey",
+        # the partition key is part of the primary key, it cannot be null
+        f"UPDATE {ACTION_LOGS_DEFAULT_PARTITION} SET date = 'epoch' WHERE date IS NULL",
+        f"ALTER TABLE {ACTION_LOGS_DEFAULT_PARTITION} ALTER COLUMN date SET NOT NULL",
+        f"CREATE TABLE action_logs (LIKE {ACTION_LOGS_DEFAULT_PARTITION} INCLUDING DEFAULTS) PARTITION BY RANGE (date)",
+        "ALTER TABLE action_logs ADD PRIMARY KEY (id, date)",
+        "ALTER TABLE action_logs ADD FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE SET NULL",
+        "ALTER SEQUENCE action_logs_id_seq OWNED BY action_logs.id",
+        "CREATE INDEX ix_action_logs_date_brin ON action_logs USING brin (date)",
+        "CREATE INDEX ix_action_logs_user_id_date ON action_logs (user_id, date)",
+        f"ALTER TABLE action_logs ATTACH PARTITION {ACTION_LOGS_DEFAULT_PARTITION} DEFAULT",
+    ):
+        db.execute(text(statement))
+    return True
+
+def create_action_logs_partition(db: Session, month: Date) -> bool:
+    """
+    Creates the partition of the action logs of a month, if the table is partitioned and the partition does
+    not exist yet (PostgreSQL only).
+
+    A month whose rows already went to the default partition (written before its partition existed) is
+    skipped, they stay in the default partition. The caller commits.
+
+    Args:
+        db (Session): The database session used to interact with the database.
+        month (date): The first day of the month.
+
+    Returns:
+        Whether the partition was created.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    name = f"action_logs_y{month.year}m{month.month:02d}"
+    start = month.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    exists = db.execute(text(
+        "SELECT to_regclass(:name) IS NOT NULL, "
+        "EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'action_logs'::regclass)"
+    ), {"name": name}).first()
+    if exists[0] or not exists[1]:
+        return False
+    in_default = db.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {ACTION_LOGS_DEFAULT_PARTITION} WHERE date >= :start AND date < :end)"
+    ), {"start": start, "end": end}).scalar()
+    if in_default:
+        return False
+    db.execute(text(
+        f"CREATE TABLE {name} PARTITION OF action_logs FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    return True
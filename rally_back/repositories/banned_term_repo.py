@@ -0,0 +1,44 @@
+"""This file contains the banned term repository"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.banned_term_model import BannedTerm
+
+
+def add_banned_term(db: Session, banned_term: BannedTerm) -> None:
+    """
+    This function is used to add a banned term in the database.
+    """
+    db.add(banned_term)
+
+def commit_banned_term(db: Session) -> None:
+    """
+    This function is used to commit the changes in the database.
+    """
+    db.commit()
+
+def refresh_banned_term(db: Session, banned_term: BannedTerm) -> None:
+    """
+    This function is used to refresh a banned term.
+    """
+    db.refresh(banned_term)
+
+def get_banned_term_by_term(db: Session, term: str) -> Optional[BannedTerm]:
+    """
+    This function is used to fetch a banned term by its term.
+    """
+    return db.query(BannedTerm).filter(BannedTerm.term == term).first()
+
+def get_banned_terms(db: Session) -> list[tuple[str, str, str]]:
+    """
+    This function is used to fetch the term, kind and severity of every banned term, without loading the objects.
+    """
+    return [tuple(row) for row in db.query(BannedTerm.term, BannedTerm.kind, BannedTerm.severity).all()]
+
+def get_banned_terms_version(db: Session) -> tuple[int, Optional[datetime]]:
+    """
+    This function is used to fetch the number of banned terms and their last update, they change with the terms.
+    """
+    count, updated_at = db.query(func.count(BannedTerm.id), func.max(BannedTerm.updated_at)).one()
+    return count, updated_at
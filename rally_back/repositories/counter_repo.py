@@ -0,0 +1,200 @@
+"""This file contains the counters repository (likes and comments counters)"""
+from typing import Optional
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import Integer, bindparam, case, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.comment_model import Comment
+from models.counter_flush_model import CounterFlush
+from models.event_model import Event
+from models.like_model import Like
+from models.profile_model import Profile
+
+
+def _shifted(column, delta: int):
+    """
+    This function returns `column + delta` computed by the database, floored at 0.
+    """
+    shifted = func.coalesce(column, 0) + delta
+    return case((shifted < 0, 0), else_=shifted)
+
+
+def increment_event_likes(db: Session, event_id: int, delta: int) -> Optional[tuple[int, int]]:
+    """
+    This function adds `delta` to the likes counter of an event in a single UPDATE ... RETURNING.
+
+    It returns the new counter and the id of the organizer profile, or None if the event does not exist.
+    """
+    row = db.execute(
+        update(Event)
+        .where(Event.id == event_id)
+        .values(nb_likes=_shifted(Event.nb_likes, delta))
+        .returning(Event.nb_likes, Event.profile_id)
+        .execution_options(synchronize_session="fetch")
+    ).first()
+    return tuple(row) if row else None
+
+
+def increment_profile_likes(db: Session, profile_id: int, delta: int) -> Optional[int]:
+    """
+    This function adds `delta` to the likes received by a profile in a single UPDATE ... RETURNING.
+
+    It returns the new counter, or None if the profile does not exist.
+    """
+    return db.execute(
+        update(Profile)
+        .where(Profile.id == profile_id)
+        .values(nb_like=_shifted(Profile.nb_like, delta))
+        .returning(Profile.nb_like)
+        .execution_options(synchronize_session="fetch")
+    ).scalar()
+
+
+def increment_event_comments(db: Session, event_id: int, delta: int) -> Optional[int]:
+    """
+    This function adds `delta` to the comments counter of an event in a single UPDATE ... RETURNING.
+
+    It returns the new counter, or None if the event does not exist.
+    """
+    return db.execute(
+        update(Event)
+        .where(Event.id == event_id)
+        .values(nb_comments=_shifted(Event.nb_comments, delta))
+        .returning(Event.nb_comments)
+        .execution_options(synchronize_session="fetch")
+    ).scalar()
+
+
+def record_flush(db: Session, batch_id: str) -> bool:
+    """
+    This function records a batch of buffered deltas with INSERT ... ON CONFLICT DO NOTHING on its id,
+    in the transaction applying it.
+
+    It returns False if the batch was already applied by a previous flush.
+    """
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    return db.execute(
+        insert(CounterFlush)
+        .values(batch_id=batch_id, flushed_at=datetime.now())
+        .on_conflict_do_nothing(index_elements=[CounterFlush.batch_id])
+        .returning(CounterFlush.batch_id)
+    ).first() is not None
+
+
+def delete_flushes_before(db: Session, before: datetime) -> int:
+    """
+    This function deletes the records of the batches flushed before a date, their replay window is over.
+
+    It returns the number of deleted records.
+    """
+    return db.execute(
+        delete(CounterFlush)
+        .where(CounterFlush.flushed_at < before)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def apply_event_likes(db: Session, deltas: dict[int, int]) -> None:
+    """
+    This function adds buffered deltas to the likes counters of many events in one batched UPDATE.
+
+    The rows are updated in id order so that concurrent flushes lock them in the same order.
+    """
+    if not deltas:
+        return
+    table = Event.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("event_id"))
+        .values(nb_likes=_shifted(table.c.nb_likes, bindparam("delta", type_=Integer))),
+        [{"event_id": event_id, "delta": deltas[event_id]} for event_id in sorted(deltas)]
+    )
+
+
+def apply_profile_likes(db: Session, deltas: dict[int, int]) -> None:
+    """
+    This function adds buffered deltas to the likes received by many profiles in one batched UPDATE.
+
+    The rows are updated in id order so that concurrent flushes lock them in the same order.
+    """
+    if not deltas:
+        return
+    table = Profile.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("profile_id"))
+        .values(nb_like=_shifted(table.c.nb_like, bindparam("delta", type_=Integer))),
+        [{"profile_id": profile_id, "delta": deltas[profile_id]} for profile_id in sorted(deltas)]
+    )
+
+
+def reconcile_event_likes(db: Session, event_ids: Optional[list[int]] = None) -> list[int]:
+    """
+    This function recomputes the likes counter of every event from the likes table in one UPDATE.
+
+    When `event_ids` is given, only these events are recomputed.
+    It returns the ids of the events whose counter was wrong.
+    """
+    actual = (
+        select(func.count(Like.id))
+        .where(Like.event_id == Event.id)
+        .scalar_subquery()
+    )
+    query = update(Event).where(func.coalesce(Event.nb_likes, -1) != actual)
+    if event_ids is not None:
+        query = query.where(Event.id.in_(event_ids))
+    return list(db.execute(
+        query
+        .values(nb_likes=actual)
+        .returning(Event.id)
+        .execution_options(synchronize_session=False)
+    ).scalars())
+
+
+def reconcile_profile_likes(db: Session, profile_ids: Optional[list[int]] = None) -> list[int]:
+    """
+    This function recomputes the likes received by every profile (likes on the events it organizes)
+    from the likes table in one UPDATE.
+
+    When `profile_ids` is given, only these profiles are recomputed.
+    It returns the ids of the profiles whose counter was wrong.
+    """
+    actual = (
+        select(func.count(Like.id))
+        .join(Event, Event.id == Like.event_id)
+        .where(Event.profile_id == Profile.id)
+        .scalar_subquery()
+    )
+    query = update(Profile).where(func.coalesce(Profile.nb_like, -1) != actual)
+    if profile_ids is not None:
+        query = query.where(Profile.id.in_(profile_ids))
+    return list(db.execute(
+        query
+        .values(nb_like=actual)
+        .returning(Profile.id)
+        .execution_options(synchronize_session=False)
+    ).scalars())
+
+
+def reconcile_event_comments(db: Session, event_ids: Optional[list[int]] = None) -> list[int]:
+    """
+    This function recomputes the comments counter of every event from the comments table in one UPDATE.
+
+    When `event_ids` is given, only these events are recomputed.
+    It returns the ids of the events whose counter was wrong.
+    """
+    actual = (
+        select(func.count(Comment.id))
+        .where(Comment.event_id == Event.id)
+        .scalar_subquery()
+    )
+    query = update(Event).where(func.coalesce(Event.nb_comments, -1) != actual)
+    if event_ids is not None:
+        query = query.where(Event.id.in_(event_ids))
+    return list(db.execute(
+        query
+        .values(nb_comments=actual)
+        .returning(Event.id)
+        .execution_options(synchronize_session=False)
+    ).scalars())
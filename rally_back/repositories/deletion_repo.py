@@ -0,0 +1,104 @@
+"""This file contains the bulk deletion repository: set-based deletes of events, profiles and their dependent rows"""
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from models.address_model import Address
+from models.association_model import EventType
+from models.comment_model import Comment
+from models.event_model import Event
+from models.event_picture_model import EventPicture
+from models.like_model import Like
+from models.payment_model import Payment
+from models.registration_model import Registration
+from models.signaled_comments_model import SignaledComment
+from models.signaled_events_model import SignaledEvent
+from models.signaled_users_model import SignaledUser
+
+
+def delete_events(db: Session, event_ids: list[int]) -> dict[str, int]:
+    """
+    This function deletes events and every row depending on them with one DELETE ... WHERE ... IN
+    per table, children first. The payments are kept and detached from the events.
+
+    It returns the number of deleted rows by table. The caller commits.
+    """
+    if not event_ids:
+        return {}
+
+    address_ids = select(Event.address_id).where(Event.id.in_(event_ids), Event.address_id.is_not(None))
+    address_ids = list(db.scalars(address_ids))
+    comment_ids = select(Comment.id).where(Comment.event_id.in_(event_ids))
+
+    summary = {
+        "signaled_comments": db.query(SignaledComment)
+            .filter(SignaledComment.comment_id.in_(comment_ids))
+            .delete(synchronize_session=False),
+        "comments": db.query(Comment).filter(Comment.event_id.in_(event_ids)).delete(synchronize_session=False),
+        "likes": db.query(Like).filter(Like.event_id.in_(event_ids)).delete(synchronize_session=False),
+        "registrations": db.query(Registration)
+            .filter(Registration.event_id.in_(event_ids))
+            .delete(synchronize_session=False),
+        "signaled_events": db.query(SignaledEvent)
+            .filter(SignaledEvent.event_id.in_(event_ids))
+            .delete(synchronize_session=False),
+        "event_pictures": db.query(EventPicture)
+            .filter(EventPicture.event_id.in_(event_ids))
+            .delete(synchronize_session=False),
+        "event_types": db.execute(delete(EventType).where(EventType.c.event_id.in_(event_ids))).rowcount,
+    }
+    db.query(Payment).filter(Payment.event_id.in_(event_ids)).update(
+        {Payment.event_id: None},
+        synchronize_session=False
+    )
+    summary["events"] = db.query(Event).filter(Event.id.in_(event_ids)).delete(synchronize_session=False)
+    summary["addresses"] = db.query(Address).filter(Address.id.in_(address_ids)).delete(synchronize_session=False)
+    return summary
+
+
+def get_event_ids_touched_by_profile(db: Session, profile_id: int) -> list[int]:
+    """
+    This function fetches the ids of the events a profile commented, liked or registered to.
+    """
+    commented = select(Comment.event_id).where(Comment.profile_id == profile_id)
+    liked = select(Like.event_id).where(Like.profile_id == profile_id)
+    registered = select(Registration.event_id).where(Registration.profile_id == profile_id)
+    return sorted(
+        event_id for event_id in db.scalars(commented.union(liked, registered)) if event_id is not None
+    )
+
+
+def delete_profile_activity(db: Session, profile_id: int) -> dict[str, int]:
+    """
+    This function deletes the comments, likes and registrations of a profile on any event.
+
+    It returns the number of deleted rows by table. The caller commits and fixes the counters.
+    """
+    comment_ids = select(Comment.id).where(Comment.profile_id == profile_id)
+    return {
+        "signaled_comments": db.query(SignaledComment)
+            .filter(SignaledComment.comment_id.in_(comment_ids))
+            .delete(synchronize_session=False),
+        "comments": db.query(Comment).filter(Comment.profile_id == profile_id).delete(synchronize_session=False),
+        "likes": db.query(Like).filter(Like.profile_id == profile_id).delete(synchronize_session=False),
+        "registrations": db.query(Registration)
+            .filter(Registration.profile_id == profile_id)
+            .delete(synchronize_session=False),
+    }
+
+
+def delete_user_reports(db: Session, user_id: int) -> dict[str, int]:
+    """
+    This function deletes the reports made by a user and the reports made against them.
+
+    It returns the number of deleted rows by table. The caller commits.
+    """
+    return {
+        "signaled_users": db.query(SignaledUser)
+            .filter((SignaledUser.user_id == user_id) | (SignaledUser.user_signaled_id == user_id))
+            .delete(synchronize_session=False),
+        "signaled_comments_by_user": db.query(SignaledComment)
+            .filter(SignaledComment.user_id == user_id)
+            .delete(synchronize_session=False),
+        "signaled_events_by_user": db.query(SignaledEvent)
+            .filter(SignaledEvent.user_id == user_id)
+            .delete(synchronize_session=False),
+    }
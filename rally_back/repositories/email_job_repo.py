@@ -0,0 +1,66 @@
+"""This file contains the email job repository (outbound email queue)"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+from models.email_job_model import EmailJob
+from enums.email_job_status import EmailJobStatusEnum
+
+
+def add_email_job(db: Session, email_job: EmailJob) -> None:
+    """
+    This function adds an email job to the queue.
+    """
+    db.add(email_job)
+
+
+def commit_email_job(db: Session) -> None:
+    """
+    This function commits the changes in the database.
+    """
+    db.commit()
+
+
+def get_email_job_by_id(db: Session, email_job_id: int) -> Optional[EmailJob]:
+    """
+    This function fetches an email job by its ID.
+    """
+    return db.get(EmailJob, email_job_id)
+
+
+def claim_email_jobs(db: Session, limit: int, now: datetime, stale_before: datetime) -> list[EmailJob]:
+    """
+    This function claims a batch of due jobs in one UPDATE ... RETURNING: the pending jobs whose next
+    attempt is due, and the jobs left in sending by a worker that died before `stale_before`.
+
+    The candidates are selected with FOR UPDATE SKIP LOCKED so that concurrent workers claim
+    disjoint batches. The caller commits.
+    """
+    due = (
+        select(EmailJob.id)
+        .where(or_(
+            (EmailJob.status == EmailJobStatusEnum.PENDING.value) & (EmailJob.next_attempt_at <= now),
+            (EmailJob.status == EmailJobStatusEnum.SENDING.value) & (EmailJob.locked_at < stale_before)
+        ))
+        .order_by(EmailJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return list(db.scalars(
+        update(EmailJob)
+        .where(EmailJob.id.in_(due.scalar_subquery()))
+        .values(
+            status=EmailJobStatusEnum.SENDING.value,
+            locked_at=now,
+            attempts=EmailJob.attempts + 1
+        )
+        .returning(EmailJob)
+        .execution_options(synchronize_session=False)
+    ).all())
+
+
+def count_email_jobs_by_status(db: Session, status: EmailJobStatusEnum) -> int:
+    """
+    This function counts the email jobs having a status.
+    """
+    return db.query(EmailJob).filter(EmailJob.status == status.value).count()
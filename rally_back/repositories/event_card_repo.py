@@ -0,0 +1,77 @@
+"""This file contains the event card repository"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Row, select
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.event_card_model import EventCard
+from models.event_model import Event
+from models.profile_model import Profile
+
+
+def get_event_card(db: Session, event_id: int) -> Optional[EventCard]:
+    """
+    This function fetches the card of an event.
+    """
+    return db.get(EventCard, event_id)
+
+
+def get_event_cards(db: Session, event_ids: list[int]) -> list[Row]:
+    """
+    This function fetches the cards of many events in a single primary key lookup, with the likes
+    of the events and the likes received by their organizer (not stored in the cards).
+
+    It returns rows of (event_id, payload, event_likes, organizer_likes).
+    """
+    if not event_ids:
+        return []
+    return db.execute(
+        select(
+            EventCard.event_id,
+            EventCard.payload,
+            Event.nb_likes.label("event_likes"),
+            Profile.nb_like.label("organizer_likes")
+        )
+        .join(Event, Event.id == EventCard.event_id)
+        .outerjoin(Profile, Profile.id == Event.profile_id)
+        .where(EventCard.event_id.in_(event_ids))
+    ).all()
+
+
+def upsert_event_card(db: Session, event_id: int, payload: dict) -> None:
+    """
+    This function creates or replaces the card of an event in a single INSERT ... ON CONFLICT (event_id)
+    DO UPDATE, two concurrent first builds of a card do not collide.
+    """
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = insert(EventCard).values(event_id=event_id, payload=payload, updated_at=datetime.now())
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[EventCard.event_id],
+            set_={"payload": statement.excluded.payload, "updated_at": statement.excluded.updated_at}
+        )
+    )
+
+
+def delete_event_card(db: Session, event_id: int) -> None:
+    """
+    This function deletes the card of an event.
+    """
+    db.query(EventCard).filter(EventCard.event_id == event_id).delete(synchronize_session=False)
+
+
+def delete_event_cards(db: Session, event_ids: list[int]) -> int:
+    """
+    This function deletes the cards of many events.
+    """
+    if not event_ids:
+        return 0
+    return db.query(EventCard).filter(EventCard.event_id.in_(event_ids)).delete(synchronize_session=False)
+
+
+def commit_event_card(db: Session) -> None:
+    """
+    This function commits the changes in the database.
+    """
+    db.commit()
@@ -1,12 +1,42 @@
 """This file contains the event repository"""
-from typing import Optional
+import json
+from typing import Any, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, case, func
+from sqlalchemy.orm import Session, Query, load_only, selectinload
+from sqlalchemy import or_, and_, case, distinct, func, text
 from models.event_model import Event
 from models.address_model import Address
 from models.type_model import Type
 from models.profile_model import Profile
+from models.event_search_model import EventSearch
+from repositories import event_search_repo
+from core.date_range import filter_days
+
+
+def event_list_loader_options() -> tuple:
+    """
+    This function returns the loader options used to build event cards.
+
+    Every relationship serialized in a card (profile -> user, types, pictures and address) is loaded
+    with a `selectinload`, so a batch of events always costs the same fixed number of queries
+    whatever its size.
+    """
+    return (
+        selectinload(Event.profile).selectinload(Profile.user),
+        selectinload(Event.types),
+        selectinload(Event.pictures),
+        selectinload(Event.address),
+    )
+
+
+def event_list_key_options() -> tuple:
+    """
+    This function returns the loader options used by the event listing queries.
+
+    The lists are served from the event cards, so the listing queries only load the columns needed
+    to fetch the cards and to build the pagination cursor.
+    """
+    return (load_only(Event.id, Event.nb_likes, Event.created_at),)
 
 
 def add_new_event(db: Session, event: Event)->None:
@@ -65,7 +95,14 @@ def get_events_by_profile(db: Session, profile_id: int, offset: int, limit: int)
     :param offset: offset for pagination
     :param limit: limit for pagination
     """
-    return db.query(Event).filter(Event.profile_id == profile_id).offset(offset).limit(limit).all()
+    return (
+        db.query(Event)
+        .options(*event_list_key_options())
+        .filter(Event.profile_id == profile_id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
 
 
 def get_all_events_by_profile(db: Session, profile_id: int)->list[Event]:
@@ -100,18 +137,22 @@ def get_events_filters(
     """
     This function takes various filters as input parameters and returns a list of events based on those
     filters.
+    The events are filtered by `filter_events_query`, only the columns needed to fetch their cards are
+    loaded (`event_list_key_options`).
     """
-    query = db.query(Event)
-
-    if date_avant is not None:
-        query = query.filter(func.date(Event.date) <= date_avant.date())
-
-    if date_apres is not None:
-        query = query.filter(func.date(Event.date) >= date_apres.date())
+    # the search is applied here, its rank is needed for the ordering
+    query = filter_events_query(
+        db.query(Event).options(*event_list_key_options()),
+        date_avant,
+        date_apres,
+        type_ids,
+        profile_id,
+        country,
+        city,
+        None
+    )
 
     if type_ids:
-        query = query.join(Event.types).filter(Type.id.in_(type_ids)).group_by(Event.id)
-
         query = query.order_by(
             case(
                 (
@@ -121,30 +162,9 @@ def get_events_filters(
             )
         )
 
-    if profile_id is not None:
-        query = query.filter(Event.profile_id == profile_id)
-
-    if country is not None:
-        query = query.join(Event.address).filter(Address.country == country)
-
-    if city is not None:
-        query = query.join(Event.address).filter(Address.city == city)
-
+    search_rank = None
     if search is not None:
-        query = query.join(Event.address)
-        query = query.join(Event.profile)
-        query = query.filter(
-            or_(
-                Event.title.ilike(f"%{search}%"),
-                Event.description.ilike(f"%{search}%"),
-                Address.city.ilike(f"%{search}%"),
-                Address.country.ilike(f"%{search}%"),
-                Address.zipcode.ilike(f"%{search}%"),
-                Profile.first_name.ilike(f"%{search}%"),
-                Profile.last_name.ilike(f"%{search}%"),
-                # Type.type.ilike(f"%{search}%")
-            )
-        )
+        query, search_rank = filter_events_search(db, query, search)
 
     if popularity:
         query = query.order_by(Event.nb_likes.desc())
@@ -160,7 +180,13 @@ def get_events_filters(
             )
         )
 
-    return query.offset(offset=offset).limit(limit=limit)
+    if search_rank is not None and not popularity and not recent:
+        if type_ids:
+            # makes the search vector functionally dependent on the GROUP BY
+            query = query.group_by(EventSearch.event_id)
+        query = query.order_by(search_rank.desc())
+
+    return query.offset(offset=offset).limit(limit=limit).all()
 
 def get_events_filters_total_count(
     db: Session,
@@ -173,16 +199,39 @@ def get_events_filters_total_count(
     search: Optional[str]
 )->int:
     """
-    This function takes various filters as input parameters and returns a list of events based on those
-    filters.
+    This function takes various filters as input parameters and returns the number of events matching
+    those filters.
     """
-    query = db.query(Event)
-
-    if date_avant is not None:
-        query = query.filter(func.date(Event.date) <= date_avant.date())
+    query = filter_events_query(
+        db.query(Event),
+        date_avant,
+        date_apres,
+        type_ids,
+        profile_id,
+        country,
+        city,
+        search
+    )
+    # the GROUP BY of the type filter would return one count per event
+    return query.with_entities(func.count(distinct(Event.id))).group_by(None).scalar()
+
+
+def filter_events_query(
+    query: Query,
+    date_avant: Optional[datetime],
+    date_apres: Optional[datetime],
+    type_ids: Optional[list[int]],
+    profile_id: Optional[int],
+    country: Optional[str],
+    city: Optional[str],
+    search: Optional[str]
+)->Query:
+    """
+    This function applies the event filters (without any ordering) to the given query.
 
-    if date_apres is not None:
-        query = query.filter(func.date(Event.date) >= date_apres.date())
+    :param query: A query selecting from the events table.
+    """
+    query = filter_days(query, Event.date, date_apres, date_avant)
 
     if type_ids:
         query = query.join(Event.types).filter(Type.id.in_(type_ids)).group_by(Event.id)
@@ -190,27 +239,213 @@ def get_events_filters_total_count(
     if profile_id is not None:
         query = query.filter(Event.profile_id == profile_id)
 
+    if country is not None or city is not None:
+        query = query.join(Event.address)
+
     if country is not None:
-        query = query.join(Event.address).filter(Address.country == country)
+        query = query.filter(Address.country == country)
 
     if city is not None:
-        query = query.join(Event.address).filter(Address.city == city)
+        query = query.filter(Address.city == city)
 
     if search is not None:
-        query = query.join(Event.address)
-        query = query.join(Event.profile)
-        query = query.join(Event.types)
-        query = query.filter(
-            or_(
-                Event.title.ilike(f"%{search}%"),
-                Event.description.ilike(f"%{search}%"),
-                Address.city.ilike(f"%{search}%"),
-                Address.country.ilike(f"%{search}%"),
-                Address.zipcode.ilike(f"%{search}%"),
-                Profile.first_name.ilike(f"%{search}%"),
-                Profile.last_name.ilike(f"%{search}%"),
-                Type.type.ilike(f"%{search}%")
+        query, _ = filter_events_search(query.session, query, search)
+
+    return query
+
+
+def filter_events_search(db: Session, query: Query, search: str) -> tuple[Query, Optional[Any]]:
+    """
+    This function restricts an events query to the events whose search document (title, description,
+    city, country, zipcode, organizer name and type names) matches the search string.
+
+    It returns the filtered query and the rank expression to order by (None when the database does
+    not support ranking).
+    """
+    condition, rank = event_search_repo.search_condition(db, search)
+    query = query.join(EventSearch, EventSearch.event_id == Event.id).filter(condition)
+    return query, rank
+
+
+def get_events_keyset(
+    db: Session,
+    date_avant: Optional[datetime],
+    date_apres: Optional[datetime],
+    type_ids: Optional[list[int]],
+    profile_id: Optional[int],
+    country: Optional[str],
+    city: Optional[str],
+    search: Optional[str],
+    ordering: str,
+    after_key: Optional[Any],
+    after_id: Optional[int],
+    limit: int
+)->list[Event]:
+    """
+    This function returns a page of events using keyset pagination: instead of skipping `offset`
+    rows, it seeks directly after the last row of the previous page, so deep pages cost the same
+    as the first one.
+
+    :param ordering: "popularity" (nb_likes desc), "recent" (created_at desc) or "default" (id asc).
+    :param after_key: The sort key of the last row of the previous page (None for the first page).
+    :param after_id: The id of the last row of the previous page (None for the first page).
+    :param limit: The number of rows to return, the caller asks for one extra row to know if a
+    next page exists.
+    """
+    query = filter_events_query(
+        db.query(Event).options(*event_list_key_options()),
+        date_avant,
+        date_apres,
+        type_ids,
+        profile_id,
+        country,
+        city,
+        search
+    )
+
+    if ordering == "popularity":
+        sort_column, descending = Event.nb_likes, True
+    elif ordering == "recent":
+        sort_column, descending = Event.created_at, True
+    else:
+        sort_column, descending = None, False
+
+    if after_id is not None:
+        if sort_column is None:
+            query = query.filter(Event.id > after_id)
+        else:
+            query = query.filter(
+                or_(
+                    sort_column < after_key,
+                    and_(sort_column == after_key, Event.id < after_id)
+                )
             )
+
+    if sort_column is None:
+        query = query.order_by(Event.id.asc())
+    elif descending:
+        query = query.order_by(sort_column.desc(), Event.id.desc())
+
+    return query.limit(limit).all()
+
+
+def get_events_estimated_count(
+    db: Session,
+    date_avant: Optional[datetime],
+    date_apres: Optional[datetime],
+    type_ids: Optional[list[int]],
+    profile_id: Optional[int],
+    country: Optional[str],
+    city: Optional[str],
+    search: Optional[str]
+)->int:
+    """
+    This function returns an estimation of the number of events matching the filters without
+    counting them.
+
+    On PostgreSQL the estimation comes from the planner statistics: `pg_class.reltuples` when there
+    is no filter, the row estimate of `EXPLAIN` otherwise. On other databases it falls back to the
+    exact count.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return get_events_filters_total_count(
+            db, date_avant, date_apres, type_ids, profile_id, country, city, search
+        )
+
+    has_filters = any(
+        value is not None and value != []
+        for value in (date_avant, date_apres, type_ids, profile_id, country, city, search)
+    )
+    if not has_filters:
+        estimate = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'events'::regclass")
+        ).scalar()
+        # reltuples is -1 (or 0) as long as the table has never been analyzed
+        if estimate is not None and estimate > 0:
+            return int(estimate)
+        return db.query(func.count(Event.id)).scalar()
+
+    query = filter_events_query(
+        db.query(Event.id),
+        date_avant,
+        date_apres,
+        type_ids,
+        profile_id,
+        country,
+        city,
+        search
+    )
+    compiled = query.statement.compile(dialect=db.get_bind().dialect)
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_events_for_indexing(db: Session, event_ids: list[int]) -> list[Event]:
+    """
+    This function fetches events with the relationships needed to build their search documents
+    (organizer, types and address) loaded in batch.
+    """
+    return (
+        db.query(Event)
+        .options(
+            selectinload(Event.profile),
+            selectinload(Event.types),
+            selectinload(Event.address)
         )
+        .filter(Event.id.in_(event_ids))
+        .all()
+    )
+
+
+def get_event_ids_by_profile(db: Session, profile_id: int) -> list[int]:
+    """
+    This function fetches the ids of the events organized by a profile.
+    """
+    return [event_id for (event_id,) in db.query(Event.id).filter(Event.profile_id == profile_id).all()]
+
+
+def get_event_organizer_id(db: Session, event_id: int) -> Optional[int]:
+    """
+    This function fetches the id of the profile organizing an event, or None if the event does not exist.
+    """
+    return db.query(Event.profile_id).filter(Event.id == event_id).scalar()
+
+
+def get_organizer_ids(db: Session, event_ids: list[int]) -> list[int]:
+    """
+    This function fetches the distinct ids of the profiles organizing the given events.
+    """
+    if not event_ids:
+        return []
+    return [
+        profile_id for (profile_id,) in db.query(Event.profile_id)
+        .filter(Event.id.in_(event_ids), Event.profile_id.is_not(None))
+        .distinct()
+        .all()
+    ]
+
 
-    return query.distinct(Event.id).count()
+def get_event_ids_after(db: Session, last_id: int, limit: int) -> list[int]:
+    """
+    This function fetches a batch of event ids greater than `last_id`, ordered by id.
+    """
+    return [
+        event_id for (event_id,) in db.query(Event.id)
+        .filter(Event.id > last_id)
+        .order_by(Event.id)
+        .limit(limit)
+        .all()
+    ]
+
+
+def get_events_for_cards(db: Session, event_ids: list[int]) -> list[Event]:
+    """
+    This function fetches events with every relationship serialized in their cards loaded in batch.
+    """
+    return db.query(Event).options(*event_list_loader_options()).filter(Event.id.in_(event_ids)).all()
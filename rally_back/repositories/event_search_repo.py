@@ -0,0 +1,142 @@
+"""This file contains the event search repository"""
+import os
+import re
+import unicodedata
+from typing import Optional
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, true
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.sql.elements import ColumnElement
+from models.event_search_model import EventSearch
+
+SEARCH_TS_CONFIG = os.getenv("SEARCH_TS_CONFIG", "simple")
+
+
+def normalize_search_text(value: Optional[str]) -> str:
+    """
+    This function lowercases the given text and strips its accents, it is used both on the indexed
+    documents and on the searched terms.
+    """
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def search_terms(search: str) -> list[str]:
+    """
+    This function splits a search string into normalized terms.
+    """
+    return re.findall(r"\w+", normalize_search_text(search))
+
+
+def is_postgresql(db: Session) -> bool:
+    """
+    This function tells whether the session is bound to PostgreSQL (tsvector search) or not
+    (normalized document fallback).
+    """
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def get_event_document(db: Session, event_id: int) -> Optional[EventSearch]:
+    """
+    This function fetches the search document of an event.
+    """
+    return db.get(EventSearch, event_id)
+
+
+def upsert_event_document(
+    db: Session,
+    event_id: int,
+    title: str,
+    description: str,
+    place: str,
+    organizer: str,
+    types: str
+) -> None:
+    """
+    This function creates or updates the search document of an event in a single
+    INSERT ... ON CONFLICT (event_id) DO UPDATE, two concurrent first indexings do not collide.
+
+    On PostgreSQL the tsvector is weighted: title (A), types (B), place and organizer (C) and
+    description (D), so that `ts_rank` favours events whose title matches.
+    """
+    values = {
+        "document": " ".join(
+            normalize_search_text(part) for part in (title, types, place, organizer, description) if part
+        ),
+        "updated_at": datetime.now()
+    }
+
+    if is_postgresql(db):
+        weighted_parts = (
+            (title, "A"),
+            (types, "B"),
+            (f"{place} {organizer}", "C"),
+            (description, "D"),
+        )
+        vector = None
+        for part, weight in weighted_parts:
+            part_vector = func.setweight(
+                func.to_tsvector(SEARCH_TS_CONFIG, normalize_search_text(part)),
+                weight
+            )
+            vector = part_vector if vector is None else vector.op("||")(part_vector)
+        values["search_vector"] = vector
+
+    insert = postgresql_insert if is_postgresql(db) else sqlite_insert
+    statement = insert(EventSearch).values(event_id=event_id, **values)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[EventSearch.event_id],
+            set_={column: statement.excluded[column] for column in values}
+        )
+    )
+
+
+def delete_event_document(db: Session, event_id: int) -> None:
+    """
+    This function deletes the search document of an event.
+    """
+    db.query(EventSearch).filter(EventSearch.event_id == event_id).delete(synchronize_session=False)
+
+
+def delete_event_documents(db: Session, event_ids: list[int]) -> int:
+    """
+    This function deletes the search documents of many events.
+    """
+    if not event_ids:
+        return 0
+    return db.query(EventSearch).filter(EventSearch.event_id.in_(event_ids)).delete(synchronize_session=False)
+
+
+def commit_event_document(db: Session) -> None:
+    """
+    This function commits the changes in the database.
+    """
+    db.commit()
+
+
+def search_condition(db: Session, search: str) -> tuple[ColumnElement, Optional[ColumnElement]]:
+    """
+    This function builds the condition matching the event search documents against a search string
+    and, on PostgreSQL, the rank expression to order by.
+
+    Every term must match. On PostgreSQL each term is a prefix query on the tsvector (GIN indexed), so
+    "conc" matches "concert". Elsewhere each term must be a substring of the normalized document.
+
+    Returns:
+        tuple: the condition on `EventSearch` and the rank expression (None when not available).
+    """
+    terms = search_terms(search)
+    if not terms:
+        return true(), None
+
+    if is_postgresql(db):
+        ts_query = func.to_tsquery(SEARCH_TS_CONFIG, " & ".join(f"{term}:*" for term in terms))
+        condition = EventSearch.search_vector.op("@@")(ts_query)
+        return condition, func.ts_rank(EventSearch.search_vector, ts_query)
+
+    return and_(*(EventSearch.document.contains(term, autoescape=True) for term in terms)), None
@@ -1,5 +1,10 @@
 """This file contains the like repository"""
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from models.like_model import Like
 
 def add_like(db: Session, like: Like)->None:
@@ -14,6 +19,12 @@ def commit_like(db: Session)->None:
     """
     db.commit()
 
+def rollback_like(db: Session)->None:
+    """
+    This function is used to rollback the changes in db.
+    """
+    db.rollback()
+
 def refresh_like(db: Session, like: Like)->None:
     """
     This function is used to refresh a like object in the db.
@@ -52,3 +63,30 @@ def get_likes_from_profile(db: Session, profile_id: int)->list[Like]:
     This function is used to fetch likes from db according to their profiles.
     """
     return db.query(Like).filter(Like.profile_id == profile_id).all()
+
+def insert_like(db: Session, profile_id: int, event_id: int) -> Optional[Like]:
+    """
+    This function inserts a like with INSERT ... ON CONFLICT DO NOTHING on (profile_id, event_id).
+
+    It returns the new like, or None if the profile already liked the event.
+    """
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    return db.scalars(
+        insert(Like)
+        .values(profile_id=profile_id, event_id=event_id, created_at=datetime.now())
+        .on_conflict_do_nothing(index_elements=[Like.profile_id, Like.event_id])
+        .returning(Like)
+    ).first()
+
+def delete_like_by_profile_and_event(db: Session, profile_id: int, event_id: int) -> bool:
+    """
+    This function deletes the like of a profile on an event in a single DELETE.
+
+    It returns whether a like was deleted.
+    """
+    result = db.execute(
+        delete(Like)
+        .where(Like.profile_id == profile_id, Like.event_id == event_id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
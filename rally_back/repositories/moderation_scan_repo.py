@@ -0,0 +1,151 @@
+"""This file contains the moderation scan repository (retroactive scans of the comments and events)"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.orm import Session
+from models.comment_model import Comment
+from models.event_model import Event
+from models.moderation_scan_model import ModerationScan
+from models.signaled_comments_model import SignaledComment
+from models.signaled_events_model import SignaledEvent
+from enums.moderation_scan_status import ModerationScanStatusEnum
+
+
+def add_moderation_scan(db: Session, moderation_scan: ModerationScan) -> None:
+    """
+    This function is used to add a moderation scan in the database.
+    """
+    db.add(moderation_scan)
+
+
+def commit_moderation_scan(db: Session) -> None:
+    """
+    This function is used to commit the changes in the database (and to end the read transactions of a scan).
+    """
+    db.commit()
+
+
+def refresh_moderation_scan(db: Session, moderation_scan: ModerationScan) -> None:
+    """
+    This function is used to refresh a moderation scan.
+    """
+    db.refresh(moderation_scan)
+
+
+def get_moderation_scan_by_id(db: Session, moderation_scan_id: int) -> Optional[ModerationScan]:
+    """
+    This function is used to fetch a moderation scan by its id.
+    """
+    return db.get(ModerationScan, moderation_scan_id)
+
+
+def claim_moderation_scan(db: Session, now: datetime, stale_before: datetime) -> Optional[ModerationScan]:
+    """
+    This function claims the oldest waiting scan in one UPDATE ... RETURNING: a pending scan, or a scan left
+    running by a worker that died before `stale_before`. The candidate is selected with FOR UPDATE SKIP LOCKED
+    so that concurrent workers never run the same scan.
+
+    It returns the claimed scan or None. The caller commits.
+    """
+    waiting = (
+        select(ModerationScan.id)
+        .where(
+            or_(
+                ModerationScan.status == ModerationScanStatusEnum.PENDING.value,
+                (ModerationScan.status == ModerationScanStatusEnum.RUNNING.value)
+                & (ModerationScan.locked_at < stale_before)
+            )
+        )
+        .order_by(ModerationScan.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    return db.scalars(
+        update(ModerationScan)
+        .where(ModerationScan.id.in_(waiting.scalar_subquery()))
+        .values(status=ModerationScanStatusEnum.RUNNING.value, locked_at=now)
+        .returning(ModerationScan)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+
+def update_moderation_scan(db: Session, moderation_scan_id: int, values: dict) -> None:
+    """
+    This function updates the columns of a moderation scan in a single UPDATE. The caller commits.
+    """
+    db.execute(
+        update(ModerationScan)
+        .where(ModerationScan.id == moderation_scan_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_comments_after(db: Session, after_id: int, limit: int) -> list[tuple[int, str]]:
+    """
+    This function fetches the id and content of the next `limit` comments after `after_id` (keyset pagination
+    on the primary key: every batch is an index range scan, whatever the progress of the scan).
+    """
+    return [
+        tuple(row) for row in db.execute(
+            select(Comment.id, Comment.content)
+            .where(Comment.id > after_id)
+            .order_by(Comment.id)
+            .limit(limit)
+        )
+    ]
+
+
+def get_events_after(db: Session, after_id: int, limit: int) -> list[tuple[int, str, str]]:
+    """
+    This function fetches the id, title and description of the next `limit` events after `after_id`
+    (keyset pagination on the primary key).
+    """
+    return [
+        tuple(row) for row in db.execute(
+            select(Event.id, Event.title, Event.description)
+            .where(Event.id > after_id)
+            .order_by(Event.id)
+            .limit(limit)
+        )
+    ]
+
+
+def get_signaled_comment_ids(db: Session, comment_ids: list[int], reason_id: int) -> set[int]:
+    """
+    This function fetches, among the given comments, the ones already signaled with a reason.
+    """
+    if not comment_ids:
+        return set()
+    return set(db.scalars(
+        select(SignaledComment.comment_id)
+        .where(SignaledComment.comment_id.in_(comment_ids), SignaledComment.reason_id == reason_id)
+    ))
+
+
+def get_signaled_event_ids(db: Session, event_ids: list[int], reason_id: int) -> set[int]:
+    """
+    This function fetches, among the given events, the ones already signaled with a reason.
+    """
+    if not event_ids:
+        return set()
+    return set(db.scalars(
+        select(SignaledEvent.event_id)
+        .where(SignaledEvent.event_id.in_(event_ids), SignaledEvent.reason_id == reason_id)
+    ))
+
+
+def insert_signaled_comments(db: Session, rows: list[dict]) -> None:
+    """
+    This function inserts signaled comments in one executemany INSERT. The caller commits.
+    """
+    if rows:
+        db.execute(insert(SignaledComment), rows)
+
+
+def insert_signaled_events(db: Session, rows: list[dict]) -> None:
+    """
+    This function inserts signaled events in one executemany INSERT. The caller commits.
+    """
+    if rows:
+        db.execute(insert(SignaledEvent), rows)
@@ -1,10 +1,29 @@
 """This file contains the payment repository"""
-from typing import Optional
+from typing import Iterator, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+from sqlalchemy import Row
 from enums.payment_status import PaymentStatusEnum
 from models.payment_model import Payment
+from core.date_range import filter_days
+
+# columns of the payments exports, plain rows instead of ORM objects (no identity map growing with the export)
+PAYMENT_EXPORT_COLUMNS = (
+    Payment.id,
+    Payment.event_id,
+    Payment.event_title,
+    Payment.buyer_id,
+    Payment.buyer_email,
+    Payment.organizer_id,
+    Payment.organizer_email,
+    Payment.amount,
+    Payment.fee,
+    Payment.brut_amount,
+    Payment.stripe_session_id,
+    Payment.stripe_payment_intent_id,
+    Payment.status,
+    Payment.created_at,
+)
 
 def add_payment(db: Session, payment: Payment)->None:
     """
@@ -24,8 +43,8 @@ def refresh_payment(db: Session, payment: Payment)->None:
     """
     db.refresh(payment)
 
-def get_payment_filters(
-    db: Session,
+def filter_payments(
+    query: Query,
     event_title: Optional[str],
     buyer_email: Optional[str],
     organizer_email: Optional[str],
@@ -39,20 +58,12 @@ def get_payment_filters(
     stripe_payment_intent_id: Optional[str],
     status: Optional[PaymentStatusEnum],
     date_apres: Optional[datetime],
-    date_avant: Optional[datetime],
-    offset: int,
-    limit: int
-)->list[Payment]:
+    date_avant: Optional[datetime]
+)->Query:
     """
-    This function is used to fetch all the payments from db according to given filters.
+    This function is used to apply the given filters to a payments query, shared by the list, its count and the export.
     """
-    query = db.query(Payment)
-
-    if date_avant is not None:
-        query = query.filter(func.date(Payment.created_at) <= date_avant.date())
-
-    if date_apres is not None:
-        query = query.filter(func.date(Payment.created_at) >= date_apres.date())
+    query = filter_days(query, Payment.created_at, date_apres, date_avant)
 
     if event_title is not None:
         query = query.filter(Payment.event_title.ilike(f"%{event_title}%"))
@@ -90,6 +101,47 @@ def get_payment_filters(
     if status is not None:
         query = query.filter(Payment.status == status)
 
+    return query
+
+def get_payment_filters(
+    db: Session,
+    event_title: Optional[str],
+    buyer_email: Optional[str],
+    organizer_email: Optional[str],
+    amount_min: Optional[float],
+    amount_max: Optional[float],
+    fee_min: Optional[float],
+    fee_max: Optional[float],
+    brut_amount_min: Optional[float],
+    brut_amount_max: Optional[float],
+    stripe_session_id: Optional[str],
+    stripe_payment_intent_id: Optional[str],
+    status: Optional[PaymentStatusEnum],
+    date_apres: Optional[datetime],
+    date_avant: Optional[datetime],
+    offset: int,
+    limit: int
+)->list[Payment]:
+    """
+    This function is used to fetch all the payments from db according to given filters.
+    """
+    query = filter_payments(
+        db.query(Payment),
+        event_title,
+        buyer_email,
+        organizer_email,
+        amount_min,
+        amount_max,
+        fee_min,
+        fee_max,
+        brut_amount_min,
+        brut_amount_max,
+        stripe_session_id,
+        stripe_payment_intent_id,
+        status,
+        date_apres,
+        date_avant
+    )
     return query.order_by(Payment.created_at.desc()).offset(offset).limit(limit).all()
 
 def get_payment_by_id(db: Session, payment_id: int)->Payment:
@@ -116,11 +168,7 @@ def get_payments_by_user_id_filters(
     """
     query = db.query(Payment).filter(Payment.buyer_id == user_id)
 
-    if date_avant is not None:
-        query = query.filter(func.date(Payment.created_at) <= date_avant.date())
-
-    if date_apres is not None:
-        query = query.filter(func.date(Payment.created_at) >= date_apres.date())
+    query = filter_days(query, Payment.created_at, date_apres, date_avant)
 
     if event_title is not None:
         query = query.filter(Payment.event_title.ilike(f"%{event_title}%"))
@@ -145,6 +193,12 @@ def get_payment_by_event_and_users(db: Session, event_id: int, buyer_id: int, or
     """
     return db.query(Payment).filter(Payment.event_id == event_id).filter(Payment.buyer_id == buyer_id).filter(Payment.organizer_id == organizer_id).first()
 
+def get_payments_by_event_id(db: Session, event_id: int, status: PaymentStatusEnum)->list[Payment]:
+    """
+    This function is used to fetch the payments of an event with the given status, oldest first.
+    """
+    return db.query(Payment).filter(Payment.event_id == event_id).filter(Payment.status == status).order_by(Payment.id).all()
+
 def get_payment_by_session_id(db: Session, session_id: str)->Payment:
     """
     This function is used to fet a payment by its session id.
@@ -172,48 +226,62 @@ def get_payment_filters_total_count(
     """
     This function is used to fetch all the payments from db according to given filters.
     """
-    query = db.query(Payment)
-
-    if date_avant is not None:
-        query = query.filter(func.date(Payment.created_at) <= date_avant.date())
-
-    if date_apres is not None:
-        query = query.filter(func.date(Payment.created_at) >= date_apres.date())
-
-    if event_title is not None:
-        query = query.filter(Payment.event_title.ilike(f"%{event_title}%"))
-
-    if buyer_email is not None:
-        query = query.filter(Payment.buyer_email == buyer_email)
-
-    if organizer_email is not None:
-        query = query.filter(Payment.organizer_email == organizer_email)
-
-    if amount_min is not None:
-        query = query.filter(Payment.amount >= amount_min)
-
-    if amount_max is not None:
-        query = query.filter(Payment.amount <= amount_max)
-
-    if fee_min is not None:
-        query = query.filter(Payment.fee >= fee_min)
-
-    if fee_max is not None:
-        query = query.filter(Payment.fee <= fee_max)
-
-    if brut_amount_min is not None:
-        query = query.filter(Payment.brut_amount >= brut_amount_min)
-
-    if brut_amount_max is not None:
-        query = query.filter(Payment.brut_amount <= brut_amount_max)
-
-    if stripe_session_id is not None:
-        query = query.filter(Payment.stripe_session_id == stripe_session_id)
-
-    if stripe_payment_intent_id is not None:
-        query = query.filter(Payment.stripe_payment_intent_id == stripe_payment_intent_id)
-
-    if status is not None:
-        query = query.filter(Payment.status == status)
-
+    query = filter_payments(
+        db.query(Payment),
+        event_title,
+        buyer_email,
+        organizer_email,
+        amount_min,
+        amount_max,
+        fee_min,
+        fee_max,
+        brut_amount_min,
+        brut_amount_max,
+        stripe_session_id,
+        stripe_payment_intent_id,
+        status,
+        date_apres,
+        date_avant
+    )
     return query.order_by(Payment.created_at.desc()).count()
+
+def stream_payment_filters(
+    db: Session,
+    event_title: Optional[str],
+    buyer_email: Optional[str],
+    organizer_email: Optional[str],
+    amount_min: Optional[float],
+    amount_max: Optional[float],
+    fee_min: Optional[float],
+    fee_max: Optional[float],
+    brut_amount_min: Optional[float],
+    brut_amount_max: Optional[float],
+    stripe_session_id: Optional[str],
+    stripe_payment_intent_id: Optional[str],
+    status: Optional[PaymentStatusEnum],
+    date_apres: Optional[datetime],
+    date_avant: Optional[datetime],
+    batch_size: int
+)->Iterator[Row]:
+    """
+    This function is used to iterate over the columns of the payments matching the given filters, fetched by
+    batches of `batch_size` rows (server-side cursor on PostgreSQL) instead of loading them all.
+    """
+    query = filter_payments(
+        db.query(*PAYMENT_EXPORT_COLUMNS),
+        event_title,
+        buyer_email,
+        organizer_email,
+        amount_min,
+        amount_max,
+        fee_min,
+        fee_max,
+        brut_amount_min,
+        brut_amount_max,
+        stripe_session_id,
+        stripe_payment_intent_id,
+        status,
+        date_apres,
+        date_avant
+    )
+    return query.order_by(Payment.created_at.desc(), Payment.id.desc()).yield_per(batch_size)
@@ -2,9 +2,12 @@
 from datetime import datetime
 from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from models.registration_model import Registration
 from models.event_model import Event
+from core.date_range import filter_day
 
 def get_number_registrations_for_event(db: Session, event_id: int)->int:
     """used to get the number of registrations from an event"""
@@ -18,6 +21,37 @@ def commit_registration(db: Session)->None:
     """used to commit changes"""
     db.commit()
 
+def rollback_registration(db: Session)->None:
+    """used to rollback the current transaction"""
+    db.rollback()
+
+def insert_registration(db: Session, profile_id: int, event_id: int, payment_status: str)->Optional[Registration]:
+    """
+    used to insert a registration with INSERT ... ON CONFLICT DO NOTHING on (profile_id, event_id),
+    returns None if the profile is already registered
+    """
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    return db.scalars(
+        insert(Registration)
+        .values(
+            profile_id=profile_id,
+            event_id=event_id,
+            payment_status=payment_status,
+            registered_at=datetime.now()
+        )
+        .on_conflict_do_nothing(index_elements=[Registration.profile_id, Registration.event_id])
+        .returning(Registration)
+    ).first()
+
+def delete_registration_by_id(db: Session, registration_id: int)->Optional[int]:
+    """used to delete a registration in a single DELETE, returns the event id or None if nothing was deleted"""
+    return db.execute(
+        delete(Registration)
+        .where(Registration.id == registration_id)
+        .returning(Registration.event_id)
+        .execution_options(synchronize_session="fetch")
+    ).scalar()
+
 def refresh_registration(db: Session, registration: Registration)->None:
     """used to refresh registration"""
     db.refresh(registration)
@@ -57,8 +91,7 @@ def get_registrations_filters(
     """used to fetch registrations from db according to given filters"""
     query = db.query(Registration)
 
-    if date is not None:
-        query = query.filter(func.date(Registration.registered_at) == date.date())
+    query = filter_day(query, Registration.registered_at, date)
 
     if event_id is not None:
         query = query.filter(Registration.event_id == event_id)
@@ -0,0 +1,155 @@
+"""This file contains the daily revenue rollups repository"""
+from datetime import date
+from typing import Optional
+from sqlalchemy import Date, cast, delete, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.payment_model import Payment
+from models.revenue_rollup_model import EventDailyRevenue, OrganizerDailyRevenue
+
+
+def _upsert_revenue(db: Session, model, key_columns: list[str], values: dict) -> None:
+    """
+    This function adds the count and amounts of `values` to the rollup row of its key with
+    INSERT ... ON CONFLICT DO UPDATE, the concurrent transitions of a same row add up instead of overwriting.
+    """
+    upsert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = upsert(model).values(**values)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={
+                column: getattr(model, column) + getattr(statement.excluded, column)
+                for column in ("payments_count", "gross_amount", "fee_amount", "net_amount")
+            }
+        )
+    )
+
+
+def add_payment_to_revenues(
+    db: Session,
+    organizer_id: Optional[int],
+    event_id: Optional[int],
+    day: date,
+    status: str,
+    sign: int,
+    gross_amount: float,
+    fee_amount: float,
+    net_amount: float
+) -> None:
+    """
+    This function adds (sign 1) or removes (sign -1) a payment from the rollups of its organizer and its
+    event, in the row of the given status. The caller commits, with the payment status change.
+    """
+    if organizer_id is None:
+        return
+    values = {
+        "organizer_id": organizer_id,
+        "day": day,
+        "status": status,
+        "payments_count": sign,
+        "gross_amount": sign * gross_amount,
+        "fee_amount": sign * fee_amount,
+        "net_amount": sign * net_amount
+    }
+    _upsert_revenue(db, OrganizerDailyRevenue, ["organizer_id", "day", "status"], values)
+    if event_id is not None:
+        _upsert_revenue(db, EventDailyRevenue, ["event_id", "day", "status"], {**values, "event_id": event_id})
+
+
+def get_organizer_daily_revenues(
+    db: Session,
+    organizer_id: Optional[int],
+    day_from: Optional[date],
+    day_to: Optional[date],
+    status: Optional[str]
+) -> list[OrganizerDailyRevenue]:
+    """
+    This function fetches the daily revenues of an organizer (or of all of them) between two days included.
+    """
+    query = db.query(OrganizerDailyRevenue)
+    if organizer_id is not None:
+        query = query.filter(OrganizerDailyRevenue.organizer_id == organizer_id)
+    if day_from is not None:
+        query = query.filter(OrganizerDailyRevenue.day >= day_from)
+    if day_to is not None:
+        query = query.filter(OrganizerDailyRevenue.day <= day_to)
+    if status is not None:
+        query = query.filter(OrganizerDailyRevenue.status == status)
+    return query.order_by(
+        OrganizerDailyRevenue.day, OrganizerDailyRevenue.organizer_id, OrganizerDailyRevenue.status
+    ).all()
+
+
+def get_event_daily_revenues(
+    db: Session,
+    event_id: Optional[int],
+    organizer_id: Optional[int],
+    day_from: Optional[date],
+    day_to: Optional[date],
+    status: Optional[str]
+) -> list[EventDailyRevenue]:
+    """
+    This function fetches the daily revenues of an event, of the events of an organizer, or of all the events,
+    between two days included.
+    """
+    query = db.query(EventDailyRevenue)
+    if event_id is not None:
+        query = query.filter(EventDailyRevenue.event_id == event_id)
+    if organizer_id is not None:
+        query = query.filter(EventDailyRevenue.organizer_id == organizer_id)
+    if day_from is not None:
+        query = query.filter(EventDailyRevenue.day >= day_from)
+    if day_to is not None:
+        query = query.filter(EventDailyRevenue.day <= day_to)
+    if status is not None:
+        query = query.filter(EventDailyRevenue.status == status)
+    return query.order_by(EventDailyRevenue.day, EventDailyRevenue.event_id, EventDailyRevenue.status).all()
+
+
+def rebuild_revenues(db: Session) -> dict[str, int]:
+    """
+    This function recomputes every rollup row from the payments table with INSERT ... SELECT ... GROUP BY.
+
+    It returns the number of rows written by table. The caller commits.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        day = cast(Payment.created_at, Date)
+    else:
+        # SQLite stores the dates as ISO text, CAST AS DATE would turn them into numbers
+        day = func.date(Payment.created_at)
+    sums = (
+        func.count(Payment.id),
+        func.coalesce(func.sum(Payment.brut_amount), 0),
+        func.coalesce(func.sum(Payment.fee), 0),
+        func.coalesce(func.sum(Payment.amount), 0)
+    )
+    amount_columns = ["payments_count", "gross_amount", "fee_amount", "net_amount"]
+
+    db.execute(delete(OrganizerDailyRevenue))
+    db.execute(delete(EventDailyRevenue))
+    organizer_rows = db.execute(
+        insert(OrganizerDailyRevenue).from_select(
+            ["organizer_id", "day", "status", *amount_columns],
+            select(Payment.organizer_id, day, Payment.status, *sums)
+            .where(Payment.organizer_id.is_not(None))
+            .group_by(Payment.organizer_id, day, Payment.status)
+        )
+    ).rowcount
+    event_rows = db.execute(
+        insert(EventDailyRevenue).from_select(
+            ["event_id", "organizer_id", "day", "status", *amount_columns],
+            select(Payment.event_id, func.max(Payment.organizer_id), day, Payment.status, *sums)
+            .where(Payment.event_id.is_not(None), Payment.organizer_id.is_not(None))
+            .group_by(Payment.event_id, day, Payment.status)
+        )
+    ).rowcount
+    return {"organizers": organizer_rows, "events": event_rows}
+
+
+def commit_revenues(db: Session) -> None:
+    """
+    This function commits the changes in the database.
+    """
+    db.commit()
@@ -0,0 +1,72 @@
+"""This file contains the seat inventory repository (seats taken on events)"""
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, select, update
+from models.event_model import Event
+from models.registration_model import Registration
+
+
+def reserve_seat(db: Session, event_id: int) -> Optional[int]:
+    """
+    This function takes a seat with a single conditional UPDATE ... WHERE seats_taken < nb_places RETURNING.
+
+    Concurrent reservations are serialized on the event row, so the event can not be overbooked.
+    It returns the new number of seats taken, or None if the event is full (or does not exist).
+    """
+    return db.execute(
+        update(Event)
+        .where(Event.id == event_id, Event.seats_taken < func.coalesce(Event.nb_places, 0))
+        .values(seats_taken=Event.seats_taken + 1)
+        .returning(Event.seats_taken)
+        .execution_options(synchronize_session="fetch")
+    ).scalar()
+
+
+def release_seat(db: Session, event_id: int) -> Optional[int]:
+    """
+    This function gives a seat back in a single UPDATE ... RETURNING, never below 0.
+
+    It returns the new number of seats taken, or None if the event does not exist.
+    """
+    return db.execute(
+        update(Event)
+        .where(Event.id == event_id)
+        .values(seats_taken=case((Event.seats_taken > 0, Event.seats_taken - 1), else_=0))
+        .returning(Event.seats_taken)
+        .execution_options(synchronize_session="fetch")
+    ).scalar()
+
+
+def get_seats(db: Session, event_id: int) -> Optional[tuple[int, int]]:
+    """
+    This function reads the seats taken and the number of places of an event by primary key.
+
+    It returns None if the event does not exist.
+    """
+    row = db.execute(
+        select(Event.seats_taken, Event.nb_places).where(Event.id == event_id)
+    ).first()
+    return tuple(row) if row else None
+
+
+def reconcile_seats(db: Session, event_ids: Optional[list[int]] = None) -> list[int]:
+    """
+    This function recomputes the seats taken of every event from the registrations table in one UPDATE.
+
+    When `event_ids` is given, only these events are recomputed.
+    It returns the ids of the events whose counter was wrong.
+    """
+    actual = (
+        select(func.count(Registration.id))
+        .where(Registration.event_id == Event.id)
+        .scalar_subquery()
+    )
+    query = update(Event).where(func.coalesce(Event.seats_taken, -1) != actual)
+    if event_ids is not None:
+        query = query.where(Event.id.in_(event_ids))
+    return list(db.execute(
+        query
+        .values(seats_taken=actual)
+        .returning(Event.id)
+        .execution_options(synchronize_session=False)
+    ).scalars())
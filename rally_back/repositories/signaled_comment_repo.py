@@ -6,6 +6,7 @@ from models.signaled_comments_model import SignaledComment
 from models.user_model import User
 from models.profile_model import Profile
 from models.comment_model import Comment
+from core.date_range import filter_days
 
 def add_signaled_comment(db: Session, signaled_comment: SignaledComment) -> None:
     """Add a new signaled comment to the database."""
@@ -62,8 +63,7 @@ def get_signaled_comments_filters(
     """Retrieve signaled comments using optional filters: date, reason, user, comment, status, or emails."""
     query = db.query(SignaledComment)
 
-    if date is not None:
-        query = query.filter(SignaledComment.created_at <= date)
+    query = filter_days(query, SignaledComment.created_at, None, date)
 
     if reason_id is not None:
         query = query.filter(SignaledComment.reason_id == reason_id)
@@ -111,8 +111,7 @@ def get_all_signaled_comments_filters(
     """Retrieve signaled comments using optional filters: date, reason, user, comment, status, or emails."""
     query = db.query(SignaledComment)
 
-    if date is not None:
-        query = query.filter(SignaledComment.created_at <= date)
+    query = filter_days(query, SignaledComment.created_at, None, date)
 
     if reason_id is not None:
         query = query.filter(SignaledComment.reason_id == reason_id)
@@ -160,8 +159,7 @@ def get_signaled_comments_filters_total_count(
     """Retrieve signaled comments using optional filters: date, reason, user, comment, status, or emails."""
     query = db.query(SignaledComment)
 
-    if date is not None:
-        query = query.filter(SignaledComment.created_at <= date)
+    query = filter_days(query, SignaledComment.created_at, None, date)
 
     if reason_id is not None:
         query = query.filter(SignaledComment.reason_id == reason_id)
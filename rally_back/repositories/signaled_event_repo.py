@@ -6,6 +6,7 @@ from models.signaled_events_model import SignaledEvent
 from models.user_model import User
 from models.event_model import Event
 from models.profile_model import Profile
+from core.date_range import filter_days
 
 def add_signaled_event(db: Session, signaled_event: SignaledEvent) -> None:
     """Add a new signaled event to the database."""
@@ -50,8 +51,7 @@ def get_signaled_events_filters(
     """Retrieve signaled events based on optional filters like date, reason, user, event, status or emails."""
     query = db.query(SignaledEvent)
 
-    if date is not None:
-        query = query.filter(SignaledEvent.created_at <= date)
+    query = filter_days(query, SignaledEvent.created_at, None, date)
 
     if reason_id is not None:
         query = query.filter(SignaledEvent.reason_id == reason_id)
@@ -4,6 +4,7 @@ from datetime import datetime
 from sqlalchemy.orm import Session, aliased
 from models.signaled_users_model import SignaledUser
 from models.user_model import User
+from core.date_range import filter_days
 
 def add_signaled_user(db: Session, signaled_user: SignaledUser) -> None:
     """Add a new signaled user to the database."""
@@ -48,8 +49,7 @@ def get_signaled_users_filters(
     """Retrieve signaled users using optional filters like date, reason, user, reported user, status or emails."""
     query = db.query(SignaledUser)
 
-    if date is not None:
-        query = query.filter(SignaledUser.created_at <= date)
+    query = filter_days(query, SignaledUser.created_at, None, date)
 
     if reason_id is not None:
         query = query.filter(SignaledUser.reason_id == reason_id)
@@ -89,8 +89,7 @@ def get_signaled_users_filters_total_count(
     """Retrieve signaled users using optional filters like date, reason, user, reported user, status or emails."""
     query = db.query(SignaledUser)
 
-    if date is not None:
-        query = query.filter(SignaledUser.created_at <= date)
+    query = filter_days(query, SignaledUser.created_at, None, date)
 
     if reason_id is not None:
         query = query.filter(SignaledUser.reason_id == reason_id)
@@ -1,7 +1,10 @@
 """This file contains the user repository"""
 from typing import Optional
+from sqlalchemy import Row, exists, select, update
 from sqlalchemy.orm import Session
 
+from models.banned_user_model import BannedUser
+from models.role_model import Role
 from models.user_model import User
 
 def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
@@ -12,6 +15,36 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """Retrieve a user by their email address."""
     return db.query(User).filter(User.email == email).first()
 
+def get_principal_by_email(db: Session, email: str) -> Optional[Row]:
+    """
+    Retrieve what the authentication needs about a user (role name and banned state included)
+    in a single query.
+    """
+    return db.execute(
+        select(
+            User.id,
+            User.email,
+            User.role_id,
+            Role.role,
+            User.is_verified,
+            User.is_planner,
+            User.account_id,
+            User.token_version,
+            exists().where(BannedUser.banned_email == User.email).label("is_banned")
+        )
+        .outerjoin(Role, Role.id == User.role_id)
+        .where(User.email == email)
+    ).first()
+
+def increment_token_version(db: Session, user_id: int) -> None:
+    """Increment the token version of a user, revoking the access tokens issued before. The caller commits."""
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+        .execution_options(synchronize_session="fetch")
+    )
+
 def add_user(db: Session, user: User) -> None:
     """Add a new user to the database."""
     db.add(user)
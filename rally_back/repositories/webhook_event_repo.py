@@ -0,0 +1,125 @@
+"""This file contains the webhook event repository (inbox of the Stripe webhooks)"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import and_, exists, or_, select, update
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.webhook_event_model import WebhookEvent
+from enums.webhook_event_status import WebhookEventStatusEnum
+
+
+def insert_webhook_event(
+    db: Session,
+    stripe_event_id: str,
+    event_type: str,
+    object_id: Optional[str],
+    stripe_created: int,
+    payload: dict
+) -> Optional[int]:
+    """
+    This function stores a Stripe event with INSERT ... ON CONFLICT DO NOTHING on the Stripe event id.
+
+    It returns the id of the new row, or None if the event was already received (redelivery).
+    The caller commits.
+    """
+    now = datetime.now()
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    return db.scalars(
+        insert(WebhookEvent)
+        .values(
+            stripe_event_id=stripe_event_id,
+            event_type=event_type,
+            object_id=object_id,
+            stripe_created=stripe_created,
+            payload=payload,
+            status=WebhookEventStatusEnum.PENDING.value,
+            attempts=0,
+            next_attempt_at=now,
+            received_at=now
+        )
+        .on_conflict_do_nothing(index_elements=[WebhookEvent.stripe_event_id])
+        .returning(WebhookEvent.id)
+    ).first()
+
+
+def commit_webhook_event(db: Session) -> None:
+    """
+    This function commits the changes in the database.
+    """
+    db.commit()
+
+
+def get_webhook_event_by_stripe_id(db: Session, stripe_event_id: str) -> Optional[WebhookEvent]:
+    """
+    This function fetches a webhook event by its Stripe event ID.
+    """
+    return db.query(WebhookEvent).filter(WebhookEvent.stripe_event_id == stripe_event_id).first()
+
+
+def claim_webhook_events(db: Session, limit: int, now: datetime, stale_before: datetime) -> list[WebhookEvent]:
+    """
+    This function claims a batch of due events in one UPDATE ... RETURNING: the pending events whose next
+    attempt is due, and the events left in processing by a worker that died before `stale_before`.
+
+    An event is only claimed when no older event of the same Stripe object is still waiting, so that the
+    events of an object are processed in the order Stripe created them. The candidates are selected with
+    FOR UPDATE SKIP LOCKED so that concurrent workers claim disjoint batches.
+
+    It returns the claimed events in order. The caller commits.
+    """
+    older = aliased(WebhookEvent)
+    waiting_older = exists().where(
+        older.object_id == WebhookEvent.object_id,
+        older.status.in_([WebhookEventStatusEnum.PENDING.value, WebhookEventStatusEnum.PROCESSING.value]),
+        or_(
+            older.stripe_created < WebhookEvent.stripe_created,
+            and_(older.stripe_created == WebhookEvent.stripe_created, older.id < WebhookEvent.id)
+        )
+    )
+    due = (
+        select(WebhookEvent.id)
+        .where(
+            or_(
+                (WebhookEvent.status == WebhookEventStatusEnum.PENDING.value)
+                & (WebhookEvent.next_attempt_at <= now),
+                (WebhookEvent.status == WebhookEventStatusEnum.PROCESSING.value)
+                & (WebhookEvent.locked_at < stale_before)
+            ),
+            or_(WebhookEvent.object_id.is_(None), ~waiting_older)
+        )
+        .order_by(WebhookEvent.stripe_created, WebhookEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = db.scalars(
+        update(WebhookEvent)
+        .where(WebhookEvent.id.in_(due.scalar_subquery()))
+        .values(
+            status=WebhookEventStatusEnum.PROCESSING.value,
+            locked_at=now,
+            attempts=WebhookEvent.attempts + 1
+        )
+        .returning(WebhookEvent)
+        .execution_options(synchronize_session=False)
+    ).all()
+    return sorted(claimed, key=lambda webhook_event: (webhook_event.stripe_created, webhook_event.id))
+
+
+def update_webhook_event(db: Session, webhook_event_id: int, values: dict) -> None:
+    """
+    This function updates the columns of a webhook event in a single UPDATE. The caller commits.
+    """
+    db.execute(
+        update(WebhookEvent)
+        .where(WebhookEvent.id == webhook_event_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def count_webhook_events_by_status(db: Session, status: WebhookEventStatusEnum) -> int:
+    """
+    This function counts the webhook events having a status.
+    """
+    return db.query(WebhookEvent).filter(WebhookEvent.status == status.value).count()
@@ -99,4 +99,4 @@ async def reset_pwd(
     db: Session = Depends(get_db)
 ):
     """Reset the user's password using provided token and new password."""
-    return authent_controller.reset_password(db, reset_password_schema)
+    return await authent_controller.reset_password(db, reset_password_schema)
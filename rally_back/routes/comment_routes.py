@@ -1,7 +1,8 @@
 from fastapi import Depends, APIRouter, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from controllers import authent_controller
-from database.db import get_db
+from database.db import get_async_db, get_db
 from models.user_model import User
 from controllers import comment_controller
 from schemas.request_schemas.comment_schema import CommentSchema
@@ -13,25 +14,25 @@ router = APIRouter(
 )
 
 @router.get("/events/{event_id}", response_model=CommentListSchemaResponse, status_code=200)
-def get_comments_from_event(
+async def get_comments_from_event(
     event_id: int,
     offset: int = Query(0),
     limit: int = Query(5),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> CommentListSchemaResponse:
     """Get comments posted on a specific event (connected users only)."""
-    return comment_controller.get_comments_from_event(db, event_id, offset, limit)
+    return await db.run_sync(comment_controller.get_comments_from_event, event_id, offset, limit)
 
 @router.get("/profiles/{profile_id}", response_model=CommentListSchemaResponse, status_code=200)
-def get_comments_from_profile(
+async def get_comments_from_profile(
     profile_id: int,
     offset: int = Query(0),
     limit: int = Query(5),
-    _: User = Depends(authent_controller.get_connected_user),
-    db: Session = Depends(get_db)
+    _: User = Depends(authent_controller.get_connected_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> CommentListSchemaResponse:
     """Get comments made by a specific profile (connected users only)."""
-    return comment_controller.get_comments_from_profile(db, profile_id, offset, limit)
+    return await db.run_sync(comment_controller.get_comments_from_profile, profile_id, offset, limit)
 
 @router.get("/", response_model=CommentListSchemaResponse, status_code=200)
 def get_comments(
@@ -44,13 +45,13 @@ def get_comments(
     return comment_controller.get_comments(db, offset, limit)
 
 @router.get("/{id}", response_model=CommentSchemaResponse, status_code=200)
-def get_comment_by_id(
+async def get_comment_by_id(
     comment_id: int,
-    _: User = Depends(authent_controller.get_connected_user),
-    db: Session = Depends(get_db)
+    _: User = Depends(authent_controller.get_connected_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> CommentSchemaResponse:
     """Retrieve a comment by its ID (connected users only)."""
-    return comment_controller.get_comment_by_id(db, comment_id)
+    return await db.run_sync(comment_controller.get_comment_by_id, comment_id)
 
 @router.post("/", response_model=CommentSchemaResponse, status_code=201)
 def comment_event(
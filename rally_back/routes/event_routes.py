@@ -2,12 +2,14 @@ from datetime import datetime
 from fastapi import Depends, APIRouter, Query
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from controllers import authent_controller
-from database.db import get_db
+from database.db import get_async_db, get_db
 from models.user_model import User
 from controllers import event_controller
 from schemas.request_schemas.event_schema import EventSchema
 from schemas.response_schemas.event_schema_response import EventSchemaResponse, EventListSchemaResponse
+from enums.count_mode import CountModeEnum
 
 router = APIRouter(
     prefix="/api/v1/events",
@@ -24,7 +26,7 @@ def post_event(
     return event_controller.create_event(db, event, current_user)
 
 @router.get("/", response_model=EventListSchemaResponse, status_code=200)
-def get_events(
+async def get_events(
     date_avant: datetime = Query(None),
     date_apres: datetime = Query(None),
     type_ids: list[int] = Query(None),
@@ -37,10 +39,13 @@ def get_events(
     search: str = Query(None),
     offset: int = Query(0),
     limit: int = Query(5),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None),
+    keyset: bool = Query(False),
+    count: CountModeEnum = Query(CountModeEnum.EXACT),
+    db: AsyncSession = Depends(get_async_db)
 ) -> EventListSchemaResponse:
-    """Retrieve a filtered and paginated list of events."""
-    return event_controller.get_events(
+    """Retrieve a filtered and paginated list of events (offset or cursor based)."""
+    return await event_controller.get_events_async(
         db,
         date_avant,
         date_apres,
@@ -53,16 +58,19 @@ def get_events(
         nb_places,
         search,
         offset,
-        limit
+        limit,
+        cursor,
+        keyset,
+        count
     )
 
 @router.get("/{event_id}", response_model=EventSchemaResponse, status_code=200)
-def get_event(
+async def get_event(
     event_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> EventSchemaResponse:
     """Retrieve event details by event ID."""
-    return event_controller.get_event_by_id(db, event_id)
+    return await event_controller.get_event_by_id_async(db, event_id)
 
 @router.patch("/{event_id}", response_model=EventSchemaResponse, status_code=200)
 def update_event(
@@ -84,14 +92,14 @@ def delete_event(
     return event_controller.delete_event(db, event_id, current_user)
 
 @router.get("/profiles/{event_id}", response_model=EventListSchemaResponse, status_code=200)
-def get_events_by_profile(
+async def get_events_by_profile(
     event_id: int,
     offset: int = Query(0),
     limit: int = Query(5),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> EventListSchemaResponse:
     """Get all events created by a specific profile (paginated)."""
-    return event_controller.get_events_by_profile(
+    return await event_controller.get_events_by_profile_async(
         db,
         event_id,
         offset,
@@ -1,14 +1,18 @@
+import json
 import os
-from datetime import datetime
+from datetime import date, datetime
 from fastapi import Depends, APIRouter, Query, Request, HTTPException, Header
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-import stripe
 
-from controllers import authent_controller, payment_controller
-from database.db import get_db
+from core.stripe_client import get_stripe
+from controllers import authent_controller, payment_controller, revenue_controller
+from database.db import get_async_db, get_db
 from models.user_model import User
 from enums.payment_status import PaymentStatusEnum
 from schemas.response_schemas.payment_schema_response import PaymentRestrictedListSchemaResponse
+from schemas.response_schemas.revenue_schema_response import RevenueListSchemaResponse
 
 router = APIRouter(
     prefix="/api/v1/payments",
@@ -36,24 +40,23 @@ def create_account(
 async def stripe_webhook(
     request: Request,
     stripe_signature: str = Header(None),
-    db: Session = Depends(get_db)
-):
-    """Handle Stripe webhook events for payment status updates."""
+    db: AsyncSession = Depends(get_async_db)
+)->dict[str, str]:
+    """Verify a Stripe webhook event and queue it in the inbox, it is processed by the webhook workers."""
     payload = await request.body()
     endpoint_secret = os.getenv("STRIPE_WEBHOOK_SECRET")
+    stripe = get_stripe()
 
     try:
-        event = stripe.Webhook.construct_event(
+        stripe.Webhook.construct_event(
             payload=payload,
             sig_header=stripe_signature,
             secret=endpoint_secret
         )
-    except HTTPException as e:
+    except (ValueError, stripe.SignatureVerificationError) as e:
         raise HTTPException(status_code=400, detail="Signature invalide") from e
 
-    payment_controller.handle_webhooks(event, db)
-
-    return {"status": "ok"}
+    return await db.run_sync(payment_controller.receive_webhook, json.loads(payload))
 
 @router.get("/", response_model=PaymentRestrictedListSchemaResponse)
 def get_payments_for_current_user(
@@ -83,3 +86,35 @@ def get_payments_for_current_user(
         offset,
         limit
     )
+
+@router.get("/{payment_id}/invoice", response_class=FileResponse)
+def download_invoice(
+    payment_id: int,
+    current_user: User = Depends(authent_controller.get_connected_user),
+    db: Session = Depends(get_db)
+)->FileResponse:
+    """Download the invoice (buyer) or the receipt (organizer) of a payment."""
+    return payment_controller.download_invoice(db, payment_id, current_user)
+
+@router.get("/revenue", response_model=RevenueListSchemaResponse)
+def get_revenue_for_current_user(
+    date_apres: date = Query(None),
+    date_avant: date = Query(None),
+    status: PaymentStatusEnum = Query(None),
+    current_user: User = Depends(authent_controller.get_connected_user),
+    db: Session = Depends(get_db)
+)->RevenueListSchemaResponse:
+    """Get the daily revenues of the current user as an organizer between two days included."""
+    return revenue_controller.get_organizer_revenues(db, current_user.id, date_apres, date_avant, status)
+
+@router.get("/revenue/events", response_model=RevenueListSchemaResponse)
+def get_events_revenue_for_current_user(
+    event_id: int = Query(None),
+    date_apres: date = Query(None),
+    date_avant: date = Query(None),
+    status: PaymentStatusEnum = Query(None),
+    current_user: User = Depends(authent_controller.get_connected_user),
+    db: Session = Depends(get_db)
+)->RevenueListSchemaResponse:
+    """Get the daily revenues of the events of the current user (or of one of them) between two days included."""
+    return revenue_controller.get_event_revenues(db, event_id, current_user.id, date_apres, date_avant, status)
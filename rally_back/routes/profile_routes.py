@@ -1,7 +1,8 @@
 from fastapi import Depends, APIRouter, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.db import get_db
+from database.db import get_async_db, get_db
 from controllers import authent_controller
 from controllers import profile_controller
 from models.user_model import User
@@ -15,12 +16,12 @@ router = APIRouter(
 )
 
 @router.get("/me", response_model=ProfileSchemaResponse, status_code=200)
-def get_current_profile(
-    current_user: User = Depends(authent_controller.get_connected_user),
-    db: Session = Depends(get_db)
+async def get_current_profile(
+    current_user: User = Depends(authent_controller.get_connected_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> ProfileSchemaResponse:
     """Get the profile of the currently authenticated user."""
-    return profile_controller.get_profile(db, current_user.id)
+    return await profile_controller.get_profile_async(db, current_user.id)
 
 @router.get("/", response_model=ProfileListSchemaResponse, status_code=200)
 def filter_profiles(
@@ -37,12 +38,12 @@ def filter_profiles(
     return profile_controller.filter_profiles(db, nb_like, is_planner, role, search, offset, limit)
 
 @router.get("/{profile_id}", response_model=ProfileSchemaResponse, status_code=200)
-def get_profile(
+async def get_profile(
     profile_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ProfileSchemaResponse:
     """Get the profile of a specific user by their profile ID."""
-    return profile_controller.get_profile(db, profile_id)
+    return await profile_controller.get_profile_async(db, profile_id)
 
 @router.patch("/", response_model=ProfileSchemaResponse, status_code=200)
 def update_profile(
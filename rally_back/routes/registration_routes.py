@@ -2,9 +2,10 @@ from typing import Optional
 from datetime import datetime
 from fastapi import Depends, APIRouter, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from controllers import authent_controller
-from database.db import get_db
+from database.db import get_async_db, get_db
 from models.user_model import User
 from controllers import registration_controller
 from schemas.request_schemas.registration_schema import RegistrationSchema
@@ -45,66 +46,66 @@ def get_registrations(
 
 
 @router.get("/places/{event_id}", response_model=RegistrationNumberSchemaResponseSchemas, status_code=201)
-def get_count_registrations_for_event(
+async def get_count_registrations_for_event(
     event_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> RegistrationNumberSchemaResponseSchemas:
     """Get the count of registrations for a specific event."""
-    return registration_controller.get_number_places_from_event(db, event_id)
+    return await db.run_sync(registration_controller.get_number_places_from_event, event_id)
 
 
 @router.get("/fetch", response_model=RegistrationSchemaResponseSchemas, status_code=201)
-def get_registration(
+async def get_registration(
     event_id: Optional[int] = Query(None),
     profile_id: Optional[int] = Query(None),
-    _: User = Depends(authent_controller.get_connected_user),
-    db: Session = Depends(get_db)
+    _: User = Depends(authent_controller.get_connected_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> RegistrationSchemaResponseSchemas:
     """Fetch a specific registration by event and profile ID."""
-    return registration_controller.get_registration(db, event_id, profile_id)
+    return await db.run_sync(registration_controller.get_registration, event_id, profile_id)
 
 
 @router.get("/self", response_model=RegistrationListSchemaResponseSchemas, status_code=200)
-def get_registrations_current_user(
+async def get_registrations_current_user(
     offset: int = Query(0),
     limit: int = Query(5),
-    current_user: User = Depends(authent_controller.get_connected_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(authent_controller.get_connected_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> RegistrationSchemaResponseSchemas:
     """Get a list of registrations for the current user."""
-    return registration_controller.get_registrations_for_current_user(db, current_user, offset, limit)
+    return await db.run_sync(registration_controller.get_registrations_for_current_user, current_user, offset, limit)
 
 
 @router.get("/self/events", response_model=RegistrationListSchemaResponseSchemas, status_code=200)
-def get_registrations_event_by_current_user(
+async def get_registrations_event_by_current_user(
     offset: int = Query(0),
     limit: int = Query(5),
     event_id: Optional[int] = Query(None),
-    current_user: User = Depends(authent_controller.get_connected_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(authent_controller.get_connected_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> RegistrationSchemaResponseSchemas:
     """Get a list of registrations for events by the current user, optionally filtered by event ID."""
-    return registration_controller.get_registrations_for_event_by_user(db, current_user, event_id, offset, limit)
+    return await db.run_sync(registration_controller.get_registrations_for_event_by_user, current_user, event_id, offset, limit)
 
 
 @router.get("/is-registered", response_model=IsUserRegistered, status_code=200)
-def is_user_registered(
+async def is_user_registered(
     event_id: int = Query,
-    current_user: User = Depends(authent_controller.get_connected_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(authent_controller.get_connected_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> IsUserRegistered:
     """Know if the curret user is registered for an event"""
-    return registration_controller.is_user_registered(db, event_id, current_user.id)
+    return await db.run_sync(registration_controller.is_user_registered, event_id, current_user.id)
 
 
 @router.get("/{registration_id}", response_model=RegistrationSchemaResponseSchemas, status_code=201)
-def get_registration_by_id(
+async def get_registration_by_id(
     registration_id: int,
-    _: User = Depends(authent_controller.get_connected_user),
-    db: Session = Depends(get_db)
+    _: User = Depends(authent_controller.get_connected_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> RegistrationSchemaResponseSchemas:
     """Get a specific registration by its ID."""
-    return registration_controller.get_registration_by_id(db, registration_id)
+    return await db.run_sync(registration_controller.get_registration_by_id, registration_id)
 
 
 @router.delete("/", response_model=dict[str, str], status_code=200)
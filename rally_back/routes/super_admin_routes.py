@@ -1,16 +1,25 @@
-from datetime import datetime
+from datetime import date, datetime
 from fastapi import Depends, APIRouter, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from controllers import (
     action_logs_controller,
     authent_controller,
+    banned_term_controller,
+    event_controller,
+    like_controller,
+    moderation_scan_controller,
     payment_controller,
     profile_controller,
     reason_controller,
+    revenue_controller,
     type_controller
 )
 from database.db import get_db
 from schemas.response_schemas.user_schema_response import UserResponse
+from schemas.request_schemas.banned_term_schema import BannedTermSchema
+from schemas.response_schemas.banned_term_schema_response import BannedTermSchemaResponse
+from schemas.response_schemas.moderation_scan_schema_response import ModerationScanSchemaResponse
 from schemas.response_schemas.profile_schema_response import ProfileListSchemaResponse
 from controllers import user_controller
 from schemas.response_schemas.action_log_schema_response import ActionLogListResponse
@@ -23,8 +32,11 @@ from schemas.response_schemas.type_schema_response import TypeSchemaResponse
 from schemas.request_schemas.type_schema import TypeSchema
 from schemas.request_schemas.reason_schema import ReasonSchema
 from schemas.response_schemas.reason_schema_response import ReasonSchemaResponse
+from enums.export_format import ExportFormatEnum
 from enums.payment_status import PaymentStatusEnum
+from enums.count_mode import CountModeEnum
 from schemas.response_schemas.payment_schema_response import PaymentListSchemaResponse
+from schemas.response_schemas.revenue_schema_response import RevenueListSchemaResponse
 
 
 
@@ -70,11 +82,12 @@ def get_logs(
     log_type: LogLevelEnum = Query(None),
     offset: int = Query(0),
     limit: int = Query(5),
+    count: CountModeEnum = Query(CountModeEnum.EXACT),
     _: User = Depends(authent_controller.get_current_super_admin),
     db: Session = Depends(get_db)
 ) -> ActionLogListResponse:
     """Fetch action logs with various filters, including date, action type, user ID, and log level. Restricted to super-admins."""
-    return action_logs_controller.get_action_logs(db, date, action_type, user_id, log_type, offset, limit)
+    return action_logs_controller.get_action_logs(db, date, action_type, user_id, log_type, offset, limit, count)
 
 
 # 🔹 4. Créer un type
@@ -151,3 +164,178 @@ def get_types(
 ) -> TypeListSchemaResponse:
     """Retrieve a list of all types (e.g., event types)."""
     return type_controller.get_types(db)
+
+
+# 🔹 8. Reconstruire l'index de recherche des events
+@router.post("/search/reindex", response_model=dict[str, int], status_code=200)
+def reindex_search(
+    current_user: User = Depends(authent_controller.get_current_super_admin),
+    db: Session = Depends(get_db)
+) -> dict[str, int]:
+    """Rebuild the full-text search documents of every event. Restricted to super-admins."""
+    return event_controller.reindex_search(db, current_user)
+
+
+# 🔹 9. Recalculer les compteurs de likes et de commentaires
+@router.post("/counters/reconcile", response_model=dict[str, int], status_code=200)
+def reconcile_counters(
+    current_user: User = Depends(authent_controller.get_current_super_admin),
+    db: Session = Depends(get_db)
+) -> dict[str, int]:
+    """Recompute the likes, comments and seats counters from their source tables. Restricted to super-admins."""
+    return like_controller.reconcile_counters(db, current_user)
+
+
+# 🔹 10. Suivre la file d'attente du hachage des mots de passe
+@router.get("/metrics/password-hashing", response_model=dict[str, float], status_code=200)
+def get_password_hashing_metrics(
+    _: User = Depends(authent_controller.get_current_super_admin)
+) -> dict[str, float]:
+    """Get the queue depth and counters of the password hashing pool. Restricted to super-admins."""
+    return authent_controller.get_password_hashing_metrics()
+
+
+# 🔹 11. Ajouter un terme interdit
+@router.post("/banned-terms", response_model=BannedTermSchemaResponse, status_code=201)
+def create_banned_term(
+    banned_term: BannedTermSchema,
+    current_user: User = Depends(authent_controller.get_current_super_admin),
+    db: Session = Depends(get_db)
+) -> BannedTermSchemaResponse:
+    """Add a banned term (word, phrase or substring, with a severity) to the moderation. Restricted to super-admins."""
+    return banned_term_controller.create_banned_term(db, banned_term, current_user)
+
+
+# 🔹 12. Recharger les termes interdits
+@router.post("/banned-terms/reload", response_model=dict[str, int], status_code=200)
+def reload_banned_terms(
+    current_user: User = Depends(authent_controller.get_current_super_admin),
+    db: Session = Depends(get_db)
+) -> dict[str, int]:
+    """Reload the banned terms from the banned words file and the database. Restricted to super-admins."""
+    return banned_term_controller.reload_banned_terms(db, current_user)
+
+
+# 🔹 13. Lancer un scan de modération des commentaires et events existants
+@router.post("/moderation/scans", response_model=ModerationScanSchemaResponse, status_code=202)
+def create_moderation_scan(
+    current_user: User = Depends(authent_controller.get_current_super_admin),
+    db: Session = Depends(get_db)
+) -> ModerationScanSchemaResponse:
+    """Queue a background scan of the existing comments and events against the banned terms. Restricted to super-admins."""
+    return moderation_scan_controller.create_moderation_scan(db, current_user)
+
+
+# 🔹 14. Suivre un scan de modération
+@router.get("/moderation/scans/{moderation_scan_id}", response_model=ModerationScanSchemaResponse, status_code=200)
+def get_moderation_scan(
+    moderation_scan_id: int,
+    _: User = Depends(authent_controller.get_current_super_admin),
+    db: Session = Depends(get_db)
+) -> ModerationScanSchemaResponse:
+    """Get the progress of a moderation scan. Restricted to super-admins."""
+    return moderation_scan_controller.get_moderation_scan(db, moderation_scan_id)
+
+
+# 🔹 15. Reprendre un scan de modération échoué
+@router.post("/moderation/scans/{moderation_scan_id}/resume", response_model=ModerationScanSchemaResponse, status_code=202)
+def resume_moderation_scan(
+    moderation_scan_id: int,
+    current_user: User = Depends(authent_controller.get_current_super_admin),
+    db: Session = Depends(get_db)
+) -> ModerationScanSchemaResponse:
+    """Resume a failed moderation scan from its checkpoint. Restricted to super-admins."""
+    return moderation_scan_controller.resume_moderation_scan(db, moderation_scan_id, current_user)
+
+
+# 🔹 16. Renvoyer les factures d'un event
+@router.post("/events/{event_id}/invoices/resend", response_model=dict[str, int], status_code=200)
+def resend_event_invoices(
+    event_id: int,
+    current_user: User = Depends(authent_controller.get_current_super_admin),
+    db: Session = Depends(get_db)
+) -> dict[str, int]:
+    """Send again the invoices and receipts of the successful payments of an event. Restricted to super-admins."""
+    return payment_controller.resend_event_invoices(db, event_id, current_user)
+
+
+# 🔹 17. Exporter les paiements (CSV ou NDJSON, en flux)
+@router.get("/payments/export", response_class=StreamingResponse, status_code=200)
+def export_payments(
+    event_title: str = Query(None),
+    buyer_email: str = Query(None),
+    organizer_email: str = Query(None),
+    amount_min: float = Query(None),
+    amount_max: float = Query(None),
+    fee_min: float = Query(None),
+    fee_max: float = Query(None),
+    brut_amount_min: float = Query(None),
+    brut_amount_max: float = Query(None),
+    stripe_session_id: str = Query(None),
+    stripe_payment_intent_id: str = Query(None),
+    status: PaymentStatusEnum = Query(None),
+    date_apres: datetime = Query(None),
+    date_avant: datetime = Query(None),
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.CSV, alias="format"),
+    current_user: User = Depends(authent_controller.get_current_super_admin),
+    db: Session = Depends(get_db)
+) -> StreamingResponse:
+    """Stream all the payments matching the filters as a CSV or NDJSON download, without pagination. Restricted to super-admins."""
+    return payment_controller.export_payments(
+        db,
+        current_user,
+        event_title,
+        buyer_email,
+        organizer_email,
+        amount_min,
+        amount_max,
+        fee_min,
+        fee_max,
+        brut_amount_min,
+        brut_amount_max,
+        stripe_session_id,
+        stripe_payment_intent_id,
+        status,
+        date_apres,
+        date_avant,
+        export_format
+    )
+
+
+# 🔹 18. Consulter les revenus journaliers des organisateurs
+@router.get("/revenue/organizers", response_model=RevenueListSchemaResponse, status_code=200)
+def get_organizer_revenues(
+    organizer_id: int = Query(None),
+    date_apres: date = Query(None),
+    date_avant: date = Query(None),
+    status: PaymentStatusEnum = Query(None),
+    _: User = Depends(authent_controller.get_current_super_admin),
+    db: Session = Depends(get_db)
+) -> RevenueListSchemaResponse:
+    """Get the daily revenues of an organizer (or of all of them) between two days included. Restricted to super-admins."""
+    return revenue_controller.get_organizer_revenues(db, organizer_id, date_apres, date_avant, status)
+
+
+# 🔹 19. Consulter les revenus journaliers des events
+@router.get("/revenue/events", response_model=RevenueListSchemaResponse, status_code=200)
+def get_event_revenues(
+    event_id: int = Query(None),
+    organizer_id: int = Query(None),
+    date_apres: date = Query(None),
+    date_avant: date = Query(None),
+    status: PaymentStatusEnum = Query(None),
+    _: User = Depends(authent_controller.get_current_super_admin),
+    db: Session = Depends(get_db)
+) -> RevenueListSchemaResponse:
+    """Get the daily revenues of an event (or of the events of an organizer) between two days included. Restricted to super-admins."""
+    return revenue_controller.get_event_revenues(db, event_id, organizer_id, date_apres, date_avant, status)
+
+
+# 🔹 20. Recalculer les revenus journaliers depuis les paiements
+@router.post("/revenue/rebuild", response_model=dict[str, int], status_code=200)
+def rebuild_revenues(
+    current_user: User = Depends(authent_controller.get_current_super_admin),
+    db: Session = Depends(get_db)
+) -> dict[str, int]:
+    """Recompute the daily revenues of the organizers and events from the payments. Restricted to super-admins."""
+    return revenue_controller.rebuild_revenues(db, current_user)
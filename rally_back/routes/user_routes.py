@@ -64,8 +64,8 @@ def toggle_user_planner(
 @router.delete("/{user_id}", response_model=dict[str, str], status_code=201)
 def ban_user(
     user_id: int,
-    _: User = Depends(authent_controller.get_current_admin_or_super_admin),
+    current_user: User = Depends(authent_controller.get_current_admin_or_super_admin),
     db: Session = Depends(get_db)
 ) -> dict[str, str]:
     """Delete or ban a user by their ID. Accessible by an admin or super admin."""
-    return user_controller.delete_user(db, user_id)
+    return user_controller.delete_user(db, user_id, current_user.id)
@@ -1,4 +1,5 @@
 from . import address_schema
+from . import banned_term_schema
 from . import comment_schema
 from . import event_picture_schema
 from . import event_schema
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from enums.moderation_rule_kind import ModerationRuleKindEnum
+from enums.moderation_severity import ModerationSeverityEnum
+
+class BannedTermSchema(BaseModel):
+    """the request schema for banned terms"""
+    term: str
+    kind: ModerationRuleKindEnum = ModerationRuleKindEnum.WORD
+    severity: ModerationSeverityEnum = ModerationSeverityEnum.HIGH
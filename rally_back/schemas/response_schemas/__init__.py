@@ -1,15 +1,18 @@
 from . import action_log_schema_response
 from . import address_schema_response
+from . import banned_term_schema_response
 from . import banned_user_schema_response
 from . import comment_schema_response
 from . import event_picture_schema_response
 from . import event_schema_response
 from . import like_schema_response
+from . import moderation_scan_schema_response
 from . import payment_schema_response
 from . import profile_schema_response
 from . import reason_schema_response
 from . import register_schema_response
 from . import registration_schema_response
+from . import revenue_schema_response
 from . import role_schema_response
 from . import signaled_comment_schema_response
 from . import signaled_event_schema_response
@@ -21,7 +21,7 @@ class ActionLogSchemaResponse(BaseModel):
 class ActionLogListResponse(BaseModel):
     """the response schema for many action log"""
     count: int
-    total: int
+    total: Optional[int]
     data: list[ActionLogSchemaResponse]
 
     model_config = {
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from enums.moderation_rule_kind import ModerationRuleKindEnum
+from enums.moderation_severity import ModerationSeverityEnum
+
+class BannedTermSchemaResponse(BaseModel):
+    """the response schema for banned term"""
+    id: int
+    term: str
+    kind: ModerationRuleKindEnum
+    severity: ModerationSeverityEnum
+
+    model_config = {
+        "from_attributes": True
+    }
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel
 
 from schemas.response_schemas.profile_schema_response import ProfileRestrictedSchemaResponse
@@ -32,8 +33,9 @@ class EventSchemaResponse(BaseModel):
 class EventListSchemaResponse(BaseModel):
     """the response schema for many events"""
     count: int
-    total: int
+    total: Optional[int] = None
     data: list[EventSchemaResponse]
+    next_cursor: Optional[str] = None
 
     model_config = {
         "from_attributes": True
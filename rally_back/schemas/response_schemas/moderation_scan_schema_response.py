@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+class ModerationScanSchemaResponse(BaseModel):
+    """the response schema for moderation scan"""
+    id: int
+    user_id: Optional[int]
+    status: str
+    phase: str
+    last_comment_id: int
+    last_event_id: int
+    comments_scanned: int
+    comments_flagged: int
+    events_scanned: int
+    events_flagged: int
+    last_error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+    model_config = {
+        "from_attributes": True
+    }
@@ -0,0 +1,24 @@
+from datetime import date
+from typing import Optional
+from pydantic import BaseModel
+from enums.payment_status import PaymentStatusEnum
+
+class RevenueSchemaResponse(BaseModel):
+    """the response schema for a daily revenue (of an organizer or of an event)"""
+    day: date
+    organizer_id: int
+    event_id: Optional[int] = None
+    status: PaymentStatusEnum
+    payments_count: int
+    gross_amount: float
+    fee_amount: float
+    net_amount: float
+
+    model_config = {
+        "from_attributes": True
+    }
+
+class RevenueListSchemaResponse(BaseModel):
+    """the response schema for the daily revenues of a date range"""
+    count: int
+    data: list[RevenueSchemaResponse]
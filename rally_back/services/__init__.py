@@ -2,20 +2,30 @@ from . import action_log_service
 from . import address_service
 from . import authent_service
 from . import banned_user_service
+from . import cache_service
 from . import comment_service
+from . import counter_service
+from . import email_service
+from . import event_card_service
 from . import event_picture_service
 from . import event_service
 from . import failed_login_service
+from . import invoice_service
 from . import like_service
+from . import moderation_scan_service
 from . import moderation_service
 from . import payment_service
 from . import profile_service
 from . import reason_service
 from . import registration_service
+from . import revenue_service
 from . import role_service
+from . import search_service
 from . import signaled_comment_service
 from . import signaled_event_service
 from . import signaled_user_service
 from . import type_service
 from . import user_service
+from . import warmup_service
+from . import webhook_service
 from . import pictures_service
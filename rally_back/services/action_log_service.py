@@ -1,14 +1,87 @@
-from datetime import datetime
+import logging
+import os
+from datetime import date, datetime
 from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from core.background import BackgroundLoop
+from core.log_writer import BufferedWriter, FileSink, Sink, StdoutSink
+from database.db import SessionLocal
 from models.action_logs_model import ActionLog
 from enums.action import ActionEnum
 from enums.log_level import LogLevelEnum
-from services import user_service
 from repositories import action_log_repo
-from errors import UserNotFoundError
 
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# where the action logs are written, comma separated: db, file (rotating NDJSON), stdout (NDJSON)
+ACTION_LOG_SINKS = os.getenv("ACTION_LOG_SINKS", "db")
+ACTION_LOG_FILE_PATH = os.getenv("ACTION_LOG_FILE_PATH", "logs/action_logs.ndjson")
+ACTION_LOG_FILE_MAX_BYTES = int(os.getenv("ACTION_LOG_FILE_MAX_BYTES", str(50 * 1024 * 1024)))
+ACTION_LOG_FILE_BACKUPS = int(os.getenv("ACTION_LOG_FILE_BACKUPS", "10"))
+# logs queued in memory before the requests write them themselves, logs written per insert
+ACTION_LOG_QUEUE_SIZE = int(os.getenv("ACTION_LOG_QUEUE_SIZE", "10000"))
+ACTION_LOG_BATCH_SIZE = int(os.getenv("ACTION_LOG_BATCH_SIZE", "500"))
+ACTION_LOG_FLUSH_INTERVAL_MS = int(os.getenv("ACTION_LOG_FLUSH_INTERVAL_MS", "1000"))
+# monthly partitions of the action_logs table (PostgreSQL) created in advance, and checked every
+ACTION_LOG_PARTITIONS_AHEAD = int(os.getenv("ACTION_LOG_PARTITIONS_AHEAD", "3"))
+ACTION_LOG_PARTITION_CHECK_SECONDS = int(os.getenv("ACTION_LOG_PARTITION_CHECK_SECONDS", "3600"))
+
+
+class DatabaseSink:
+    """writes the action logs in the action_logs table, one multi-row insert per batch"""
+
+    def write(self, records: list[dict], db: Optional[Session] = None) -> None:
+        """used to insert a batch of action logs, in the given session or in its own one"""
+        if db is not None:
+            action_log_repo.insert_action_logs(db, records)
+            action_log_repo.commit_action_log(db)
+            return
+        with SessionLocal() as own_db:
+            try:
+                action_log_repo.insert_action_logs(own_db, records)
+                action_log_repo.commit_action_log(own_db)
+            except SQLAlchemyError:
+                # one bad row (deleted user, ...) must not lose the batch, the rows are written one by one
+                own_db.rollback()
+                if len(records) == 1:
+                    raise
+                for record in records:
+                    try:
+                        action_log_repo.insert_action_logs(own_db, [record])
+                        action_log_repo.commit_action_log(own_db)
+                    except SQLAlchemyError:
+                        own_db.rollback()
+                        logger.exception("action log rejected: %s", record)
+
+
+def build_sinks(names: str) -> list[Sink]:
+    """used to create the sinks of the action logs from their comma separated names"""
+    sinks = []
+    for name in filter(None, (name.strip() for name in names.split(","))):
+        if name == "db":
+            sinks.append(DatabaseSink())
+        elif name == "file":
+            os.makedirs(os.path.dirname(ACTION_LOG_FILE_PATH) or ".", exist_ok=True)
+            sinks.append(FileSink(ACTION_LOG_FILE_PATH, ACTION_LOG_FILE_MAX_BYTES, ACTION_LOG_FILE_BACKUPS))
+        elif name == "stdout":
+            sinks.append(StdoutSink())
+        else:
+            raise ValueError(f"Unknown action log sink: {name}")
+    return sinks
+
+
+action_log_writer = BufferedWriter(
+    "action-log-writer",
+    build_sinks(ACTION_LOG_SINKS),
+    ACTION_LOG_QUEUE_SIZE,
+    ACTION_LOG_BATCH_SIZE,
+    ACTION_LOG_FLUSH_INTERVAL_MS / 1000
+)
 
 
 def create_action_log(
@@ -17,9 +90,13 @@ def create_action_log(
     log_type: LogLevelEnum,
     action_type: ActionEnum,
     description: str
-) -> ActionLog:
+) -> None:
     """
-    Creates a new action log entry in the database.
+    Queues a new action log entry, written in batches by the action log writer.
+
+    The request does not wait for the log: it is written to the sinks (database, file, stdout) by the
+    writer thread. When the writer is not running (tests, scripts, standalone workers) the log is written
+    at once, in the database session of the caller.
 
     Parameters:
     - db (Session): The database session used for queries.
@@ -27,27 +104,70 @@ def create_action_log(
     - log_type (LogLevelEnum): The level of the log (e.g., INFO, ERROR).
     - action_type (ActionEnum): The type of the action (e.g., CREATE, UPDATE).
     - description (str): A detailed description of the action performed.
+    """
+    record = {
+        "user_id": user_id,
+        "log_type": log_type,
+        "action_type": action_type,
+        "description": description,
+        "date": datetime.now()
+    }
+    if action_log_writer.running:
+        action_log_writer.submit(record)
+        return
+    for sink in action_log_writer.sinks:
+        if isinstance(sink, DatabaseSink):
+            sink.write([record], db)
+        else:
+            sink.write([record])
 
-    Raises:
-    - UserNotFoundError: If the user with the specified user_id does not exist.
 
-    Returns:
-    - ActionLog: The created action log entry.
-    """
-    if not user_service.get_user(db, user_id):
-        raise UserNotFoundError(status_code=404, detail="Utilisateur non trouvé.")
-
-    new_action_log = ActionLog(
-        user_id=user_id,
-        log_type=log_type,
-        action_type=action_type,
-        description=description,
-        date=datetime.now()
-    )
+def start_action_log_writer() -> None:
+    """used to start the thread writing the queued action logs"""
+    action_log_writer.start()
+
+
+def stop_action_log_writer() -> None:
+    """used to stop the action log writer, the queued logs are written first"""
+    action_log_writer.stop()
 
-    action_log_repo.add_action_log(db, new_action_log)
+
+def maintain_action_log_partitions(db: Session, today: Optional[date] = None) -> list[date]:
+    """used to partition the action_logs table and to create its next monthly partitions (PostgreSQL)"""
+    today = today or date.today()
+    action_log_repo.partition_action_logs(db)
+    created = []
+    month = today.replace(day=1)
+    for _ in range(ACTION_LOG_PARTITIONS_AHEAD + 1):
+        if action_log_repo.create_action_logs_partition(db, month):
+            created.append(month)
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
     action_log_repo.commit_action_log(db)
-    action_log_repo.refresh_action_log(db, new_action_log)
+    return created
+
+
+def _maintain_action_log_partitions() -> None:
+    with SessionLocal() as db:
+        maintain_action_log_partitions(db)
+
+
+_partition_keeper = BackgroundLoop(
+    "action-log-partitions", _maintain_action_log_partitions, ACTION_LOG_PARTITION_CHECK_SECONDS
+)
+
+
+def start_action_log_partition_keeper() -> None:
+    """used to partition the action logs at startup and to create the next months partitions in the background"""
+    try:
+        _maintain_action_log_partitions()
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception("action logs partitioning failed")
+    _partition_keeper.start()
+
+
+def stop_action_log_partition_keeper() -> None:
+    """used to stop the action log partitions keeper"""
+    _partition_keeper.stop()
 
 
 def get_action_logs(
@@ -110,3 +230,13 @@ def get_action_logs_count(
         log_type
     )
 
+
+def get_action_logs_estimated_count(
+    db: Session,
+    date: Optional[datetime],
+    action_type: Optional[ActionEnum],
+    user_id: Optional[int],
+    log_type: Optional[LogLevelEnum],
+) -> int:
+    """used to estimate the number of action logs matching the filters from the planner statistics"""
+    return action_log_repo.get_action_logs_estimated_count(db, date, action_type, user_id, log_type)
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 
 from models.address_model import Address
 from repositories import address_repo
+from services import cache_service
 from errors import AddressNotFoundError
 
 
@@ -107,4 +108,6 @@ def update_address(
     address.country = country
     address_repo.commit_address(db)
     address_repo.refresh_address(db, address)
+    if address.event:
+        cache_service.invalidate_event(address.event.id)
     return address
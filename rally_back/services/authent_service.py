@@ -1,22 +1,27 @@
+import hashlib
+import math
 import os
 import re
 import random
 from datetime import datetime, timedelta
+from typing import Optional
 import jwt
-from jinja2 import Environment, FileSystemLoader
 from fastapi import Depends, status, Cookie, Request, Header
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from dotenv import load_dotenv
 from fastapi.security import OAuth2PasswordBearer
 from database.db import get_db
-from core.security import verify_password
+from core import cache, templates, throttle
+from core.principal import Principal
+from core.security import hash_password_async, verify_and_update_password
 from models.user_model import User
 from schemas.request_schemas.user_schema import UserAuth
 from services import (
     banned_user_service,
+    cache_service,
     failed_login_service,
-    role_service,
     user_service,
     email_service
 )
@@ -41,6 +46,13 @@ load_dotenv()
 
 HOST = os.getenv("RALLY_HOST", "https://127.0.0.1:8000/api/v1")
 
+# failed logins allowed per client IP and per account during the sliding window
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "20"))
+LOGIN_MAX_FAILURES_PER_ACCOUNT = int(os.getenv("LOGIN_MAX_FAILURES_PER_ACCOUNT", "5"))
+LOGIN_THROTTLE_WINDOW_SECONDS = int(os.getenv("LOGIN_THROTTLE_WINDOW_SECONDS", "60"))
+# the failed logins are also written to the failed_logins table, as an audit trail
+LOGIN_AUDIT_FAILURES = os.getenv("LOGIN_AUDIT_FAILURES", "false").lower() == "true"
+
 
 def generate_code()->int:
     """used to generate a random token with 6 numbers"""
@@ -50,7 +62,7 @@ def generate_code()->int:
 def register_user(
     db: Session,
     email: str,
-    password: str,
+    hashed_password: str,
     phone_number: str,
     first_name: str,
     last_name: str,
@@ -62,12 +74,12 @@ def register_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Cet utilisateur a été banni. Création du compte impossible."
         )
-    return user_service.create_user(db, email, password, phone_number, first_name, last_name, photo)
+    return user_service.create_user(db, email, hashed_password, phone_number, first_name, last_name, photo)
 
 def register_admin(
     db: Session,
     email: str,
-    password: str,
+    hashed_password: str,
     phone_number: str,
     first_name: str,
     last_name: str,
@@ -79,12 +91,12 @@ def register_admin(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Cet utilisateur a été banni. Création du compte impossible."
         )
-    return user_service.create_admin(db, email, password, phone_number, first_name, last_name, photo)
+    return user_service.create_admin(db, email, hashed_password, phone_number, first_name, last_name, photo)
 
 def register_super_admin(
     db: Session,
     email: str,
-    password: str,
+    hashed_password: str,
     phone_number: str,
     first_name: str,
     last_name: str,
@@ -96,7 +108,7 @@ def register_super_admin(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Cet utilisateur a été banni. Création du compte impossible."
         )
-    return user_service.create_super_admin(db, email, password, phone_number, first_name, last_name, photo)
+    return user_service.create_super_admin(db, email, hashed_password, phone_number, first_name, last_name, photo)
 
 def create_access_token(data: dict, expires_delta: timedelta = None)->str:
     """used to create a new access token"""
@@ -119,6 +131,35 @@ def create_refresh_token(data: dict, expires_delta: timedelta = None)->str:
     return jwt.encode(to_encode, os.getenv("SECRET_KEY"), algorithm=os.getenv("ALGORITHM"))
 
 
+def login_throttle_keys(client_ip: str, email: str) -> tuple[str, str]:
+    """used to get the throttle keys of a login attempt, the email is hashed to keep it out of redis"""
+    account = hashlib.sha1(email.strip().lower().encode()).hexdigest()
+    return f"login:ip:{client_ip}", f"login:account:{account}"
+
+
+async def acquire_login_attempts(ip_key: str, account_key: str) -> list[tuple[str, Optional[str]]]:
+    """used to record a login attempt on the ip and account keys, raises a 429 when one of them is over its limit"""
+    attempts = []
+    for key, limit in ((ip_key, LOGIN_MAX_FAILURES_PER_IP), (account_key, LOGIN_MAX_FAILURES_PER_ACCOUNT)):
+        attempt, retry_after = await throttle.acquire_async(key, limit, LOGIN_THROTTLE_WINDOW_SECONDS)
+        if retry_after:
+            # a throttled attempt is not counted on the other key
+            await release_login_attempts(attempts)
+            raise TooManyAttemptsError(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts. Try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+        attempts.append((key, attempt))
+    return attempts
+
+
+async def release_login_attempts(attempts: list[tuple[str, Optional[str]]]) -> None:
+    """used to forget login attempts that are not failures"""
+    for key, attempt in attempts:
+        await throttle.release_async(key, attempt)
+
+
 async def login_for_access_token(
     request: Request,
     user_login: UserAuth,
@@ -126,42 +167,45 @@ async def login_for_access_token(
 )->JSONResponse:
     """used to login user"""
     client_ip = request.client.host
-    failed_login = failed_login_service.get_failed_login(db, client_ip)
-
-    if failed_login:
-        # Reset après 60s
-        if datetime.now() - failed_login.last_attempt > timedelta(minutes=1):
-            failed_login.attempts = 0
+    ip_key, account_key = login_throttle_keys(client_ip, user_login.email)
+    # the attempt counts as a failure from the start, the concurrent ones see it while bcrypt runs
+    attempts = await acquire_login_attempts(ip_key, account_key)
 
-        if failed_login.attempts >= 5:
-            raise TooManyAttemptsError(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many login attempts. Try again later."
-            )
-
-    user = user_service.get_user_by_email(db, user_login.email)
-    if not user or not verify_password(user_login.password, user.password):
-        if not failed_login:
-            failed_login_service.create_failed_login(db, client_ip)
-        else:
-            failed_login_service.update_failed_login(db, failed_login)
+    try:
+        user = user_service.get_user_by_email(db, user_login.email)
+        is_valid, new_hash = False, None
+        if user:
+            # bcrypt runs on the password pool, the event loop keeps serving the other requests
+            is_valid, new_hash = await verify_and_update_password(user_login.password, user.password)
+    except Exception:
+        # the password was not checked (e.g. pool full), the attempt is not a failure
+        await release_login_attempts(attempts)
+        raise
+    if not is_valid:
+        if LOGIN_AUDIT_FAILURES:
+            failed_login_service.record_failed_login(db, client_ip)
 
         raise InvalidCredentialsError(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
+    await release_login_attempts(attempts)
     if not user.is_verified:
         raise UserNotVerifiedError(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is not verified"
         )
 
-    # Reset tentatives si succès
-    if failed_login:
-        failed_login_service.delete_failed_login(db, failed_login)
+    # the stored hash was made with another cost factor (BCRYPT_ROUNDS changed)
+    if new_hash:
+        user.password = new_hash
+        user_repo.commit_user(db)
+
+    # Reset tentatives si succès (celles de l'IP restent, un compte valide ne doit pas couvrir les autres)
+    await throttle.reset_async(account_key)
 
     # Générer les tokens
-    access_token = create_access_token(data={"sub": user.email}, expires_delta=timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))))
+    access_token = create_access_token(data=create_token_claims(user), expires_delta=timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))))
     refresh_token = create_refresh_token(data={"sub": user.email}, expires_delta=timedelta(days=7))  # Le refresh token dure 7 jours
 
     # Réponse avec les tokens et cookie
@@ -191,51 +235,130 @@ async def login_for_access_token(
 
     return response
 
+
+def decode_token(token: str) -> dict:
+    """used to verify and decode a jwt"""
+    return jwt.decode(token, os.getenv("SECRET_KEY"), algorithms=[os.getenv("ALGORITHM")])
+
+
+def create_token_claims(user: User) -> dict:
+    """used to build the claims of an access token: subject, user id, role and token version"""
+    return {
+        "sub": user.email,
+        "uid": user.id,
+        "role": user.role.role if user.role else None,
+        "ver": int(user.token_version or 0)
+    }
+
+
+def get_principal(db: Session, payload: dict) -> Principal:
+    """used to get the principal of a decoded token, from the cache or with a single query"""
+    email = payload.get("sub")
+    if not email:
+        raise InvalidTokenError(status_code=401, detail="Invalid Token")
+
+    version = payload.get("ver")
+    key = cache_service.principal_key(email, version)
+    principal = cache.get_model(key, Principal)
+    if principal is None:
+        principal = user_service.get_principal(db, email)
+        if not principal:
+            raise UserNotFoundError(status_code=404, detail="User not found")
+        cache.set_model(key, principal, cache_service.PRINCIPAL_TTL, [cache_service.principal_tag(principal.id)])
+    return check_principal(principal, version)
+
+
+async def get_principal_async(db: AsyncSession, payload: dict) -> Principal:
+    """used to get the principal of a decoded token from the asyncio routes, the cache is awaited on the event loop"""
+    email = payload.get("sub")
+    if not email:
+        raise InvalidTokenError(status_code=401, detail="Invalid Token")
+
+    version = payload.get("ver")
+    key = cache_service.principal_key(email, version)
+    principal = await cache.get_model_async(key, Principal)
+    if principal is None:
+        principal = await db.run_sync(user_service.get_principal, email)
+        if not principal:
+            raise UserNotFoundError(status_code=404, detail="User not found")
+        await cache.set_model_async(
+            key,
+            principal,
+            cache_service.PRINCIPAL_TTL,
+            [cache_service.principal_tag(principal.id)]
+        )
+    return check_principal(principal, version)
+
+
+def check_principal(principal: Principal, version: Optional[int]) -> Principal:
+    """used to reject the principal of a banned user or of a token issued before a role change"""
+    # the token was issued before a role change
+    if version is not None and version != principal.token_version:
+        raise InvalidTokenError(status_code=401, detail="Invalid or expired token")
+    if principal.is_banned:
+        raise UserBannedError(status_code=401, detail="Cet utilisateur a été banni.")
+    return principal
+
+
+def authorize(db: Session, payload: dict, roles: tuple[RoleEnum, ...], detail: str) -> Principal:
+    """used to get the principal of a decoded token having one of the given roles"""
+    # the role claim rejects the other roles before the principal is looked up
+    claimed_role = payload.get("role")
+    if claimed_role is not None and claimed_role not in roles:
+        raise BadRoleError(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+    principal = get_principal(db, payload)
+    if principal.role not in roles:
+        raise BadRoleError(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+    return principal
+
+
 def get_connected_user(
     db: Session = Depends(get_db),
     authorization: str = Header(None),
     access_token: str = Cookie(None)
-) -> User:
-    print(f"POPOOOOOO ", authorization, access_token)
-    if not authorization and not access_token:
-        print("MISSING")
-        raise InvalidTokenError(status_code=401, detail="Authorization header or cookie is required")
-
+) -> Principal:
+    """used to get the principal of the connected user, whatever their role"""
+    token = get_request_token(authorization, access_token)
     try:
-        if authorization:
-            parts = authorization.split()
-            if len(parts) != 2 or parts[0].lower() != "bearer":
-                print("INVALID FORMAT")
-                raise InvalidTokenError(status_code=401, detail="Invalid Authorization header format")
+        return get_principal(db, decode_token(token))
 
-            token = parts[1]
-        elif access_token:
-            token = access_token
-        else:
-            print("NO TOKEN")
-            raise InvalidTokenError(status_code=401, detail="No token provided")
-        payload = jwt.decode(token, os.getenv("SECRET_KEY"), algorithms=[os.getenv("ALGORITHM")])
-        email = payload.get("sub")
-        if not email:
-            print("NO EMAIL")
-            raise InvalidTokenError(status_code=401, detail="Invalid Token")
+    except jwt.PyJWTError:
+        raise InvalidTokenError(status_code=401, detail="Invalid or expired token")
 
-        user = user_service.get_user_by_email(db, email)
-        if not user:
-            raise UserNotFoundError(status_code=404, detail="User not found")
 
-        return user
+async def get_connected_user_async(
+    db: AsyncSession,
+    authorization: Optional[str] = None,
+    access_token: Optional[str] = None
+) -> Principal:
+    """used to get the principal of the connected user from the asyncio routes, whatever their role"""
+    token = get_request_token(authorization, access_token)
+    try:
+        payload = decode_token(token)
+    except jwt.PyJWTError as error:
+        raise InvalidTokenError(status_code=401, detail="Invalid or expired token") from error
+    return await get_principal_async(db, payload)
 
-    except jwt.PyJWTError:
-        print("EXPIRED")
-        raise InvalidTokenError(status_code=401, detail="Invalid or expired token")
+
+def get_request_token(authorization: Optional[str], access_token: Optional[str]) -> str:
+    """used to get the access token of a request, from the Authorization header or else from the cookie"""
+    if not authorization and not access_token:
+        raise InvalidTokenError(status_code=401, detail="Authorization header or cookie is required")
+
+    if authorization:
+        parts = authorization.split()
+        if len(parts) != 2 or parts[0].lower() != "bearer":
+            raise InvalidTokenError(status_code=401, detail="Invalid Authorization header format")
+        return parts[1]
+    return access_token
 
 
 def get_current_user(
     db: Session,
     authorization: str = Header(None),
     access_token: str = Cookie(None)
-) -> User:
+) -> Principal:
     """Get current user, checking token from Authorization header or cookie"""
 
     if not authorization and not access_token:
@@ -257,21 +380,12 @@ def get_current_user(
             token_to_use = access_token
 
     try:
-        payload = jwt.decode(token_to_use, os.getenv("SECRET_KEY"), algorithms=[os.getenv("ALGORITHM")])
-        email = payload.get("sub")
-        if not email:
-            raise InvalidTokenError(status_code=401, detail="Invalid Token")
-
-        user = user_service.get_user_by_email(db, email)
-        if not user:
-            raise UserNotFoundError(status_code=404, detail="User not found")
-
-        if RoleEnum.ROLE_USER != role_service.get_role_by_id(db, user.role_id).role:
-            raise BadRoleError(
-                status_code=403,
-                detail="You do not have the rights to access this resource"
-            )
-        return user
+        return authorize(
+            db,
+            decode_token(token_to_use),
+            (RoleEnum.ROLE_USER,),
+            "You do not have the rights to access this resource"
+        )
     except jwt.PyJWTError:
         raise InvalidTokenError(
             status_code=401,
@@ -283,7 +397,7 @@ def get_current_admin(
     db: Session = Depends(get_db),
     authorization: str = Header(None),
     access_token: str = Cookie(None)
-)->User:
+)->Principal:
     """used to get the currently connected admin"""
     if not authorization and not access_token:
         raise InvalidTokenError(status_code=401, detail="Both Authorization header and cookie are required")
@@ -292,28 +406,12 @@ def get_current_admin(
     if len(parts) != 2 or parts[0].lower() != "bearer":
         raise InvalidTokenError(status_code=401, detail="Invalid Authorization header format")
     try:
-        
-        parts = authorization.split()
-        if len(parts) != 2 or parts[0].lower() != "bearer":
-            raise InvalidTokenError(status_code=401, detail="Invalid Authorization header format")
-
-        token_from_header = parts[1]
-
-        payload = jwt.decode(token_from_header, os.getenv("SECRET_KEY"), algorithms=[os.getenv("ALGORITHM")])
-        email = payload.get("sub")
-        if not email:
-            raise InvalidTokenError(status_code=401, detail="Invalid Token")
-
-        user = user_service.get_user_by_email(db, email)
-        if not user:
-            raise UserNotFoundError(status_code=404, detail="User not found")
-
-        if RoleEnum.ROLE_ADMIN != role_service.get_role_by_id(db, user.role_id).role:
-            raise BadRoleError(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have the rights to access this ressource"
-            )
-        return user
+        return authorize(
+            db,
+            decode_token(parts[1]),
+            (RoleEnum.ROLE_ADMIN,),
+            "You do not have the rights to access this ressource"
+        )
     except jwt.PyJWTError:
         raise InvalidTokenError(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -325,7 +423,7 @@ def get_current_super_admin(
     db: Session = Depends(get_db),
     authorization: str = Header(None),
     access_token: str = Cookie(None)
-)->User:
+)->Principal:
     """used to get the currently connected super admin (role super admin)"""
     if not authorization and not access_token:
         raise InvalidTokenError(status_code=401, detail="Both Authorization header and cookie are required")
@@ -336,23 +434,12 @@ def get_current_super_admin(
         if len(parts) != 2 or parts[0].lower() != "bearer":
             raise InvalidTokenError(status_code=401, detail="Invalid Authorization header format")
 
-        token_from_header = parts[1]
-
-        payload = jwt.decode(token_from_header, os.getenv("SECRET_KEY"), algorithms=[os.getenv("ALGORITHM")])
-        email = payload.get("sub")
-        if not email:
-            raise InvalidTokenError(status_code=401, detail="Invalid Token")
-
-        user = user_service.get_user_by_email(db, email)
-        if not user:
-            raise UserNotFoundError(status_code=404, detail="User not found")
-
-        if RoleEnum.ROLE_SUPER_ADMIN != role_service.get_role_by_id(db, user.role_id).role:
-            raise BadRoleError(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have the rights to access this ressource"
-            )
-        return user
+        return authorize(
+            db,
+            decode_token(parts[1]),
+            (RoleEnum.ROLE_SUPER_ADMIN,),
+            "You do not have the rights to access this ressource"
+        )
     except jwt.PyJWTError:
         raise InvalidTokenError(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -363,34 +450,22 @@ def get_super_admin_or_admin(
     db: Session = Depends(get_db),
     authorization: str = Header(None),
     access_token: str = Cookie(None)
-)->User:
+)->Principal:
     """used to get the currently connected admin or super admin"""
     if not authorization and not access_token:
         raise InvalidTokenError(status_code=401, detail="Both Authorization header and cookie are required")
 
-    print(f"TOKEN {authorization}, {access_token}")
-
     try:
         parts = authorization.split()
         if len(parts) != 2 or parts[0].lower() != "bearer":
             raise InvalidTokenError(status_code=401, detail="Invalid Authorization header format")
 
-        token_from_header = parts[1]
-        payload = jwt.decode(token_from_header, os.getenv("SECRET_KEY"), algorithms=[os.getenv("ALGORITHM")])
-        email = payload.get("sub")
-        if not email:
-            raise InvalidTokenError(status_code=401, detail="Invalid Token")
-
-        user = user_service.get_user_by_email(db, email)
-        if not user:
-            raise UserNotFoundError(status_code=404, detail="User not found")
-
-        if role_service.get_role_by_id(db, user.role_id).role not in (RoleEnum.ROLE_SUPER_ADMIN, RoleEnum.ROLE_ADMIN):
-            raise BadRoleError(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have the rights to access this ressource"
-            )
-        return user
+        return authorize(
+            db,
+            decode_token(parts[1]),
+            (RoleEnum.ROLE_SUPER_ADMIN, RoleEnum.ROLE_ADMIN),
+            "You do not have the rights to access this ressource"
+        )
     except jwt.PyJWTError:
         raise InvalidTokenError(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -424,7 +499,7 @@ async def refresh_token(db: Session, refresh_token: str = Cookie(None))->JSONRes
 
         # 🔹 Générer un nouveau access token
         access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")))
+            data=create_token_claims(user), expires_delta=timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")))
         )
 
         response = JSONResponse(content={"access_token": access_token})
@@ -462,18 +537,16 @@ def send_mail_for_email_verif(db: Session, user: User) -> None:
     user.verification_token_sent_at = datetime.now()
     user_repo.commit_user(db)
 
-    env = Environment(loader=FileSystemLoader("templates"))
-    template = env.get_template("email_verification.html")
-
     verification_url = f"{HOST}/authent/verify-token?user_email={user.email}&token={user.verification_token}"
-    html_content = template.render(
+    html_content = templates.render(
+        "email_verification.html",
         first_name=profile.first_name,
         token=user.verification_token,
         url=verification_url
     )
 
     subject = "Vérifiez votre compte !"
-    email_service.send_email(html_content, user.email, subject)
+    email_service.send_email(db, html_content, user.email, subject)
 
 
 def verify_register_token(db: Session, user: User, token: int) -> bool:
@@ -495,6 +568,7 @@ def verify_register_token(db: Session, user: User, token: int) -> bool:
 
     user.is_verified = True
     user_repo.commit_user(db)
+    cache_service.invalidate_principal(user.id)
     return True
 
 def create_reset_password_token(email: str)->str:
@@ -510,22 +584,20 @@ def send_mail_for_password_reset(db: Session, user: User) -> None:
 
     reset_token = create_reset_password_token(user.email)
 
-    env = Environment(loader=FileSystemLoader("templates"))
-    template = env.get_template("reset_password.html")
-
     verification_url = f"{HOST}/authent/reset?t={reset_token}"
-    html_content = template.render(
+    html_content = templates.render(
+        "reset_password.html",
         first_name=profile.first_name,
         token=user.verification_token,
         url=verification_url
     )
 
     subject = "Réinitialisez votre mot de passe"
-    email_service.send_email(html_content, user.email, subject)
+    email_service.send_email(db, html_content, user.email, subject)
 
 
-def reset_pwd(db: Session, token: str, new_password: str, confirm_password: str)-> bool:
-    """used to modify the user's password"""
+async def reset_pwd(db: Session, token: str, new_password: str, confirm_password: str)-> bool:
+    """used to modify the user's password, the new one is hashed on the password pool off the event loop"""
     try:
         payload = jwt.decode(
             token,
@@ -554,7 +626,7 @@ def reset_pwd(db: Session, token: str, new_password: str, confirm_password: str)
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    hashed_password = user_service.hash_password(new_password)
+    hashed_password = await hash_password_async(new_password)
     user.password = hashed_password
     user_repo.commit_user(db)
     return True
@@ -1,21 +1,147 @@
+import logging
 import os
-import re
+import threading
+from typing import Optional
 from dotenv import load_dotenv
+from fastapi import status
+from sqlalchemy.orm import Session
+
+from core.background import BackgroundLoop
+from core.text_matcher import Match, Rule, TextMatcher
+from database.db import SessionLocal
+from models.banned_term_model import BannedTerm
+from repositories import banned_term_repo
+from enums.moderation_rule_kind import ModerationRuleKindEnum
+from enums.moderation_severity import ModerationSeverityEnum
+from errors import BannedTermAlreadyExistsError
 
 load_dotenv()
 
-BANNED_WORDS = set()
+logger = logging.getLogger(__name__)
+
+# the content is refused when it contains a term of this severity or above, the lower ones are only reported
+MODERATION_BLOCK_SEVERITY = ModerationSeverityEnum(os.getenv("MODERATION_BLOCK_SEVERITY", "medium"))
+# interval at which the banned words file and the banned_terms table are checked for changes
+MODERATION_RELOAD_INTERVAL_SECONDS = int(os.getenv("MODERATION_RELOAD_INTERVAL_SECONDS", "30"))
+
+# built by the first check (or the reloader, or the warm-up) rather than when the module is imported
+_matcher: Optional[TextMatcher] = None
+_file_version: Optional[float] = None
+_db_version: Optional[tuple] = None
+_db_rules: list[Rule] = []
+_lock = threading.Lock()
+
 
-def load_banned_words():
-    """used to load the bad words from the txt file."""
-    global BANNED_WORDS
+def parse_rule(line: str) -> Optional[Rule]:
+    """
+    used to read a line of the banned words file: "term" or "term;kind;severity",
+    a plain term is a whole word (or phrase) rule of high severity
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    term, _, options = line.partition(";")
+    kind, _, severity = options.partition(";")
+    return Rule(
+        term.strip(),
+        ModerationRuleKindEnum(kind.strip() or ModerationRuleKindEnum.WORD.value),
+        ModerationSeverityEnum(severity.strip() or ModerationSeverityEnum.HIGH.value)
+    )
+
+
+def _read_file_rules() -> list[Rule]:
     with open(os.getenv("BANNED_TERMS_PATH"), "r", encoding="utf-8") as f:
-        BANNED_WORDS = set(word.strip().lower() for word in f)
+        return [rule for rule in (parse_rule(line) for line in f) if rule is not None]
+
+
+def _compile(file_rules: list[Rule], db_rules: list[Rule]) -> None:
+    global _matcher  # pylint: disable=global-statement
+    # the new automaton replaces the old one at once, the checks in progress finish with the old one
+    _matcher = TextMatcher(file_rules + db_rules)
+
+
+def load_banned_words(db: Optional[Session] = None) -> int:
+    """used to (re)load the banned terms from the txt file, and from the database when a session is given"""
+    global _file_version, _db_version, _db_rules  # pylint: disable=global-statement
+    with _lock:
+        path = os.getenv("BANNED_TERMS_PATH")
+        _file_version = os.path.getmtime(path)
+        file_rules = _read_file_rules()
+        if db is not None:
+            _db_version = banned_term_repo.get_banned_terms_version(db)
+            _db_rules = [
+                Rule(term, ModerationRuleKindEnum(kind), ModerationSeverityEnum(severity))
+                for term, kind, severity in banned_term_repo.get_banned_terms(db)
+            ]
+        _compile(file_rules, _db_rules)
+        return len(_matcher)
+
+
+def reload_banned_words_if_changed(db: Session) -> bool:
+    """used to reload the banned terms when the txt file or the banned_terms table changed"""
+    file_changed = os.path.getmtime(os.getenv("BANNED_TERMS_PATH")) != _file_version
+    if not file_changed and banned_term_repo.get_banned_terms_version(db) == _db_version:
+        return False
+    load_banned_words(db)
+    return True
+
+
+def get_matcher() -> TextMatcher:
+    """used to get the matcher of the banned terms, the terms of the file are loaded by the first call"""
+    if _matcher is None:
+        load_banned_words()
+    return _matcher
+
+
+def find_banned_words(content: str) -> list[Match]:
+    """used to find the banned terms of a content, with their span and severity"""
+    return get_matcher().find(content)
+
+
+def is_blocking(match: Match) -> bool:
+    """used to know if a banned term found in a content is severe enough to refuse it"""
+    return ModerationSeverityEnum(match.rule.severity).rank >= MODERATION_BLOCK_SEVERITY.rank
+
 
 def is_content_clean(content: str) -> bool:
     """used to check if the given content is free of bad words."""
-    content_lower = content.lower()
-    words = re.findall(r'\b\w+\b', content_lower)
-    return not any(word in BANNED_WORDS for word in words)
+    return not any(is_blocking(match) for match in get_matcher().iter_matches(content))
+
+
+def create_banned_term(db: Session, term: str, kind: ModerationRuleKindEnum, severity: ModerationSeverityEnum) -> BannedTerm:
+    """used to add a banned term in the database, the matcher of this worker is rebuilt at once"""
+    term = term.strip().lower()
+    if banned_term_repo.get_banned_term_by_term(db, term):
+        raise BannedTermAlreadyExistsError(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"The banned term '{term}' already exists"
+        )
+    banned_term = BannedTerm(term=term, kind=kind.value, severity=severity.value)
+    banned_term_repo.add_banned_term(db, banned_term)
+    banned_term_repo.commit_banned_term(db)
+    banned_term_repo.refresh_banned_term(db, banned_term)
+    load_banned_words(db)
+    return banned_term
+
+
+def _reload_banned_words() -> None:
+    with SessionLocal() as db:
+        reload_banned_words_if_changed(db)
+
+
+_reloader = BackgroundLoop("banned-words-reloader", _reload_banned_words, MODERATION_RELOAD_INTERVAL_SECONDS)
+
+
+def start_banned_words_reloader() -> None:
+    """used to load the banned terms of the database and to watch the terms for changes"""
+    try:
+        _reload_banned_words()
+    except Exception:  # pylint: disable=broad-exception-caught
+        # the file terms are already loaded, the database terms are retried by the reloader
+        logger.exception("banned terms loading failed")
+    _reloader.start()
+
 
-load_banned_words()
+def stop_banned_words_reloader() -> None:
+    """used to stop the banned terms reloader"""
+    _reloader.stop()
@@ -4,13 +4,14 @@ from sqlalchemy.orm import Session
 from fastapi import status
 
 from models.banned_user_model import BannedUser
-from repositories import banned_user_repo
+from repositories import banned_user_repo, user_repo
+from services import cache_service
 from errors import BannedUserNotFoundError
 
 
 
 def create_banned_user(db: Session, banned_email: str, banned_by_email: str) -> BannedUser:
-    """used to create a banned user"""
+    """used to create a banned user, the access tokens and the cached principal of the user are revoked"""
     banned_user = get_banned_user_by_email(db, banned_email)
     if banned_user is not None:
         return banned_user
@@ -22,8 +23,13 @@ def create_banned_user(db: Session, banned_email: str, banned_by_email: str) ->
     )
 
     banned_user_repo.add_new_banned_user(db, new_banned_user)
+    user = user_repo.get_user_by_email(db, banned_email)
+    if user:
+        user_repo.increment_token_version(db, user.id)
     banned_user_repo.commit_banned_user(db)
     banned_user_repo.refresh_banned_user(db, new_banned_user)
+    if user:
+        cache_service.invalidate_principal(user.id)
     return new_banned_user
 
 def get_banned_user_by_email(db: Session, email: str) -> Optional[BannedUser]:
@@ -31,7 +37,7 @@ def get_banned_user_by_email(db: Session, email: str) -> Optional[BannedUser]:
     return banned_user_repo.get_banned_user_by_email(db, email)
 
 def delete_banned_user_by_email(db: Session, email: str) -> bool:
-    """used to delete banned user by email"""
+    """used to delete banned user by email, the cached principal of the user is dropped"""
     banned_user = get_banned_user_by_email(db, email)
     if not banned_user:
         raise BannedUserNotFoundError(
@@ -41,6 +47,9 @@ def delete_banned_user_by_email(db: Session, email: str) -> bool:
 
     banned_user_repo.delete_banned_user(db, banned_user)
     banned_user_repo.commit_banned_user(db)
+    user = user_repo.get_user_by_email(db, email)
+    if user:
+        cache_service.invalidate_principal(user.id)
     return True
 
 def get_banned_emails(db: Session, offset: int, limit: int) -> list[BannedUser]:
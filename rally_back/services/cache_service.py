@@ -0,0 +1,83 @@
+import os
+from typing import Optional
+
+from core import cache
+
+EVENT_TTL = int(os.getenv("CACHE_EVENT_TTL", "60"))
+EVENT_LIST_TTL = int(os.getenv("CACHE_EVENT_LIST_TTL", "15"))
+REFERENCE_TTL = int(os.getenv("CACHE_REFERENCE_TTL", "3600"))
+# with the memory backend, a role change or a deletion reaches the other API processes after this delay at most
+PRINCIPAL_TTL = int(os.getenv("CACHE_PRINCIPAL_TTL", "30"))
+
+EVENT_LIST_TAG = "events:list"
+TYPES_TAG = "types"
+REASONS_TAG = "reasons"
+
+
+
+def event_key(event_id: int) -> str:
+    """used to build the cache key of an event"""
+    return f"events:detail:{event_id}"
+
+
+def event_tag(event_id: int) -> str:
+    """used to build the tag of the cached entries showing an event"""
+    return f"event:{event_id}"
+
+
+def profile_tag(profile_id: int) -> str:
+    """used to build the tag of the cached entries showing a profile (event organizer)"""
+    return f"profile:{profile_id}"
+
+
+def principal_key(email: str, token_version: Optional[int]) -> str:
+    """used to build the cache key of the principal of a token (subject and version)"""
+    return f"principals:{email}:{token_version}"
+
+
+def principal_tag(user_id: int) -> str:
+    """used to build the tag of the cached principals of a user"""
+    return f"principal:{user_id}"
+
+
+def invalidate_event(event_id: int) -> None:
+    """used to drop the cached event and the cached event lists after the event changed"""
+    cache.delete(event_key(event_id))
+    cache.invalidate_tags(event_tag(event_id), EVENT_LIST_TAG)
+
+
+def invalidate_events(event_ids: list[int]) -> None:
+    """used to drop many cached events and the cached event lists"""
+    cache.delete(*(event_key(event_id) for event_id in event_ids))
+    cache.invalidate_tags(*(event_tag(event_id) for event_id in event_ids), EVENT_LIST_TAG)
+
+
+def invalidate_counters(event_ids: list[int], profile_ids: list[int]) -> None:
+    """
+    used to drop the cached events and profiles after only their likes changed, the cached event lists
+    are kept until their short TTL, a like must not clear every cached page under load
+    """
+    cache.delete(*(event_key(event_id) for event_id in event_ids))
+    tags = [event_tag(event_id) for event_id in event_ids] + [profile_tag(profile_id) for profile_id in profile_ids]
+    if tags:
+        cache.invalidate_tags(*tags)
+
+
+def invalidate_profile(profile_id: int) -> None:
+    """used to drop the cached entries showing a profile after it changed"""
+    cache.invalidate_tags(profile_tag(profile_id), EVENT_LIST_TAG)
+
+
+def invalidate_principal(user_id: int) -> None:
+    """used to drop the cached principals of a user after their role, verification, bans or account changed"""
+    cache.invalidate_tags(principal_tag(user_id))
+
+
+def invalidate_types() -> None:
+    """used to drop the cached types"""
+    cache.invalidate_tags(TYPES_TAG)
+
+
+def invalidate_reasons() -> None:
+    """used to drop the cached reasons"""
+    cache.invalidate_tags(REASONS_TAG)
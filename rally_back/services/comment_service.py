@@ -1,9 +1,9 @@
 from sqlalchemy.orm import Session
 from fastapi import status
 
-from services import event_service, profile_service, bad_words_service
+from services import cache_service, event_card_service, event_service, profile_service, bad_words_service
 from models.comment_model import Comment
-from repositories import comment_repo, event_repo, profile_repo
+from repositories import comment_repo, counter_repo, event_repo, profile_repo
 from errors import EventNotFound, ProfileNotFound, CommentNotFound, InvalidContent
 
 def comment_event(db: Session, profile_id: int, event_id: int, content: str) -> Comment:
@@ -29,12 +29,14 @@ def comment_event(db: Session, profile_id: int, event_id: int, content: str) ->
         )
 
     comment = Comment(event_id=event.id, profile_id=profile_id, content=content)
-    event.nb_comments += 1
     comment_repo.add_new_comment(db, comment)
+    counter_repo.increment_event_comments(db, event.id, 1)
     comment_repo.commit_comment(db)
     comment_repo.refresh_comment(db, comment)
     event_repo.refresh_event(db, event)
     profile_repo.refresh_profile(db, profile)
+    event_card_service.refresh_event_card(db, event.id)
+    cache_service.invalidate_event(event.id)
 
     return comment
 
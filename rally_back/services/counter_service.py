@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from core import counter_buffer
+from core.background import BackgroundLoop
+from database.db import SessionLocal
+from services import cache_service, event_card_service
+from repositories import counter_repo, seat_repo
+
+# a batch is replayed at the next flush after a lost acknowledgement, its record is kept well beyond
+COUNTER_FLUSH_RETENTION = timedelta(days=1)
+
+
+def reconcile_counters(db: Session) -> dict[str, int]:
+    """used to recompute the likes, comments and seats counters from the source tables, returns the number of fixed rows"""
+    event_like_ids = counter_repo.reconcile_event_likes(db)
+    profile_ids = counter_repo.reconcile_profile_likes(db)
+    event_comment_ids = counter_repo.reconcile_event_comments(db)
+    event_seat_ids = seat_repo.reconcile_seats(db)
+    db.commit()
+    # the bulk updates do not synchronize the identity map
+    db.expire_all()
+
+    _refresh_counters(db, sorted(set(event_like_ids) | set(event_comment_ids)), profile_ids, event_comment_ids)
+
+    return {
+        "event_likes": len(event_like_ids),
+        "profile_likes": len(profile_ids),
+        "event_comments": len(event_comment_ids),
+        "event_seats": len(event_seat_ids)
+    }
+
+
+def _refresh_counters(
+    db: Session,
+    event_ids: list[int],
+    profile_ids: list[int],
+    card_event_ids: Optional[list[int]] = None
+) -> None:
+    # the likes are read with the cards, only the cards of the events whose comments changed are rebuilt
+    event_card_service.refresh_event_cards(db, sorted(card_event_ids or []))
+    cache_service.invalidate_counters(event_ids, profile_ids)
+
+
+def add_like_delta(db: Session, event_id: int, organizer_id: int, delta: int) -> None:
+    """used to count a like (delta 1) or an unlike (delta -1) once the like row is committed"""
+    if counter_buffer.enabled():
+        if counter_buffer.add(counter_buffer.EVENT_LIKES, event_id, delta):
+            if counter_buffer.add(counter_buffer.PROFILE_LIKES, organizer_id, delta):
+                return
+            # the event delta is buffered, only the profile is written directly
+            counter_repo.increment_profile_likes(db, organizer_id, delta)
+            db.commit()
+            return
+
+    counter_repo.increment_event_likes(db, event_id, delta)
+    counter_repo.increment_profile_likes(db, organizer_id, delta)
+    db.commit()
+    cache_service.invalidate_counters([event_id], [organizer_id])
+
+
+def get_pending_event_likes(event_ids: list[int]) -> dict[int, int]:
+    """used to get the buffered likes of events, not yet written to the database"""
+    return counter_buffer.pending(counter_buffer.EVENT_LIKES, event_ids)
+
+
+def get_pending_profile_likes(profile_ids: list[int]) -> dict[int, int]:
+    """used to get the buffered likes received by profiles, not yet written to the database"""
+    return counter_buffer.pending(counter_buffer.PROFILE_LIKES, profile_ids)
+
+
+async def get_pending_event_likes_async(event_ids: list[int]) -> dict[int, int]:
+    """used to get the buffered likes of events from the asyncio routes, without blocking the event loop"""
+    return await counter_buffer.pending_async(counter_buffer.EVENT_LIKES, event_ids)
+
+
+async def get_pending_profile_likes_async(profile_ids: list[int]) -> dict[int, int]:
+    """used to get the buffered likes received by profiles from the asyncio routes"""
+    return await counter_buffer.pending_async(counter_buffer.PROFILE_LIKES, profile_ids)
+
+
+def flush_counters(db: Session) -> dict[str, int]:
+    """used to write the buffered likes to the database in batches, returns the number of updated rows"""
+    deltas = counter_buffer.drain()
+    event_deltas = deltas.get(counter_buffer.EVENT_LIKES, {})
+    profile_deltas = deltas.get(counter_buffer.PROFILE_LIKES, {})
+    if not event_deltas and not profile_deltas:
+        # the drain holds the flush lock even when there is nothing to write
+        counter_buffer.acknowledge()
+        return {"event_likes": 0, "profile_likes": 0}
+
+    try:
+        # a batch whose acknowledgement was lost is already in the counters, it is only acknowledged
+        applied = counter_repo.record_flush(db, counter_buffer.batch_id())
+        if applied:
+            counter_repo.apply_event_likes(db, event_deltas)
+            counter_repo.apply_profile_likes(db, profile_deltas)
+        counter_repo.delete_flushes_before(db, datetime.now() - COUNTER_FLUSH_RETENTION)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        counter_buffer.restore()
+        raise
+    counter_buffer.acknowledge()
+    if not applied:
+        return {"event_likes": 0, "profile_likes": 0}
+    db.expire_all()
+
+    _refresh_counters(db, sorted(event_deltas), sorted(profile_deltas))
+
+    return {"event_likes": len(event_deltas), "profile_likes": len(profile_deltas)}
+
+
+def _flush_buffered_counters() -> None:
+    with SessionLocal() as db:
+        flush_counters(db)
+
+
+_flusher = BackgroundLoop(
+    "counter-flusher",
+    _flush_buffered_counters,
+    counter_buffer.COUNTER_FLUSH_INTERVAL_MS / 1000
+)
+
+
+def start_counter_flusher() -> None:
+    """used to start the background thread flushing the buffered likes, when a buffer is configured"""
+    if counter_buffer.enabled():
+        _flusher.start()
+
+
+def stop_counter_flusher() -> None:
+    """used to stop the flush thread and write the remaining buffered likes"""
+    if not _flusher.running:
+        return
+    _flusher.stop()
+    _flush_buffered_counters()
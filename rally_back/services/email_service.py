@@ -1,24 +1,178 @@
+import logging
 import os
-from smtplib import SMTP
+import time
+from datetime import datetime, timedelta
+from smtplib import SMTP, SMTPException, SMTPRecipientsRefused, SMTPResponseException, SMTPServerDisconnected
 from email.mime.text import MIMEText
 from email.utils import formataddr
 from email.mime.multipart import MIMEMultipart
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
 
+from core.background import BackgroundLoop
+from database.db import SessionLocal
+from models.email_job_model import EmailJob
+from repositories import email_job_repo
+from enums.email_job_status import EmailJobStatusEnum
 
+load_dotenv()
 
-def send_email(message: str, send_to_email: str, subject: str):
-    """used to send an email"""
+logger = logging.getLogger(__name__)
+
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+EMAIL_RETRY_BASE_SECONDS = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+EMAIL_RETRY_MAX_SECONDS = int(os.getenv("EMAIL_RETRY_MAX_SECONDS", "3600"))
+EMAIL_POLL_INTERVAL_MS = int(os.getenv("EMAIL_POLL_INTERVAL_MS", "1000"))
+# a job still in sending after this delay belongs to a dead worker and is claimed again
+EMAIL_LOCK_TIMEOUT_SECONDS = int(os.getenv("EMAIL_LOCK_TIMEOUT_SECONDS", "300"))
+# the API process runs a worker thread unless the emails are sent by dedicated worker processes
+EMAIL_WORKER_IN_APP = os.getenv("EMAIL_WORKER_IN_APP", "true").lower() == "true"
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_TIMEOUT = int(os.getenv("SMTP_TIMEOUT", "10"))
+# an idle session is closed by most servers after a minute, it is reopened instead of reused
+SMTP_MAX_IDLE_SECONDS = int(os.getenv("SMTP_MAX_IDLE_SECONDS", "30"))
+
+
+class SmtpSession:
+    """SMTP connection kept open (STARTTLS and login done once) and reused for every email of a worker."""
+
+    def __init__(self):
+        self._smtp: Optional[SMTP] = None
+        self._last_used = 0.0
+
+    def _connect(self) -> SMTP:
+        smtp = SMTP(os.getenv("SMTP_SENDER"), int(os.getenv("SMTP_PORT", "587")), timeout=SMTP_TIMEOUT)
+        if SMTP_STARTTLS:
+            smtp.starttls()
+        if os.getenv("EMAIL_PASSWORD"):
+            smtp.login(os.getenv("EMAIL_SENDER"), os.getenv("EMAIL_PASSWORD"))
+        return smtp
+
+    def send(self, msg: MIMEMultipart) -> None:
+        """used to send an email on the open session, reconnecting when it is idle or dropped"""
+        if self._smtp is not None and time.monotonic() - self._last_used > SMTP_MAX_IDLE_SECONDS:
+            self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(msg)
+        except SMTPServerDisconnected:
+            # the server dropped the session, the email is sent again on a fresh one
+            self._smtp = self._connect()
+            self._smtp.send_message(msg)
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        """used to close the SMTP session, it is reopened by the next send"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+
+_session = SmtpSession()
+
+
+
+def build_message(message: str, send_to_email: str, subject: str) -> MIMEMultipart:
+    """used to build an html email"""
     msg = MIMEMultipart("alternative")
     msg['Subject'] = subject
     msg['From'] = formataddr(("Rally", os.getenv("EMAIL_SENDER")))
     msg['To'] = send_to_email
     msg.attach(MIMEText(message, "html"))
+    return msg
+
+
+def send_email(db: Session, message: str, send_to_email: str, subject: str, commit: bool = True) -> EmailJob:
+    """used to queue an email, it is sent by an email worker, without commit the caller commits"""
+    email_job = EmailJob(
+        recipient=send_to_email,
+        subject=subject,
+        body=message,
+        status=EmailJobStatusEnum.PENDING.value,
+        attempts=0,
+        next_attempt_at=datetime.now(),
+        created_at=datetime.now()
+    )
+    email_job_repo.add_email_job(db, email_job)
+    if commit:
+        email_job_repo.commit_email_job(db)
+    return email_job
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """used to compute the exponential backoff before the next attempt of a job"""
+    return timedelta(seconds=min(EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), EMAIL_RETRY_MAX_SECONDS))
+
+
+def process_email_jobs(db: Session, session: Optional[SmtpSession] = None) -> dict[str, int]:
+    """used to send a batch of due emails over one SMTP session, returns the number of sent and failed emails"""
+    session = session or _session
+    now = datetime.now()
+    email_jobs = email_job_repo.claim_email_jobs(
+        db,
+        EMAIL_BATCH_SIZE,
+        now,
+        now - timedelta(seconds=EMAIL_LOCK_TIMEOUT_SECONDS)
+    )
+    # built before the commit expires the claimed jobs, so that they are not reloaded one by one
+    batch = [
+        (email_job, email_job.id, email_job.attempts, build_message(email_job.body, email_job.recipient, email_job.subject))
+        for email_job in email_jobs
+    ]
+    email_job_repo.commit_email_job(db)
+
+    summary = {"sent": 0, "failed": 0}
+    for email_job, email_job_id, attempts, msg in batch:
+        try:
+            session.send(msg)
+        except (SMTPException, OSError) as error:
+            if not isinstance(error, (SMTPRecipientsRefused, SMTPResponseException)):
+                # connection level failure, the next email opens a new session
+                session.close()
+            email_job.last_error = str(error)
+            email_job.locked_at = None
+            if attempts >= EMAIL_MAX_ATTEMPTS:
+                email_job.status = EmailJobStatusEnum.FAILED.value
+                logger.error("email %s to %s failed for good: %s", email_job_id, msg["To"], error)
+            else:
+                email_job.status = EmailJobStatusEnum.PENDING.value
+                email_job.next_attempt_at = datetime.now() + retry_delay(attempts)
+            summary["failed"] += 1
+        else:
+            email_job.status = EmailJobStatusEnum.SENT.value
+            email_job.sent_at = datetime.now()
+            email_job.locked_at = None
+            summary["sent"] += 1
+    email_job_repo.commit_email_job(db)
+    return summary
+
+
+def _process_due_email_jobs() -> None:
+    with SessionLocal() as db:
+        # a full batch means more jobs are waiting, they are sent without waiting for the next tick
+        while True:
+            summary = process_email_jobs(db)
+            if summary["sent"] + summary["failed"] < EMAIL_BATCH_SIZE:
+                return
+
+
+email_worker = BackgroundLoop("email-worker", _process_due_email_jobs, EMAIL_POLL_INTERVAL_MS / 1000)
+
+
+def start_email_worker() -> None:
+    """used to start the email worker thread of the API process, unless dedicated workers send the emails"""
+    if EMAIL_WORKER_IN_APP:
+        email_worker.start()
+
 
-    smtp = SMTP()
-    smtp.set_debuglevel(0)
-    smtp = SMTP(os.getenv("SMTP_SENDER"), os.getenv("SMTP_PORT"))
-    smtp.connect(os.getenv("SMTP_SENDER"), os.getenv("SMTP_PORT"))
-    smtp.starttls()
-    smtp.login(os.getenv("EMAIL_SENDER"),  os.getenv("EMAIL_PASSWORD"))
-    smtp.sendmail(msg['From'], [msg['To']], msg.as_string())
-    smtp.quit()
+def stop_email_worker() -> None:
+    """used to stop the email worker thread and close its SMTP session"""
+    email_worker.stop()
+    _session.close()
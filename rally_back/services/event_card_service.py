@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from fastapi import status
+
+from models.event_model import Event
+from repositories import event_card_repo, event_repo
+from errors import ProfileNotFound
+
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def build_event_card(event: Event) -> dict:
+    """
+    used to build the card (list representation) of an event, its relationships must be loaded.
+    The likes of the event and the likes received by the organizer change with every like, they are
+    not stored in the card but read with it.
+    """
+    profile = event.profile
+    if not profile:
+        raise ProfileNotFound(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Le profil n'a pas été trouvé"
+        )
+    address = event.address
+
+    return {
+        "id": event.id,
+        "title": event.title,
+        "description": event.description,
+        "nb_places": event.nb_places,
+        "price": event.price,
+        "profile": {
+            "id": profile.id,
+            "first_name": profile.first_name,
+            "last_name": profile.last_name,
+            "photo": profile.photo,
+            "email": profile.user.email,
+            "created_at": _isoformat(profile.created_at)
+        },
+        "nb_comments": event.nb_comments,
+        "date": _isoformat(event.date),
+        "cloture_billets": _isoformat(event.cloture_billets),
+        "address": {
+            "id": address.id,
+            "city": address.city,
+            "zipcode": address.zipcode,
+            "number": address.number,
+            "street": address.street,
+            "country": address.country
+        } if address else None,
+        "created_at": _isoformat(event.created_at),
+        "updated_at": _isoformat(event.updated_at),
+        "types": [{"id": type_.id, "type": type_.type} for type_ in event.types],
+        "pictures": [{"id": picture.id, "photo": picture.photo} for picture in event.pictures]
+    }
+
+
+def refresh_event_cards(db: Session, event_ids: list[int]) -> dict[int, dict]:
+    """used to rebuild the cards of many events, returns the new payloads by event id"""
+    if not event_ids:
+        return {}
+
+    payloads = {}
+    for event in event_repo.get_events_for_cards(db, event_ids):
+        payloads[event.id] = build_event_card(event)
+        event_card_repo.upsert_event_card(db, event.id, payloads[event.id])
+    event_card_repo.commit_event_card(db)
+    return payloads
+
+
+def refresh_event_card(db: Session, event_id: int) -> None:
+    """used to rebuild the card of an event after it, its pictures, types or comments changed"""
+    refresh_event_cards(db, [event_id])
+
+
+def refresh_profile_event_cards(db: Session, profile_id: int) -> None:
+    """used to rebuild the cards of the events of a profile after the organizer changed (name, photo, email)"""
+    refresh_event_cards(db, event_repo.get_event_ids_by_profile(db, profile_id))
+
+
+def remove_event_card(db: Session, event_id: int) -> None:
+    """used to remove the card of an event, the caller commits"""
+    event_card_repo.delete_event_card(db, event_id)
+
+
+def remove_event_cards(db: Session, event_ids: list[int]) -> None:
+    """used to remove the cards of many events, the caller commits"""
+    event_card_repo.delete_event_cards(db, event_ids)
+
+
+def _with_likes(payload: dict, event_likes: int, organizer_likes: Optional[int]) -> dict:
+    return {**payload, "nb_likes": event_likes, "profile": {**payload["profile"], "nb_like": organizer_likes}}
+
+
+def get_event_cards(db: Session, event_ids: list[int]) -> list[dict]:
+    """used to fetch the cards of events in the given order, missing cards are built on the fly"""
+    cards = event_card_repo.get_event_cards(db, event_ids)
+    payloads = {card.event_id: _with_likes(card.payload, card.event_likes, card.organizer_likes) for card in cards}
+
+    missing_ids = [event_id for event_id in event_ids if event_id not in payloads]
+    if missing_ids:
+        refresh_event_cards(db, missing_ids)
+        for card in event_card_repo.get_event_cards(db, missing_ids):
+            payloads[card.event_id] = _with_likes(card.payload, card.event_likes, card.organizer_likes)
+
+    return [payloads[event_id] for event_id in event_ids if event_id in payloads]
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from fastapi import status
 from models.event_picture_model import EventPicture
 from repositories import event_picture_repo
+from services import cache_service, event_card_service
 from errors import PictureNotFoundError
 
 
@@ -15,6 +16,7 @@ def create_event_picture(db: Session, event_id: int, photo: str)->EventPicture:
     event_picture_repo.add_new_event_picture(db, new_picture)
     event_picture_repo.commit_event_picture(db)
     event_picture_repo.refresh_event_picture(db, new_picture)
+    cache_service.invalidate_event(event_id)
     return new_picture
 
 def get_picture_by_id(db: Session, picture_id: int)->EventPicture:
@@ -47,8 +49,12 @@ def delete_picture(db: Session, picture_id: int)->None:
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Picture not found"
         )
+    event_id = picture.event_id
     event_picture_repo.delete_event_picture(db, picture)
     event_picture_repo.commit_event_picture(db)
+    if event_id:
+        event_card_service.refresh_event_card(db, event_id)
+        cache_service.invalidate_event(event_id)
 
 def get_picture_by_name(db: Session, name: str)->EventPicture:
     """used to fetch a picture by its name"""
@@ -63,10 +69,14 @@ def add_picture_to_event(db: Session, names: list[str], event_id: int):
         picture.event_id = event_id
         event_picture_repo.commit_event_picture(db)
         event_picture_repo.refresh_event_picture(db, picture)
+    cache_service.invalidate_event(event_id)
 
 def delete_pictures(db: Session, names: list[str]) -> None:
     """used to delete pictures"""
+    event_ids = set()
     for name in names:
         picture = get_picture_by_name(db, name)
+        event_ids.add(picture.event_id)
         event_picture_repo.delete_event_picture(db, picture)
     event_picture_repo.commit_event_picture(db)
+    cache_service.invalidate_events([event_id for event_id in event_ids if event_id])
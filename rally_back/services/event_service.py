@@ -3,8 +3,9 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from fastapi import status
 
+from core.pagination import encode_cursor, decode_cursor
 from models.event_model import Event
-from services import bad_words_service
+from services import bad_words_service, cache_service
 from repositories import event_repo, type_repo
 from errors import EventNotFound, InvalidContent
 
@@ -48,6 +49,7 @@ def create_event(
     event_repo.commit_event(db)
     add_types_to_event(db, new_event.id, types)
     event_repo.refresh_event(db, new_event)
+    cache_service.invalidate_event(new_event.id)
     return new_event
 
 def get_event_by_id(db: Session, event_id: int)->Event:
@@ -94,6 +96,7 @@ def update_event(
 
     event_repo.commit_event(db)
     event_repo.refresh_event(db, event)
+    cache_service.invalidate_event(event_id)
     return event
 
 def add_types_to_event(db: Session, event_id: int, types: list[int])->Event:
@@ -112,6 +115,7 @@ def add_types_to_event(db: Session, event_id: int, types: list[int])->Event:
         event.types.append(type_)
 
     event_repo.commit_event(db)
+    cache_service.invalidate_event(event_id)
     return event
 
 def remove_types_to_event(db: Session, event_id: int, types: list[int])->Event:
@@ -132,6 +136,7 @@ def remove_types_to_event(db: Session, event_id: int, types: list[int])->Event:
             event.types.remove(type_)
 
     event_repo.commit_event(db)
+    cache_service.invalidate_event(event_id)
     return event
 
 def get_events_by_profile(db: Session, profile_id: int, offset: int, limit: int) -> list[Event]:
@@ -196,4 +201,73 @@ def get_count_total_events(
         country,
         city,
         search
-    )
\ No newline at end of file
+    )
+
+def get_events_keyset(
+    db: Session,
+    date_avant: Optional[datetime] = None,
+    date_apres: Optional[datetime] = None,
+    type_ids: Optional[list[int]] = None,
+    profile_id: Optional[int] = None,
+    country: Optional[str] = None,
+    city: Optional[str] = None,
+    popularity: Optional[bool] = None,
+    recent: Optional[bool] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 5
+) -> tuple[list[Event], Optional[str]]:
+    """used to fetch a page of events after the given cursor, returns the events and the next cursor"""
+    if popularity:
+        ordering = "popularity"
+    elif recent:
+        ordering = "recent"
+    else:
+        ordering = "default"
+
+    after_key, after_id = decode_cursor(cursor, ordering) if cursor else (None, None)
+
+    events = event_repo.get_events_keyset(
+        db,
+        date_avant,
+        date_apres,
+        type_ids,
+        profile_id,
+        country,
+        city,
+        search,
+        ordering,
+        after_key,
+        after_id,
+        limit + 1
+    )
+
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        last = events[-1]
+        sort_key = {"popularity": last.nb_likes, "recent": last.created_at}.get(ordering)
+        next_cursor = encode_cursor(ordering, sort_key, last.id)
+    return events, next_cursor
+
+def get_estimated_count_total_events(
+    db: Session,
+    date_avant: Optional[datetime] = None,
+    date_apres: Optional[datetime] = None,
+    type_ids: Optional[list[int]] = None,
+    profile_id: Optional[int] = None,
+    country: Optional[str] = None,
+    city: Optional[str] = None,
+    search: Optional[str] = None
+)->int:
+    """used to fetch an estimation of the count of events according to given filters"""
+    return event_repo.get_events_estimated_count(
+        db,
+        date_avant,
+        date_apres,
+        type_ids,
+        profile_id,
+        country,
+        city,
+        search
+    )
@@ -36,3 +36,12 @@ def reset_failed_login(db: Session, failed_login: FailedLogin)->None:
     """used to reset a failed login instance to attempts zero"""
     failed_login.attempts = 0
     failed_login_repo.commit_failed_login(db)
+
+
+def record_failed_login(db: Session, client_ip: str) -> None:
+    """used to write a failed login in the audit table, the throttling itself is done by core.throttle"""
+    failed_login = get_failed_login(db, client_ip)
+    if failed_login is None:
+        create_failed_login(db, client_ip)
+    else:
+        update_failed_login(db, failed_login)
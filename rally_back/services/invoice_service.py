@@ -0,0 +1,111 @@
+import glob
+import hashlib
+import os
+import tempfile
+from dotenv import load_dotenv
+from fastapi import status
+from sqlalchemy.orm import Session
+
+from core import templates
+from core.principal import Principal
+from models.payment_model import Payment
+from repositories import payment_repo
+from services import email_service
+from enums.payment_status import PaymentStatusEnum
+from enums.role import RoleEnum
+from errors import InvoiceAccessForbiddenError, PaymentNotFound
+
+load_dotenv()
+
+# rendered invoices and receipts, served again without rendering
+INVOICES_DIR = os.getenv("INVOICES_DIR", os.path.join(tempfile.gettempdir(), "rally-invoices"))
+
+FACTURE_TEMPLATE = "facture.html"
+RECU_TEMPLATE = "recu_organizer.html"
+
+
+def payment_context(payment: Payment) -> dict:
+    """used to get the template variables of a payment, plain values that can be sent to the rendering processes"""
+    return {
+        "payment": {
+            "id": payment.id,
+            "event_title": payment.event_title,
+            "buyer_email": payment.buyer_email,
+            "organizer_email": payment.organizer_email,
+            "amount": payment.amount,
+            "fee": payment.fee,
+            "brut_amount": payment.brut_amount,
+            "stripe_payment_intent_id": payment.stripe_payment_intent_id,
+            "status": payment.status,
+            "created_at": payment.created_at
+        }
+    }
+
+
+def get_invoice_path(payment_id: int, template_name: str, context: dict) -> str:
+    """used to get the file of a rendered document, its name changes with the payment (status update, ...)"""
+    fingerprint = hashlib.sha1(repr(sorted(context["payment"].items())).encode()).hexdigest()[:16]
+    return os.path.join(INVOICES_DIR, f"{payment_id}-{template_name.split('.')[0]}-{fingerprint}.html")
+
+
+def store_invoice(path: str, content: str) -> None:
+    """used to save a rendered document and to remove its outdated versions"""
+    os.makedirs(INVOICES_DIR, exist_ok=True)
+    prefix = os.path.basename(path).rsplit("-", 1)[0]
+    for outdated in glob.glob(os.path.join(INVOICES_DIR, f"{prefix}-*.html")):
+        os.remove(outdated)
+    # written aside then renamed, a concurrent download never reads a half written file
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(temporary_path, path)
+
+
+def render_invoice(payment: Payment, template_name: str) -> tuple[str, str]:
+    """used to get a document of a payment (path and content), rendered only when it is not stored yet"""
+    context = payment_context(payment)
+    path = get_invoice_path(payment.id, template_name, context)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return path, f.read()
+    content = templates.render(template_name, **context)
+    store_invoice(path, content)
+    return path, content
+
+
+def get_invoice_for_user(db: Session, payment_id: int, current_user: Principal) -> str:
+    """used to get the document of a payment for its buyer (invoice), its organizer (receipt) or a super admin"""
+    payment = payment_repo.get_payment_by_id(db, payment_id)
+    if not payment:
+        raise PaymentNotFound(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Payment not found"
+        )
+    if current_user.id == payment.buyer_id or current_user.email == payment.buyer_email:
+        template_name = FACTURE_TEMPLATE
+    elif current_user.id == payment.organizer_id or current_user.email == payment.organizer_email:
+        template_name = RECU_TEMPLATE
+    elif current_user.role == RoleEnum.ROLE_SUPER_ADMIN.value:
+        template_name = FACTURE_TEMPLATE
+    else:
+        raise InvoiceAccessForbiddenError(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have the rights to access this invoice"
+        )
+    path, _ = render_invoice(payment, template_name)
+    return path
+
+
+def resend_event_invoices(db: Session, event_id: int) -> int:
+    """used to send again the invoices and receipts of the successful payments of an event"""
+    payments = payment_repo.get_payments_by_event_id(db, event_id, PaymentStatusEnum.SUCCESS.value)
+    contexts = [payment_context(payment) for payment in payments]
+    # the big events are rendered by the process pool
+    factures = templates.render_many(FACTURE_TEMPLATE, contexts)
+    recus = templates.render_many(RECU_TEMPLATE, contexts)
+    for payment, context, facture, recu in zip(payments, contexts, factures, recus):
+        store_invoice(get_invoice_path(payment.id, FACTURE_TEMPLATE, context), facture)
+        store_invoice(get_invoice_path(payment.id, RECU_TEMPLATE, context), recu)
+        email_service.send_email(db, facture, payment.buyer_email, f"Facture de votre paiement pour {payment.event_title}")
+        email_service.send_email(db, recu, payment.organizer_email, f"Reçu de paiement pour {payment.event_title}")
+    return len(payments)
@@ -1,46 +1,44 @@
-from datetime import datetime
 from sqlalchemy.orm import Session
 from fastapi import status
-from services import event_service, profile_service
+from core import counter_buffer
+from services import cache_service, counter_service
 from models.like_model import Like
-from repositories import event_repo, like_repo, profile_repo
+from repositories import counter_repo, event_repo, like_repo
 from errors import EventNotFound, ProfileNotFound, LikeNotFoundError
 
 
 def like_event(db: Session, profile_id: int, event_id: int) -> Like:
-    """used to like an event"""
-    like = get_like(db, profile_id, event_id)
-
-    if like:
-        return like
-
-    event = event_service.get_event_by_id(db, event_id)
-    if not event:
+    """used to like an event, the counters are updated by the database"""
+    if counter_buffer.enabled():
+        return _like_event_buffered(db, profile_id, event_id)
+
+    # the event row is locked first, in the same order as unlike_event, so they cannot deadlock
+    counters = counter_repo.increment_event_likes(db, event_id, 1)
+    if counters is None:
+        like_repo.rollback_like(db)
         raise EventNotFound(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Event not found"
         )
-    profile = profile_service.get_profile(db, event.profile_id) if event else None
-    if not profile:
+    _, organizer_id = counters
+
+    like = like_repo.insert_like(db, profile_id, event_id)
+    if like is None:
+        # already liked: undo the increment
+        like_repo.rollback_like(db)
+        return get_like(db, profile_id, event_id)
+
+    if counter_repo.increment_profile_likes(db, organizer_id, 1) is None:
+        like_repo.rollback_like(db)
         raise ProfileNotFound(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profile not found"
         )
 
-    like = Like(profile_id=profile_id, event_id=event_id)
-    like_repo.add_like(db, like)
-
-    event.nb_likes = (event.nb_likes or 0) + 1
-    event.updated_at = datetime.now()
-
-    profile.nb_like = (profile.nb_like or 0) + 1
-    profile.updated_at = datetime.now()
-
     like_repo.commit_like(db)
 
-    like_repo.refresh_like(db, like)
-    event_repo.refresh_event(db, event)
-    profile_repo.refresh_profile(db, profile)
+    # the likes are read with the cards, they are not rebuilt
+    cache_service.invalidate_counters([event_id], [organizer_id])
 
     return like
 
@@ -52,41 +50,77 @@ def get_like(db: Session, profile_id: int, event_id: int) -> Like:
 
 
 def unlike_event(db: Session, profile_id: int, event_id: int) -> bool:
-    """used to remove a like"""
-    like = get_like(db, profile_id, event_id)
+    """used to remove a like, the counters are updated by the database"""
+    if counter_buffer.enabled():
+        return _unlike_event_buffered(db, profile_id, event_id)
 
-    if not like:
-        raise LikeNotFoundError(
+    counters = counter_repo.increment_event_likes(db, event_id, -1)
+    if counters is None:
+        like_repo.rollback_like(db)
+        raise EventNotFound(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Like not found"
+            detail="Event not found"
         )
+    _, organizer_id = counters
 
-    event = event_service.get_event_by_id(db, event_id)
-    if not event:
-        raise EventNotFound(
+    if not like_repo.delete_like_by_profile_and_event(db, profile_id, event_id):
+        like_repo.rollback_like(db)
+        raise LikeNotFoundError(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found"
+            detail="Like not found"
         )
-    profile = profile_service.get_profile(db, profile_id) if event else None
-    if not profile:
+
+    # the like was counted on the organizer's profile, not on the profile removing it
+    if counter_repo.increment_profile_likes(db, organizer_id, -1) is None:
+        like_repo.rollback_like(db)
         raise ProfileNotFound(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profile not found"
         )
 
-    like_repo.delete_like(db, like)
+    like_repo.commit_like(db)
+
+    cache_service.invalidate_counters([event_id], [organizer_id])
 
-    event.nb_likes = max(0, (event.nb_likes or 0) - 1)
-    event.updated_at = datetime.now()
+    return True
 
-    profile.nb_like = max(0, (profile.nb_like or 0) - 1)
-    profile.updated_at = datetime.now()
 
+def _like_event_buffered(db: Session, profile_id: int, event_id: int) -> Like:
+    # the event and profile rows are not locked, the counters are flushed later in batches
+    organizer_id = event_repo.get_event_organizer_id(db, event_id)
+    if organizer_id is None:
+        raise EventNotFound(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+
+    like = like_repo.insert_like(db, profile_id, event_id)
+    if like is None:
+        like_repo.rollback_like(db)
+        return get_like(db, profile_id, event_id)
     like_repo.commit_like(db)
 
-    event_repo.refresh_event(db, event)
-    profile_repo.refresh_profile(db, profile)
+    counter_service.add_like_delta(db, event_id, organizer_id, 1)
+    return like
+
+
+def _unlike_event_buffered(db: Session, profile_id: int, event_id: int) -> bool:
+    organizer_id = event_repo.get_event_organizer_id(db, event_id)
+    if organizer_id is None:
+        raise EventNotFound(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+
+    if not like_repo.delete_like_by_profile_and_event(db, profile_id, event_id):
+        like_repo.rollback_like(db)
+        raise LikeNotFoundError(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Like not found"
+        )
+    like_repo.commit_like(db)
 
+    counter_service.add_like_delta(db, event_id, organizer_id, -1)
     return True
 
 def get_likes(db: Session, offset: int, limit: int) -> list[Like]:
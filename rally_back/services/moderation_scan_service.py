@@ -0,0 +1,200 @@
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from dotenv import load_dotenv
+from fastapi import status
+from sqlalchemy.orm import Session
+
+from core.background import BackgroundLoop
+from database.db import SessionLocal
+from models.moderation_scan_model import ModerationScan
+from models.reason_model import Reason
+from repositories import moderation_scan_repo, reason_repo
+from services import bad_words_service, reason_service
+from enums.moderation_scan_status import ModerationScanStatusEnum
+from errors import ModerationScanNotFoundError, ModerationScanNotResumableError
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+MODERATION_SCAN_BATCH_SIZE = int(os.getenv("MODERATION_SCAN_BATCH_SIZE", "500"))
+# pause between two batches, the scan leaves room to the production load
+MODERATION_SCAN_PAUSE_MS = int(os.getenv("MODERATION_SCAN_PAUSE_MS", "50"))
+# a worker gives the scan back (checkpoint saved) after this long, so that stopping the API is not delayed
+MODERATION_SCAN_TICK_SECONDS = int(os.getenv("MODERATION_SCAN_TICK_SECONDS", "10"))
+MODERATION_SCAN_POLL_INTERVAL_MS = int(os.getenv("MODERATION_SCAN_POLL_INTERVAL_MS", "2000"))
+# a scan still running after this delay without checkpoint belongs to a dead worker and is claimed again
+MODERATION_SCAN_LOCK_TIMEOUT_SECONDS = int(os.getenv("MODERATION_SCAN_LOCK_TIMEOUT_SECONDS", "120"))
+# reason of the signals created by the scans
+MODERATION_SCAN_REASON = os.getenv("MODERATION_SCAN_REASON", "Contenu interdit (détection automatique)")
+
+COMMENTS_PHASE = "comments"
+EVENTS_PHASE = "events"
+
+
+def create_moderation_scan(db: Session, user_id: int) -> ModerationScan:
+    """used to queue a retroactive moderation scan of the comments and events"""
+    moderation_scan = ModerationScan(
+        user_id=user_id,
+        status=ModerationScanStatusEnum.PENDING.value,
+        phase=COMMENTS_PHASE,
+        created_at=datetime.now()
+    )
+    moderation_scan_repo.add_moderation_scan(db, moderation_scan)
+    moderation_scan_repo.commit_moderation_scan(db)
+    moderation_scan_repo.refresh_moderation_scan(db, moderation_scan)
+    return moderation_scan
+
+
+def get_moderation_scan(db: Session, moderation_scan_id: int) -> ModerationScan:
+    """used to get a moderation scan by its id"""
+    moderation_scan = moderation_scan_repo.get_moderation_scan_by_id(db, moderation_scan_id)
+    if not moderation_scan:
+        raise ModerationScanNotFoundError(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Moderation scan not found"
+        )
+    return moderation_scan
+
+
+def resume_moderation_scan(db: Session, moderation_scan_id: int) -> ModerationScan:
+    """used to queue again a failed moderation scan, it resumes from its checkpoint"""
+    moderation_scan = get_moderation_scan(db, moderation_scan_id)
+    if moderation_scan.status != ModerationScanStatusEnum.FAILED.value:
+        raise ModerationScanNotResumableError(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Moderation scan is {moderation_scan.status}, only a failed scan can be resumed"
+        )
+    moderation_scan_repo.update_moderation_scan(db, moderation_scan_id, {
+        "status": ModerationScanStatusEnum.PENDING.value,
+        "last_error": None
+    })
+    moderation_scan_repo.commit_moderation_scan(db)
+    moderation_scan_repo.refresh_moderation_scan(db, moderation_scan)
+    return moderation_scan
+
+
+def get_scan_reason(db: Session) -> Reason:
+    """used to get the system reason of the signals created by the scans, created on first use"""
+    return (
+        reason_repo.get_reason_by_reason(db, MODERATION_SCAN_REASON)
+        or reason_service.create_reason(db, MODERATION_SCAN_REASON)
+    )
+
+
+def is_flagged(*contents: Optional[str]) -> bool:
+    """used to know if one of the texts of a content would be refused by the moderation"""
+    return any(content and not bad_words_service.is_content_clean(content) for content in contents)
+
+
+def scan_next_batch(db: Session, moderation_scan: ModerationScan, reason_id: int) -> bool:
+    """used to scan the next batch of a scan and to save its checkpoint, returns True once the scan is over"""
+    comments_phase = moderation_scan.phase == COMMENTS_PHASE
+    if comments_phase:
+        rows = moderation_scan_repo.get_comments_after(db, moderation_scan.last_comment_id, MODERATION_SCAN_BATCH_SIZE)
+    else:
+        rows = moderation_scan_repo.get_events_after(db, moderation_scan.last_event_id, MODERATION_SCAN_BATCH_SIZE)
+    # the read transaction ends here, the matching runs outside of any transaction
+    moderation_scan_repo.commit_moderation_scan(db)
+
+    flagged_ids = [row[0] for row in rows if is_flagged(*row[1:])]
+    now = datetime.now()
+    values = {"locked_at": now}
+    if comments_phase:
+        already_signaled = moderation_scan_repo.get_signaled_comment_ids(db, flagged_ids, reason_id)
+        flagged_ids = [comment_id for comment_id in flagged_ids if comment_id not in already_signaled]
+        moderation_scan_repo.insert_signaled_comments(db, [
+            {"comment_id": comment_id, "reason_id": reason_id, "user_id": moderation_scan.user_id,
+             "status": "pending", "created_at": now}
+            for comment_id in flagged_ids
+        ])
+        values.update(
+            comments_scanned=moderation_scan.comments_scanned + len(rows),
+            comments_flagged=moderation_scan.comments_flagged + len(flagged_ids),
+            last_comment_id=rows[-1][0] if rows else moderation_scan.last_comment_id
+        )
+        if len(rows) < MODERATION_SCAN_BATCH_SIZE:
+            values["phase"] = EVENTS_PHASE
+    else:
+        already_signaled = moderation_scan_repo.get_signaled_event_ids(db, flagged_ids, reason_id)
+        flagged_ids = [event_id for event_id in flagged_ids if event_id not in already_signaled]
+        moderation_scan_repo.insert_signaled_events(db, [
+            {"event_id": event_id, "reason_id": reason_id, "user_id": moderation_scan.user_id,
+             "status": "pending", "created_at": now}
+            for event_id in flagged_ids
+        ])
+        values.update(
+            events_scanned=moderation_scan.events_scanned + len(rows),
+            events_flagged=moderation_scan.events_flagged + len(flagged_ids),
+            last_event_id=rows[-1][0] if rows else moderation_scan.last_event_id
+        )
+        if len(rows) < MODERATION_SCAN_BATCH_SIZE:
+            values.update(status=ModerationScanStatusEnum.COMPLETED.value, finished_at=now, locked_at=None)
+
+    # the signals and the checkpoint are committed together: a resumed scan never signals a content twice,
+    # the commit expires the scan, the next batch reads the saved checkpoint
+    moderation_scan_repo.update_moderation_scan(db, moderation_scan.id, values)
+    moderation_scan_repo.commit_moderation_scan(db)
+    return values.get("status") == ModerationScanStatusEnum.COMPLETED.value
+
+
+def process_moderation_scan(db: Session, time_budget: Optional[float] = None) -> Optional[int]:
+    """used to run the oldest waiting scan for `time_budget` seconds at most, returns the id of the scan run"""
+    now = datetime.now()
+    moderation_scan = moderation_scan_repo.claim_moderation_scan(
+        db, now, now - timedelta(seconds=MODERATION_SCAN_LOCK_TIMEOUT_SECONDS)
+    )
+    moderation_scan_repo.commit_moderation_scan(db)
+    if moderation_scan is None:
+        return None
+
+    # the scan is checked with the latest banned terms, whichever worker runs it
+    bad_words_service.reload_banned_words_if_changed(db)
+    deadline = time.monotonic() + (time_budget if time_budget is not None else MODERATION_SCAN_TICK_SECONDS)
+    try:
+        reason_id = get_scan_reason(db).id
+        while not scan_next_batch(db, moderation_scan, reason_id):
+            if time.monotonic() >= deadline:
+                # given back with its checkpoint, the next tick (of any worker) resumes it
+                moderation_scan_repo.update_moderation_scan(db, moderation_scan.id, {
+                    "status": ModerationScanStatusEnum.PENDING.value,
+                    "locked_at": None
+                })
+                moderation_scan_repo.commit_moderation_scan(db)
+                break
+            time.sleep(MODERATION_SCAN_PAUSE_MS / 1000)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        db.rollback()
+        logger.exception("moderation scan %s failed", moderation_scan.id)
+        moderation_scan_repo.update_moderation_scan(db, moderation_scan.id, {
+            "status": ModerationScanStatusEnum.FAILED.value,
+            "last_error": str(getattr(error, "detail", None) or error),
+            "locked_at": None
+        })
+        moderation_scan_repo.commit_moderation_scan(db)
+    return moderation_scan.id
+
+
+def _process_waiting_moderation_scans() -> None:
+    with SessionLocal() as db:
+        process_moderation_scan(db)
+
+
+moderation_scan_worker = BackgroundLoop(
+    "moderation-scan-worker",
+    _process_waiting_moderation_scans,
+    MODERATION_SCAN_POLL_INTERVAL_MS / 1000
+)
+
+
+def start_moderation_scan_worker() -> None:
+    """used to start the moderation scan worker thread"""
+    moderation_scan_worker.start()
+
+
+def stop_moderation_scan_worker() -> None:
+    """used to stop the moderation scan worker thread"""
+    moderation_scan_worker.stop()
@@ -3,14 +3,15 @@ from fastapi import status
 
 from services import (
     banned_user_service,
+    cache_service,
     comment_service,
+    event_card_service,
     event_service,
-    like_service,
     signaled_comment_service,
     signaled_event_service,
     signaled_user_service,
     user_service,
-    registration_service
+    search_service
 )
 from errors import (
     CommentNotFound,
@@ -24,12 +25,13 @@ from errors import (
 from repositories import (
     user_repo,
     comment_repo,
+    counter_repo,
+    deletion_repo,
     event_repo,
+    seat_repo,
     signaled_comment_repo,
     signaled_event_repo,
-    signaled_user_repo,
-    address_repo,
-    like_repo
+    signaled_user_repo
 )
 
 
@@ -54,22 +56,23 @@ def delete_comment(db: Session, comment_id: int, current_user_id: int) -> bool:
     signaled_comments = signaled_comment_service.get_signaled_comment_by_comment_id(db, comment_id)
     for signaled_comment in signaled_comments:
         signaled_comment_repo.delete_signaled_comment(db, signaled_comment)
-    # Récupérer l'événement lié (pour mettre à jour le nombre de commentaires)
-    event = event_service.get_event_by_id(db, comment.event_id)
+    event_id = comment.event_id
 
     # Supprimer le commentaire
     comment_repo.delete_comment(db, comment)
 
-    # S'assurer que l'événement existe avant de modifier nb_comments
-    if event and event.nb_comments is not None and event.nb_comments > 0:
-        event.nb_comments -= 1
+    # Décrémenter nb_comments côté base (jamais en dessous de 0), None si l'événement n'existe plus
+    nb_comments = counter_repo.increment_event_comments(db, event_id, -1)
 
     comment_repo.commit_comment(db)
+    if nb_comments is not None:
+        event_card_service.refresh_event_card(db, event_id)
+        cache_service.invalidate_event(event_id)
     return True
 
 
-def delete_event(db: Session, event_id: int, current_user_id: int) -> None:
-    """used to delete an event"""
+def delete_event(db: Session, event_id: int, current_user_id: int) -> dict[str, int]:
+    """used to delete an event and everything depending on it in one transaction, returns the deleted rows by table"""
     event = event_service.get_event_by_id(db, event_id)
     if not event:
         raise EventNotFound(
@@ -84,28 +87,24 @@ def delete_event(db: Session, event_id: int, current_user_id: int) -> None:
             detail="Accès refusé"
         )
 
-    comments = comment_service.get_all_comments_no_limit_by_event(db, event.id)
-    for comment in comments:
-        delete_comment(db, comment.id, current_user_id)
-
-    likes = like_service.get_likes_from_event(db, event.id)
-    for like in likes:
-        like_service.unlike_event(db, like.profile_id, like.event_id)
-
-    registrations = registration_service.get_all_registrations_from_event(db, event.id)
-    for registration in registrations:
-        registration_service.delete_registration(db, registration.profile_id, registration.event_id)
-
-    signaled_events = signaled_event_service.get_signaled_event_by_event_id(db, event.id)
-    for signaled_event in signaled_events:
-        signaled_event_repo.delete_signaled_event(db, signaled_event)
+    organizer_id = event.profile_id
+    # pending ORM deletes (e.g. the report being handled) must not collide with the set-based deletes
+    db.flush()
+    summary = _delete_events(db, [event_id])
+    # the likes of the event were counted on the organizer's profile
+    counter_repo.reconcile_profile_likes(db, [organizer_id])
+    event_repo.commit_event(db)
+    db.expire_all()
 
-    event_repo.delete_event(db, event)
+    cache_service.invalidate_event(event_id)
+    cache_service.invalidate_profile(organizer_id)
+    return summary
 
-    if event.address:
-        address_repo.delete_address(db, event.address)
 
-    event_repo.commit_event(db)
+def _delete_events(db: Session, event_ids: list[int]) -> dict[str, int]:
+    search_service.remove_events(db, event_ids)
+    event_card_service.remove_event_cards(db, event_ids)
+    return deletion_repo.delete_events(db, event_ids)
 
 
 def delete_signaled_comment(db: Session, signaled_comment_id: int, ban: bool, current_user_id: int) -> None:
@@ -167,11 +166,11 @@ def delete_signaled_user(db: Session, signaled_user_id: int, ban: bool, current_
     signaled_user_repo.commit_signaled_user(db)
 
 
-def delete_user(db: Session, user_id: int, current_user_id: int) -> bool:
-    """used to delete a user"""
+def delete_user(db: Session, user_id: int, current_user_id: int) -> dict[str, int]:
+    """used to delete a user, their events and their activity in one transaction, returns the deleted rows by table"""
     user = user_service.get_user(db, user_id)
     if not user:
-        return UserNotFoundError(
+        raise UserNotFoundError(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="la ressource n'existe pas"
         )
@@ -183,32 +182,37 @@ def delete_user(db: Session, user_id: int, current_user_id: int) -> bool:
             detail="Accès refusé"
         )
 
-    # Suppression des signalements FAITS PAR le user
-    signalements_par = signaled_user_service.get_signaled_user_by_user_by_id(db, user.id)
-    for s in signalements_par:
-        signaled_user_repo.delete_signaled_user(db, s)
+    # ⚠️ user.id == profile.id by design
+    profile_id = user.id
+    db.flush()
 
-    # Suppression des signalements CONTRE le user
-    signalements_contre = signaled_user_service.get_signaled_user_by_id(db, user.id)
-    for s in signalements_contre:
-        if s not in signalements_par:
-            signaled_user_repo.delete_signaled_user(db, s)
+    event_ids = event_repo.get_event_ids_by_profile(db, profile_id)
+    summary = _delete_events(db, event_ids)
 
+    # the comments, likes and registrations of the user on the events of other organizers
+    touched_event_ids = deletion_repo.get_event_ids_touched_by_profile(db, profile_id)
+    for table, count in deletion_repo.delete_profile_activity(db, profile_id).items():
+        summary[table] = summary.get(table, 0) + count
+    summary.update(deletion_repo.delete_user_reports(db, user.id))
 
-    events = event_service.get_all_events_by_profile(db, user.id)
-    for event in events:
-        delete_event(db, event.id, current_user_id)
+    organizer_ids = [
+        organizer_id for organizer_id in event_repo.get_organizer_ids(db, touched_event_ids)
+        if organizer_id != profile_id
+    ]
+    counter_repo.reconcile_event_likes(db, touched_event_ids)
+    counter_repo.reconcile_event_comments(db, touched_event_ids)
+    seat_repo.reconcile_seats(db, touched_event_ids)
+    counter_repo.reconcile_profile_likes(db, organizer_ids)
 
-    comments = comment_service.get_comment_from_profile(db, user.id)
-    for comment in comments:
-        delete_comment(db, comment.id, current_user_id)
-
-    likes = like_service.get_likes_from_profile(db, user.id)
-    for like in likes:
-        like_repo.delete_like(db, like)
-
-
-    # Suppression du user
     user_repo.delete_user(db, user)
     user_repo.commit_user(db)
-    return True
+    db.expire_all()
+    summary["users"] = 1
+
+    event_card_service.refresh_event_cards(db, touched_event_ids)
+    for organizer_id in organizer_ids:
+        cache_service.invalidate_profile(organizer_id)
+    cache_service.invalidate_events(event_ids + touched_event_ids)
+    cache_service.invalidate_profile(profile_id)
+    cache_service.invalidate_principal(profile_id)
+    return summary
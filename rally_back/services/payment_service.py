@@ -1,16 +1,20 @@
-from typing import Optional
+from typing import Iterator, Optional
+import csv
+import io
+import json
 import os
 from datetime import datetime
-import stripe
 from fastapi import status
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
-from jinja2 import Environment, FileSystemLoader
 
 
+from core.stripe_client import get_stripe
+from database.db import SessionLocal
+from enums.export_format import ExportFormatEnum
 from enums.payment_status import PaymentStatusEnum
 from models.payment_model import Payment
-from services import event_service, registration_service, user_service, email_service
+from services import event_service, invoice_service, registration_service, revenue_service, user_service, email_service
 from repositories import payment_repo
 from errors import (
     PaymentError,
@@ -26,12 +30,15 @@ from errors import (
 
 load_dotenv()
 
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+
+# rows fetched per round trip by the exports, and size of the text chunks sent to the client
+PAYMENT_EXPORT_BATCH_SIZE = int(os.getenv("PAYMENT_EXPORT_BATCH_SIZE", "1000"))
+PAYMENT_EXPORT_CHUNK_SIZE = int(os.getenv("PAYMENT_EXPORT_CHUNK_SIZE", "65536"))
 
 def create_checkout_session(amount: int, event: str, event_id: int, app_fee: int = 0, metadata: dict = {}, connected_account_id: str = None):
     """used to create a stripe session and a link leading to a payment page"""
     try:
-        session = stripe.checkout.Session.create(
+        session = get_stripe().checkout.Session.create(
             payment_method_types=["card"],
             line_items=[{
                 "price_data": {
@@ -66,7 +73,7 @@ def create_checkout_session(amount: int, event: str, event_id: int, app_fee: int
 def create_connect_account(email: str) -> dict:
     """used to create a stripe connected account"""
     try:
-        return stripe.Account.create(
+        return get_stripe().Account.create(
             type="express",
             country="FR",
             email=email,
@@ -85,7 +92,7 @@ def create_connect_account(email: str) -> dict:
 def create_account_onboarding_link(account_id: str) -> str:
     """used to generate a link leading to page where the user can finalize their account creation"""
     try:
-        link = stripe.AccountLink.create(
+        link = get_stripe().AccountLink.create(
             account=account_id,
             refresh_url=f"{os.getenv('STRIPE_REFRESH_URL')}?account=error",
             return_url=f"{os.getenv('STRIPE_RETURN_URL')}?account=success",
@@ -147,6 +154,7 @@ def create_payment(
     )
 
     payment_repo.add_payment(db, new_payment)
+    revenue_service.record_payment_transition(db, new_payment, None, PaymentStatusEnum.PENDING)
     payment_repo.commit_payment(db)
     payment_repo.refresh_payment(db, new_payment)
     return new_payment
@@ -230,6 +238,78 @@ def get_payments_total_count(
     )
 
 
+def export_payments(
+    db: Session,
+    event_title: Optional[str],
+    buyer_email: Optional[str],
+    organizer_email: Optional[str],
+    amount_min: Optional[float],
+    amount_max: Optional[float],
+    fee_min: Optional[float],
+    fee_max: Optional[float],
+    brut_amount_min: Optional[float],
+    brut_amount_max: Optional[float],
+    stripe_session_id: Optional[str],
+    stripe_payment_intent_id: Optional[str],
+    payment_status: Optional[PaymentStatusEnum],
+    date_apres: Optional[datetime],
+    date_avant: Optional[datetime],
+    export_format: ExportFormatEnum
+) -> Iterator[str]:
+    """used to export the payments matching the given filters, as chunks of CSV or NDJSON text"""
+    rows = payment_repo.stream_payment_filters(
+        db,
+        event_title,
+        buyer_email,
+        organizer_email,
+        amount_min,
+        amount_max,
+        fee_min,
+        fee_max,
+        brut_amount_min,
+        brut_amount_max,
+        stripe_session_id,
+        stripe_payment_intent_id,
+        payment_status,
+        date_apres,
+        date_avant,
+        PAYMENT_EXPORT_BATCH_SIZE
+    )
+    columns = [column.key for column in payment_repo.PAYMENT_EXPORT_COLUMNS]
+    buffer = io.StringIO()
+    if export_format == ExportFormatEnum.CSV:
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        write_row = writer.writerow
+    else:
+        def write_row(row):
+            buffer.write(json.dumps(dict(zip(columns, row)), default=datetime.isoformat, ensure_ascii=False))
+            buffer.write("\n")
+
+    if buffer.tell():
+        # the header goes out at once, the client sees the download start before the first batch is read
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    for row in rows:
+        write_row(row)
+        if buffer.tell() >= PAYMENT_EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_payments_export(*filters, export_format: ExportFormatEnum) -> Iterator[str]:
+    """
+    used to stream an export with its own session: the response is sent after the request session is closed,
+    the export reads one snapshot of the payments (a single transaction) whatever its duration
+    """
+    with SessionLocal() as db:
+        yield from export_payments(db, *filters, export_format)
+
+
 def get_payment_by_id(db: Session, payment_id: int) -> Payment:
     """used to fetch a payment from db by its id"""
     payment = payment_repo.get_payment_by_id(db, payment_id)
@@ -241,8 +321,14 @@ def get_payment_by_id(db: Session, payment_id: int) -> Payment:
     return payment
 
 
-def change_payment_status(db: Session, payment_status: PaymentStatusEnum, payment_id: int, intent_id: str) -> Payment:
-    """used to change the payment status"""
+def change_payment_status(
+    db: Session,
+    payment_status: PaymentStatusEnum,
+    payment_id: int,
+    intent_id: str,
+    commit: bool = True
+) -> Payment:
+    """used to change the payment status, without commit the caller commits"""
     payment = get_payment_by_id(db, payment_id)
     if not payment:
         raise PaymentNotFound(
@@ -250,16 +336,22 @@ def change_payment_status(db: Session, payment_status: PaymentStatusEnum, paymen
             detail="Payment not found"
         )
 
+    # the daily revenues follow the transition in the same transaction
+    revenue_service.record_payment_transition(db, payment, payment.status, payment_status)
     payment.status = payment_status
     payment.stripe_payment_intent_id = intent_id
 
-    payment_repo.commit_payment(db)
-    payment_repo.refresh_payment(db, payment)
+    if commit:
+        payment_repo.commit_payment(db)
+        payment_repo.refresh_payment(db, payment)
     return payment
 
 
 def handle_stripe_webhook_event(event: dict, db: Session):
-    """used by stripe as a webhook when a payment is made"""
+    """
+    used by stripe as a webhook when a payment is made, the payment steps are only flushed: the webhook
+    worker commits them with the event, or rolls them all back
+    """
     event_type = event.get("type")
     data = event["data"]["object"]
     
@@ -277,13 +369,6 @@ def handle_stripe_webhook_event(event: dict, db: Session):
     if not session_id and metadata:
         return
 
-    existing_payment = get_payment_by_session_id(db, session_id)
-    if not existing_payment:
-        raise PaymentNotFound(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Payment not found"
-        )
-
     payment_status = None
     if event_type == "checkout.session.completed":
         payment_status = PaymentStatusEnum.SUCCESS
@@ -296,6 +381,13 @@ def handle_stripe_webhook_event(event: dict, db: Session):
     else:
         return
 
+    existing_payment = get_payment_by_session_id(db, session_id)
+    if not existing_payment:
+        raise PaymentNotFound(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Payment not found"
+        )
+
     registration_id = int(metadata["registration_id"])
     if not registration_id:
         raise RegistrationNotFound(
@@ -303,12 +395,14 @@ def handle_stripe_webhook_event(event: dict, db: Session):
             detail="Missing registration_id in metadata"
         )
 
-    change_payment_status(db, payment_status, existing_payment.id, intent_id)
-    if status == PaymentStatusEnum.FAILED:
-        registration_service.delete_registration_by_id(db, registration_id)
+    change_payment_status(db, payment_status, existing_payment.id, intent_id, commit=False)
+    if payment_status == PaymentStatusEnum.FAILED:
+        registration_service.delete_registration_by_id(db, registration_id, commit=False)
     else:
-        registration_service.update_registration_status(db, payment_status, registration_id)
-        send_facture(db, existing_payment.id)
+        registration_service.update_registration_status(db, payment_status, registration_id, commit=False)
+        send_facture(db, existing_payment.id, commit=False)
+    # the database errors are raised here, while the worker can still roll the event back
+    db.flush()
 
 
 def get_payment_by_event_and_users(db: Session, event_id: int, buyer_id: int, organizer_id: int) -> Payment:
@@ -359,8 +453,8 @@ def get_payments_by_user_id(
         limit
     )
 
-def send_facture(db: Session, payment_id: int)-> bool:
-    """used to send factures by email"""
+def send_facture(db: Session, payment_id: int, commit: bool = True)-> bool:
+    """used to send factures by email, without commit the caller commits"""
     payment = payment_repo.get_payment_by_id(db, payment_id)
     if not payment:
         raise PaymentNotFound(
@@ -381,18 +475,15 @@ def send_facture(db: Session, payment_id: int)-> bool:
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    env = Environment(loader=FileSystemLoader("templates"))
-
-    template_facture = env.get_template("facture.html")
-    facture_content = template_facture.render(
-        payment=payment
+    # stored by payment id, the downloads of the invoice and receipt are served without rendering them again
+    _, facture_content = invoice_service.render_invoice(payment, invoice_service.FACTURE_TEMPLATE)
+    email_service.send_email(
+        db, facture_content, buyer.email, f"Facture de votre paiement pour {payment.event_title}", commit=commit
     )
-    email_service.send_email(facture_content, buyer.email, f"Facture de votre paiement pour {payment.event_title}")
 
-    template_recu = env.get_template("recu_organizer.html")
-    recu_content = template_recu.render(
-        payment=payment
+    _, recu_content = invoice_service.render_invoice(payment, invoice_service.RECU_TEMPLATE)
+    email_service.send_email(
+        db, recu_content, organizer.email, f"Reçu de paiement pour {payment.event_title}", commit=commit
     )
-    email_service.send_email(recu_content, organizer.email, f"Reçu de paiement pour {payment.event_title}")
 
     return True
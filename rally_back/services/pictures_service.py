@@ -1,9 +1,8 @@
 import hashlib
 import time
 import os
-import requests
-from dotenv import load_dotenv
 from typing import IO
+from dotenv import load_dotenv
 
 load_dotenv()
 
@@ -12,6 +11,9 @@ CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY")
 CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET")
 
 def upload_to_cloudinary(file: IO):
+    # requests is only needed by the uploads, not imported when the API starts
+    import requests  # pylint: disable=import-outside-toplevel
+
     timestamp = int(time.time())
     signature_string = f"folder=rally&timestamp={timestamp}{CLOUDINARY_API_SECRET}"
     signature = hashlib.sha1(signature_string.encode()).hexdigest()
@@ -6,6 +6,7 @@ from fastapi import status
 from models.profile_model import Profile
 from enums.role import RoleEnum
 from repositories import profile_repo
+from services import cache_service, event_card_service, search_service
 from errors import ProfileNotFound
 
 
@@ -59,6 +60,9 @@ def update_profile(
     profile.updated_at = datetime.now()
     profile_repo.commit_profile(db)
     profile_repo.refresh_profile(db, profile)
+    search_service.index_profile_events(db, profile.id)
+    event_card_service.refresh_profile_event_cards(db, profile.id)
+    cache_service.invalidate_profile(profile.id)
     return profile
 
 def update_profile_personal_infos(
@@ -81,6 +85,9 @@ def update_profile_personal_infos(
     profile.updated_at = datetime.now()
     profile_repo.commit_profile(db)
     profile_repo.refresh_profile(db, profile)
+    search_service.index_profile_events(db, profile.id)
+    event_card_service.refresh_profile_event_cards(db, profile.id)
+    cache_service.invalidate_profile(profile.id)
     return profile
 
 def delete_profile(db: Session, profile_id: int)->None:
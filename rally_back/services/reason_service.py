@@ -3,6 +3,7 @@ from fastapi import status
 
 from models.reason_model import Reason
 from repositories import reason_repo
+from services import cache_service
 from errors import ReasonAlreadyExists, ReasonNotFound
 
 
@@ -20,6 +21,7 @@ def create_reason(db: Session, reason: str)->Reason:
     reason_repo.add_reason(db, new_reason)
     reason_repo.commit_reason(db)
     reason_repo.refresh_reason(db, new_reason)
+    cache_service.invalidate_reasons()
     return new_reason
 
 def get_reasons(db: Session)->list[Reason]:
@@ -48,3 +50,4 @@ def delete_reason(db: Session, reason_id: int)->None:
 
     reason_repo.delete_reason(db, reason)
     reason_repo.commit_reason(db)
+    cache_service.invalidate_reasons()
@@ -6,7 +6,7 @@ from fastapi import status
 from services import event_service, profile_service
 from models.registration_model import Registration
 from enums.payment_status import PaymentStatusEnum
-from repositories import registration_repo
+from repositories import registration_repo, seat_repo
 from errors import (
     RegistrationNotFound,
     EventNotFound,
@@ -17,20 +17,21 @@ from errors import (
 
 
 def get_number_registration_from_event(db: Session, event_id: int) -> int:
-    """used to get the number of registration from an event"""
-    event = event_service.get_event_by_id(db, event_id)
+    """used to get the number of registration from an event, read from the seats counter"""
+    seats = seat_repo.get_seats(db, event_id)
 
-    if not event:
+    if seats is None:
         raise EventNotFound(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="la ressource n'existe pas"
         )
 
-    return registration_repo.get_number_registrations_for_event(db, event_id)
+    seats_taken, _ = seats
+    return seats_taken
 
 
 def register_for_event(db: Session, profile_id: int, event_id: int) -> Registration:
-    """used to create a registration for an event"""
+    """used to create a registration for an event, the seat is reserved by the database"""
     event = event_service.get_event_by_id(db, event_id)
     if not event:
         raise EventNotFound(
@@ -46,31 +47,32 @@ def register_for_event(db: Session, profile_id: int, event_id: int) -> Registrat
         )
 
     registration = get_registration(db, profile_id, event_id)
-    if not registration:
-        registration = Registration(
-            profile_id=profile_id,
-            event_id=event_id,
-            payment_status=PaymentStatusEnum.FREE
+    if registration:
+        return registration
+
+    if ( event.date <= datetime.now()
+        or event.cloture_billets < datetime.now()
+    ):
+        raise RegistrationNotPossible(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inscription impossible : date dépassée"
         )
 
-        if ( event.date <= datetime.now()
-            or event.cloture_billets < datetime.now()
-        ):
-            raise RegistrationNotPossible(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Inscription impossible : date dépassée"
-            )
-
-        if get_number_registration_from_event(db, event.id) >= event.nb_places:
-            raise RegistrationNotPossible(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Inscription impossible : évènement complet"
-            )
-
-        registration_repo.add_registration(db, registration)
-        registration_repo.commit_registration(db)
-        registration_repo.refresh_registration(db, registration)
+    # the seat is taken first (event row locked) then the registration is inserted, in one transaction
+    if seat_repo.reserve_seat(db, event_id) is None:
+        registration_repo.rollback_registration(db)
+        raise RegistrationNotPossible(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inscription impossible : évènement complet"
+        )
+
+    registration = registration_repo.insert_registration(db, profile_id, event_id, PaymentStatusEnum.FREE.value)
+    if registration is None:
+        # registered concurrently by another request: the seat is given back
+        registration_repo.rollback_registration(db)
+        return get_registration(db, profile_id, event_id)
 
+    registration_repo.commit_registration(db)
     return registration
 
 
@@ -95,6 +97,15 @@ def get_registration_by_id(db: Session, registration_id: int) -> Registration:
     return registration
 
 
+def _delete_registration(db: Session, registration_id: int, commit: bool = True) -> None:
+    # the seat is only given back if this request actually deleted the registration
+    event_id = registration_repo.delete_registration_by_id(db, registration_id)
+    if event_id is not None:
+        seat_repo.release_seat(db, event_id)
+    if commit:
+        registration_repo.commit_registration(db)
+
+
 def delete_registration(db: Session, profile_id: int, event_id: int) -> bool:
     """used to delete a registration according to event and profile"""
     registration = get_registration(db, profile_id, event_id)
@@ -118,12 +129,11 @@ def delete_registration(db: Session, profile_id: int, event_id: int) -> bool:
             detail="la ressource n'existe pas"
         )
 
-    registration_repo.delete_registration(db, registration)
-    registration_repo.commit_registration(db)
+    _delete_registration(db, registration.id)
     return True
 
-def delete_registration_by_id(db: Session, registration_id: int) -> bool:
-    """used to delete registration by its id"""
+def delete_registration_by_id(db: Session, registration_id: int, commit: bool = True) -> bool:
+    """used to delete registration by its id, without commit the caller commits"""
     registration = get_registration_by_id(db, registration_id)
 
     if not registration:
@@ -145,8 +155,7 @@ def delete_registration_by_id(db: Session, registration_id: int) -> bool:
             detail="la ressource n'existe pas"
         )
 
-    registration_repo.delete_registration(db, registration)
-    registration_repo.commit_registration(db)
+    _delete_registration(db, registration.id, commit)
     return True
 
 def get_registrations(
@@ -185,8 +194,13 @@ def get_count_registrations_for_user(
     count = registration_repo.get_count_registrations_from_user(db, profile_id)
     return count
 
-def update_registration_status(db: Session, status: PaymentStatusEnum, registration_id: int) -> Registration:
-    """used to update the status of a registration"""
+def update_registration_status(
+    db: Session,
+    status: PaymentStatusEnum,
+    registration_id: int,
+    commit: bool = True
+) -> Registration:
+    """used to update the status of a registration, without commit the caller commits"""
     registration = get_registration_by_id(db, registration_id)
 
     if not registration:
@@ -196,8 +210,9 @@ def update_registration_status(db: Session, status: PaymentStatusEnum, registrat
         )
 
     registration.payment_status = status
-    registration_repo.commit_registration(db)
-    registration_repo.refresh_registration(db, registration)
+    if commit:
+        registration_repo.commit_registration(db)
+        registration_repo.refresh_registration(db, registration)
 
     return registration
 
@@ -0,0 +1,62 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from models.payment_model import Payment
+from models.revenue_rollup_model import EventDailyRevenue, OrganizerDailyRevenue
+from repositories import revenue_rollup_repo
+from enums.payment_status import PaymentStatusEnum
+
+
+def record_payment_transition(
+    db: Session,
+    payment: Payment,
+    old_status: Optional[PaymentStatusEnum],
+    new_status: PaymentStatusEnum
+) -> None:
+    """used to move a payment between the status rows of its daily revenues, committed with the payment"""
+    if old_status is not None and PaymentStatusEnum(old_status) == PaymentStatusEnum(new_status):
+        return
+    amounts = (payment.brut_amount or 0, payment.fee or 0, payment.amount or 0)
+    day = payment.created_at.date()
+    if old_status is not None:
+        revenue_rollup_repo.add_payment_to_revenues(
+            db, payment.organizer_id, payment.event_id, day, PaymentStatusEnum(old_status).value, -1, *amounts
+        )
+    revenue_rollup_repo.add_payment_to_revenues(
+        db, payment.organizer_id, payment.event_id, day, PaymentStatusEnum(new_status).value, 1, *amounts
+    )
+
+
+def get_organizer_revenues(
+    db: Session,
+    organizer_id: Optional[int],
+    day_from: Optional[date],
+    day_to: Optional[date],
+    payment_status: Optional[PaymentStatusEnum]
+) -> list[OrganizerDailyRevenue]:
+    """used to get the daily revenues of an organizer (or of all of them) between two days included"""
+    return revenue_rollup_repo.get_organizer_daily_revenues(
+        db, organizer_id, day_from, day_to, payment_status.value if payment_status else None
+    )
+
+
+def get_event_revenues(
+    db: Session,
+    event_id: Optional[int],
+    organizer_id: Optional[int],
+    day_from: Optional[date],
+    day_to: Optional[date],
+    payment_status: Optional[PaymentStatusEnum]
+) -> list[EventDailyRevenue]:
+    """used to get the daily revenues of an event (or of the events of an organizer) between two days included"""
+    return revenue_rollup_repo.get_event_daily_revenues(
+        db, event_id, organizer_id, day_from, day_to, payment_status.value if payment_status else None
+    )
+
+
+def rebuild_revenues(db: Session) -> dict[str, int]:
+    """used to recompute the daily revenues from the payments (first deployment, drift repair)"""
+    summary = revenue_rollup_repo.rebuild_revenues(db)
+    revenue_rollup_repo.commit_revenues(db)
+    return summary
@@ -0,0 +1,66 @@
+from sqlalchemy.orm import Session
+
+from repositories import event_repo, event_search_repo
+
+
+
+def index_event(db: Session, event_id: int) -> None:
+    """used to (re)build the search document of an event"""
+    index_events(db, [event_id])
+
+
+def index_events(db: Session, event_ids: list[int]) -> int:
+    """used to (re)build the search documents of many events"""
+    if not event_ids:
+        return 0
+
+    events = event_repo.get_events_for_indexing(db, event_ids)
+    for event in events:
+        address = event.address
+        place = " ".join(
+            part for part in (
+                address.city if address else None,
+                address.country if address else None,
+                address.zipcode if address else None
+            ) if part
+        )
+        organizer = f"{event.profile.first_name} {event.profile.last_name}" if event.profile else ""
+        event_search_repo.upsert_event_document(
+            db,
+            event.id,
+            event.title,
+            event.description,
+            place,
+            organizer,
+            " ".join(type_.type for type_ in event.types)
+        )
+    event_search_repo.commit_event_document(db)
+    return len(events)
+
+
+def index_profile_events(db: Session, profile_id: int) -> int:
+    """used to rebuild the search documents of the events of a profile (organizer name changed)"""
+    event_ids = event_repo.get_event_ids_by_profile(db, profile_id)
+    return index_events(db, event_ids)
+
+
+def remove_event(db: Session, event_id: int) -> None:
+    """used to remove the search document of an event, the caller commits"""
+    event_search_repo.delete_event_document(db, event_id)
+
+
+def remove_events(db: Session, event_ids: list[int]) -> None:
+    """used to remove the search documents of many events, the caller commits"""
+    event_search_repo.delete_event_documents(db, event_ids)
+
+
+def reindex_all_events(db: Session, batch_size: int = 500) -> int:
+    """used to rebuild every search document (backfill), batch by batch"""
+    indexed = 0
+    last_id = 0
+    while True:
+        event_ids = event_repo.get_event_ids_after(db, last_id, batch_size)
+        if not event_ids:
+            return indexed
+        indexed += index_events(db, event_ids)
+        last_id = event_ids[-1]
@@ -5,6 +5,7 @@ from fastapi import status
 from errors import TypeNotFound
 from models.type_model import Type
 from repositories import type_repo
+from services import cache_service, event_card_service, search_service
 
 
 
@@ -16,6 +17,7 @@ def create_type(db: Session, type: str)->Type:
     type_repo.add_type(db, new_type)
     type_repo.commit_type(db)
     type_repo.refresh_type(db, new_type)
+    cache_service.invalidate_types()
     return new_type
 
 def get_type_by_id(db: Session, type_id: int)->Optional[Type]:
@@ -46,5 +48,10 @@ def delete_type(db: Session, type_id: int) -> None:
             detail="Type not found"
         )
 
+    event_ids = [event.id for event in type_.events]
     type_repo.delete_type(db, type_)
     type_repo.commit_type(db)
+    search_service.index_events(db, event_ids)
+    event_card_service.refresh_event_cards(db, event_ids)
+    cache_service.invalidate_types()
+    cache_service.invalidate_events(event_ids)
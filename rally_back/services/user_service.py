@@ -3,10 +3,10 @@ import re
 from sqlalchemy.orm import Session
 from fastapi import status
 
-from services import profile_service, role_service
+from services import cache_service, event_card_service, profile_service, role_service
 from models.role_model import Role
 from models.user_model import User
-from core.security import hash_password
+from core.principal import Principal
 from enums.role import RoleEnum
 from errors import UserNotFoundError, InvalidEmailFormat, RoleNotFound
 
@@ -23,6 +23,13 @@ def get_user(db: Session, user_id: int)->User:
     """used to get a user by its id"""
     return user_repo.get_user_by_id(db, user_id)
 
+def get_principal(db: Session, email: str)->Optional[Principal]:
+    """used to get the principal of a user (id, role, verified and banned state) in one query"""
+    row = user_repo.get_principal_by_email(db, email)
+    if row is None:
+        return None
+    return Principal(**row._asdict())
+
 def get_user_by_email(db: Session, email: str)->User:
     """used to get a user by its email"""
     return user_repo.get_user_by_email(db, email)
@@ -30,7 +37,7 @@ def get_user_by_email(db: Session, email: str)->User:
 def create_user(
     db: Session,
     email: str,
-    password: str,
+    hashed_password: str,
     phone_number: str,
     first_name: str,
     last_name: str,
@@ -42,7 +49,6 @@ def create_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid email format"
         )
-    hashed_password = hash_password(password)
     role_user = role_service.get_role_user(db)
     if not role_user:
         role_user = role_service.create_role_user(db)
@@ -69,7 +75,7 @@ def create_user(
 def create_admin(
     db: Session,
     email: str,
-    password: str,
+    hashed_password: str,
     phone_number: str,
     first_name: str,
     last_name: str,
@@ -81,7 +87,6 @@ def create_admin(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid email format"
         )
-    hashed_password = hash_password(password)
     role_admin = role_service.get_role_admin(db)
     if not role_admin:
         role_admin = role_service.create_role_admin(db)
@@ -108,7 +113,7 @@ def create_admin(
 def create_super_admin(
     db: Session,
     email: str,
-    password: str,
+    hashed_password: str,
     phone_number: str,
     first_name: str,
     last_name: str,
@@ -121,7 +126,6 @@ def create_super_admin(
             detail="Invalid email format"
         )
 
-    hashed_password = hash_password(password)
     role_super_admin = role_service.get_role_super_admin(db)
     if not role_super_admin:
         role_super_admin = role_service.create_role_super_admin(db)
@@ -164,6 +168,11 @@ def update_user(
     user.is_planner = is_planner
     user_repo.commit_user(db)
     user_repo.refresh_user(db, user)
+    cache_service.invalidate_principal(user.id)
+    # the organizer's email is shown on their event cards
+    if user.profile:
+        event_card_service.refresh_profile_event_cards(db, user.profile.id)
+        cache_service.invalidate_profile(user.profile.id)
     return user
 
 def update_user_phone_number(
@@ -201,13 +210,16 @@ def toggle_is_planner(db: Session, user_id: int)->User:
         user.is_planner = True
     user_repo.commit_user(db)
     user_repo.refresh_user(db, user)
+    cache_service.invalidate_principal(user.id)
     return user
 
 def grant_role(db: Session, role: Role, user: User)->User:
-    """used to grant a role to a user"""
+    """used to grant a role to a user, the access tokens carrying the previous role are revoked"""
     user.role_id = role.id
+    user_repo.increment_token_version(db, user.id)
     user_repo.commit_user(db)
     user_repo.refresh_user(db, user)
+    cache_service.invalidate_principal(user.id)
     return user
 
 def is_admin(db: Session, user_id: int) -> bool:
@@ -240,4 +252,5 @@ def update_stripe_account(db: Session, user_id: int, account_id: str)->User:
     user.account_id = account_id
     user_repo.commit_user(db)
     user_repo.refresh_user(db, user)
+    cache_service.invalidate_principal(user.id)
     return user
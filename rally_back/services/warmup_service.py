@@ -0,0 +1,52 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+
+from core import templates
+from core.stripe_client import get_stripe
+from services import bad_words_service
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# loads the subsystems initialized on first use and fills the reference caches in the background once the API
+# serves, so that the first requests of a new worker do not pay for them
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
+
+
+def warm_up_subsystems() -> None:
+    """used to load the subsystems initialized on first use: the Stripe client, the templates and the banned terms"""
+    get_stripe()
+    environment = templates.get_environment()
+    for template_name in environment.list_templates():
+        environment.get_template(template_name)
+    bad_words_service.get_matcher()
+
+
+def warm_up(steps: list[Callable[[], None]]) -> dict[str, float]:
+    """used to run the warm-up steps in order, a failed step is logged and skipped, returns the seconds of each step"""
+    durations = {}
+    for step in steps:
+        started_at = time.perf_counter()
+        try:
+            step()
+        except Exception:  # pylint: disable=broad-exception-caught
+            # the warm-up is an optimization, the step is done again by the first request needing it
+            logger.exception("warm-up step %s failed", step.__name__)
+        durations[step.__name__] = time.perf_counter() - started_at
+    logger.info("warm-up done: %s", ", ".join(f"{name} {seconds:.3f}s" for name, seconds in durations.items()))
+    return durations
+
+
+def start_warm_up(steps: list[Callable[[], None]]) -> Optional[threading.Thread]:
+    """used to run the warm-up in a daemon thread when WARMUP_ON_STARTUP is enabled, the API serves meanwhile"""
+    if not WARMUP_ON_STARTUP:
+        return None
+    thread = threading.Thread(target=warm_up, args=(steps,), name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,118 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from core.background import BackgroundLoop
+from database.db import SessionLocal
+from repositories import webhook_event_repo
+from services import payment_service
+from enums.webhook_event_status import WebhookEventStatusEnum
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "50"))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "8"))
+WEBHOOK_RETRY_BASE_SECONDS = int(os.getenv("WEBHOOK_RETRY_BASE_SECONDS", "10"))
+WEBHOOK_RETRY_MAX_SECONDS = int(os.getenv("WEBHOOK_RETRY_MAX_SECONDS", "3600"))
+WEBHOOK_POLL_INTERVAL_MS = int(os.getenv("WEBHOOK_POLL_INTERVAL_MS", "1000"))
+# an event still in processing after this delay belongs to a dead worker and is claimed again
+WEBHOOK_LOCK_TIMEOUT_SECONDS = int(os.getenv("WEBHOOK_LOCK_TIMEOUT_SECONDS", "300"))
+# the API process runs a worker thread unless the webhooks are processed by dedicated worker processes
+WEBHOOK_WORKER_IN_APP = os.getenv("WEBHOOK_WORKER_IN_APP", "true").lower() == "true"
+
+
+def get_object_id(event: dict) -> Optional[str]:
+    """used to get the id of the Stripe object an event is about (checkout session, account)"""
+    data = event.get("data") or {}
+    return (data.get("object") or {}).get("id")
+
+
+def receive_stripe_event(db: Session, event: dict) -> bool:
+    """used to store a verified Stripe event in the inbox, returns False if it was already received"""
+    webhook_event_id = webhook_event_repo.insert_webhook_event(
+        db,
+        event["id"],
+        event["type"],
+        get_object_id(event),
+        int(event.get("created") or 0),
+        event
+    )
+    webhook_event_repo.commit_webhook_event(db)
+    return webhook_event_id is not None
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """used to compute the exponential backoff before the next attempt of an event"""
+    return timedelta(seconds=min(WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1), WEBHOOK_RETRY_MAX_SECONDS))
+
+
+def process_webhook_events(db: Session) -> dict[str, int]:
+    """used to process a batch of due webhook events in order, returns the number of processed and failed events"""
+    now = datetime.now()
+    webhook_events = webhook_event_repo.claim_webhook_events(
+        db,
+        WEBHOOK_BATCH_SIZE,
+        now,
+        now - timedelta(seconds=WEBHOOK_LOCK_TIMEOUT_SECONDS)
+    )
+    # read before the commit expires the claimed events, so that they are not reloaded one by one
+    batch = [
+        (webhook_event.id, webhook_event.stripe_event_id, webhook_event.attempts, webhook_event.payload)
+        for webhook_event in webhook_events
+    ]
+    webhook_event_repo.commit_webhook_event(db)
+
+    summary = {"processed": 0, "failed": 0}
+    for webhook_event_id, stripe_event_id, attempts, payload in batch:
+        try:
+            payment_service.handle_stripe_webhook_event(payload, db)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # the changes of the failed event are dropped, the event is retried on its own
+            db.rollback()
+            values = {"last_error": str(getattr(error, "detail", None) or error), "locked_at": None}
+            if attempts >= WEBHOOK_MAX_ATTEMPTS:
+                values["status"] = WebhookEventStatusEnum.FAILED.value
+                logger.error("webhook event %s failed for good: %s", stripe_event_id, error)
+            else:
+                values["status"] = WebhookEventStatusEnum.PENDING.value
+                values["next_attempt_at"] = datetime.now() + retry_delay(attempts)
+            summary["failed"] += 1
+        else:
+            values = {
+                "status": WebhookEventStatusEnum.PROCESSED.value,
+                "processed_at": datetime.now(),
+                "locked_at": None,
+                "last_error": None
+            }
+            summary["processed"] += 1
+        webhook_event_repo.update_webhook_event(db, webhook_event_id, values)
+        webhook_event_repo.commit_webhook_event(db)
+    return summary
+
+
+def _process_due_webhook_events() -> None:
+    with SessionLocal() as db:
+        # a full batch means more events are waiting, they are processed without waiting for the next tick
+        while True:
+            summary = process_webhook_events(db)
+            if summary["processed"] + summary["failed"] < WEBHOOK_BATCH_SIZE:
+                return
+
+
+webhook_worker = BackgroundLoop("webhook-worker", _process_due_webhook_events, WEBHOOK_POLL_INTERVAL_MS / 1000)
+
+
+def start_webhook_worker() -> None:
+    """used to start the webhook worker thread of the API process, unless dedicated workers process the webhooks"""
+    if WEBHOOK_WORKER_IN_APP:
+        webhook_worker.start()
+
+
+def stop_webhook_worker() -> None:
+    """used to stop the webhook worker thread"""
+    webhook_worker.stop()
@@ -0,0 +1,4 @@
+"""
+Route benchmarks: a synthetic dataset bulk-inserted in a dedicated database and the routes of the API driven
+in-process, see routes_benchmark.py
+"""
@@ -0,0 +1,272 @@
+"""
+Synthetic dataset of the route benchmarks: users and their profiles, types, events (with their address,
+types and pictures), likes, comments, registrations and payments, inserted with one multi-row INSERT per
+batch instead of one ORM object per row.
+
+The counters (likes, comments, seats taken), the search documents and the revenue rollups are computed
+afterwards, so that the routes read a consistent database.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import Engine, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from enums.payment_status import PaymentStatusEnum
+from enums.role import RoleEnum
+from models.address_model import Address
+from models.association_model import EventType
+from models.comment_model import Comment
+from models.event_model import Event
+from models.event_picture_model import EventPicture
+from models.like_model import Like
+from models.payment_model import Payment
+from models.profile_model import Profile
+from models.registration_model import Registration
+from models.role_model import Role
+from models.type_model import Type
+from models.user_model import User
+from services import revenue_service, search_service
+
+CITIES = [("Paris", "75001"), ("Lyon", "69001"), ("Marseille", "13001"), ("Lille", "59000"), ("Nantes", "44000")]
+WORDS = ["concert", "rallye", "soirée", "course", "festival", "atelier", "balade", "tournoi", "marché", "expo"]
+
+
+class DatasetSize(NamedTuple):
+    """
+    Number of rows of each table. Likes and registrations are capped by the distinct (profile, event) pairs
+    and the seats of the events, payments by the registrations to paid events.
+    """
+    users: int = 200
+    events: int = 1000
+    types: int = 10
+    likes: int = 5000
+    comments: int = 5000
+    registrations: int = 5000
+    payments: int = 2000
+
+
+class Dataset(NamedTuple):
+    """Ids of the seeded rows used by the routes of the benchmark."""
+    size: DatasetSize
+    user_ids: list[int]
+    profile_ids: list[int]
+    event_ids: list[int]
+    type_ids: list[int]
+    admin_id: int
+    # the profile with the most registrations, for the routes of the connected user
+    busy_profile_id: int
+    # the event with the most comments and registrations, for the routes of an event
+    busy_event_id: int
+
+
+def insert_rows(db: Session, model, rows: list[dict], batch_size: int = 1000) -> list[int]:
+    """Inserts rows by batches of multi-row INSERTs and returns their ids in the order of `rows`."""
+    ids = []
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    for start in range(0, len(rows), batch_size):
+        ids.extend(db.scalars(statement, rows[start:start + batch_size]).all())
+    return ids
+
+
+def sample_pairs(generator: random.Random, nb_pairs: int, profile_ids: list[int], event_ids: list[int]) -> list[tuple]:
+    """Draws distinct (profile, event) pairs, the popular events first (a few events get most of the activity)."""
+    nb_pairs = min(nb_pairs, len(profile_ids) * len(event_ids))
+    weights = [1 / (rank + 1) for rank in range(len(event_ids))]
+    pairs = set()
+    while len(pairs) < nb_pairs:
+        for event_id in generator.choices(event_ids, weights, k=nb_pairs - len(pairs)):
+            pairs.add((generator.choice(profile_ids), event_id))
+    return sorted(pairs)
+
+
+def get_role_ids(db: Session) -> dict[str, int]:
+    role_ids = {role: role_id for role_id, role in db.execute(select(Role.id, Role.role))}
+    missing = [{"role": role.value} for role in RoleEnum if role.value not in role_ids]
+    if missing:
+        for row, role_id in zip(missing, insert_rows(db, Role, missing)):
+            role_ids[row["role"]] = role_id
+    return role_ids
+
+
+def seed_dataset(engine: Engine, size: DatasetSize = DatasetSize(), seed: int = 0) -> Dataset:
+    """
+    Fills an empty database with a reproducible dataset of the given size.
+
+    Args:
+        engine (Engine): The engine of the benchmark database, migrated and empty.
+        size (DatasetSize): The number of rows of each table.
+        seed (int): The seed of the random generator, the same seed gives the same dataset.
+
+    Returns:
+        Dataset: The ids of the seeded rows.
+    """
+    generator = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+
+    with Session(engine) as db:
+        if db.scalar(select(func.count()).select_from(User)):
+            raise RuntimeError("the benchmark database must be empty, the dataset would mix with its rows")
+        role_ids = get_role_ids(db)
+
+        user_ids = insert_rows(db, User, [
+            {
+                "email": f"bench{index}@rally.fr",
+                "password": "x",
+                "phone_number": "0600000000",
+                "is_planner": index % 5 == 0,
+                "created_at": now - timedelta(days=365),
+                "role_id": role_ids[RoleEnum.ROLE_ADMIN.value if index == 0 else RoleEnum.ROLE_USER.value],
+                "account_id": f"acct_bench{index}" if index % 5 == 0 else None,
+                "is_verified": True,
+                "token_version": 0,
+            }
+            for index in range(size.users)
+        ])
+        profile_ids = insert_rows(db, Profile, [
+            {
+                "user_id": user_id,
+                "first_name": generator.choice(["Jean", "Marie", "Luc", "Emma", "Paul", "Léa"]),
+                "last_name": f"Bench{index}",
+                "photo": "default.jpg",
+                "nb_like": 0,
+                "created_at": now - timedelta(days=365),
+                "updated_at": now - timedelta(days=365),
+            }
+            for index, user_id in enumerate(user_ids)
+        ])
+        user_by_profile = dict(zip(profile_ids, user_ids))
+        email_by_user = {user_id: f"bench{index}@rally.fr" for index, user_id in enumerate(user_ids)}
+        type_ids = insert_rows(db, Type, [{"type": f"{WORDS[index % len(WORDS)]} {index}"} for index in range(size.types)])
+
+        cities = [generator.choice(CITIES) for _ in range(size.events)]
+        address_ids = insert_rows(db, Address, [
+            {"city": city, "zipcode": zipcode, "number": str(index % 100), "street": "rue de la Paix", "country": "France"}
+            for index, (city, zipcode) in enumerate(cities)
+        ])
+        organizer_ids = profile_ids[::5] or profile_ids
+        event_rows = []
+        for index, address_id in enumerate(address_ids):
+            date = now + timedelta(days=generator.randint(-60, 180), hours=generator.randint(8, 22))
+            event_rows.append({
+                "title": f"{generator.choice(WORDS).capitalize()} {cities[index][0]} {index}",
+                "description": " ".join(generator.choices(WORDS, k=30)),
+                "nb_places": generator.choice([20, 50, 100, 500]),
+                "seats_taken": 0,
+                "price": generator.choice([0.0, 0.0, 10.0, 25.0]),
+                "profile_id": generator.choice(organizer_ids),
+                "nb_likes": 0,
+                "nb_comments": 0,
+                "date": date,
+                "cloture_billets": date - timedelta(days=1),
+                "address_id": address_id,
+                "created_at": date - timedelta(days=30),
+                "updated_at": date - timedelta(days=30),
+            })
+        event_ids = insert_rows(db, Event, event_rows)
+        db.execute(insert(EventType), [
+            {"event_id": event_id, "type_id": type_id}
+            for event_id in event_ids
+            for type_id in generator.sample(type_ids, min(2, len(type_ids)))
+        ])
+        db.execute(insert(EventPicture), [
+            {"event_id": event_id, "photo": f"bench/{event_id}_{rank}.jpg"} for event_id in event_ids for rank in range(2)
+        ])
+        events = dict(zip(event_ids, event_rows))
+
+        likes = sample_pairs(generator, size.likes, profile_ids, event_ids)
+        insert_rows(db, Like, [
+            {"profile_id": profile_id, "event_id": event_id, "created_at": now - timedelta(minutes=generator.randint(0, 90000))}
+            for profile_id, event_id in likes
+        ])
+        comments = [
+            (generator.choice(profile_ids), event_id)
+            for event_id in generator.choices(event_ids, [1 / (rank + 1) for rank in range(len(event_ids))], k=size.comments)
+        ]
+        insert_rows(db, Comment, [
+            {
+                "content": " ".join(generator.choices(WORDS, k=12)),
+                "profile_id": profile_id,
+                "event_id": event_id,
+                "created_at": now - timedelta(minutes=generator.randint(0, 90000)),
+            }
+            for profile_id, event_id in comments
+        ])
+
+        # a registration holds a seat: the events are never overbooked
+        seats_taken = {event_id: 0 for event_id in event_ids}
+        registrations = []
+        for profile_id, event_id in sample_pairs(generator, size.registrations, profile_ids, event_ids):
+            if seats_taken[event_id] < events[event_id]["nb_places"]:
+                seats_taken[event_id] += 1
+                registrations.append((profile_id, event_id))
+        paid_registrations = [(profile_id, event_id) for profile_id, event_id in registrations if events[event_id]["price"]]
+        paid = set(paid_registrations[:size.payments])
+        insert_rows(db, Registration, [
+            {
+                "profile_id": profile_id,
+                "event_id": event_id,
+                "registered_at": events[event_id]["created_at"] + timedelta(hours=generator.randint(1, 600)),
+                "payment_status": (
+                    PaymentStatusEnum.SUCCESS.value if (profile_id, event_id) in paid else PaymentStatusEnum.FREE.value
+                ),
+            }
+            for profile_id, event_id in registrations
+        ])
+        insert_rows(db, Payment, [
+            {
+                "event_id": event_id,
+                "event_title": events[event_id]["title"],
+                "buyer_id": user_by_profile[profile_id],
+                "buyer_email": email_by_user[user_by_profile[profile_id]],
+                "organizer_id": user_by_profile[events[event_id]["profile_id"]],
+                "organizer_email": email_by_user[user_by_profile[events[event_id]["profile_id"]]],
+                "amount": events[event_id]["price"] * 0.9,
+                "fee": events[event_id]["price"] * 0.1,
+                "brut_amount": events[event_id]["price"],
+                "stripe_session_id": f"cs_bench_{index}",
+                "stripe_payment_intent_id": f"pi_bench_{index}",
+                "status": PaymentStatusEnum.SUCCESS.value,
+                "created_at": events[event_id]["created_at"] + timedelta(hours=generator.randint(1, 600)),
+            }
+            for index, (profile_id, event_id) in enumerate(sorted(paid))
+        ])
+
+        nb_likes = {event_id: 0 for event_id in event_ids}
+        for _, event_id in likes:
+            nb_likes[event_id] += 1
+        nb_comments = {event_id: 0 for event_id in event_ids}
+        for _, event_id in comments:
+            nb_comments[event_id] += 1
+        nb_profile_likes = {profile_id: 0 for profile_id in profile_ids}
+        for event_id, count in nb_likes.items():
+            nb_profile_likes[events[event_id]["profile_id"]] += count
+        db.execute(update(Event), [
+            {"id": event_id, "nb_likes": nb_likes[event_id], "nb_comments": nb_comments[event_id], "seats_taken": seats_taken[event_id]}
+            for event_id in event_ids
+        ])
+        db.execute(update(Profile), [
+            {"id": profile_id, "nb_like": count} for profile_id, count in nb_profile_likes.items()
+        ])
+        db.commit()
+
+        search_service.reindex_all_events(db)
+        revenue_service.rebuild_revenues(db)
+        db.commit()
+
+    registrations_per_profile = {profile_id: 0 for profile_id in profile_ids}
+    activity_per_event = dict(nb_comments)
+    for profile_id, event_id in registrations:
+        registrations_per_profile[profile_id] += 1
+        activity_per_event[event_id] += 1
+    return Dataset(
+        size=size,
+        user_ids=user_ids,
+        profile_ids=profile_ids,
+        event_ids=event_ids,
+        type_ids=type_ids,
+        admin_id=user_ids[0],
+        busy_profile_id=max(registrations_per_profile, key=registrations_per_profile.get),
+        busy_event_id=max(activity_per_event, key=activity_per_event.get),
+    )
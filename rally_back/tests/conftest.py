@@ -0,0 +1,103 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+from core import cache, counter_buffer, throttle
+from database.db import Base
+from tests.local_smtp import LocalSmtpServer
+
+
+@pytest.fixture(autouse=True)
+def no_cache():
+    # the tests share ids across databases, responses must not leak from one test to another
+    cache.configure("none")
+    yield
+    cache.configure()
+
+@pytest.fixture(autouse=True)
+def fresh_throttle():
+    # failed logins of a test must not throttle the next ones
+    throttle.configure("memory")
+    yield
+    throttle.clear()
+
+@pytest.fixture
+def memory_cache():
+    cache.configure("memory")
+    yield
+    cache.clear()
+
+@pytest.fixture
+def memory_counter_buffer():
+    counter_buffer.configure("memory")
+    yield
+    counter_buffer.configure("none")
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    server = LocalSmtpServer()
+    server.start()
+    monkeypatch.setenv("SMTP_SENDER", "127.0.0.1")
+    monkeypatch.setenv("SMTP_PORT", str(server.port))
+    monkeypatch.setenv("EMAIL_SENDER", "noreply@rally.fr")
+    monkeypatch.delenv("EMAIL_PASSWORD", raising=False)
+    monkeypatch.setattr("services.email_service.SMTP_STARTTLS", False)
+    yield server
+    server.stop()
+
+@pytest.fixture
+def sqlite_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def sqlite_db(sqlite_engine):
+    session = sessionmaker(bind=sqlite_engine, autocommit=False, autoflush=False)()
+    yield session
+    session.close()
+
+@pytest.fixture
+def query_counter(sqlite_engine):
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(sqlite_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(sqlite_engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
+
+@pytest.fixture
+def query_plans(sqlite_engine):
+    @contextmanager
+    def explain():
+        # the SQLite query plan of every SELECT, one line per step ("SEARCH events USING INDEX ...")
+        plans = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                rows = cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+                plans.append("\n".join(row[-1] for row in rows))
+
+        event.listen(sqlite_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield plans
+        finally:
+            event.remove(sqlite_engine, "before_cursor_execute", before_cursor_execute)
+
+    return explain
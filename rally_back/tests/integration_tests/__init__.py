@@ -1 +1,6 @@
-from . import authent_test
\ No newline at end of file
+from . import async_routes_test
+from . import authent_test
+from . import lifespan_test
+from . import registration_concurrency_test
+from . import routes_benchmark_test
+from . import stripe_webhook_test
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from main import app
+from core import cache, counter_buffer
+from database.db import async_engine
+
+
+@pytest_asyncio.fixture
+async def async_client():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    # pooled connections are bound to the event loop of the test
+    await async_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_get_events_concurrent_requests(async_client):
+    # Act
+    responses = await asyncio.gather(
+        *(async_client.get("/api/v1/events/", params={"limit": 2}) for _ in range(20))
+    )
+
+    # Assert
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.text for response in responses}) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_profile_not_found(async_client):
+    # Act
+    response = await async_client.get("/api/v1/profiles/999999")
+
+    # Assert
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_current_profile_requires_token(async_client):
+    # Act
+    response = await async_client.get("/api/v1/profiles/me")
+
+    # Assert
+    assert response.status_code == 401
+
+
+class BlockingRedis:
+    """A synchronous redis client, it would block the event loop of the asyncio routes"""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"blocking redis call on the event loop: {name}")
+
+
+class AsyncStubPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args))
+
+    async def execute(self):
+        return [self.client.run(name, *args) for name, args in self.commands]
+
+
+class AsyncStubRedis:
+    """The few asyncio redis commands used by the cache and the counter buffer, on a dict"""
+
+    def __init__(self):
+        self.values = {}
+
+    def run(self, name, *args):
+        if name == "set":
+            self.values[args[0]] = args[1].encode()
+        elif name == "sadd":
+            self.values.setdefault(args[0], set()).add(args[1])
+        elif name == "hmget":
+            return [self.values.get(args[0], {}).get(field.encode()) for field in args[1]]
+        return None
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    def pipeline(self):
+        return AsyncStubPipeline(self)
+
+
+@pytest.mark.asyncio
+async def test_get_events_does_not_block_the_event_loop_on_redis(async_client, mocker):
+    # Arrange
+    remote = cache.RedisBackend("redis://localhost:6379/0", "rally:cache:")
+    remote.client, remote.async_client = BlockingRedis(), AsyncStubRedis()
+    mocker.patch.object(cache, "_remote", remote)
+    mocker.patch.object(cache, "_local", cache.MemoryBackend(16, max_ttl=5))
+    buffer = counter_buffer.RedisBuffer("redis://localhost:6379/0", "rally:counters:")
+    buffer.client, buffer.async_client = BlockingRedis(), AsyncStubRedis()
+    mocker.patch.object(counter_buffer, "_buffer", buffer)
+
+    # Act
+    first = await async_client.get("/api/v1/events/", params={"limit": 2})
+    # the next response comes from the redis tier
+    cache._local.clear()
+    second = await async_client.get("/api/v1/events/", params={"limit": 2})
+
+    # Assert
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert any(key.startswith("rally:cache:events:list") for key in remote.async_client.values)
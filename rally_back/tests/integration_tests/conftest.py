@@ -0,0 +1,9 @@
+import pytest
+
+from database.migrations import upgrade_database
+
+
+@pytest.fixture(autouse=True, scope="session")
+def migrated_database():
+    # the routes use the database of the application, its schema comes from the migrations
+    upgrade_database()
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_import_main_loads_no_lazy_subsystem():
+    # Act: a fresh interpreter, the modules of the test session are already loaded
+    result = subprocess.run(
+        [
+            sys.executable, "-c",
+            "import sys, main; print(','.join(name for name in ('stripe', 'alembic', 'jinja2', 'requests') "
+            "if name in sys.modules))"
+        ],
+        cwd=os.path.dirname(main.__file__), capture_output=True, text=True, check=True
+    )
+
+    # Assert
+    assert result.stdout.strip() == ""
+
+
+def test_lifespan_starts_in_order_and_stops_in_reverse(mocker):
+    # Arrange
+    calls = []
+    mocker.patch.object(main, "LIFECYCLE", [
+        (lambda: calls.append("start migrations"), None),
+        (lambda: calls.append("start writer"), lambda: calls.append("stop writer")),
+        (None, lambda: calls.append("stop pool")),
+        (lambda: calls.append("start worker"), lambda: calls.append("stop worker")),
+    ])
+    start_warm_up = mocker.patch.object(main.warmup_service, "start_warm_up")
+
+    # Act
+    with TestClient(main.create_app()) as client:
+        started = list(calls)
+        response = client.get("/docs")
+
+    # Assert
+    assert response.status_code == 200
+    assert started == ["start migrations", "start writer", "start worker"]
+    assert calls[3:] == ["stop worker", "stop pool", "stop writer"]
+    start_warm_up.assert_called_once()
+
+
+def test_lifespan_stops_the_started_subsystems_when_a_start_fails(mocker):
+    # Arrange
+    calls = []
+
+    def failing_start():
+        raise RuntimeError("database unreachable")
+
+    mocker.patch.object(main, "LIFECYCLE", [
+        (lambda: calls.append("start writer"), lambda: calls.append("stop writer")),
+        (failing_start, lambda: calls.append("stop worker")),
+    ])
+
+    # Act / Assert
+    with pytest.raises(RuntimeError):
+        with TestClient(main.create_app()):
+            pass
+    assert calls == ["start writer", "stop writer"]
@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.db import Base
+from models.event_model import Event
+from models.registration_model import Registration
+from services import registration_service
+from errors import RegistrationNotPossible
+from tests.unit_tests.controllers.event_controller_test import seed_events
+
+NB_PLACES = 50
+NB_BUYERS = 300
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    # a file database shared by threads, each with its own connection (the in-memory one is a single connection)
+    # the transaction only starts at the first write: the reads of the service (event, existing registration)
+    # run concurrently, the seat is only protected by the conditional UPDATE
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'registrations.db'}",
+        connect_args={"check_same_thread": False, "timeout": 60}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_concurrent_registrations_never_overbook(file_engine):
+    # Arrange
+    session_factory = sessionmaker(bind=file_engine, autocommit=False, autoflush=False)
+    with session_factory() as db:
+        seed_events(db, 1, nb_profiles=NB_BUYERS)
+        db.get(Event, 1).nb_places = NB_PLACES
+        db.commit()
+
+    def register(profile_id):
+        with session_factory() as db:
+            try:
+                registration_service.register_for_event(db, profile_id, 1)
+                return "registered"
+            except RegistrationNotPossible:
+                return "full"
+
+    # every buyer tries twice, the second attempt returns the first registration or is refused
+    buyers = [profile_id for profile_id in range(1, NB_BUYERS + 1) for _ in range(2)]
+
+    # Act
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        results = list(executor.map(register, buyers))
+
+    # Assert
+    with session_factory() as db:
+        registrations = db.query(Registration).filter(Registration.event_id == 1).all()
+        assert len(registrations) == NB_PLACES
+        assert len({registration.profile_id for registration in registrations}) == NB_PLACES
+        assert db.get(Event, 1).seats_taken == NB_PLACES
+        assert registration_service.get_number_registration_from_event(db, 1) == NB_PLACES
+    assert results.count("full") >= NB_BUYERS - NB_PLACES
@@ -0,0 +1,57 @@
+import asyncio
+
+from main import create_app
+from tests.benchmarks.dataset import DatasetSize, seed_dataset
+from tests.benchmarks.routes_benchmark import ROUTES, compare, create_engines, prepare_database, run_benchmark, use_database
+
+SMALL_DATASET = DatasetSize(users=10, events=20, types=3, likes=40, comments=40, registrations=40, payments=10)
+
+
+def test_routes_benchmark_on_a_small_dataset(tmp_path):
+    # Arrange
+    engine, async_engine = create_engines(f"sqlite:///{tmp_path / 'benchmark.db'}")
+    prepare_database(engine, reset=False)
+    dataset = seed_dataset(engine, SMALL_DATASET)
+    app = create_app()
+    use_database(app, engine, async_engine)
+    routes = [route for route in ROUTES if route.name in ("events.list", "registrations.self", "types.list")]
+
+    # Act
+    report = asyncio.run(run_benchmark(app, engine, async_engine, dataset, routes, requests=4, concurrency=2))
+
+    # Assert
+    assert report["dialect"] == "sqlite"
+    assert report["dataset"] == SMALL_DATASET._asdict()
+    for result in report["routes"].values():
+        assert result["status"] == 200
+        assert result["errors"] == 0
+        assert result["queries"] >= 1
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    assert compare(report, report, tolerance=0.25) == []
+    engine.dispose()
+
+
+def test_compare_reports_more_queries_and_slower_routes():
+    # Arrange
+    baseline = {
+        "dialect": "sqlite", "dataset": {}, "requests": 10, "concurrency": 2,
+        "routes": {
+            "events.list": {"status": 200, "queries": 3, "p95_ms": 20.0},
+            "types.list": {"status": 200, "queries": 1, "p95_ms": 5.0},
+        }
+    }
+    report = {
+        **baseline,
+        "routes": {
+            "events.list": {"status": 200, "queries": 23, "p95_ms": 40.0},
+            "types.list": {"status": 200, "queries": 1, "p95_ms": 6.0},
+        }
+    }
+
+    # Act
+    regressions = compare(report, baseline, tolerance=0.25)
+
+    # Assert: types.list is 1ms slower, below the noise floor
+    assert regressions == ["events.list: 23 queries instead of 3", "events.list: p95 40.0ms instead of 20.0ms"]
+    # another load: only the queries are compared
+    assert compare({**report, "concurrency": 20}, baseline, tolerance=0.25) == ["events.list: 23 queries instead of 3"]
@@ -0,0 +1,57 @@
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from main import app
+from database.db import SessionLocal, async_engine
+from models.webhook_event_model import WebhookEvent
+from enums.webhook_event_status import WebhookEventStatusEnum
+from tests.stripe_replay import WEBHOOK_PATH, build_request, load_fixture
+
+SECRET = "whsec_test_rally"
+
+
+@pytest_asyncio.fixture
+async def async_client(monkeypatch):
+    monkeypatch.setenv("STRIPE_WEBHOOK_SECRET", SECRET)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    await async_engine.dispose()
+    with SessionLocal() as db:
+        db.query(WebhookEvent).delete()
+        db.commit()
+
+
+@pytest.mark.asyncio
+async def test_webhook_redeliveries_are_acknowledged_once(async_client):
+    # Arrange
+    payload, headers = build_request(load_fixture("checkout_session_completed"), SECRET)
+
+    # Act
+    responses = [await async_client.post(WEBHOOK_PATH, content=payload, headers=headers) for _ in range(3)]
+
+    # Assert
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert [response.json()["status"] for response in responses] == ["queued", "duplicate", "duplicate"]
+    with SessionLocal() as db:
+        # only queued: there is no payment for this session, processing it would have failed
+        webhook_event = db.query(WebhookEvent).one()
+        assert webhook_event.stripe_event_id == "evt_test_checkout_completed"
+        assert webhook_event.status == WebhookEventStatusEnum.PENDING.value
+        assert webhook_event.attempts == 0
+
+
+@pytest.mark.asyncio
+async def test_webhook_invalid_signature(async_client):
+    # Arrange
+    payload, headers = build_request(load_fixture("checkout_session_completed"), "whsec_other")
+
+    # Act
+    response = await async_client.post(WEBHOOK_PATH, content=payload, headers=headers)
+    unsigned = await async_client.post(WEBHOOK_PATH, content=payload)
+
+    # Assert
+    assert response.status_code == 400
+    assert unsigned.status_code == 400
+    with SessionLocal() as db:
+        assert db.query(WebhookEvent).count() == 0
@@ -0,0 +1,110 @@
+"""
+Login throughput benchmark: concurrent logins of a verified account against a running API, to size
+BCRYPT_ROUNDS and PASSWORD_HASH_WORKERS (the bcrypt work runs on the password pool, off the event loop).
+
+While the logins run, a cheap endpoint is polled to check that the event loop keeps answering.
+
+Used by hand against a running API:
+    python -m tests.login_benchmark --url http://127.0.0.1:8000 --email user@rally.fr --password ... \
+        --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Optional
+
+import httpx
+
+LOGIN_PATH = "/api/v1/authent/login"
+PROBE_PATH = "/docs"
+
+
+def percentile(values: list[float], ratio: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> tuple[int, float]:
+    started_at = time.perf_counter()
+    response = await client.post(LOGIN_PATH, json={"email": email, "password": password})
+    return response.status_code, time.perf_counter() - started_at
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list[float]) -> None:
+    """Polls a cheap endpoint during the benchmark, its latency shows whether the event loop is blocked."""
+    while not stop.is_set():
+        started_at = time.perf_counter()
+        await client.get(PROBE_PATH)
+        latencies.append(time.perf_counter() - started_at)
+        await asyncio.sleep(0.05)
+
+
+async def run_benchmark(
+    url: str,
+    email: str,
+    password: str,
+    requests: int,
+    concurrency: int,
+    admin_token: Optional[str] = None
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=url, verify=False, limits=limits, timeout=60) as client:
+
+        async def bounded_login() -> tuple[int, float]:
+            async with semaphore:
+                return await login(client, email, password)
+
+        stop = asyncio.Event()
+        probe_latencies: list[float] = []
+        prober = asyncio.create_task(probe(client, stop, probe_latencies))
+        started_at = time.perf_counter()
+        results = await asyncio.gather(*(bounded_login() for _ in range(requests)))
+        elapsed = time.perf_counter() - started_at
+        stop.set()
+        await prober
+
+        metrics = None
+        if admin_token:
+            response = await client.get(
+                "/api/v1/super-admin/metrics/password-hashing",
+                headers={"Authorization": f"Bearer {admin_token}"}
+            )
+            metrics = response.json()
+
+    latencies = [latency for status_code, latency in results if status_code == 200]
+    status_codes: dict[int, int] = {}
+    for status_code, _ in results:
+        status_codes[status_code] = status_codes.get(status_code, 0) + 1
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "logins_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "status_codes": status_codes,
+        "login_p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "login_p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "probe_p50_ms": round(statistics.median(probe_latencies) * 1000, 1) if probe_latencies else 0.0,
+        "probe_max_ms": round(max(probe_latencies, default=0.0) * 1000, 1),
+        "password_pool": metrics,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the login throughput of the API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True, help="email of a verified account")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--admin-token", help="access token of a super-admin, to print the password pool metrics")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(
+        args.url, args.email, args.password, args.requests, args.concurrency, args.admin_token
+    ))
+    for key, value in report.items():
+        print(f"{key}: {value}")
@@ -0,0 +1,64 @@
+"""
+Moderation benchmark: the Aho-Corasick matcher of bad_words_service against the previous implementation
+(lowercased text split into words, each word looked up in a set), on event descriptions and comments of
+growing length. The matcher also catches phrases, accents and leetspeak, its cost must stay linear.
+
+    BANNED_TERMS_PATH=errors/banned_words.txt python -m tests.moderation_benchmark --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import random
+import re
+import timeit
+
+from services import bad_words_service
+
+WORDS = [
+    "concert", "soirée", "génial", "rendez-vous", "place", "musique", "ce", "soir", "avec", "des", "amis",
+    "rallye", "départ", "à", "10h", "parking", "inscription", "gratuite", "ambiance", "top", "!",
+]
+
+
+def legacy_is_content_clean(banned_words: set[str], content: str) -> bool:
+    """the previous implementation, kept here as the reference of the benchmark"""
+    words = re.findall(r'\b\w+\b', content.lower())
+    return not any(word in banned_words for word in words)
+
+
+def make_content(size: int, seed: int = 0) -> str:
+    generator = random.Random(seed)
+    words = []
+    length = 0
+    while length < size:
+        word = generator.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def run(sizes: list[int], number: int) -> list[dict]:
+    with open(os.getenv("BANNED_TERMS_PATH"), "r", encoding="utf-8") as f:
+        banned_words = set(word.strip().lower() for word in f)
+    results = []
+    for size in sizes:
+        # clean contents: the worst case, the whole text is scanned
+        content = make_content(size)
+        legacy = min(timeit.repeat(lambda: legacy_is_content_clean(banned_words, content), number=number, repeat=3))
+        matcher = min(timeit.repeat(lambda: bad_words_service.is_content_clean(content), number=number, repeat=3))
+        results.append({
+            "chars": size,
+            "legacy_us": round(legacy / number * 1e6, 1),
+            "matcher_us": round(matcher / number * 1e6, 1),
+            "matcher_ns_per_char": round(matcher / number / size * 1e9, 1),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the banned words matcher")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 2000, 20000, 200000])
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    for result in run(args.sizes, args.number):
+        print(result)
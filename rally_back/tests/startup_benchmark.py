@@ -0,0 +1,96 @@
+"""
+Startup benchmark: how long a new API worker takes before it can serve, measured in fresh interpreters.
+
+- import: `import main` (modules loaded, routers registered), with the heaviest imports of the last run
+- ready: from the launch of uvicorn until a first request is answered (lifespan included: migrations,
+  background workers), the time an autoscaled worker is unavailable
+
+Used by hand, from rally_back with the environment of the API (.env):
+    python -m tests.startup_benchmark --runs 5 --port 8765
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+PROBE_PATH = "/docs"
+IMPORT_SCRIPT = "import time; started_at = time.perf_counter(); import main; print(time.perf_counter() - started_at)"
+
+
+def measure_import() -> float:
+    result = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def heaviest_imports(top: int) -> list[tuple[str, float]]:
+    """Runs `python -X importtime -c "import main"` and returns the modules imported by main taking the most time."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # a module is printed after its imports: the ones of main are indented once, the deeper ones are counted
+        # in the time of their parent, the top-level ones before main belong to the interpreter startup
+        if name.strip() == "main":
+            break
+        if not name.startswith("  "):
+            modules = []
+        elif not name.startswith("    "):
+            modules.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(modules, key=lambda module: module[1], reverse=True)[:top]
+
+
+def measure_ready(port: int, timeout: float) -> float:
+    started_at = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"]
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1) as client:
+            while time.perf_counter() - started_at < timeout:
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+                try:
+                    if client.get(PROBE_PATH).status_code == 200:
+                        return time.perf_counter() - started_at
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        raise TimeoutError(f"the API did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run_benchmark(runs: int, port: int, timeout: float, top: int) -> dict:
+    imports = [measure_import() for _ in range(runs)]
+    readies = [measure_ready(port, timeout) for _ in range(runs)]
+    return {
+        "runs": runs,
+        "import_p50_ms": round(statistics.median(imports) * 1000, 1),
+        "import_max_ms": round(max(imports) * 1000, 1),
+        "ready_p50_ms": round(statistics.median(readies) * 1000, 1),
+        "ready_max_ms": round(max(readies) * 1000, 1),
+        "heaviest_imports_ms": {name: round(seconds * 1000, 1) for name, seconds in heaviest_imports(top)},
+        "warmup_on_startup": os.getenv("WARMUP_ON_STARTUP", "false"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of an API worker")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for the first answer")
+    parser.add_argument("--top", type=int, default=10, help="heaviest imports listed")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.runs, args.port, args.timeout, args.top)
+    for key, value in report.items():
+        print(f"{key}: {value}")
@@ -1 +1,3 @@
+from . import controllers
+from . import database
 from . import services
@@ -0,0 +1 @@
+from . import event_controller_test
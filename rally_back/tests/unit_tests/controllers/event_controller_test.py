@@ -0,0 +1,301 @@
+from datetime import datetime, timedelta
+import pytest
+
+from models.address_model import Address
+from models.event_model import Event
+from models.event_picture_model import EventPicture
+from models.profile_model import Profile
+from models.role_model import Role
+from models.type_model import Type
+from models.user_model import User
+from controllers import event_controller
+from services import comment_service, like_service, profile_service, search_service
+from enums.count_mode import CountModeEnum
+from errors import InvalidCursorError
+from core.pagination import encode_cursor
+
+
+def seed_events(db, nb_events, nb_profiles=None):
+    role = Role(role="ROLE_USER")
+    db.add(role)
+    db.flush()
+
+    types = [Type(type="concert"), Type(type="sport")]
+    db.add_all(types)
+
+    profiles = []
+    for i in range(nb_profiles or nb_events):
+        user = User(email=f"user{i}@rally.fr", password="x", phone_number="0", role_id=role.id)
+        db.add(user)
+        db.flush()
+        profile = Profile(id=user.id, user_id=user.id, first_name="Jean", last_name=f"Dupont{i}", photo="default.jpg", nb_like=0)
+        db.add(profile)
+        profiles.append(profile)
+    db.flush()
+
+    for i in range(nb_events):
+        profile = profiles[i % len(profiles)]
+        address = Address(city="Paris", zipcode="75001", number="1", street="rue de Rivoli", country="France")
+        db.add(address)
+        db.flush()
+        event = Event(
+            title=f"Event {i}",
+            description="description",
+            nb_places=10,
+            price=0.0,
+            profile_id=profile.id,
+            nb_likes=0,
+            nb_comments=0,
+            date=datetime.now() + timedelta(days=10),
+            cloture_billets=datetime.now() + timedelta(days=5),
+            address_id=address.id,
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+        event.types = types
+        event.pictures = [EventPicture(photo=f"pic{i}_1.jpg"), EventPicture(photo=f"pic{i}_2.jpg")]
+        db.add(event)
+    db.commit()
+
+
+def count_get_events_queries(db, query_counter, limit):
+    # builds the missing event cards first
+    event_controller.get_events(
+        db, None, None, None, None, None, None, None, None, None, None, 0, limit
+    )
+    db.expire_all()
+    with query_counter() as statements:
+        response = event_controller.get_events(
+            db, None, None, None, None, None, None, None, None, None, None, 0, limit
+        )
+    assert response.count == limit
+    return len(statements)
+
+
+def count_get_events_by_profile_queries(db, query_counter, limit):
+    event_controller.get_events_by_profile(db, 1, 0, limit)
+    db.expire_all()
+    with query_counter() as statements:
+        response = event_controller.get_events_by_profile(db, 1, 0, limit)
+    assert response.count == limit
+    return len(statements)
+
+
+@pytest.mark.parametrize("limit", [5, 50])
+def test_get_events_query_count_is_constant(sqlite_db, query_counter, limit):
+    # Arrange
+    seed_events(sqlite_db, 50)
+
+    # Act
+    nb_queries_one = count_get_events_queries(sqlite_db, query_counter, 1)
+    nb_queries = count_get_events_queries(sqlite_db, query_counter, limit)
+
+    # Assert
+    assert nb_queries == nb_queries_one
+
+
+def test_get_events_serializes_relationships(sqlite_db):
+    # Arrange
+    seed_events(sqlite_db, 3)
+
+    # Act
+    response = event_controller.get_events(
+        sqlite_db, None, None, None, None, None, None, None, None, None, None, 0, 3
+    )
+
+    # Assert
+    assert response.total == 3
+    for event in response.data:
+        assert event.profile.email.startswith("user")
+        assert [t.type for t in event.types] == ["concert", "sport"]
+        assert len(event.pictures) == 2
+        assert event.address.city == "Paris"
+
+
+def test_get_events_by_profile_query_count_is_constant(sqlite_db, query_counter):
+    # Arrange
+    seed_events(sqlite_db, 20, nb_profiles=1)
+
+    # Act
+    nb_queries_one = count_get_events_by_profile_queries(sqlite_db, query_counter, 1)
+    nb_queries = count_get_events_by_profile_queries(sqlite_db, query_counter, 20)
+
+    # Assert
+    assert nb_queries == nb_queries_one
+
+
+@pytest.mark.parametrize("popularity, recent", [(None, None), (True, None), (None, True)])
+def test_get_events_keyset_walks_every_event_once(sqlite_db, popularity, recent):
+    # Arrange
+    seed_events(sqlite_db, 12)
+    for event in sqlite_db.query(Event).all():
+        event.nb_likes = event.id % 3
+    sqlite_db.commit()
+
+    # Act
+    seen = []
+    cursor = None
+    while True:
+        response = event_controller.get_events(
+            sqlite_db, None, None, None, None, None, None, popularity, recent, None, None, 0, 5,
+            cursor=cursor, keyset=True, count_mode=CountModeEnum.NONE
+        )
+        seen.extend(response.data)
+        cursor = response.next_cursor
+        if cursor is None:
+            break
+
+    # Assert
+    assert response.total is None
+    assert sorted(event.id for event in seen) == list(range(1, 13))
+    if popularity:
+        likes = [event.nb_likes for event in seen]
+        assert likes == sorted(likes, reverse=True)
+
+
+def test_get_events_keyset_rejects_cursor_from_other_ordering(sqlite_db):
+    # Arrange
+    seed_events(sqlite_db, 3)
+    response = event_controller.get_events(
+        sqlite_db, None, None, None, None, None, None, True, None, None, None, 0, 1, keyset=True
+    )
+
+    # Act / Assert
+    with pytest.raises(InvalidCursorError):
+        event_controller.get_events(
+            sqlite_db, None, None, None, None, None, None, None, True, None, None, 0, 1,
+            cursor=response.next_cursor
+        )
+
+
+@pytest.mark.parametrize("popularity, recent, ordering, sort_key", [
+    (True, None, "popularity", "3"),
+    (True, None, "popularity", None),
+    (True, None, "popularity", True),
+    (None, True, "recent", "yesterday"),
+    (None, True, "recent", 12),
+    (None, None, "default", 4)
+])
+def test_get_events_keyset_rejects_tampered_cursor(sqlite_db, popularity, recent, ordering, sort_key):
+    # Arrange
+    seed_events(sqlite_db, 3)
+    cursor = encode_cursor(ordering, sort_key, 2)
+
+    # Act / Assert
+    with pytest.raises(InvalidCursorError):
+        event_controller.get_events(
+            sqlite_db, None, None, None, None, None, None, popularity, recent, None, None, 0, 1,
+            cursor=cursor, keyset=True
+        )
+
+
+def test_get_events_estimated_count_falls_back_to_exact_count(sqlite_db):
+    # Arrange
+    seed_events(sqlite_db, 4)
+
+    # Act
+    response = event_controller.get_events(
+        sqlite_db, None, None, None, None, None, None, None, None, None, None, 0, 2,
+        count_mode=CountModeEnum.ESTIMATED
+    )
+
+    # Assert
+    assert response.total == 4
+
+
+def search_event_ids(db, search, keyset=False):
+    response = event_controller.get_events(
+        db, None, None, None, None, None, None, None, None, None, search, 0, 50, keyset=keyset
+    )
+    return sorted(event.id for event in response.data)
+
+
+@pytest.mark.parametrize("keyset", [False, True])
+def test_get_events_search_matches_indexed_fields(sqlite_db, keyset):
+    # Arrange
+    seed_events(sqlite_db, 4)
+    event = sqlite_db.get(Event, 2)
+    event.title = "Fête de la musique"
+    sqlite_db.commit()
+
+    # Act
+    indexed = search_service.reindex_all_events(sqlite_db, batch_size=3)
+
+    # Assert
+    assert indexed == 4
+    assert search_event_ids(sqlite_db, "dupont3", keyset) == [4]
+    assert search_event_ids(sqlite_db, "paris concert", keyset) == [1, 2, 3, 4]
+    assert search_event_ids(sqlite_db, "FETE musiq", keyset) == [2]
+    assert search_event_ids(sqlite_db, "fête rugby", keyset) == []
+    assert search_event_ids(sqlite_db, "100%", keyset) == []
+
+
+def test_get_events_search_follows_profile_updates(sqlite_db):
+    # Arrange
+    seed_events(sqlite_db, 2)
+    search_service.reindex_all_events(sqlite_db)
+
+    # Act
+    profile_service.update_profile_personal_infos(sqlite_db, 1, "Jeanne", "Martin", "default.jpg")
+
+    # Assert
+    assert search_event_ids(sqlite_db, "martin") == [1]
+    assert search_event_ids(sqlite_db, "dupont0") == []
+
+
+def test_get_event_by_id_is_cached_until_liked(sqlite_db, query_counter, memory_cache):
+    # Arrange
+    seed_events(sqlite_db, 2, nb_profiles=1)
+    event_controller.get_event_by_id(sqlite_db, 1)
+
+    # Act
+    with query_counter() as statements:
+        cached = event_controller.get_event_by_id(sqlite_db, 1)
+    like_service.like_event(sqlite_db, 1, 1)
+    liked = event_controller.get_event_by_id(sqlite_db, 1)
+    other = event_controller.get_event_by_id(sqlite_db, 2)
+
+    # Assert
+    assert statements == []
+    assert cached.nb_likes == 0
+    assert liked.nb_likes == 1
+    assert other.profile.nb_like == 1
+
+
+def test_get_events_cache_is_invalidated_by_comment(sqlite_db, mocker, memory_cache):
+    # Arrange
+    mocker.patch("services.bad_words_service.is_content_clean", return_value=True)
+    seed_events(sqlite_db, 2)
+    event_controller.get_events(
+        sqlite_db, None, None, None, None, None, None, None, None, None, None, 0, 2
+    )
+
+    # Act
+    comment_service.comment_event(sqlite_db, 1, 1, "super")
+    response = event_controller.get_events(
+        sqlite_db, None, None, None, None, None, None, None, None, None, None, 0, 2
+    )
+
+    # Assert
+    assert [event.nb_comments for event in response.data] == [1, 0]
+
+
+def test_get_events_cache_is_kept_on_like(sqlite_db, query_counter, memory_cache):
+    # Arrange
+    seed_events(sqlite_db, 2)
+    event_controller.get_events(
+        sqlite_db, None, None, None, None, None, None, None, None, None, None, 0, 2
+    )
+
+    # Act
+    like_service.like_event(sqlite_db, 1, 1)
+    with query_counter() as statements:
+        response = event_controller.get_events(
+            sqlite_db, None, None, None, None, None, None, None, None, None, None, 0, 2
+        )
+    liked = event_controller.get_event_by_id(sqlite_db, 1)
+
+    # Assert
+    assert statements == []
+    assert [event.nb_likes for event in response.data] == [0, 0]
+    assert liked.nb_likes == 1
@@ -0,0 +1,209 @@
+import re
+from datetime import date, datetime
+
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from database.migrations import BASELINE_REVISION, get_alembic_config, upgrade_database
+from models.event_model import Event
+from models.event_search_model import EventSearch
+from models.like_model import Like
+from models.registration_model import Registration
+from models.revenue_rollup_model import OrganizerDailyRevenue
+from models.user_model import User
+from repositories import (
+    action_log_repo,
+    banned_user_repo,
+    comment_repo,
+    event_picture_repo,
+    event_repo,
+    failed_login_repo,
+    like_repo,
+    payment_repo,
+    registration_repo,
+    signaled_comment_repo,
+    signaled_event_repo,
+    signaled_user_repo,
+    webhook_event_repo
+)
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rally.db'}")
+    yield engine
+    engine.dispose()
+
+
+def current_revision(engine):
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def create_baseline_database(engine):
+    # a database created by create_all before the migrations existed: the baseline schema, no alembic_version
+    upgrade_database(engine, BASELINE_REVISION)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+        connection.execute(text("INSERT INTO users (id, email) VALUES (1, 'organizer@rally.fr'), (2, 'user@rally.fr')"))
+        connection.execute(text("INSERT INTO profiles (id, user_id, nb_like) VALUES (1, 1, 1), (2, 2, 0)"))
+        connection.execute(text("INSERT INTO events (id, title, nb_places, profile_id) VALUES (1, 'Rally', 2, 1)"))
+        # the same like and the same registration twice, the tables had no unique constraint
+        connection.execute(text("INSERT INTO likes (id, profile_id, event_id) VALUES (1, 2, 1), (2, 2, 1)"))
+        connection.execute(text(
+            "INSERT INTO registrations (id, profile_id, event_id) VALUES (1, 2, 1), (2, 2, 1), (3, 1, 1)"
+        ))
+        connection.execute(text(
+            "INSERT INTO payments (id, event_id, event_title, buyer_id, buyer_email, organizer_id, organizer_email, "
+            "amount, fee, brut_amount, status, created_at) VALUES "
+            "(1, 1, 'Rally', 2, 'user@rally.fr', 1, 'organizer@rally.fr', 9.5, 0.5, 10, 'success', '2025-06-01 10:00:00'), "
+            "(2, 1, 'Rally', 2, 'user@rally.fr', 1, 'organizer@rally.fr', 9.5, 0.5, 10, 'success', '2025-06-01 18:00:00')"
+        ))
+
+
+def test_migrations_match_the_models(file_engine):
+    # Act
+    upgrade_database(file_engine)
+
+    # Assert
+    assert current_revision(file_engine) == "0006"
+    with file_engine.connect() as connection:
+        # raises when the models hold a table, a column or an index that no migration creates
+        command.check(get_alembic_config(connection))
+
+
+def test_create_all_database_is_stamped_then_upgraded(file_engine):
+    # Arrange
+    create_baseline_database(file_engine)
+
+    # Act
+    upgrade_database(file_engine)
+
+    # Assert
+    assert current_revision(file_engine) == "0006"
+    with Session(file_engine) as session:
+        event = session.query(Event).one()
+        user = session.query(User).filter(User.id == 2).one()
+        assert event.seats_taken == 2
+        assert user.token_version == 0
+        assert [like.id for like in session.query(Like).all()] == [1]
+        assert [registration.id for registration in session.query(Registration).order_by(Registration.id)] == [1, 3]
+        # the existing events are found by the search right after the upgrade
+        assert session.get(EventSearch, 1).document == "rally"
+        # the revenues of the existing payments are rolled up
+        revenue = session.query(OrganizerDailyRevenue).one()
+        assert (revenue.organizer_id, revenue.day, revenue.payments_count, revenue.gross_amount) == (
+            1, date(2025, 6, 1), 2, 20
+        )
+    inspector = inspect(file_engine)
+    assert {"event_search", "event_cards", "email_jobs", "webhook_events", "banned_terms", "moderation_scans",
+            "event_daily_revenues", "organizer_daily_revenues"} <= set(inspector.get_table_names())
+    assert "uq_likes_profile_event" in {constraint["name"] for constraint in inspector.get_unique_constraints("likes")}
+    assert {key["options"].get("ondelete") for key in inspector.get_foreign_keys("likes")} == {"CASCADE"}
+    assert "ix_likes_event_id_created_at" in {index["name"] for index in inspector.get_indexes("likes")}
+
+
+def test_likes_of_a_migrated_database_are_inserted_once(file_engine):
+    # Arrange
+    create_baseline_database(file_engine)
+    upgrade_database(file_engine)
+
+    # Act
+    with Session(file_engine) as session:
+        # ON CONFLICT (profile_id, event_id) needs the unique constraint added by the migration
+        existing_like = like_repo.insert_like(session, 2, 1)
+        new_like = like_repo.insert_like(session, 1, 1)
+        session.commit()
+
+        # Assert
+        assert existing_like is None
+        assert new_like.profile_id == 1
+        assert session.query(Like).count() == 2
+
+
+def test_downgrade_to_the_baseline_drops_the_lookup_indexes(file_engine):
+    # Arrange
+    upgrade_database(file_engine)
+
+    # Act
+    upgrade_database(file_engine, "head")
+    with file_engine.connect() as connection:
+        command.downgrade(get_alembic_config(connection), "0001")
+
+    # Assert
+    assert current_revision(file_engine) == "0001"
+    assert {index["name"] for index in inspect(file_engine).get_indexes("payments")} == {"ix_payments_id"}
+
+
+# the lookups run on every request, each one must be served by an index: no full scan of a table and
+# no sort of the whole table for the pagination
+REPOSITORY_LOOKUPS = {
+    "like of a profile on an event": lambda db: like_repo.get_like_by_profile_and_event(db, 1, 1),
+    "likes of an event": lambda db: like_repo.get_likes_from_event(db, 1),
+    "likes of a profile": lambda db: like_repo.get_likes_from_profile(db, 1),
+    "registrations count of an event": lambda db: registration_repo.get_number_registrations_for_event(db, 1),
+    "registration of a profile on an event": lambda db: registration_repo.get_registration_by_profile_and_event(db, 1, 1),
+    "registrations of an event": lambda db: registration_repo.get_registrations_filters(db, None, 1, None, 0, 10),
+    "registrations of a day": lambda db: registration_repo.get_registrations_filters(db, datetime(2025, 6, 1), None, None, 0, 10),
+    "registrations of a profile": lambda db: registration_repo.get_registrations_from_user(db, 1, 0, 10),
+    "registrations of the events of an organizer": lambda db: registration_repo.get_registrations_for_event_by_user(db, 1, None, 0, 10),
+    "comments of an event": lambda db: comment_repo.get_comment_by_event_id(db, 1, 0, 10),
+    "comments of a profile": lambda db: comment_repo.get_comments_by_profile_id(db, 1, 0, 10),
+    "payment of a checkout session": lambda db: payment_repo.get_payment_by_session_id(db, "cs_1"),
+    "payments of an event": lambda db: payment_repo.get_payments_by_event_id(db, 1, "success"),
+    "payments of a buyer": lambda db: payment_repo.get_payments_by_user_id_filters(
+        db, 1, None, None, None, None, None, None, None, 0, 10
+    ),
+    "payments of a payment intent": lambda db: payment_repo.get_payment_filters(
+        db, None, None, None, None, None, None, None, None, None, None, "pi_1", None, None, None, 0, 10
+    ),
+    "payments of a week": lambda db: payment_repo.get_payment_filters(
+        db, None, None, None, None, None, None, None, None, None, None, None, None,
+        datetime(2025, 6, 1), datetime(2025, 6, 7), 0, 10
+    ),
+    "failed logins of an ip": lambda db: failed_login_repo.get_failed_login_by_ip_address(db, "127.0.0.1"),
+    "reports of a comment": lambda db: signaled_comment_repo.get_signaled_comments_by_comment_id(db, 1),
+    "comment reports of a user": lambda db: signaled_comment_repo.get_signaled_comment_by_user_id(db, 1),
+    "pending comment reports": lambda db: signaled_comment_repo.get_signaled_comments_filters(db, status="pending"),
+    "reports of an event": lambda db: signaled_event_repo.get_signaled_events_by_event_id(db, 1),
+    "pending event reports": lambda db: signaled_event_repo.get_signaled_events_filters(
+        db, None, None, None, None, "pending", None, None, 0, 10
+    ),
+    "reports of a user": lambda db: signaled_user_repo.get_signaled_user_by_user_signaled_id(db, 1),
+    "user reports sent by a user": lambda db: signaled_user_repo.get_signaled_user_by_user_id(db, 1),
+    "pending user reports": lambda db: signaled_user_repo.get_signaled_users_filters(
+        db, None, None, None, None, "pending", None, None, 0, 10
+    ),
+    "events of an organizer": lambda db: event_repo.get_events_by_profile(db, 1, 0, 10),
+    "event ids of an organizer": lambda db: event_repo.get_event_ids_by_profile(db, 1),
+    "pictures of an event": lambda db: event_picture_repo.get_event_pictures_from_event_id(db, 1),
+    "picture by name": lambda db: event_picture_repo.get_picture_by_name(db, "event.jpeg"),
+    "ban of an email": lambda db: banned_user_repo.get_banned_user_by_email(db, "User@Rally.fr"),
+    "webhook of a stripe event": lambda db: webhook_event_repo.get_webhook_event_by_stripe_id(db, "evt_1"),
+    "action logs of a day": lambda db: action_log_repo.get_action_logs_with_filters(
+        db, datetime(2025, 6, 1), None, None, None, 0, 10
+    ),
+}
+# lookups matching a few rows (one payment intent, one day), sorting them in memory is fine
+SORTED_IN_MEMORY = {"payments of a payment intent", "action logs of a day"}
+
+
+def unindexed_steps(plan, allow_sort):
+    return [
+        step for step in plan.splitlines()
+        if re.fullmatch(r"SCAN (?!anon_)\w+", step.strip())
+        or (not allow_sort and "USE TEMP B-TREE FOR ORDER BY" in step)
+    ]
+
+
+@pytest.mark.parametrize("lookup", REPOSITORY_LOOKUPS)
+def test_repository_lookups_have_a_supporting_index(sqlite_db, query_plans, lookup):
+    # Act
+    with query_plans() as plans:
+        REPOSITORY_LOOKUPS[lookup](sqlite_db)
+
+    # Assert
+    assert plans
+    assert [step for plan in plans for step in unindexed_steps(plan, lookup in SORTED_IN_MEMORY)] == []
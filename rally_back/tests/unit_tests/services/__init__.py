@@ -1,7 +1,19 @@
+from . import action_log_service_test
 from . import address_service_test
 from . import authent_service_test
+from . import bad_words_service_test
 from . import comment_service_test
+from . import email_service_test
+from . import event_card_service_test
 from . import event_picture_service_test
 from . import event_service_test
 from . import failed_login_service_test
+from . import invoice_service_test
 from . import like_service_test
+from . import moderation_scan_service_test
+from . import moderation_service_test
+from . import payment_service_test
+from . import registration_service_test
+from . import revenue_service_test
+from . import warmup_service_test
+from . import webhook_service_test
@@ -0,0 +1,130 @@
+import io
+import json
+from datetime import datetime, timedelta
+
+from core.log_writer import BufferedWriter, FileSink, StdoutSink
+from models.action_logs_model import ActionLog
+from repositories import action_log_repo
+from services import action_log_service
+from enums.action import ActionEnum
+from enums.log_level import LogLevelEnum
+
+
+class ListSink:
+    def __init__(self):
+        self.batches = []
+
+    def write(self, records):
+        self.batches.append(list(records))
+
+
+class FailingSink:
+    def write(self, records):
+        raise RuntimeError("sink down")
+
+
+def make_record(i, day=datetime(2025, 6, 1, 12, 0)):
+    return {
+        "user_id": None,
+        "log_type": LogLevelEnum.INFO,
+        "action_type": ActionEnum.LOGIN,
+        "description": f"log {i}",
+        "date": day
+    }
+
+
+def test_writer_flushes_in_batches():
+    # Arrange
+    sink = ListSink()
+    writer = BufferedWriter("test-writer", [sink], max_pending=100, batch_size=4, interval=60)
+    for i in range(10):
+        writer.submit(make_record(i))
+
+    # Act
+    written = writer.flush()
+
+    # Assert
+    assert written == 10
+    assert [len(batch) for batch in sink.batches] == [4, 4, 2]
+    assert writer.pending == 0
+
+
+def test_writer_full_queue_writes_in_the_caller_and_failing_sink_does_not_stop_others():
+    # Arrange
+    sink = ListSink()
+    writer = BufferedWriter("test-writer", [FailingSink(), sink], max_pending=2, batch_size=10, interval=60)
+
+    # Act
+    for i in range(3):
+        writer.submit(make_record(i))
+
+    # Assert
+    # the third record did not fit in the queue, it was written at once
+    assert sink.batches == [[make_record(2)]]
+    assert writer.stats["overflowed"] == 1
+    assert writer.stats["failed"] == 1
+    writer.flush()
+    assert [record["description"] for record in sink.batches[-1]] == ["log 0", "log 1"]
+
+
+def test_file_and_stdout_sinks_write_ndjson(tmp_path):
+    # Arrange
+    path = tmp_path / "action_logs.ndjson"
+    file_sink = FileSink(str(path), max_bytes=1024 * 1024, backup_count=1)
+    stream = io.StringIO()
+
+    # Act
+    file_sink.write([make_record(0), make_record(1)])
+    file_sink.close()
+    StdoutSink(stream).write([make_record(2)])
+
+    # Assert
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["description"] for line in lines] == ["log 0", "log 1"]
+    assert lines[0]["action_type"] == ActionEnum.LOGIN.value
+    assert json.loads(stream.getvalue())["date"] == "2025-06-01T12:00:00"
+
+
+def test_create_action_log_without_user_check(sqlite_db):
+    # Act
+    # the writer is not running in the tests, the log is written in the session of the caller
+    action_log_service.create_action_log(sqlite_db, None, LogLevelEnum.INFO, ActionEnum.LOGIN, "anonymous")
+
+    # Assert
+    logs = sqlite_db.query(ActionLog).all()
+    assert [(log.user_id, log.description) for log in logs] == [(None, "anonymous")]
+
+
+def test_action_logs_date_filter_covers_the_whole_day(sqlite_db):
+    # Arrange
+    action_log_repo.insert_action_logs(sqlite_db, [
+        make_record(0, datetime(2025, 5, 31, 23, 59, 59)),
+        make_record(1, datetime(2025, 6, 1, 0, 0)),
+        make_record(2, datetime(2025, 6, 1, 23, 59, 59)),
+        make_record(3, datetime(2025, 6, 2, 0, 0)),
+    ])
+    sqlite_db.commit()
+
+    # Act
+    logs = action_log_service.get_action_logs(sqlite_db, datetime(2025, 6, 1, 15, 0), None, None, None, 0, 10)
+    total = action_log_service.get_action_logs_count(sqlite_db, datetime(2025, 6, 1, 15, 0), None, None, None)
+
+    # Assert
+    assert [log.description for log in logs] == ["log 2", "log 1"]
+    assert total == 2
+
+
+def test_action_logs_of_a_day_use_the_date_index(sqlite_db, query_plans):
+    # Arrange
+    action_log_repo.insert_action_logs(sqlite_db, [
+        make_record(i, datetime(2025, 6, 1) + timedelta(minutes=30 * i)) for i in range(48 * 5)
+    ])
+    sqlite_db.commit()
+
+    # Act
+    with query_plans() as plans:
+        total = action_log_service.get_action_logs_count(sqlite_db, datetime(2025, 6, 3), None, None, None)
+
+    # Assert
+    assert total == 48
+    assert "USING COVERING INDEX ix_action_logs_date (date>? AND date<?)" in plans[0]
@@ -1,4 +1,7 @@
 from unittest.mock import patch, MagicMock
+import asyncio
+import threading
+import time
 import pytest
 import jwt
 import os
@@ -9,7 +12,10 @@ from fastapi import Request
 from fastapi.responses import JSONResponse
 from datetime import datetime, timedelta
 
-from services import authent_service
+from core import security, throttle
+from core.principal import Principal
+from models.role_model import Role
+from services import authent_service, banned_user_service, moderation_service, user_service
 from schemas.request_schemas.user_schema import UserAuth
 from errors import (
     UserBannedError,
@@ -19,8 +25,10 @@ from errors import (
     UserNotFoundError,
     BadRoleError,
     NoRefreshTokenError,
-    UserNotVerifiedError
+    UserNotVerifiedError,
+    PasswordHashingBusyError
 )
+from tests.unit_tests.controllers.event_controller_test import seed_events
 
 
 
@@ -30,7 +38,9 @@ def mock_db_session():
 
 @pytest.fixture
 def mock_request():
-    return MagicMock(spec=Request)
+    request = MagicMock(spec=Request)
+    request.client.host = "127.0.0.1"
+    return request
 
 @pytest.fixture
 def mock_create_user(mocker):
@@ -48,6 +58,10 @@ def mock_create_super_admin(mocker):
 def mock_get_user_by_email(mocker):
     return mocker.patch("services.user_service.get_user_by_email")
 
+@pytest.fixture
+def mock_get_principal(mocker):
+    return mocker.patch("services.user_service.get_principal")
+
 @pytest.fixture
 def mock_get_failed_login(mocker):
     return mocker.patch("services.failed_login_service.get_failed_login")
@@ -60,10 +74,6 @@ def mock_create_failed_login(mocker):
 def mock_update_failed_login(mocker):
     return mocker.patch("services.failed_login_service.update_failed_login")
 
-@pytest.fixture
-def mock_delete_failed_login(mocker):
-    return mocker.patch("services.failed_login_service.delete_failed_login")
-
 @pytest.fixture
 def mock_create_access_token(mocker):
     return mocker.patch("services.authent_service.create_access_token")
@@ -117,6 +127,10 @@ def mock_super_admin():
     return super_admin
 
 
+def make_principal(role: str) -> Principal:
+    return Principal(id=1, email="john.doe@mail.com", role_id=1, role=role, is_verified=True)
+
+
 @pytest.fixture
 def mock_failed_login():
     failed_login = MagicMock()
@@ -133,7 +147,7 @@ def test_register_user(mock_create_user, mock_db_session, mock_user, mock_get_ba
     result = authent_service.register_user(
         db=mock_db_session,
         email="john.doe@mail.com",
-        password="password",
+        hashed_password="hashed_password",
         phone_number="0000000000",
         first_name="John",
         last_name="Doe",
@@ -159,7 +173,7 @@ def test_register_user_banned(mock_create_user, mock_db_session, mock_user, mock
         authent_service.register_user(
             db=mock_db_session,
             email="john.doe@mail.com",
-            password="password",
+            hashed_password="hashed_password",
             phone_number="0000000000",
             first_name="John",
             last_name="Doe",
@@ -181,7 +195,7 @@ def test_register_admin(mock_create_admin, mock_db_session, mock_admin, mock_get
     result = authent_service.register_admin(
         db=mock_db_session,
         email="john.doe@mail.com",
-        password="password",
+        hashed_password="hashed_password",
         phone_number="0000000000",
         first_name="John",
         last_name="Doe",
@@ -206,7 +220,7 @@ def test_register_admin_banned(mock_create_admin, mock_db_session, mock_admin, m
         authent_service.register_admin(
             db=mock_db_session,
             email="john.doe@mail.com",
-            password="password",
+            hashed_password="hashed_password",
             phone_number="0000000000",
             first_name="John",
             last_name="Doe",
@@ -228,7 +242,7 @@ def test_register_super_admin(mock_create_super_admin, mock_db_session, mock_sup
     result = authent_service.register_super_admin(
         db=mock_db_session,
         email="john.doe@mail.com",
-        password="password",
+        hashed_password="hashed_password",
         phone_number="0000000000",
         first_name="John",
         last_name="Doe",
@@ -254,7 +268,7 @@ def test_register_super_admin_banned(mock_create_super_admin, mock_db_session, m
         authent_service.register_super_admin(
             db=mock_db_session,
             email="john.doe@mail.com",
-            password="password",
+            hashed_password="hashed_password",
             phone_number="0000000000",
             first_name="John",
             last_name="Doe",
@@ -309,7 +323,6 @@ async def test_login_for_access_token(
     mock_user.is_verified = True
     mock_user.id = 1
     mock_get_user_by_email.return_value = mock_user
-    mock_get_failed_login.return_value = None
 
     # Act
     result = await authent_service.login_for_access_token(mock_request, user_auth, mock_db_session)
@@ -323,14 +336,14 @@ async def test_login_for_access_token(
     assert "refresh_token" in body
     assert body["user_id"] == 1
     mock_get_user_by_email.assert_called_once()
-    mock_get_failed_login.assert_called_once()
+    # the throttling does not read the failed_logins table anymore
+    mock_get_failed_login.assert_not_called()
 
 
 
 @pytest.mark.asyncio
 async def test_login_for_access_token_user_not_verified(
     mock_request,
-    mock_get_failed_login,
     mock_get_user_by_email,
     mock_user,
     mock_db_session
@@ -341,7 +354,6 @@ async def test_login_for_access_token_user_not_verified(
     mock_user.password = hashed_password
     mock_user.is_verified = False
     mock_get_user_by_email.return_value = mock_user
-    mock_get_failed_login.return_value = None
 
     # Act
     with pytest.raises(UserNotVerifiedError) as result:
@@ -350,20 +362,20 @@ async def test_login_for_access_token_user_not_verified(
     # Assert
     assert str(result.value) == "403: User is not verified"
     mock_get_user_by_email.assert_called_once()
-    mock_get_failed_login.assert_called_once()
 
 
 @pytest.mark.asyncio
 async def test_login_for_access_token_failed_to_many_times(
     mock_request,
-    mock_get_failed_login,
-    mock_db_session,
-    mock_failed_login
+    mock_get_user_by_email,
+    mock_db_session
 ):
     # Arrange
     user_auth = UserAuth(email="john.doe@mail.com", password="password")
-    mock_failed_login.attempts = 6
-    mock_get_failed_login.return_value = mock_failed_login
+    mock_get_user_by_email.return_value = None
+    for _ in range(authent_service.LOGIN_MAX_FAILURES_PER_ACCOUNT):
+        with pytest.raises(InvalidCredentialsError):
+            await authent_service.login_for_access_token(mock_request, user_auth, mock_db_session)
 
     # Act
     with pytest.raises(TooManyAttemptsError) as result:
@@ -371,23 +383,50 @@ async def test_login_for_access_token_failed_to_many_times(
 
     # Assert
     assert str(result.value) == "429: Too many login attempts. Try again later."
-    mock_get_failed_login.assert_called_once()
+    assert 0 < int(result.value.headers["Retry-After"]) <= authent_service.LOGIN_THROTTLE_WINDOW_SECONDS
+    # the password is not checked once the account is throttled
+    assert mock_get_user_by_email.call_count == authent_service.LOGIN_MAX_FAILURES_PER_ACCOUNT
+
+
+@pytest.mark.asyncio
+async def test_login_for_access_token_throttles_ip_across_accounts(
+    mock_request,
+    mock_get_user_by_email,
+    mock_db_session,
+    mocker
+):
+    # Arrange
+    mocker.patch("services.authent_service.LOGIN_MAX_FAILURES_PER_IP", 3)
+    mock_get_user_by_email.return_value = None
+    for index in range(3):
+        with pytest.raises(InvalidCredentialsError):
+            await authent_service.login_for_access_token(
+                mock_request, UserAuth(email=f"user{index}@mail.com", password="password"), mock_db_session
+            )
+
+    # Act
+    with pytest.raises(TooManyAttemptsError):
+        await authent_service.login_for_access_token(
+            mock_request, UserAuth(email="other@mail.com", password="password"), mock_db_session
+        )
+    mock_request.client.host = "10.0.0.2"
+    with pytest.raises(InvalidCredentialsError):
+        await authent_service.login_for_access_token(
+            mock_request, UserAuth(email="other@mail.com", password="password"), mock_db_session
+        )
 
 
 @pytest.mark.asyncio
-async def test_login_for_access_token_invalid_credentials_no_failed_login(
+async def test_login_for_access_token_invalid_credentials(
     mock_request,
     mock_get_failed_login,
     mock_get_user_by_email,
     mock_db_session,
-    mock_create_failed_login,
-    mock_failed_login
+    mock_create_failed_login
 ):
     # Arrange
-    user_auth = UserAuth(email="john.doe@mail.com", password="password")
+    user_auth = UserAuth(email="John.Doe@mail.com", password="password")
     mock_get_user_by_email.return_value = None
-    mock_get_failed_login.return_value = None
-    mock_create_failed_login.return_value = mock_failed_login
 
     # Act
     with pytest.raises(InvalidCredentialsError) as result:
@@ -396,77 +435,164 @@ async def test_login_for_access_token_invalid_credentials_no_failed_login(
     # Assert
     assert str(result.value) == "401: Invalid credentials"
     mock_get_user_by_email.assert_called_once()
-    mock_get_failed_login.assert_called_once()
-    mock_create_failed_login.assert_called_once()
+    ip_key, account_key = authent_service.login_throttle_keys(mock_request.client.host, "john.doe@mail.com")
+    assert throttle.hit(ip_key, 60) == 2
+    assert throttle.hit(account_key, 60) == 2
+    # no audit by default
+    mock_get_failed_login.assert_not_called()
+    mock_create_failed_login.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_login_for_access_token_invalid_credentials(
+async def test_login_for_access_token_invalid_credentials_audited(
     mock_request,
     mock_get_failed_login,
     mock_get_user_by_email,
     mock_db_session,
+    mock_create_failed_login,
     mock_update_failed_login,
-    mock_failed_login
+    mock_failed_login,
+    mocker
 ):
     # Arrange
+    mocker.patch("services.authent_service.LOGIN_AUDIT_FAILURES", True)
     user_auth = UserAuth(email="john.doe@mail.com", password="password")
     mock_get_user_by_email.return_value = None
-    mock_failed_login.attempts = 2
-    mock_get_failed_login.return_value = mock_failed_login
-    mock_update_failed_login.return_value = mock_failed_login
+    mock_get_failed_login.side_effect = [None, mock_failed_login]
 
     # Act
-    with pytest.raises(InvalidCredentialsError) as result:
-        await authent_service.login_for_access_token(mock_request, user_auth, mock_db_session)
+    for _ in range(2):
+        with pytest.raises(InvalidCredentialsError):
+            await authent_service.login_for_access_token(mock_request, user_auth, mock_db_session)
 
     # Assert
-    assert str(result.value) == "401: Invalid credentials"
-    mock_get_user_by_email.assert_called_once()
-    mock_get_failed_login.assert_called_once()
-    mock_update_failed_login.assert_called_once()
+    mock_create_failed_login.assert_called_once_with(mock_db_session, mock_request.client.host)
+    mock_update_failed_login.assert_called_once_with(mock_db_session, mock_failed_login)
 
 
 @pytest.mark.asyncio
-async def test_login_for_access_token_delete_failed_login(
+async def test_login_for_access_token_resets_account_failures(
     mock_request,
-    mock_get_failed_login,
     mock_get_user_by_email,
     mock_user,
-    mock_db_session,
-    mock_failed_login,
-    mock_delete_failed_login
+    mock_db_session
 ):
     # Arrange
     user_auth = UserAuth(email="john.doe@mail.com", password="password")
     pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    hashed_password = pwd_context.hash("password")
-    mock_user.password = hashed_password
+    mock_user.password = pwd_context.hash("password")
     mock_user.is_verified = True
     mock_user.id = 1
     mock_get_user_by_email.return_value = mock_user
-    mock_failed_login.attempts = 4
-    mock_get_failed_login.return_value = mock_failed_login
-    mock_delete_failed_login.return_value = None
+    ip_key, account_key = authent_service.login_throttle_keys(mock_request.client.host, user_auth.email)
+    for _ in range(4):
+        throttle.hit(ip_key, 60)
+        throttle.hit(account_key, 60)
 
     # Act
     result = await authent_service.login_for_access_token(mock_request, user_auth, mock_db_session)
 
     # Assert
-    assert isinstance(result, JSONResponse)
     assert result.status_code == 200
-
     body = json.loads(result.body.decode())
     assert body["msg"] == "Login successful"
-    assert "access_token" in body
-    assert "refresh_token" in body
-    assert "user_id" in body
+    assert throttle.hit(account_key, 60) == 1
+    # the failures of the IP are kept, a valid account must not cover the other ones
+    assert throttle.hit(ip_key, 60) == 5
 
-    mock_delete_failed_login.assert_called_once()
-    mock_get_user_by_email.assert_called_once()
-    mock_get_failed_login.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_concurrent_logins_cannot_exceed_the_account_limit(
+    mock_request,
+    mock_get_user_by_email,
+    mock_user,
+    mock_db_session,
+    mocker
+):
+    # Arrange
+    mocker.patch.object(security, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4))
+    mock_user.password = security.pwd_context.hash("password")
+    mock_get_user_by_email.return_value = mock_user
+    user_auth = UserAuth(email="john.doe@mail.com", password="wrong")
+
+    async def login():
+        try:
+            await authent_service.login_for_access_token(mock_request, user_auth, mock_db_session)
+        except (InvalidCredentialsError, TooManyAttemptsError) as error:
+            return type(error)
+        return None
+
+    # Act
+    # the guesses wait for bcrypt together, none of them is rejected by the password yet
+    results = await asyncio.gather(*(login() for _ in range(3 * authent_service.LOGIN_MAX_FAILURES_PER_ACCOUNT)))
+
+    # Assert
+    assert results.count(InvalidCredentialsError) == authent_service.LOGIN_MAX_FAILURES_PER_ACCOUNT
+    assert results.count(TooManyAttemptsError) == 2 * authent_service.LOGIN_MAX_FAILURES_PER_ACCOUNT
 
 
+def test_throttle_acquire_records_attempts_up_to_the_limit():
+    # Arrange
+    now = [1000.0]
+    backend = throttle.MemoryBackend(max_keys=10, clock=lambda: now[0])
+    first, _ = backend.acquire("login:account:a", 2, 60)
+    now[0] += 10
+    backend.acquire("login:account:a", 2, 60)
+
+    # Act
+    rejected = backend.acquire("login:account:a", 2, 60)
+    backend.release("login:account:a", first)
+    accepted = backend.acquire("login:account:a", 2, 60)
+
+    # Assert
+    assert rejected == (None, 50)
+    assert accepted[0] is not None and accepted[1] == 0
+    assert backend.hit("login:account:a", 60) == 3
+
+@pytest.mark.asyncio
+async def test_redis_throttle_acquires_with_one_async_script(mocker):
+    # Arrange
+    backend = throttle.RedisBackend("redis://localhost:6379/0", "rally:throttle:")
+    backend.client = None
+    mocker.patch.object(throttle.time, "time", return_value=1000.0)
+    backend._acquire_script = mocker.AsyncMock(side_effect=[[1], [0, b"990.5"]])
+
+    # Act
+    accepted = await backend.acquire_async("login:account:a", 5, 60)
+    rejected = await backend.acquire_async("login:account:a", 5, 60)
+
+    # Assert
+    assert accepted[0].startswith("1000.0:") and accepted[1] == 0
+    assert rejected == (None, 50.5)
+    assert backend._acquire_script.await_args.kwargs == {
+        "keys": ["rally:throttle:login:account:a"],
+        "args": ["1000.0", "940.0", 5, 60, mocker.ANY]
+    }
+
+def test_sliding_window_throttle():
+    # Arrange
+    now = [1000.0]
+    backend = throttle.MemoryBackend(max_keys=2, clock=lambda: now[0])
+
+    # Act
+    counts = [backend.hit("login:ip:a", 60) for _ in range(3)]
+    limited = backend.retry_after("login:ip:a", 3, 60)
+    now[0] += 30
+    backend.hit("login:ip:a", 60)
+    now[0] += 31
+    slid = backend.retry_after("login:ip:a", 3, 60)
+    backend.hit("login:ip:b", 60)
+    backend.hit("login:ip:c", 60)
+
+    # Assert
+    assert counts == [1, 2, 3]
+    assert limited == 60
+    # the 3 first attempts left the window, only the one made 31 seconds ago is left
+    assert slid == 0
+    assert backend.hit("login:ip:a", 60) == 1
+    # the least recently used key was dropped
+    assert backend.hit("login:ip:b", 60) == 1
+
 
 def test_get_current_user_no_token(mock_db_session):
     # Act / Arrange
@@ -480,48 +606,36 @@ def test_get_current_user_no_token(mock_db_session):
 @patch.dict(os.environ, {"SECRET_KEY": "mysecret", "ALGORITHM": "HS256"})
 def test_get_current_user_with_valid_header_token(
     mock_db_session,
-    mock_user,
-    mock_get_user_by_email,
-    mock_get_role_by_id,
-    mock_role
+    mock_get_principal
 ):
     # Arrange
-    mock_role.role = "ROLE_USER"
-    mock_user.role = mock_role
+    principal = make_principal("ROLE_USER")
     access_token = "Mon_token_valide"
     token_header = f"Bearer {access_token}"
-    mock_get_user_by_email.return_value = mock_user
-    mock_get_role_by_id.return_value = mock_role
+    mock_get_principal.return_value = principal
 
     with patch("services.authent_service.jwt.decode", return_value={"sub": "admin@example.com"}):
         # Act
         result = authent_service.get_current_user(mock_db_session, token_header, access_token)
 
     # Assert
-    assert result.email == mock_user.email
-    assert result.password == mock_user.password
-    assert result.is_planner == mock_user.is_planner
-    assert result.phone_number == mock_user.phone_number
-    assert result.role.role == mock_user.role.role
-    mock_get_user_by_email.assert_called_once()
-    mock_get_role_by_id.assert_called_once()
+    assert result.id == principal.id
+    assert result.email == principal.email
+    assert result.is_planner == principal.is_planner
+    assert result.role == "ROLE_USER"
+    mock_get_principal.assert_called_once_with(mock_db_session, "admin@example.com")
 
 
 
 @patch.dict(os.environ, {"SECRET_KEY": "mysecret", "ALGORITHM": "HS256"})
 def test_get_current_user_not_role_user(
     mock_db_session,
-    mock_user,
-    mock_get_user_by_email,
-    mock_get_role_by_id,
-    mock_role
+    mock_get_principal
 ):
     # Arrange
-    mock_role.role = "ROLE_INVALIDE"
     access_token = "Mon_token_valide"
     token_header = "Bearer Mon_token_valide"
-    mock_get_user_by_email.return_value = mock_user
-    mock_get_role_by_id.return_value = mock_role
+    mock_get_principal.return_value = make_principal("ROLE_INVALIDE")
 
     # Act
     with pytest.raises(BadRoleError) as result:
@@ -530,8 +644,7 @@ def test_get_current_user_not_role_user(
 
     # Assert
     assert str(result.value) == "403: You do not have the rights to access this resource"
-    mock_get_user_by_email.assert_called_once()
-    mock_get_role_by_id.assert_called_once()
+    mock_get_principal.assert_called_once()
 
 
 
@@ -549,11 +662,11 @@ def test_get_current_user_email_not_in_token(mock_db_session):
     assert str(result.value) == "401: Invalid Token"
 
 
-def test_get_current_user_not_found(mock_db_session, mock_get_user_by_email):
+def test_get_current_user_not_found(mock_db_session, mock_get_principal):
     # Arrange
     access_token = "Mon_token_invalidevalide"
     token_header = " Bearer Mon_token_header"
-    mock_get_user_by_email.return_value = None
+    mock_get_principal.return_value = None
 
     # Act
     with patch("services.authent_service.jwt.decode", return_value={"sub": "admin@example.com"}):
@@ -565,13 +678,11 @@ def test_get_current_user_not_found(mock_db_session, mock_get_user_by_email):
 
 
 @patch.dict(os.environ, {"SECRET_KEY": "mysecret", "ALGORITHM": "HS256"})
-def test_get_current_admin_not_role_admin(mock_db_session, mock_admin, mock_get_user_by_email, mock_get_role_by_id, mock_role):
+def test_get_current_admin_not_role_admin(mock_db_session, mock_get_principal):
     # Arrange
-    mock_role.role = "ROLE_INVALIDE"
     access_token = "Mon_token_valide"
     token_header = "bearer Mon_token_header"
-    mock_get_user_by_email.return_value = mock_admin
-    mock_get_role_by_id.return_value = mock_role
+    mock_get_principal.return_value = make_principal("ROLE_INVALIDE")
 
     # Act
     with pytest.raises(BadRoleError) as result:
@@ -580,31 +691,26 @@ def test_get_current_admin_not_role_admin(mock_db_session, mock_admin, mock_get_
 
     # Assert
     assert str(result.value) == "403: You do not have the rights to access this ressource"
-    mock_get_user_by_email.assert_called_once()
-    mock_get_role_by_id.assert_called_once()
+    mock_get_principal.assert_called_once()
 
 
 @patch.dict(os.environ, {"SECRET_KEY": "mysecret", "ALGORITHM": "HS256"})
-def test_get_current_admin(mock_db_session, mock_admin, mock_get_user_by_email, mock_get_role_by_id, mock_role):
+def test_get_current_admin(mock_db_session, mock_get_principal):
     # Arrange
-    mock_role.role = "ROLE_ADMIN"
+    principal = make_principal("ROLE_ADMIN")
     access_token = "Mon_token_valide"
     token_header = "bearer Mon_token_header"
-    mock_get_user_by_email.return_value = mock_admin
-    mock_get_role_by_id.return_value = mock_role
+    mock_get_principal.return_value = principal
 
     # Act
     with patch("services.authent_service.jwt.decode", return_value={"sub": "admin@example.com"}):
         result = authent_service.get_current_admin(mock_db_session, token_header, access_token)
 
     # Assert
-    assert result.email == mock_admin.email
-    assert result.password == mock_admin.password
-    assert result.is_planner == mock_admin.is_planner
-    assert result.phone_number == mock_admin.phone_number
-    assert result.role.role == mock_admin.role.role
-    mock_get_user_by_email.assert_called_once()
-    mock_get_role_by_id.assert_called_once()
+    assert result.id == principal.id
+    assert result.email == principal.email
+    assert result.role == "ROLE_ADMIN"
+    mock_get_principal.assert_called_once()
 
 
 def test_get_current_admin_no_token(mock_db_session):
@@ -631,11 +737,11 @@ def test_get_current_admin_email_not_in_token(mock_db_session):
     assert str(result.value) == "401: Invalid Token"
 
 
-def test_get_current_admin_not_found(mock_db_session, mock_get_user_by_email):
+def test_get_current_admin_not_found(mock_db_session, mock_get_principal):
     # Arrange
     access_token = "Mon_token_invalidevalide"
     token_header = "bearer Mon_token_header"
-    mock_get_user_by_email.return_value = None
+    mock_get_principal.return_value = None
 
     # Act
     with patch("services.authent_service.jwt.decode", return_value={"sub": "admin@example.com"}):
@@ -656,36 +762,30 @@ def test_get_current_super_admin_no_token(mock_db_session):
 
 
 @patch.dict(os.environ, {"SECRET_KEY": "mysecret", "ALGORITHM": "HS256"})
-def test_get_current_super_admin(mock_db_session, mock_super_admin, mock_get_user_by_email, mock_role, mock_get_role_by_id):
+def test_get_current_super_admin(mock_db_session, mock_get_principal):
     # Arrange
-    mock_role.role = "ROLE_SUPER_ADMIN"
+    principal = make_principal("ROLE_SUPER_ADMIN")
     access_token = "Mon_token_valide"
     token_header = "bearer Mon_token_header"
-    mock_get_user_by_email.return_value = mock_super_admin
-    mock_get_role_by_id.return_value = mock_role
+    mock_get_principal.return_value = principal
 
     # Act
     with patch("services.authent_service.jwt.decode", return_value={"sub": "admin@example.com"}):
         result = authent_service.get_current_super_admin(mock_db_session, token_header, access_token)
 
     # Assert
-    assert result.email == mock_super_admin.email
-    assert result.password == mock_super_admin.password
-    assert result.is_planner == mock_super_admin.is_planner
-    assert result.phone_number == mock_super_admin.phone_number
-    assert result.role.role == mock_super_admin.role.role
-    mock_get_user_by_email.assert_called_once()
-    mock_get_role_by_id.assert_called_once()
+    assert result.id == principal.id
+    assert result.email == principal.email
+    assert result.role == "ROLE_SUPER_ADMIN"
+    mock_get_principal.assert_called_once()
 
 
 @patch.dict(os.environ, {"SECRET_KEY": "mysecret", "ALGORITHM": "HS256"})
-def test_get_current_super_admin_no_role_super_admin(mock_db_session, mock_super_admin, mock_get_user_by_email, mock_role, mock_get_role_by_id):
+def test_get_current_super_admin_no_role_super_admin(mock_db_session, mock_get_principal):
     # Arrange
-    mock_role.role = "ROLE_INVALIDE"
     access_token = "Mon_token_valide"
     token_header = "bearer Mon_token_header"
-    mock_get_user_by_email.return_value = mock_super_admin
-    mock_get_role_by_id.return_value = mock_role
+    mock_get_principal.return_value = make_principal("ROLE_INVALIDE")
 
     # Act
     with pytest.raises(BadRoleError) as result:
@@ -694,8 +794,7 @@ def test_get_current_super_admin_no_role_super_admin(mock_db_session, mock_super
 
     # Assert
     assert str(result.value) == "403: You do not have the rights to access this ressource"
-    mock_get_user_by_email.assert_called_once()
-    mock_get_role_by_id.assert_called_once()
+    mock_get_principal.assert_called_once()
 
 
 def test_get_current_super_admin_email_not_in_token(mock_db_session):
@@ -712,11 +811,11 @@ def test_get_current_super_admin_email_not_in_token(mock_db_session):
     assert str(result.value) == "401: Invalid Token"
 
 
-def test_get_current_super_admin_not_found(mock_db_session, mock_get_user_by_email):
+def test_get_current_super_admin_not_found(mock_db_session, mock_get_principal):
     # Arrange
     access_token = "Mon_token_invalidevalide"
     token_header = "bearer Mon_token_header"
-    mock_get_user_by_email.return_value = None
+    mock_get_principal.return_value = None
 
     # Act
     with patch("services.authent_service.jwt.decode", return_value={"sub": "admin@example.com"}):
@@ -787,25 +886,21 @@ async def test_refresh_token(mock_db_session, mock_get_user_by_email, mock_user,
 @patch.dict(os.environ, {"SECRET_KEY": "mysecret", "ALGORITHM": "HS256"})
 def test_get_connected_user(
     mock_db_session,
-    mock_user,
-    mock_get_user_by_email,
+    mock_get_principal,
 ):
     # Arrange
+    principal = make_principal("ROLE_USER")
     access_token = "Mon_token_valide"
     token_header = "bearer Mon_token_header"
-    mock_get_user_by_email.return_value = mock_user
+    mock_get_principal.return_value = principal
 
     # Act
     with patch("services.authent_service.jwt.decode", return_value={"sub": "admin@example.com"}):
         result = authent_service.get_connected_user(mock_db_session, token_header, access_token)
 
     # Assert
-    assert result.email == mock_user.email
-    assert result.password == mock_user.password
-    assert result.is_planner == mock_user.is_planner
-    assert result.phone_number == mock_user.phone_number
-    assert result.role.role == mock_user.role.role
-    mock_get_user_by_email.assert_called_once()
+    assert result == principal
+    mock_get_principal.assert_called_once()
 
 
 def test_get_connected_user_email_not_in_token(mock_db_session):
@@ -822,11 +917,11 @@ def test_get_connected_user_email_not_in_token(mock_db_session):
     assert str(result.value) == "401: Invalid Token"
 
 
-def test_get_connected_user_not_found(mock_db_session, mock_get_user_by_email):
+def test_get_connected_user_not_found(mock_db_session, mock_get_principal):
     # Arrange
     access_token = "Mon_token_invalidevalide"
     token_header = "bearer Mon_token_header"
-    mock_get_user_by_email.return_value = None
+    mock_get_principal.return_value = None
 
     # Act
     with patch("services.authent_service.jwt.decode", return_value={"sub": "admin@example.com"}):
@@ -835,3 +930,213 @@ def test_get_connected_user_not_found(mock_db_session, mock_get_user_by_email):
 
     # Assert
     assert str(result.value) == "404: User not found"
+
+
+@pytest.fixture
+def jwt_env():
+    with patch.dict(os.environ, {"SECRET_KEY": "mysecret", "ALGORITHM": "HS256"}):
+        yield
+
+
+def login_token(db, user_id):
+    user = user_service.get_user(db, user_id)
+    return f"Bearer {authent_service.create_access_token(authent_service.create_token_claims(user))}"
+
+
+def test_get_connected_user_cached_principal(sqlite_db, query_counter, memory_cache, jwt_env):
+    # Arrange
+    seed_events(sqlite_db, 1)
+    token = login_token(sqlite_db, 1)
+
+    # Act
+    with query_counter() as miss:
+        principal = authent_service.get_connected_user(sqlite_db, token, None)
+    with query_counter() as hit:
+        cached = authent_service.get_connected_user(sqlite_db, token, None)
+
+    # Assert
+    assert len(miss) == 1
+    assert hit == []
+    assert cached == principal
+    assert principal.id == 1
+    assert principal.role == "ROLE_USER"
+    assert principal.is_banned is False
+
+
+def test_get_current_admin_rejects_role_claim_without_query(sqlite_db, query_counter, memory_cache, jwt_env):
+    # Arrange
+    seed_events(sqlite_db, 1)
+    token = login_token(sqlite_db, 1)
+
+    # Act
+    with query_counter() as statements:
+        with pytest.raises(BadRoleError):
+            authent_service.get_current_admin(sqlite_db, token, None)
+
+    # Assert
+    assert statements == []
+
+
+def test_grant_role_revokes_previous_tokens(sqlite_db, memory_cache, jwt_env):
+    # Arrange
+    seed_events(sqlite_db, 1)
+    admin_role = Role(role="ROLE_ADMIN")
+    sqlite_db.add(admin_role)
+    sqlite_db.commit()
+    token = login_token(sqlite_db, 1)
+    authent_service.get_connected_user(sqlite_db, token, None)
+
+    # Act
+    user_service.grant_role(sqlite_db, admin_role, user_service.get_user(sqlite_db, 1))
+    new_token = login_token(sqlite_db, 1)
+
+    # Assert
+    with pytest.raises(InvalidTokenError):
+        authent_service.get_connected_user(sqlite_db, token, None)
+    assert authent_service.get_current_admin(sqlite_db, new_token, None).role == "ROLE_ADMIN"
+
+
+def test_deleted_user_principal_is_invalidated(sqlite_db, memory_cache, jwt_env):
+    # Arrange
+    seed_events(sqlite_db, 2)
+    token = login_token(sqlite_db, 2)
+    authent_service.get_connected_user(sqlite_db, token, None)
+
+    # Act
+    moderation_service.delete_user(sqlite_db, 2, 2)
+
+    # Assert
+    with pytest.raises(UserNotFoundError):
+        authent_service.get_connected_user(sqlite_db, token, None)
+
+
+def test_ban_revokes_tokens_and_cached_principal(sqlite_db, memory_cache, jwt_env):
+    # Arrange
+    seed_events(sqlite_db, 2)
+    token = login_token(sqlite_db, 2)
+    authent_service.get_connected_user(sqlite_db, token, None)
+    email = user_service.get_user(sqlite_db, 2).email
+
+    # Act
+    banned_user_service.create_banned_user(sqlite_db, email, "admin@rally.fr")
+    banned_token = login_token(sqlite_db, 2)
+
+    # Assert
+    with pytest.raises(InvalidTokenError):
+        authent_service.get_connected_user(sqlite_db, token, None)
+    with pytest.raises(UserBannedError):
+        authent_service.get_connected_user(sqlite_db, banned_token, None)
+
+
+def test_unban_drops_cached_principal(sqlite_db, memory_cache, jwt_env):
+    # Arrange
+    seed_events(sqlite_db, 2)
+    email = user_service.get_user(sqlite_db, 2).email
+    banned_user_service.create_banned_user(sqlite_db, email, "admin@rally.fr")
+    token = login_token(sqlite_db, 2)
+    with pytest.raises(UserBannedError):
+        authent_service.get_connected_user(sqlite_db, token, None)
+
+    # Act
+    banned_user_service.delete_banned_user_by_email(sqlite_db, email)
+
+    # Assert
+    assert authent_service.get_connected_user(sqlite_db, token, None).is_banned is False
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_password_when_cost_changes(sqlite_db, mock_request, jwt_env, mocker):
+    # Arrange
+    seed_events(sqlite_db, 1)
+    user = user_service.get_user(sqlite_db, 1)
+    user.password = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("password")
+    user.is_verified = True
+    sqlite_db.commit()
+    mocker.patch.object(security, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5))
+    user_auth = UserAuth(email="user0@rally.fr", password="password")
+
+    # Act
+    first = await authent_service.login_for_access_token(mock_request, user_auth, sqlite_db)
+    rehashed = user_service.get_user(sqlite_db, 1).password
+    second = await authent_service.login_for_access_token(mock_request, user_auth, sqlite_db)
+
+    # Assert
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert rehashed.startswith("$2b$05$")
+    assert security.pwd_context.verify("password", rehashed)
+    # already at the configured cost, not rehashed again
+    assert user_service.get_user(sqlite_db, 1).password == rehashed
+
+
+@pytest.mark.asyncio
+async def test_reset_password_hashes_on_the_password_pool(sqlite_db, jwt_env, mocker):
+    # Arrange
+    seed_events(sqlite_db, 1)
+    mocker.patch.object(security, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4))
+    pool_run = mocker.spy(security.password_pool, "run_async")
+    token = authent_service.create_reset_password_token("user0@rally.fr")
+
+    # Act
+    result = await authent_service.reset_pwd(sqlite_db, token, "NewPassword1", "NewPassword1")
+
+    # Assert
+    assert result is True
+    pool_run.assert_called_once()
+    assert security.pwd_context.verify("NewPassword1", user_service.get_user(sqlite_db, 1).password)
+
+
+@pytest.mark.asyncio
+async def test_password_pool_keeps_event_loop_responsive():
+    # Arrange
+    pool = security.PasswordHasherPool(workers=1, max_pending=4)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+
+    # Act
+    result = await pool.run_async(lambda: time.sleep(0.2) or "hashed")
+    ticker.cancel()
+    pool.shutdown()
+
+    # Assert
+    assert result == "hashed"
+    assert ticks >= 5
+    stats = pool.stats()
+    assert stats["submitted"] == 1
+    assert stats["completed"] == 1
+    assert stats["pending"] == 0
+    assert stats["run_seconds"] >= 0.2
+
+
+def test_password_pool_rejects_when_full():
+    # Arrange
+    pool = security.PasswordHasherPool(workers=1, max_pending=2)
+    release = threading.Event()
+    futures = [pool.submit(release.wait) for _ in range(2)]
+    while pool.stats()["running"] == 0:
+        time.sleep(0.01)
+
+    # Act
+    with pytest.raises(PasswordHashingBusyError) as result:
+        pool.submit(release.wait)
+    stats = pool.stats()
+    release.set()
+    for future in futures:
+        future.result()
+    pool.shutdown()
+
+    # Assert
+    assert result.value.status_code == 503
+    assert stats["pending"] == 2
+    assert stats["running"] == 1
+    assert stats["waiting"] == 1
+    assert stats["rejected"] == 1
+    assert stats["max_pending"] == 2
+    assert pool.stats()["completed"] == 2
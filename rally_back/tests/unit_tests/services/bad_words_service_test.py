@@ -0,0 +1,128 @@
+import os
+import time
+
+import pytest
+
+from core.text_matcher import Rule, TextMatcher
+from models.banned_term_model import BannedTerm
+from services import bad_words_service
+from enums.moderation_rule_kind import ModerationRuleKindEnum
+from enums.moderation_severity import ModerationSeverityEnum
+from errors import BannedTermAlreadyExistsError
+
+
+@pytest.fixture
+def banned_words_file(tmp_path, monkeypatch):
+    path = tmp_path / "banned_words.txt"
+    path.write_text("merde\nfils de pute\nencul;substring\nzut;word;low\n", encoding="utf-8")
+    monkeypatch.setenv("BANNED_TERMS_PATH", str(path))
+    # the terms of the database do not outlive the test
+    monkeypatch.setattr(bad_words_service, "_db_rules", [])
+    bad_words_service.load_banned_words()
+    yield path
+    monkeypatch.undo()
+    bad_words_service.load_banned_words()
+
+
+def test_is_content_clean(banned_words_file):
+    # Act / Assert
+    assert bad_words_service.is_content_clean("Un concert génial ce soir")
+    assert not bad_words_service.is_content_clean("Quelle merde ce concert")
+    # phrases, accents, case, punctuation and leetspeak
+    assert not bad_words_service.is_content_clean("FILS-DE-PUTE")
+    assert not bad_words_service.is_content_clean("fils  de\npüte !")
+    assert not bad_words_service.is_content_clean("m3rd3")
+    # substring rules match inside words, word rules only whole words
+    assert not bad_words_service.is_content_clean("enculés")
+    assert bad_words_service.is_content_clean("emmerdeur")
+    # low severity terms are reported but not refused
+    assert bad_words_service.is_content_clean("zut alors")
+
+
+def test_find_banned_words_spans(banned_words_file):
+    # Arrange
+    content = "Oh, ZUT ! Ce fils-de-pûte..."
+
+    # Act
+    matches = bad_words_service.find_banned_words(content)
+
+    # Assert
+    assert [content[match.start:match.end] for match in matches] == ["ZUT", "fils-de-pûte"]
+    assert [match.rule.severity for match in matches] == [ModerationSeverityEnum.LOW, ModerationSeverityEnum.HIGH]
+    assert [bad_words_service.is_blocking(match) for match in matches] == [False, True]
+
+
+def test_matcher_overlapping_rules():
+    # Arrange
+    matcher = TextMatcher([
+        Rule("he", "substring", "high"),
+        Rule("she", "substring", "high"),
+        Rule("hers", "substring", "high"),
+        Rule("his", "word", "high"),
+    ])
+
+    # Act
+    matches = matcher.find("ushers this")
+
+    # Assert
+    # "his" is inside "this", not a whole word
+    assert [("ushers this"[match.start:match.end], match.start) for match in matches] == [
+        ("she", 1), ("he", 2), ("hers", 2)
+    ]
+
+
+def test_banned_words_file_hot_reload(banned_words_file, sqlite_db):
+    # Arrange
+    bad_words_service.load_banned_words(sqlite_db)
+    assert bad_words_service.is_content_clean("quel bazar")
+
+    # Act
+    unchanged = bad_words_service.reload_banned_words_if_changed(sqlite_db)
+    banned_words_file.write_text("bazar\n", encoding="utf-8")
+    modified = time.time() + 1
+    os.utime(banned_words_file, (modified, modified))
+    changed = bad_words_service.reload_banned_words_if_changed(sqlite_db)
+
+    # Assert
+    assert (unchanged, changed) == (False, True)
+    assert not bad_words_service.is_content_clean("quel bazar")
+    assert bad_words_service.is_content_clean("quelle merde")
+
+
+def test_banned_terms_from_db(banned_words_file, sqlite_db):
+    # Arrange
+    bad_words_service.load_banned_words(sqlite_db)
+
+    # Act
+    banned_term = bad_words_service.create_banned_term(
+        sqlite_db, " Arnaque ", ModerationRuleKindEnum.SUBSTRING, ModerationSeverityEnum.MEDIUM
+    )
+    with pytest.raises(BannedTermAlreadyExistsError) as result:
+        bad_words_service.create_banned_term(
+            sqlite_db, "arnaque", ModerationRuleKindEnum.WORD, ModerationSeverityEnum.HIGH
+        )
+    # added by another worker
+    sqlite_db.add(BannedTerm(term="escroc", kind="word", severity="high"))
+    sqlite_db.commit()
+    changed = bad_words_service.reload_banned_words_if_changed(sqlite_db)
+
+    # Assert
+    assert banned_term.term == "arnaque"
+    assert result.value.status_code == 409
+    assert changed
+    assert not bad_words_service.is_content_clean("Une ARNAQUES en vue")
+    assert not bad_words_service.is_content_clean("un escroc")
+    # the file terms are kept
+    assert not bad_words_service.is_content_clean("merde")
+
+
+def test_matcher_loaded_by_the_first_check(banned_words_file, monkeypatch):
+    # Arrange: nothing is read when the module is imported
+    monkeypatch.setattr(bad_words_service, "_matcher", None)
+
+    # Act
+    clean = bad_words_service.is_content_clean("Quelle merde ce concert")
+
+    # Assert
+    assert not clean
+    assert len(bad_words_service.get_matcher()) == 4
@@ -0,0 +1,82 @@
+from datetime import datetime
+
+from models.email_job_model import EmailJob
+from services import email_service
+from enums.email_job_status import EmailJobStatusEnum
+
+
+
+def test_send_email_only_queues(sqlite_db, smtp_server):
+    # Act
+    email_job = email_service.send_email(sqlite_db, "<p>Bonjour</p>", "jean@rally.fr", "Bienvenue")
+
+    # Assert
+    assert email_job.status == EmailJobStatusEnum.PENDING.value
+    assert email_job.attempts == 0
+    assert smtp_server.connections == 0
+
+
+def test_process_email_jobs_reuses_one_session(sqlite_db, smtp_server):
+    # Arrange
+    for i in range(5):
+        email_service.send_email(sqlite_db, f"<p>{i}</p>", f"user{i}@rally.fr", "Facture")
+    session = email_service.SmtpSession()
+
+    # Act
+    summary = email_service.process_email_jobs(sqlite_db, session)
+    session.close()
+
+    # Assert
+    assert summary == {"sent": 5, "failed": 0}
+    assert smtp_server.connections == 1
+    assert sorted(recipients[0] for recipients, _ in smtp_server.messages) == [f"user{i}@rally.fr" for i in range(5)]
+    assert smtp_server.messages[0][1]["Subject"] == "Facture"
+    assert sqlite_db.query(EmailJob).filter(EmailJob.status == EmailJobStatusEnum.SENT.value).count() == 5
+
+
+def test_process_email_jobs_retries_with_backoff(sqlite_db, smtp_server):
+    # Arrange
+    smtp_server.rejected.add("down@rally.fr")
+    failing = email_service.send_email(sqlite_db, "<p>1</p>", "down@rally.fr", "Facture")
+    email_service.send_email(sqlite_db, "<p>2</p>", "up@rally.fr", "Facture")
+    session = email_service.SmtpSession()
+
+    # Act
+    summary = email_service.process_email_jobs(sqlite_db, session)
+    retried_too_early = email_service.process_email_jobs(sqlite_db, session)
+    session.close()
+
+    # Assert
+    sqlite_db.refresh(failing)
+    assert summary == {"sent": 1, "failed": 1}
+    assert retried_too_early == {"sent": 0, "failed": 0}
+    assert failing.status == EmailJobStatusEnum.PENDING.value
+    assert failing.attempts == 1
+    assert failing.next_attempt_at > datetime.now()
+    assert "down@rally.fr" in failing.last_error
+
+
+def test_process_email_jobs_gives_up_after_max_attempts(sqlite_db, smtp_server):
+    # Arrange
+    smtp_server.rejected.add("down@rally.fr")
+    failing = email_service.send_email(sqlite_db, "<p>1</p>", "down@rally.fr", "Facture")
+    session = email_service.SmtpSession()
+
+    # Act
+    for _ in range(email_service.EMAIL_MAX_ATTEMPTS):
+        email_service.process_email_jobs(sqlite_db, session)
+        failing.next_attempt_at = datetime.now()
+        sqlite_db.commit()
+    session.close()
+
+    # Assert
+    sqlite_db.refresh(failing)
+    assert failing.status == EmailJobStatusEnum.FAILED.value
+    assert failing.attempts == email_service.EMAIL_MAX_ATTEMPTS
+
+
+def test_retry_delay_is_exponential_and_capped():
+    # Assert
+    assert email_service.retry_delay(1).total_seconds() == email_service.EMAIL_RETRY_BASE_SECONDS
+    assert email_service.retry_delay(3).total_seconds() == email_service.EMAIL_RETRY_BASE_SECONDS * 4
+    assert email_service.retry_delay(30).total_seconds() == email_service.EMAIL_RETRY_MAX_SECONDS
@@ -0,0 +1,58 @@
+from models.event_card_model import EventCard
+from repositories import event_card_repo
+from services import comment_service, event_card_service, like_service
+from tests.unit_tests.controllers.event_controller_test import seed_events
+
+
+
+def test_get_event_cards_builds_missing_cards_in_order(sqlite_db, query_counter):
+    # Arrange
+    seed_events(sqlite_db, 3)
+
+    # Act
+    cards = event_card_service.get_event_cards(sqlite_db, [3, 1, 2])
+    with query_counter() as statements:
+        cached_cards = event_card_service.get_event_cards(sqlite_db, [3, 1, 2])
+
+    # Assert
+    assert [card["id"] for card in cards] == [3, 1, 2]
+    assert cached_cards == cards
+    assert len(statements) == 1
+    assert sqlite_db.query(EventCard).count() == 3
+    assert cards[0]["profile"]["email"] == "user2@rally.fr"
+    assert [picture["photo"] for picture in cards[0]["pictures"]] == ["pic2_1.jpg", "pic2_2.jpg"]
+
+
+def test_event_card_is_refreshed_on_like_and_comment(sqlite_db, mocker):
+    # Arrange
+    mocker.patch("services.bad_words_service.is_content_clean", return_value=True)
+    seed_events(sqlite_db, 2, nb_profiles=1)
+    event_card_service.get_event_cards(sqlite_db, [1, 2])
+
+    # Act
+    like_service.like_event(sqlite_db, 1, 1)
+    comment_service.comment_event(sqlite_db, 1, 1, "super")
+
+    # Assert
+    liked, other = event_card_service.get_event_cards(sqlite_db, [1, 2])
+    assert liked["nb_likes"] == 1
+    assert liked["nb_comments"] == 1
+    assert liked["profile"]["nb_like"] == 1
+    assert other["profile"]["nb_like"] == 1
+
+
+def test_like_does_not_rewrite_the_cards(sqlite_db, mocker):
+    # Arrange
+    seed_events(sqlite_db, 3, nb_profiles=1)
+    event_card_service.get_event_cards(sqlite_db, [1, 2, 3])
+    upsert_event_card = mocker.spy(event_card_repo, "upsert_event_card")
+
+    # Act
+    like_service.like_event(sqlite_db, 1, 2)
+
+    # Assert
+    upsert_event_card.assert_not_called()
+    assert "nb_likes" not in sqlite_db.get(EventCard, 2).payload
+    cards = event_card_service.get_event_cards(sqlite_db, [1, 2, 3])
+    assert [card["nb_likes"] for card in cards] == [0, 1, 0]
+    assert [card["profile"]["nb_like"] for card in cards] == [1, 1, 1]
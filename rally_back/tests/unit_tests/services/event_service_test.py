@@ -1,13 +1,14 @@
 from unittest.mock import patch, MagicMock
 import pytest
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timedelta
 from fastapi import Request
 
 from models.event_model import Event
 from models.type_model import Type
 from services import event_service
 from errors import EventNotFound
+from tests.unit_tests.controllers.event_controller_test import seed_events
 
 
 
@@ -297,3 +298,43 @@ def test_get_events_by_profile(mock_db_session, mock_event, mock_get_events_by_p
     assert result[0].nb_comments == mock_event.nb_comments
     assert result == [mock_event]
     mock_get_events_by_profile.assert_called_once()
+
+
+def test_get_events_filters_weekend_uses_the_date_index(sqlite_db, query_plans):
+    # Arrange
+    # one event every six hours during june
+    sqlite_db.add_all([
+        Event(title=f"Event {i}", description="", nb_places=10, price=0, nb_likes=0, nb_comments=0,
+              date=datetime(2025, 6, 1) + timedelta(hours=6 * i))
+        for i in range(120)
+    ])
+    sqlite_db.commit()
+
+    # Act
+    with query_plans() as plans:
+        # saturday 14 and sunday 15, whatever the time of the bounds
+        events = event_service.get_events_filters(
+            sqlite_db, date_avant=datetime(2025, 6, 15, 8, 0), date_apres=datetime(2025, 6, 14, 20, 0), limit=20
+        )
+
+    # Assert
+    assert len(events) == 8
+    assert all(datetime(2025, 6, 14) <= event.date < datetime(2025, 6, 16) for event in events)
+    assert "USING INDEX ix_events_date (date>? AND date<?)" in plans[0]
+
+
+def test_get_events_filters_and_total_count_apply_the_same_filters(sqlite_db):
+    # Arrange
+    seed_events(sqlite_db, 3)
+    lyon = sqlite_db.query(Event).order_by(Event.id).first()
+    lyon.address.city = "Lyon"
+    sqlite_db.commit()
+    filters = {"country": "France", "city": "Paris", "type_ids": [1, 2]}
+
+    # Act
+    events = event_service.get_events_filters(sqlite_db, limit=10, **filters)
+    total = event_service.get_count_total_events(sqlite_db, **filters)
+
+    # Assert
+    assert total == len(events) == 2
+    assert lyon.id not in {event.id for event in events}
@@ -111,4 +111,14 @@ def test_reset_failed_login(mock_db_session, mock_failed_login, mock_commit_fail
     failed_login_service.reset_failed_login(mock_db_session, mock_failed_login)
 
     # Assert
-    mock_commit_failed_login.assert_called_once()
\ No newline at end of file
+    mock_commit_failed_login.assert_called_once()
+
+def test_record_failed_login(sqlite_db):
+    # Act
+    failed_login_service.record_failed_login(sqlite_db, "127.0.0.1")
+    failed_login_service.record_failed_login(sqlite_db, "127.0.0.1")
+
+    # Assert
+    failed_login = sqlite_db.query(FailedLogin).one()
+    assert failed_login.ip_address == "127.0.0.1"
+    assert failed_login.attempts == 2
@@ -0,0 +1,129 @@
+from datetime import datetime
+
+import pytest
+
+from core import templates
+from core.principal import Principal
+from models.email_job_model import EmailJob
+from models.payment_model import Payment
+from services import invoice_service
+from enums.payment_status import PaymentStatusEnum
+from enums.role import RoleEnum
+from errors import InvoiceAccessForbiddenError
+from tests.unit_tests.controllers.event_controller_test import seed_events
+
+
+@pytest.fixture
+def invoices_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(invoice_service, "INVOICES_DIR", str(tmp_path))
+    return tmp_path
+
+
+def make_payment(index, status=PaymentStatusEnum.SUCCESS.value):
+    return Payment(
+        event_id=1,
+        event_title="Event 0",
+        buyer_id=2,
+        buyer_email="user1@rally.fr",
+        organizer_id=1,
+        organizer_email="user0@rally.fr",
+        amount=19.0 + index,
+        fee=1.0,
+        brut_amount=20.0 + index,
+        stripe_payment_intent_id=f"pi_{index}",
+        status=status,
+        created_at=datetime(2025, 6, 1, 20, 30)
+    )
+
+
+def seed_payments(db, n):
+    # user 1 organizes the event 1, user 2 bought n tickets, the last payment failed
+    seed_events(db, 1, nb_profiles=2)
+    db.add_all([make_payment(index) for index in range(n - 1)] + [make_payment(n - 1, PaymentStatusEnum.FAILED.value)])
+    db.commit()
+
+
+def test_environment_is_shared():
+    # Act
+    context = invoice_service.payment_context(make_payment(0))
+    rendered = [templates.render("facture.html", **context) for _ in range(2)]
+
+    # Assert
+    assert templates.get_environment() is templates.get_environment()
+    assert rendered[0] == rendered[1]
+    assert "pi_0" in rendered[0]
+
+
+def test_render_many_matches_render(mocker):
+    # Arrange
+    contexts = [invoice_service.payment_context(make_payment(index)) for index in range(6)]
+    mocker.patch("core.templates.TEMPLATES_POOL_MIN_BATCH", 4)
+    mocker.patch("core.templates.TEMPLATES_POOL_WORKERS", 2)
+
+    # Act
+    documents = templates.render_many("facture.html", contexts)
+    templates.shutdown_pool()
+
+    # Assert
+    assert documents == [templates.render("facture.html", **context) for context in contexts]
+
+
+def test_invoice_is_stored_by_payment(sqlite_db, invoices_dir, mocker):
+    # Arrange
+    seed_payments(sqlite_db, 2)
+    buyer = Principal(id=2, email="user1@rally.fr", role=RoleEnum.ROLE_USER.value)
+    organizer = Principal(id=1, email="user0@rally.fr", role=RoleEnum.ROLE_USER.value)
+    render = mocker.spy(templates, "render")
+
+    # Act
+    paths = [invoice_service.get_invoice_for_user(sqlite_db, 1, buyer) for _ in range(3)]
+    recu_path = invoice_service.get_invoice_for_user(sqlite_db, 1, organizer)
+    with open(paths[0], encoding="utf-8") as f:
+        facture = f.read()
+    sqlite_db.get(Payment, 1).status = PaymentStatusEnum.FAILED.value
+    sqlite_db.commit()
+    updated_path = invoice_service.get_invoice_for_user(sqlite_db, 1, buyer)
+
+    # Assert
+    # rendered once per document and payment version
+    assert [call.args[0] for call in render.call_args_list] == ["facture.html", "recu_organizer.html", "facture.html"]
+    assert len(set(paths)) == 1
+    assert "Facture" in facture
+    assert "recu_organizer" in recu_path
+    # the outdated invoice is removed
+    assert updated_path != paths[0]
+    assert sorted(path.name for path in invoices_dir.iterdir()) == sorted([
+        updated_path.rsplit("/", 1)[1], recu_path.rsplit("/", 1)[1]
+    ])
+
+
+def test_invoice_access_is_restricted(sqlite_db, invoices_dir):
+    # Arrange
+    seed_payments(sqlite_db, 1)
+    stranger = Principal(id=3, email="user2@rally.fr", role=RoleEnum.ROLE_USER.value)
+    super_admin = Principal(id=4, email="admin@rally.fr", role=RoleEnum.ROLE_SUPER_ADMIN.value)
+
+    # Act
+    with pytest.raises(InvoiceAccessForbiddenError) as result:
+        invoice_service.get_invoice_for_user(sqlite_db, 1, stranger)
+    path = invoice_service.get_invoice_for_user(sqlite_db, 1, super_admin)
+
+    # Assert
+    assert result.value.status_code == 403
+    assert "facture" in path
+
+
+def test_resend_event_invoices(sqlite_db, invoices_dir):
+    # Arrange
+    seed_payments(sqlite_db, 4)
+
+    # Act
+    resent = invoice_service.resend_event_invoices(sqlite_db, 1)
+
+    # Assert
+    # the failed payment is skipped
+    assert resent == 3
+    jobs = sqlite_db.query(EmailJob).order_by(EmailJob.id).all()
+    assert [job.recipient for job in jobs] == ["user1@rally.fr", "user0@rally.fr"] * 3
+    assert "pi_2" in jobs[4].body
+    assert len(list(invoices_dir.iterdir())) == 6
@@ -1,14 +1,16 @@
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 import pytest
 from sqlalchemy.orm import Session
-from datetime import datetime
 from fastapi import Request
 
 from models.event_model import Event
 from models.like_model import Like
 from models.profile_model import Profile
-from services import like_service
-from errors import EventNotFound, ProfileNotFound
+from services import counter_service, like_service
+from errors import EventNotFound, ProfileNotFound, LikeNotFoundError
+from core import counter_buffer
+from controllers import event_controller
+from tests.unit_tests.controllers.event_controller_test import seed_events
 
 
 
@@ -20,68 +22,42 @@ def mock_db_session():
 def mock_request():
     return MagicMock(spec=Request)
 
-@pytest.fixture
-def mock_add_types_to_event(mocker):
-    return mocker.patch("services.event_service.add_types_to_event")
-
 @pytest.fixture
 def mock_get_like(mocker):
     return mocker.patch("services.like_service.get_like")
 
 @pytest.fixture
-def mock_get_event_by_id(mocker):
-    return mocker.patch("services.event_service.get_event_by_id")
-
-@pytest.fixture
-def mock_get_profile_by_id(mocker):
-    return mocker.patch("services.profile_service.get_profile")
+def mock_insert_like(mocker):
+    return mocker.patch("repositories.like_repo.insert_like")
 
 @pytest.fixture
-def mock_add_like(mocker):
-    return mocker.patch("repositories.like_repo.add_like")
+def mock_delete_like_by_profile_and_event(mocker):
+    return mocker.patch("repositories.like_repo.delete_like_by_profile_and_event")
 
 @pytest.fixture
 def mock_commit_like(mocker):
     return mocker.patch("repositories.like_repo.commit_like")
 
 @pytest.fixture
-def mock_refresh_like(mocker):
-    return mocker.patch("repositories.like_repo.refresh_like")
+def mock_rollback_like(mocker):
+    return mocker.patch("repositories.like_repo.rollback_like")
 
 @pytest.fixture
-def mock_refresh_event(mocker):
-    return mocker.patch("repositories.event_repo.refresh_event")
+def mock_increment_event_likes(mocker):
+    return mocker.patch("repositories.counter_repo.increment_event_likes")
 
 @pytest.fixture
-def mock_refresh_profile(mocker):
-    return mocker.patch("repositories.profile_repo.refresh_profile")
+def mock_increment_profile_likes(mocker):
+    return mocker.patch("repositories.counter_repo.increment_profile_likes")
 
 @pytest.fixture
-def mock_get_like_by_profile_and_event(mocker):
-    return mocker.patch("repositories.like_repo.get_like_by_profile_and_event")
+def mock_refresh_event_card(mocker):
+    return mocker.patch("services.event_card_service.refresh_event_card")
 
 @pytest.fixture
-def mock_delete_like(mocker):
-    return mocker.patch("repositories.like_repo.delete_like")
-
-
+def mock_get_like_by_profile_and_event(mocker):
+    return mocker.patch("repositories.like_repo.get_like_by_profile_and_event")
 
-@pytest.fixture
-def mock_event():
-    fake_event = MagicMock(spec=Event)
-    fake_event.title = "Titre"
-    fake_event.description = "mon event"
-    fake_event.nb_places = 4
-    fake_event.price = 3.0
-    fake_event.profile_id = 1
-    fake_event.nb_likes = 12
-    fake_event.nb_comments = 4
-    fake_event.date = datetime.now()
-    fake_event.cloture_billets = datetime.now()
-    fake_event.address_id = 1
-    fake_event.created_at = datetime.now()
-    fake_event.updated_at = datetime.now()
-    return fake_event
 
 @pytest.fixture
 def mock_like():
@@ -90,62 +66,48 @@ def mock_like():
     fake_like.event_id = 2
     return fake_like
 
-@pytest.fixture
-def mock_profile():
-    fake_profile = MagicMock(spec=Profile)
-    return fake_profile
 
-@patch("services.like_service.Like")
 def test_like_event(
-    mock_like_model,
     mock_db_session,
-    mock_get_like,
-    mock_get_profile_by_id,
-    mock_get_event_by_id,
-    mock_event,
-    mock_profile,
     mock_like,
-    mock_add_like,
+    mock_insert_like,
     mock_commit_like,
-    mock_refresh_event,
-    mock_refresh_like,
-    mock_refresh_profile
+    mock_rollback_like,
+    mock_increment_event_likes,
+    mock_increment_profile_likes,
+    mock_refresh_event_card
 ):
     # Arrange
-    mock_like_model.return_value = mock_like
-    mock_get_like.return_value = None
-    mock_get_event_by_id.return_value = mock_event
-    mock_get_profile_by_id.return_value = mock_profile
-    mock_add_like.return_value = None
-    mock_commit_like.return_value = None
-    mock_refresh_event.return_value = None
-    mock_refresh_like.return_value = None
-    mock_refresh_profile.return_value = None
+    mock_increment_event_likes.return_value = (13, 7)
+    mock_insert_like.return_value = mock_like
+    mock_increment_profile_likes.return_value = 5
 
     # Act
     result = like_service.like_event(mock_db_session, 1, 2)
 
     # Assert
     assert result == mock_like
-    mock_get_like.assert_called_once()
-    mock_get_event_by_id.assert_called_once()
-    mock_get_profile_by_id.assert_called_once()
-    mock_add_like.assert_called_once_with(mock_db_session, mock_like)
+    mock_increment_event_likes.assert_called_once_with(mock_db_session, 2, 1)
+    mock_insert_like.assert_called_once_with(mock_db_session, 1, 2)
+    mock_increment_profile_likes.assert_called_once_with(mock_db_session, 7, 1)
     mock_commit_like.assert_called_once()
-    mock_refresh_event.assert_called_once()
-    mock_refresh_like.assert_called_once()
-    mock_refresh_profile.assert_called_once()
+    mock_rollback_like.assert_not_called()
+    mock_refresh_event_card.assert_not_called()
 
 
-@patch("services.like_service.Like")
 def test_like_event_already_liked(
-    mock_like_model,
     mock_db_session,
     mock_get_like,
-    mock_like
+    mock_like,
+    mock_insert_like,
+    mock_commit_like,
+    mock_rollback_like,
+    mock_increment_event_likes,
+    mock_increment_profile_likes
 ):
     # Arrange
-    mock_like_model.return_value = mock_like
+    mock_increment_event_likes.return_value = (13, 7)
+    mock_insert_like.return_value = None
     mock_get_like.return_value = mock_like
 
     # Act
@@ -153,22 +115,20 @@ def test_like_event_already_liked(
 
     # Assert
     assert result == mock_like
-    mock_get_like.assert_called_once()
+    mock_rollback_like.assert_called_once()
+    mock_increment_profile_likes.assert_not_called()
+    mock_commit_like.assert_not_called()
 
 
-@patch("services.like_service.Like")
 def test_like_event_no_event(
-    mock_like_model,
     mock_db_session,
-    mock_get_like,
-    mock_get_profile_by_id,
-    mock_get_event_by_id,
-    mock_like
+    mock_insert_like,
+    mock_commit_like,
+    mock_rollback_like,
+    mock_increment_event_likes
 ):
     # Arrange
-    mock_like_model.return_value = mock_like
-    mock_get_like.return_value = None
-    mock_get_event_by_id.return_value = None
+    mock_increment_event_likes.return_value = None
 
     # Act
     with pytest.raises(EventNotFound) as result:
@@ -176,26 +136,23 @@ def test_like_event_no_event(
 
     # Assert
     assert str(result.value) == "404: Event not found"
-    mock_get_like.assert_called_once()
-    mock_get_event_by_id.assert_called_once()
-    mock_get_profile_by_id.assert_not_called()
+    mock_insert_like.assert_not_called()
+    mock_commit_like.assert_not_called()
 
 
-@patch("services.like_service.Like")
 def test_like_event_no_profile(
-    mock_like_model,
     mock_db_session,
-    mock_get_like,
-    mock_get_profile_by_id,
-    mock_get_event_by_id,
     mock_like,
-    mock_event
+    mock_insert_like,
+    mock_commit_like,
+    mock_rollback_like,
+    mock_increment_event_likes,
+    mock_increment_profile_likes
 ):
     # Arrange
-    mock_like_model.return_value = mock_like
-    mock_get_like.return_value = None
-    mock_get_event_by_id.return_value = mock_event
-    mock_get_profile_by_id.return_value = None
+    mock_increment_event_likes.return_value = (13, 7)
+    mock_insert_like.return_value = mock_like
+    mock_increment_profile_likes.return_value = None
 
     # Act
     with pytest.raises(ProfileNotFound) as result:
@@ -203,9 +160,8 @@ def test_like_event_no_profile(
 
     # Assert
     assert str(result.value) == "404: Profile not found"
-    mock_get_like.assert_called_once()
-    mock_get_event_by_id.assert_called_once()
-    mock_get_profile_by_id.assert_called_once()
+    mock_rollback_like.assert_called_once()
+    mock_commit_like.assert_not_called()
 
 
 def test_get_like(
@@ -227,37 +183,204 @@ def test_get_like(
 
 def test_unlike_event(
     mock_db_session,
-    mock_get_like,
-    mock_get_profile_by_id,
-    mock_get_event_by_id,
-    mock_event,
-    mock_profile,
-    mock_like,
-    mock_delete_like,
+    mock_delete_like_by_profile_and_event,
     mock_commit_like,
-    mock_refresh_event,
-    mock_refresh_profile
+    mock_rollback_like,
+    mock_increment_event_likes,
+    mock_increment_profile_likes,
+    mock_refresh_event_card
 ):
     # Arrange
-    mock_get_like.return_value = mock_like
-    mock_event.nb_like = 12
-    mock_get_event_by_id.return_value = mock_event
-    mock_profile.nb_like = 4
-    mock_get_profile_by_id.return_value = mock_profile
-    mock_delete_like.return_value = None
-    mock_commit_like.return_value = None
-    mock_refresh_event.return_value = None
-    mock_refresh_profile.return_value = None
+    mock_increment_event_likes.return_value = (11, 7)
+    mock_delete_like_by_profile_and_event.return_value = True
+    mock_increment_profile_likes.return_value = 3
 
     # Act
     result = like_service.unlike_event(mock_db_session, 1, 2)
 
     # Assert
-    assert result == True
-    mock_get_like.assert_called_once()
-    mock_get_event_by_id.assert_called_once()
-    mock_get_profile_by_id.assert_called_once()
-    mock_delete_like.assert_called_once_with(mock_db_session, mock_like)
+    assert result is True
+    mock_increment_event_likes.assert_called_once_with(mock_db_session, 2, -1)
+    mock_delete_like_by_profile_and_event.assert_called_once_with(mock_db_session, 1, 2)
+    mock_increment_profile_likes.assert_called_once_with(mock_db_session, 7, -1)
     mock_commit_like.assert_called_once()
-    mock_refresh_event.assert_called_once()
-    mock_refresh_profile.assert_called_once()
+    mock_rollback_like.assert_not_called()
+    mock_refresh_event_card.assert_not_called()
+
+
+def test_unlike_event_not_liked(
+    mock_db_session,
+    mock_delete_like_by_profile_and_event,
+    mock_commit_like,
+    mock_rollback_like,
+    mock_increment_event_likes,
+    mock_increment_profile_likes
+):
+    # Arrange
+    mock_increment_event_likes.return_value = (11, 7)
+    mock_delete_like_by_profile_and_event.return_value = False
+
+    # Act
+    with pytest.raises(LikeNotFoundError):
+        like_service.unlike_event(mock_db_session, 1, 2)
+
+    # Assert
+    mock_rollback_like.assert_called_once()
+    mock_increment_profile_likes.assert_not_called()
+    mock_commit_like.assert_not_called()
+
+
+def test_like_counters_are_updated_by_the_database(sqlite_db):
+    # Arrange
+    seed_events(sqlite_db, 1, nb_profiles=3)
+
+    # Act
+    like_service.like_event(sqlite_db, 2, 1)
+    like_service.like_event(sqlite_db, 2, 1)
+    like_service.like_event(sqlite_db, 3, 1)
+    like_service.unlike_event(sqlite_db, 3, 1)
+
+    # Assert
+    sqlite_db.expire_all()
+    assert sqlite_db.query(Like).count() == 1
+    assert sqlite_db.get(Event, 1).nb_likes == 1
+    assert sqlite_db.get(Profile, 1).nb_like == 1
+    assert sqlite_db.get(Profile, 3).nb_like == 0
+
+
+def test_reconcile_counters(sqlite_db):
+    # Arrange
+    seed_events(sqlite_db, 2, nb_profiles=2)
+    like_service.like_event(sqlite_db, 2, 1)
+    sqlite_db.get(Event, 1).nb_likes = 40
+    sqlite_db.get(Event, 2).nb_comments = 3
+    sqlite_db.get(Profile, 1).nb_like = None
+    sqlite_db.commit()
+
+    # Act
+    summary = counter_service.reconcile_counters(sqlite_db)
+
+    # Assert
+    assert summary == {"event_likes": 1, "profile_likes": 1, "event_comments": 1, "event_seats": 0}
+    assert sqlite_db.get(Event, 1).nb_likes == 1
+    assert sqlite_db.get(Event, 2).nb_comments == 0
+    assert sqlite_db.get(Profile, 1).nb_like == 1
+    assert counter_service.reconcile_counters(sqlite_db) == {
+        "event_likes": 0, "profile_likes": 0, "event_comments": 0, "event_seats": 0
+    }
+
+
+def test_buffered_likes_are_flushed_in_batches(sqlite_db, memory_counter_buffer):
+    # Arrange
+    seed_events(sqlite_db, 2, nb_profiles=3)
+
+    # Act
+    like_service.like_event(sqlite_db, 2, 1)
+    like_service.like_event(sqlite_db, 2, 1)
+    like_service.like_event(sqlite_db, 3, 1)
+    like_service.like_event(sqlite_db, 3, 2)
+    like_service.unlike_event(sqlite_db, 3, 2)
+
+    # Assert
+    sqlite_db.expire_all()
+    assert sqlite_db.get(Event, 1).nb_likes == 0
+    assert counter_service.get_pending_event_likes([1, 2]) == {1: 2}
+    assert event_controller.get_event_by_id(sqlite_db, 1).nb_likes == 2
+    assert event_controller.get_event_by_id(sqlite_db, 1).profile.nb_like == 2
+
+    summary = counter_service.flush_counters(sqlite_db)
+
+    assert summary == {"event_likes": 1, "profile_likes": 1}
+    assert sqlite_db.get(Event, 1).nb_likes == 2
+    assert sqlite_db.get(Event, 2).nb_likes == 0
+    assert sqlite_db.get(Profile, 1).nb_like == 2
+    assert counter_service.get_pending_event_likes([1]) == {}
+    assert event_controller.get_event_by_id(sqlite_db, 1).nb_likes == 2
+
+
+def test_failed_flush_keeps_the_deltas(memory_counter_buffer):
+    # Arrange
+    counter_buffer.add(counter_buffer.EVENT_LIKES, 1, 3)
+    drained = counter_buffer.drain()
+    counter_buffer.add(counter_buffer.EVENT_LIKES, 1, 1)
+
+    # Act
+    in_flight = counter_buffer.pending(counter_buffer.EVENT_LIKES, [1])
+    counter_buffer.restore()
+
+    # Assert
+    assert drained[counter_buffer.EVENT_LIKES] == {1: 3}
+    assert in_flight == {1: 4}
+    assert counter_buffer.drain()[counter_buffer.EVENT_LIKES] == {1: 4}
+
+
+def test_replayed_flush_is_not_counted_twice(sqlite_db, memory_counter_buffer, mocker):
+    # Arrange
+    seed_events(sqlite_db, 1)
+    counter_buffer.add(counter_buffer.EVENT_LIKES, 1, 2)
+    # the acknowledgement of the first flush is lost, the batch stays in flight
+    mocker.patch.object(counter_buffer, "acknowledge")
+    first = counter_service.flush_counters(sqlite_db)
+    mocker.stopall()
+
+    # Act
+    replayed = counter_service.flush_counters(sqlite_db)
+
+    # Assert
+    assert first == {"event_likes": 1, "profile_likes": 0}
+    assert replayed == {"event_likes": 0, "profile_likes": 0}
+    sqlite_db.expire_all()
+    assert sqlite_db.get(Event, 1).nb_likes == 2
+    assert counter_service.get_pending_event_likes([1]) == {}
+
+
+class StubRedis:
+    """The few redis commands used by the counter buffer, on dicts"""
+
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def renamenx(self, key, new_key):
+        if new_key in self.values:
+            return False
+        self.values[new_key] = self.values.pop(key)
+        return True
+
+    def hincrby(self, key, field, delta):
+        counters = self.values.setdefault(key, {})
+        counters[field.encode()] = str(int(counters.get(field.encode(), 0)) + delta).encode()
+
+    def hgetall(self, key):
+        return dict(self.values.get(key, {}))
+
+
+def test_idle_redis_flush_releases_the_lock(sqlite_db, mocker):
+    # Arrange
+    buffer = counter_buffer.RedisBuffer("redis://localhost:6379/0", "rally:counters:")
+    buffer.client = StubRedis()
+    mocker.patch.object(counter_buffer, "_buffer", buffer)
+
+    # Act
+    idle = counter_service.flush_counters(sqlite_db)
+    buffer.add(counter_buffer.EVENT_LIKES, 1, 1)
+    drained = counter_buffer.drain()
+
+    # Assert
+    assert idle == {"event_likes": 0, "profile_likes": 0}
+    assert drained[counter_buffer.EVENT_LIKES] == {1: 1}
@@ -0,0 +1,110 @@
+import pytest
+
+from models.comment_model import Comment
+from models.event_model import Event
+from models.signaled_comments_model import SignaledComment
+from models.signaled_events_model import SignaledEvent
+from services import bad_words_service, moderation_scan_service
+from enums.moderation_scan_status import ModerationScanStatusEnum
+from errors import ModerationScanNotResumableError
+from tests.unit_tests.controllers.event_controller_test import seed_events
+
+
+@pytest.fixture
+def small_batches(mocker):
+    mocker.patch("services.moderation_scan_service.MODERATION_SCAN_BATCH_SIZE", 2)
+    mocker.patch("services.moderation_scan_service.MODERATION_SCAN_PAUSE_MS", 0)
+
+
+def seed_contents(db):
+    # comments 2 and 4 and event 3 contain banned terms
+    seed_events(db, 3)
+    db.add_all([
+        Comment(content=content, profile_id=1, event_id=1)
+        for content in ["Super soirée", "Quelle m3rde", "À refaire", "fils-de-pute", "Top"]
+    ])
+    db.get(Event, 3).description = "Un concert de merde"
+    db.commit()
+
+
+def test_moderation_scan_signals_banned_contents(sqlite_db, small_batches):
+    # Arrange
+    seed_contents(sqlite_db)
+    moderation_scan = moderation_scan_service.create_moderation_scan(sqlite_db, 1)
+
+    # Act
+    scan_id = moderation_scan_service.process_moderation_scan(sqlite_db)
+    nothing_left = moderation_scan_service.process_moderation_scan(sqlite_db)
+
+    # Assert
+    assert (scan_id, nothing_left) == (moderation_scan.id, None)
+    sqlite_db.refresh(moderation_scan)
+    assert moderation_scan.status == ModerationScanStatusEnum.COMPLETED.value
+    assert (moderation_scan.comments_scanned, moderation_scan.comments_flagged) == (5, 2)
+    assert (moderation_scan.events_scanned, moderation_scan.events_flagged) == (3, 1)
+    assert (moderation_scan.last_comment_id, moderation_scan.last_event_id) == (5, 3)
+    reason = moderation_scan_service.get_scan_reason(sqlite_db)
+    signaled_comments = sqlite_db.query(SignaledComment).order_by(SignaledComment.comment_id).all()
+    assert [signaled.comment_id for signaled in signaled_comments] == [2, 4]
+    assert {(signaled.reason_id, signaled.user_id, signaled.status) for signaled in signaled_comments} == {
+        (reason.id, 1, "pending")
+    }
+    assert [signaled.event_id for signaled in sqlite_db.query(SignaledEvent).all()] == [3]
+
+
+def test_moderation_scan_time_slices_resume_from_checkpoint(sqlite_db, small_batches):
+    # Arrange
+    seed_contents(sqlite_db)
+    moderation_scan = moderation_scan_service.create_moderation_scan(sqlite_db, 1)
+
+    # Act
+    moderation_scan_service.process_moderation_scan(sqlite_db, time_budget=0)
+    sqlite_db.refresh(moderation_scan)
+    checkpoint = (moderation_scan.status, moderation_scan.last_comment_id, moderation_scan.comments_scanned)
+    slices = 1
+    while moderation_scan_service.process_moderation_scan(sqlite_db, time_budget=0):
+        slices += 1
+
+    # Assert
+    # one batch per slice: 3 batches of comments, 2 of events
+    assert checkpoint == (ModerationScanStatusEnum.PENDING.value, 2, 2)
+    assert slices == 5
+    sqlite_db.refresh(moderation_scan)
+    assert moderation_scan.status == ModerationScanStatusEnum.COMPLETED.value
+    assert (moderation_scan.comments_scanned, moderation_scan.events_scanned) == (5, 3)
+    assert sqlite_db.query(SignaledComment).count() == 2
+
+
+def test_failed_moderation_scan_is_resumed(sqlite_db, small_batches, mocker):
+    # Arrange
+    seed_contents(sqlite_db)
+    moderation_scan = moderation_scan_service.create_moderation_scan(sqlite_db, 1)
+    is_content_clean = bad_words_service.is_content_clean
+    calls = []
+
+    def failing_once(content):
+        calls.append(content)
+        if len(calls) == 4:
+            raise RuntimeError("matcher unavailable")
+        return is_content_clean(content)
+
+    mocker.patch("services.bad_words_service.is_content_clean", side_effect=failing_once)
+
+    # Act
+    moderation_scan_service.process_moderation_scan(sqlite_db)
+    sqlite_db.refresh(moderation_scan)
+    failed = (moderation_scan.status, moderation_scan.last_error, moderation_scan.last_comment_id)
+    moderation_scan_service.resume_moderation_scan(sqlite_db, moderation_scan.id)
+    moderation_scan_service.process_moderation_scan(sqlite_db)
+    with pytest.raises(ModerationScanNotResumableError):
+        moderation_scan_service.resume_moderation_scan(sqlite_db, moderation_scan.id)
+
+    # Assert
+    # the first batch (comments 1 and 2) was committed before the failure
+    assert failed == (ModerationScanStatusEnum.FAILED.value, "matcher unavailable", 2)
+    sqlite_db.refresh(moderation_scan)
+    assert moderation_scan.status == ModerationScanStatusEnum.COMPLETED.value
+    assert moderation_scan.comments_scanned == 5
+    # comments 1 and 2 were not checked again
+    assert calls[4:6] == ["À refaire", "fils-de-pute"]
+    assert [signaled.comment_id for signaled in sqlite_db.query(SignaledComment).order_by(SignaledComment.comment_id)] == [2, 4]
@@ -0,0 +1,98 @@
+from datetime import datetime
+
+from models.comment_model import Comment
+from models.event_model import Event
+from models.event_picture_model import EventPicture
+from models.like_model import Like
+from models.profile_model import Profile
+from models.registration_model import Registration
+from models.signaled_comments_model import SignaledComment
+from models.signaled_events_model import SignaledEvent
+from models.signaled_users_model import SignaledUser
+from models.user_model import User
+from services import counter_service, like_service, moderation_service
+from tests.unit_tests.controllers.event_controller_test import seed_events
+
+
+
+def seed_activity(db, nb_events):
+    # profile 1 organizes events 1, 4, 7, ..., profiles 2 and 3 organize the others
+    seed_events(db, nb_events, nb_profiles=3)
+    for event_id in range(1, nb_events + 1):
+        for profile_id in (1, 2, 3):
+            like_service.like_event(db, profile_id, event_id)
+            db.add(Comment(content="super", profile_id=profile_id, event_id=event_id, created_at=datetime.now()))
+            db.add(Registration(profile_id=profile_id, event_id=event_id))
+        db.add(SignaledEvent(event_id=event_id, user_id=2))
+    db.flush()
+    for comment in db.query(Comment).filter(Comment.profile_id == 1).all():
+        db.add(SignaledComment(comment_id=comment.id, user_id=3))
+    db.add(SignaledUser(user_signaled_id=1, user_id=2))
+    db.add(SignaledUser(user_signaled_id=3, user_id=1))
+    db.commit()
+    counter_service.reconcile_counters(db)
+
+
+def count_delete_statements(db, query_counter, nb_events):
+    seed_activity(db, nb_events)
+    with query_counter() as statements:
+        moderation_service.delete_user(db, 1, 1)
+    return len([statement for statement in statements if statement.lstrip().upper().startswith("DELETE")])
+
+
+def test_delete_event(sqlite_db):
+    # Arrange
+    seed_activity(sqlite_db, 3)
+
+    # Act
+    summary = moderation_service.delete_event(sqlite_db, 2, 2)
+
+    # Assert
+    assert summary["events"] == 1
+    assert summary["comments"] == 3
+    assert summary["likes"] == 3
+    assert summary["registrations"] == 3
+    assert summary["signaled_events"] == 1
+    assert summary["signaled_comments"] == 1
+    assert summary["event_pictures"] == 2
+    assert summary["addresses"] == 1
+    assert sqlite_db.get(Event, 2) is None
+    assert sqlite_db.query(EventPicture).filter(EventPicture.event_id == 2).count() == 0
+    assert sqlite_db.get(Profile, 2).nb_like == 0
+    assert sqlite_db.get(Profile, 1).nb_like == 3
+
+
+def test_delete_user(sqlite_db):
+    # Arrange
+    seed_activity(sqlite_db, 3)
+
+    # Act
+    summary = moderation_service.delete_user(sqlite_db, 1, 1)
+
+    # Assert
+    assert summary["events"] == 1
+    assert summary["users"] == 1
+    assert summary["signaled_users"] == 2
+    assert sqlite_db.get(User, 1) is None
+    assert sqlite_db.get(Profile, 1) is None
+    assert sqlite_db.query(Like).filter(Like.profile_id == 1).count() == 0
+    assert sqlite_db.query(Comment).filter(Comment.profile_id == 1).count() == 0
+    assert sqlite_db.query(SignaledComment).count() == 0
+    # the likes and comments of profile 1 on the other events are no longer counted
+    assert sqlite_db.get(Event, 2).nb_likes == 2
+    assert sqlite_db.get(Event, 2).nb_comments == 2
+    assert sqlite_db.get(Profile, 2).nb_like == 2
+    assert sqlite_db.get(Profile, 3).nb_like == 2
+
+
+def test_delete_user_does_not_scale_with_the_number_of_events(sqlite_engine, sqlite_db, query_counter):
+    # Act
+    few = count_delete_statements(sqlite_db, query_counter, 3)
+    sqlite_db.close()
+    for table in reversed(Event.metadata.sorted_tables):
+        with sqlite_engine.begin() as connection:
+            connection.execute(table.delete())
+    many = count_delete_statements(sqlite_db, query_counter, 30)
+
+    # Assert
+    assert few == many
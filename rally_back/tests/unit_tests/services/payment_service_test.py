@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from models.payment_model import Payment
+from services import payment_service
+from enums.export_format import ExportFormatEnum
+from enums.payment_status import PaymentStatusEnum
+
+
+def seed_payments(db, n):
+    # one payment per day of june, every third one failed
+    db.add_all([
+        Payment(
+            event_id=None,
+            event_title=f"Event {index}",
+            buyer_email=f"buyer{index % 2}@rally.fr",
+            organizer_email="organizer@rally.fr",
+            amount=19.0,
+            fee=1.0,
+            brut_amount=20.0,
+            stripe_session_id=f"cs_{index}",
+            status=PaymentStatusEnum.FAILED.value if index % 3 == 0 else PaymentStatusEnum.SUCCESS.value,
+            created_at=datetime(2025, 6, index + 1, 12)
+        )
+        for index in range(n)
+    ])
+    db.commit()
+
+
+def export(db, export_format, **filters):
+    arguments = {
+        "event_title": None, "buyer_email": None, "organizer_email": None, "amount_min": None,
+        "amount_max": None, "fee_min": None, "fee_max": None, "brut_amount_min": None,
+        "brut_amount_max": None, "stripe_session_id": None, "stripe_payment_intent_id": None,
+        "payment_status": None, "date_apres": None, "date_avant": None
+    }
+    arguments.update(filters)
+    return list(payment_service.export_payments(db, *arguments.values(), export_format))
+
+
+def test_export_payments_csv(sqlite_db):
+    # Arrange
+    seed_payments(sqlite_db, 30)
+
+    # Act
+    chunks = export(
+        sqlite_db,
+        ExportFormatEnum.CSV,
+        payment_status=PaymentStatusEnum.SUCCESS.value,
+        date_apres=datetime(2025, 6, 10),
+        buyer_email="buyer0@rally.fr"
+    )
+
+    # Assert
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    # the same filters as the paginated list, newest first
+    assert [row["stripe_session_id"] for row in rows] == ["cs_28", "cs_26", "cs_22", "cs_20", "cs_16", "cs_14", "cs_10"]
+    assert rows[0]["created_at"] == "2025-06-29 12:00:00"
+    assert rows[0]["status"] == "success"
+
+
+def test_export_payments_ndjson_chunks(sqlite_db, mocker):
+    # Arrange
+    seed_payments(sqlite_db, 30)
+    mocker.patch("services.payment_service.PAYMENT_EXPORT_CHUNK_SIZE", 1024)
+    mocker.patch("services.payment_service.PAYMENT_EXPORT_BATCH_SIZE", 7)
+
+    # Act
+    chunks = export(sqlite_db, ExportFormatEnum.NDJSON)
+
+    # Assert
+    # chunks of about 1KB, made of whole lines
+    assert len(chunks) > 5
+    assert all(len(chunk) < 1024 + 512 for chunk in chunks)
+    lines = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert len(lines) == 30
+    assert lines[-1]["stripe_session_id"] == "cs_0"
+    assert lines[-1]["created_at"] == "2025-06-01T12:00:00"
+    assert all(chunk.endswith("\n") for chunk in chunks)
@@ -0,0 +1,74 @@
+import pytest
+from datetime import datetime
+
+from models.event_model import Event
+from models.registration_model import Registration
+from services import registration_service
+from errors import RegistrationNotPossible
+from tests.unit_tests.controllers.event_controller_test import seed_events
+
+
+
+def test_register_for_event_takes_a_seat(sqlite_db):
+    # Arrange
+    seed_events(sqlite_db, 1, nb_profiles=3)
+
+    # Act
+    registration = registration_service.register_for_event(sqlite_db, 2, 1)
+    same_registration = registration_service.register_for_event(sqlite_db, 2, 1)
+
+    # Assert
+    assert registration.id == same_registration.id
+    assert registration_service.get_number_registration_from_event(sqlite_db, 1) == 1
+    assert sqlite_db.query(Registration).count() == 1
+
+
+def test_register_for_event_full(sqlite_db):
+    # Arrange
+    seed_events(sqlite_db, 1, nb_profiles=3)
+    sqlite_db.get(Event, 1).nb_places = 1
+    sqlite_db.commit()
+    registration_service.register_for_event(sqlite_db, 2, 1)
+
+    # Act
+    with pytest.raises(RegistrationNotPossible) as result:
+        registration_service.register_for_event(sqlite_db, 3, 1)
+
+    # Assert
+    assert "complet" in str(result.value)
+    assert registration_service.get_number_registration_from_event(sqlite_db, 1) == 1
+    assert sqlite_db.query(Registration).count() == 1
+
+
+def test_delete_registration_releases_the_seat(sqlite_db):
+    # Arrange
+    seed_events(sqlite_db, 1, nb_profiles=3)
+    sqlite_db.get(Event, 1).nb_places = 1
+    sqlite_db.commit()
+    registration_service.register_for_event(sqlite_db, 2, 1)
+
+    # Act
+    registration_service.delete_registration(sqlite_db, 2, 1)
+    registration = registration_service.register_for_event(sqlite_db, 3, 1)
+
+    # Assert
+    assert registration.profile_id == 3
+    assert registration_service.get_number_registration_from_event(sqlite_db, 1) == 1
+
+
+def test_get_registrations_of_a_day_use_the_registered_at_index(sqlite_db, query_plans):
+    # Arrange
+    seed_events(sqlite_db, 1, nb_profiles=50)
+    sqlite_db.add_all([
+        Registration(profile_id=profile_id, event_id=1, registered_at=datetime(2025, 6, 1 + profile_id % 5, 12, 0))
+        for profile_id in range(1, 51)
+    ])
+    sqlite_db.commit()
+
+    # Act
+    with query_plans() as plans:
+        registrations = registration_service.get_registrations(sqlite_db, datetime(2025, 6, 3, 18, 0), None, None, 0, 50)
+
+    # Assert
+    assert sorted(registration.profile_id for registration in registrations) == list(range(2, 51, 5))
+    assert "USING INDEX ix_registrations_registered_at (registered_at>? AND registered_at<?)" in plans[0]
@@ -0,0 +1,82 @@
+from datetime import date, datetime
+
+from models.payment_model import Payment
+from models.revenue_rollup_model import EventDailyRevenue, OrganizerDailyRevenue
+from services import payment_service, revenue_service
+from enums.payment_status import PaymentStatusEnum
+from tests.unit_tests.controllers.event_controller_test import seed_events
+
+
+def revenues(db, model):
+    return sorted(
+        (row.day, row.status, row.payments_count, row.gross_amount, row.net_amount)
+        for row in db.query(model).all()
+        if row.payments_count
+    )
+
+
+def test_revenues_follow_payment_transitions(sqlite_db):
+    # Arrange
+    # user 1 organizes the events 1 and 3, user 2 buys
+    seed_events(sqlite_db, 3, nb_profiles=2)
+    payments = [
+        payment_service.create_payment(sqlite_db, event_id, 2, 1, 19.0, 1.0, 20.0, f"cs_{event_id}", None)
+        for event_id in (1, 1, 3)
+    ]
+    today = payments[0].created_at.date()
+
+    # Act
+    payment_service.change_payment_status(sqlite_db, PaymentStatusEnum.SUCCESS, payments[0].id, "pi_1")
+    payment_service.change_payment_status(sqlite_db, PaymentStatusEnum.SUCCESS, payments[1].id, "pi_2")
+    # redelivered webhook
+    payment_service.change_payment_status(sqlite_db, PaymentStatusEnum.SUCCESS, payments[1].id, "pi_2")
+    payment_service.change_payment_status(sqlite_db, PaymentStatusEnum.FAILED, payments[2].id, None)
+
+    # Assert
+    assert revenues(sqlite_db, OrganizerDailyRevenue) == [
+        (today, "failed", 1, 20.0, 19.0),
+        (today, "success", 2, 40.0, 38.0),
+    ]
+    event_rows = revenue_service.get_event_revenues(sqlite_db, 1, 1, today, today, PaymentStatusEnum.SUCCESS)
+    assert [(row.event_id, row.payments_count, row.fee_amount) for row in event_rows] == [(1, 2, 2.0)]
+    # the events of another organizer are not readable with its id
+    assert revenue_service.get_event_revenues(sqlite_db, 1, 2, None, None, None) == []
+
+
+def test_rebuild_revenues_matches_transitions(sqlite_db):
+    # Arrange
+    seed_events(sqlite_db, 2, nb_profiles=2)
+    for event_id in (1, 2, 1):
+        payment = payment_service.create_payment(sqlite_db, event_id, 2, event_id, 10.0, 0.5, 10.5, f"cs_{event_id}", None)
+        payment_service.change_payment_status(sqlite_db, PaymentStatusEnum.SUCCESS, payment.id, None)
+    incremental = (revenues(sqlite_db, OrganizerDailyRevenue), revenues(sqlite_db, EventDailyRevenue))
+
+    # Act
+    summary = revenue_service.rebuild_revenues(sqlite_db)
+
+    # Assert
+    assert summary == {"organizers": 2, "events": 2}
+    assert (revenues(sqlite_db, OrganizerDailyRevenue), revenues(sqlite_db, EventDailyRevenue)) == incremental
+
+
+def test_organizer_revenues_date_range(sqlite_db):
+    # Arrange
+    # payments made before the rollups existed, one per day of june
+    seed_events(sqlite_db, 1, nb_profiles=2)
+    sqlite_db.add_all([
+        Payment(
+            event_id=1, event_title="Event 0", buyer_id=2, buyer_email="user1@rally.fr", organizer_id=1,
+            organizer_email="user0@rally.fr", amount=9.5, fee=0.5, brut_amount=10.0, stripe_session_id=f"cs_{day}",
+            status=PaymentStatusEnum.SUCCESS.value, created_at=datetime(2025, 6, day, 23, 59)
+        )
+        for day in range(1, 31)
+    ])
+    sqlite_db.commit()
+    revenue_service.rebuild_revenues(sqlite_db)
+
+    # Act
+    week = revenue_service.get_organizer_revenues(sqlite_db, 1, date(2025, 6, 8), date(2025, 6, 14), None)
+
+    # Assert
+    assert [row.day for row in week] == [date(2025, 6, day) for day in range(8, 15)]
+    assert sum(row.gross_amount for row in week) == 70.0
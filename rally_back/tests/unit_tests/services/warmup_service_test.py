@@ -0,0 +1,58 @@
+from core import templates
+from core.stripe_client import get_stripe
+from services import bad_words_service, warmup_service
+
+
+def test_warm_up_subsystems():
+    # Act
+    warmup_service.warm_up_subsystems()
+
+    # Assert
+    assert get_stripe.cache_info().currsize == 1
+    assert templates.get_environment.cache_info().currsize == 1
+    assert bad_words_service._matcher is not None  # pylint: disable=protected-access
+
+
+def test_warm_up_skips_a_failed_step():
+    # Arrange
+    calls = []
+
+    def failing_step():
+        raise RuntimeError("database unreachable")
+
+    def step():
+        calls.append("step")
+
+    # Act
+    durations = warmup_service.warm_up([failing_step, step])
+
+    # Assert
+    assert calls == ["step"]
+    assert list(durations) == ["failing_step", "step"]
+
+
+def test_start_warm_up_disabled(mocker):
+    # Arrange
+    mocker.patch("services.warmup_service.WARMUP_ON_STARTUP", False)
+    step = mocker.Mock()
+
+    # Act
+    thread = warmup_service.start_warm_up([step])
+
+    # Assert
+    assert thread is None
+    step.assert_not_called()
+
+
+def test_start_warm_up_runs_in_background(mocker):
+    # Arrange
+    mocker.patch("services.warmup_service.WARMUP_ON_STARTUP", True)
+    step = mocker.Mock(__name__="step")
+
+    # Act
+    thread = warmup_service.start_warm_up([step])
+    thread.join(timeout=5)
+
+    # Assert
+    assert thread.daemon
+    step.assert_called_once()
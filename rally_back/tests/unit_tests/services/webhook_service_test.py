@@ -0,0 +1,209 @@
+from datetime import datetime, timedelta
+
+from models.email_job_model import EmailJob
+from models.payment_model import Payment
+from models.registration_model import Registration
+from models.webhook_event_model import WebhookEvent
+from services import registration_service, webhook_service
+from enums.payment_status import PaymentStatusEnum
+from enums.webhook_event_status import WebhookEventStatusEnum
+from errors import PaymentNotFound
+from tests.stripe_replay import load_fixture
+from tests.unit_tests.controllers.event_controller_test import seed_events
+
+
+
+def make_event(stripe_event_id, event_type, object_id, created):
+    return {
+        "id": stripe_event_id,
+        "type": event_type,
+        "created": created,
+        "data": {"object": {"id": object_id}}
+    }
+
+
+def seed_checkout(db):
+    # the checkout session of the fixtures: user 2 pays 20€ for the event 1 of user 1
+    seed_events(db, 1, nb_profiles=2)
+    registration = registration_service.register_for_event(db, 2, 1)
+    db.add(Payment(
+        event_id=1,
+        event_title="Event 0",
+        buyer_id=2,
+        buyer_email="user1@rally.fr",
+        organizer_id=1,
+        organizer_email="user0@rally.fr",
+        amount=19.0,
+        fee=1.0,
+        brut_amount=20.0,
+        stripe_session_id="cs_test_rally_1",
+        status=PaymentStatusEnum.PENDING.value,
+        created_at=datetime.now()
+    ))
+    db.commit()
+    return registration
+
+
+def test_receive_stripe_event_ignores_redeliveries(sqlite_db):
+    # Arrange
+    event = load_fixture("checkout_session_completed")
+
+    # Act
+    received = [webhook_service.receive_stripe_event(sqlite_db, event) for _ in range(3)]
+
+    # Assert
+    assert received == [True, False, False]
+    webhook_event = sqlite_db.query(WebhookEvent).one()
+    assert webhook_event.stripe_event_id == "evt_test_checkout_completed"
+    assert webhook_event.object_id == "cs_test_rally_1"
+    assert webhook_event.status == WebhookEventStatusEnum.PENDING.value
+
+
+def test_process_webhook_events_in_stripe_order(sqlite_db, mocker):
+    # Arrange
+    handled = []
+    mocker.patch(
+        "services.webhook_service.payment_service.handle_stripe_webhook_event",
+        side_effect=lambda event, db: handled.append(event["id"])
+    )
+    webhook_service.receive_stripe_event(sqlite_db, make_event("evt_3", "checkout.session.completed", "cs_a", 30))
+    webhook_service.receive_stripe_event(sqlite_db, make_event("evt_1", "checkout.session.async_payment_pending", "cs_a", 10))
+    webhook_service.receive_stripe_event(sqlite_db, make_event("evt_2", "account.updated", "acct_a", 20))
+
+    # Act
+    summaries = [webhook_service.process_webhook_events(sqlite_db) for _ in range(3)]
+
+    # Assert
+    assert handled == ["evt_1", "evt_2", "evt_3"]
+    assert summaries == [{"processed": 2, "failed": 0}, {"processed": 1, "failed": 0}, {"processed": 0, "failed": 0}]
+    assert webhook_service.webhook_event_repo.count_webhook_events_by_status(
+        sqlite_db, WebhookEventStatusEnum.PROCESSED
+    ) == 3
+
+
+def test_failed_event_is_retried_and_blocks_its_object(sqlite_db, mocker):
+    # Arrange
+    handled = []
+
+    def handle(event, db):
+        if event["id"] == "evt_1" and not handled:
+            handled.append("evt_1 failed")
+            raise PaymentNotFound(status_code=404, detail="Payment not found")
+        handled.append(event["id"])
+
+    mocker.patch("services.webhook_service.payment_service.handle_stripe_webhook_event", side_effect=handle)
+    webhook_service.receive_stripe_event(sqlite_db, make_event("evt_1", "checkout.session.completed", "cs_a", 10))
+    webhook_service.receive_stripe_event(sqlite_db, make_event("evt_2", "checkout.session.expired", "cs_a", 20))
+    webhook_service.receive_stripe_event(sqlite_db, make_event("evt_3", "checkout.session.completed", "cs_b", 30))
+
+    # Act
+    first = webhook_service.process_webhook_events(sqlite_db)
+    blocked = webhook_service.process_webhook_events(sqlite_db)
+    failed = sqlite_db.query(WebhookEvent).filter(WebhookEvent.stripe_event_id == "evt_1").one()
+    failed.next_attempt_at = datetime.now() - timedelta(seconds=1)
+    sqlite_db.commit()
+    retried = webhook_service.process_webhook_events(sqlite_db)
+    last = webhook_service.process_webhook_events(sqlite_db)
+
+    # Assert
+    assert first == {"processed": 1, "failed": 1}
+    assert blocked == {"processed": 0, "failed": 0}
+    assert retried == {"processed": 1, "failed": 0}
+    assert last == {"processed": 1, "failed": 0}
+    assert handled == ["evt_1 failed", "evt_3", "evt_1", "evt_2"]
+    sqlite_db.refresh(failed)
+    assert failed.status == WebhookEventStatusEnum.PROCESSED.value
+    assert failed.attempts == 2
+
+
+def test_event_failing_for_good(sqlite_db, mocker):
+    # Arrange
+    mocker.patch(
+        "services.webhook_service.payment_service.handle_stripe_webhook_event",
+        side_effect=PaymentNotFound(status_code=404, detail="Payment not found")
+    )
+    mocker.patch("services.webhook_service.WEBHOOK_MAX_ATTEMPTS", 2)
+    webhook_service.receive_stripe_event(sqlite_db, make_event("evt_1", "checkout.session.completed", "cs_a", 10))
+
+    # Act
+    for _ in range(2):
+        webhook_service.process_webhook_events(sqlite_db)
+        sqlite_db.query(WebhookEvent).update({WebhookEvent.next_attempt_at: datetime.now() - timedelta(seconds=1)})
+        sqlite_db.commit()
+
+    # Assert
+    webhook_event = sqlite_db.query(WebhookEvent).one()
+    assert webhook_event.status == WebhookEventStatusEnum.FAILED.value
+    assert webhook_event.last_error == "Payment not found"
+    assert webhook_service.process_webhook_events(sqlite_db) == {"processed": 0, "failed": 0}
+
+
+def test_replayed_checkout_updates_the_payment_once(sqlite_db):
+    # Arrange
+    registration = seed_checkout(sqlite_db)
+    for name in ["checkout_session_completed", "account_updated", "checkout_session_completed"]:
+        webhook_service.receive_stripe_event(sqlite_db, load_fixture(name))
+
+    # Act
+    summary = webhook_service.process_webhook_events(sqlite_db)
+    summary_next = webhook_service.process_webhook_events(sqlite_db)
+
+    # Assert
+    assert summary == {"processed": 2, "failed": 0}
+    assert summary_next == {"processed": 0, "failed": 0}
+    payment = sqlite_db.query(Payment).one()
+    assert payment.status == PaymentStatusEnum.SUCCESS.value
+    assert payment.stripe_payment_intent_id == "pi_test_rally_1"
+    assert sqlite_db.get(Registration, registration.id).payment_status == PaymentStatusEnum.SUCCESS.value
+    # the invoice and the receipt, once
+    assert sqlite_db.query(EmailJob).count() == 2
+
+
+def test_replayed_expired_checkout_frees_the_seat(sqlite_db):
+    # Arrange
+    seed_checkout(sqlite_db)
+    webhook_service.receive_stripe_event(sqlite_db, load_fixture("checkout_session_expired"))
+
+    # Act
+    summary = webhook_service.process_webhook_events(sqlite_db)
+
+    # Assert
+    assert summary == {"processed": 1, "failed": 0}
+    assert sqlite_db.query(Payment).one().status == PaymentStatusEnum.FAILED.value
+    assert sqlite_db.query(Registration).count() == 0
+    assert registration_service.get_number_registration_from_event(sqlite_db, 1) == 0
+
+
+def test_failed_checkout_is_rolled_back_and_retried_once(sqlite_db, mocker):
+    # Arrange
+    registration = seed_checkout(sqlite_db)
+    webhook_service.receive_stripe_event(sqlite_db, load_fixture("checkout_session_completed"))
+    send_email = webhook_service.payment_service.email_service.send_email
+    sent = []
+
+    def send_receipt_fails_once(*args, **kwargs):
+        sent.append(args[2])
+        if len(sent) == 2:
+            raise RuntimeError("smtp template error")
+        return send_email(*args, **kwargs)
+
+    mocker.patch("services.payment_service.email_service.send_email", side_effect=send_receipt_fails_once)
+
+    # Act
+    failed = webhook_service.process_webhook_events(sqlite_db)
+    payment_status = sqlite_db.query(Payment).one().status
+    registration_status = sqlite_db.get(Registration, registration.id).payment_status
+    email_jobs = sqlite_db.query(EmailJob).count()
+    sqlite_db.query(WebhookEvent).update({WebhookEvent.next_attempt_at: datetime.now() - timedelta(seconds=1)})
+    sqlite_db.commit()
+    retried = webhook_service.process_webhook_events(sqlite_db)
+
+    # Assert
+    assert failed == {"processed": 0, "failed": 1}
+    assert payment_status == PaymentStatusEnum.PENDING.value
+    assert registration_status != PaymentStatusEnum.SUCCESS.value
+    assert email_jobs == 0
+    assert retried == {"processed": 1, "failed": 0}
+    assert sqlite_db.query(Payment).one().status == PaymentStatusEnum.SUCCESS.value
+    # the invoice and the receipt, once
+    assert sqlite_db.query(EmailJob).count() == 2
@@ -0,0 +1,13 @@
+"""
+This file contains the webhook worker process, it processes the Stripe webhooks of the inbox: python webhook_worker.py
+"""
+import logging
+from services import webhook_service
+
+logging.basicConfig(level=logging.INFO)
+
+if __name__ == "__main__":
+    try:
+        webhook_service.webhook_worker.run_forever()
+    finally:
+        webhook_service.stop_webhook_worker()